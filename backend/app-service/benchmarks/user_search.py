@@ -0,0 +1,85 @@
+"""Benchmark the in-memory battle tag search index on a synthetic corpus.
+
+Usage (from app-service/):
+    PYTHONPATH=.. python -m benchmarks.user_search --size 100000 --queries 5000
+"""
+
+import argparse
+import random
+import statistics
+import string
+import time
+
+from src.services.user.search import BattleTagEntry, BattleTagSearchIndex
+
+CONSONANTS = "bcdfghjklmnprstvwxz"
+VOWELS = "aeiouy"
+SYLLABLES = [c + v for c in CONSONANTS for v in VOWELS] + [v + c for v in VOWELS for c in "lnrsx"]
+
+
+def make_corpus(size: int, rng: random.Random) -> list[BattleTagEntry]:
+    seen: set[str] = set()
+    entries: list[BattleTagEntry] = []
+    while len(entries) < size:
+        name = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).capitalize()
+        if rng.random() < 0.3:
+            name += rng.choice(string.digits) * rng.randint(1, 2)
+        battle_tag = f"{name}#{rng.randint(1000, 99999)}"
+        if battle_tag in seen:
+            continue
+        seen.add(battle_tag)
+        entries.append(BattleTagEntry(user_id=len(entries) + 1, battle_tag=battle_tag, name=name))
+    return entries
+
+
+def make_queries(entries: list[BattleTagEntry], count: int, rng: random.Random) -> list[str]:
+    """Keystroke-like queries: prefixes, inner substrings, typos and full tags."""
+    queries = []
+    for _ in range(count):
+        tag = rng.choice(entries).battle_tag
+        kind = rng.random()
+        if kind < 0.4:
+            queries.append(tag[: rng.randint(2, len(tag))])
+        elif kind < 0.6:
+            start = rng.randint(0, max(len(tag) - 4, 0))
+            queries.append(tag[start : start + rng.randint(3, 6)])
+        elif kind < 0.8:
+            chars = list(tag.split("#")[0])
+            chars[rng.randrange(len(chars))] = rng.choice(string.ascii_lowercase)
+            queries.append("".join(chars))
+        else:
+            queries.append(tag.replace("#", "-"))
+    return queries
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=5_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    entries = make_corpus(args.size, rng)
+    queries = make_queries(entries, args.queries, rng)
+
+    started = time.perf_counter()
+    index = BattleTagSearchIndex(entries)
+    print(f"built index over {len(index)} tags in {time.perf_counter() - started:.2f}s")
+
+    timings = []
+    for query in queries:
+        started = time.perf_counter()
+        index.search(query)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    timings.sort()
+    p = lambda q: timings[min(int(len(timings) * q), len(timings) - 1)]  # noqa: E731
+    print(
+        f"{len(timings)} queries: mean={statistics.fmean(timings):.3f}ms "
+        f"p50={p(0.50):.3f}ms p95={p(0.95):.3f}ms p99={p(0.99):.3f}ms max={timings[-1]:.3f}ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,4 @@
+import asyncio
 from contextlib import asynccontextmanager
 from datetime import datetime, UTC
 
@@ -7,7 +8,7 @@ from cashews.contrib.fastapi import (
     CacheEtagMiddleware,
     CacheRequestControlMiddleware,
 )
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
 from fastapi.encoders import jsonable_encoder
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
@@ -21,14 +22,19 @@ from shared.clients import AuthClient
 from shared.observability import (
     setup_logging,
     CorrelationIdMiddleware,
+    QueryBudgetMiddleware,
     TimeMiddleware,
     setup_tracing,
     instrument_fastapi,
+    instrument_query_counter,
+    profiling_router,
     check_postgres,
     check_redis,
 )
 from src.routes import router
-from src.core import config, db
+from src.core import auth, config, db
+from src.services.standings import tasks as standings_tasks
+from src.services.user import tasks as user_tasks
 from src.middlewares.exception import ExceptionMiddleware
 from starlette.requests import Request
 
@@ -44,6 +50,9 @@ logger = setup_logging(
 auth_client = AuthClient(
     base_url=config.settings.auth_service_url,
     timeout=config.settings.auth_service_timeout,
+    local_validation=config.settings.auth_local_validation,
+    rbac_cache_ttl=config.settings.auth_rbac_cache_ttl,
+    redis_url=str(config.settings.redis_url),
 )
 
 
@@ -71,7 +80,18 @@ async def lifespan(_: FastAPI):
     logger.info("Application... Online!")
     await cache.delete_match("fastapi:*")
     await cache.delete_match("backend:*")
+
+    background_tasks: list[asyncio.Task] = []
+    if config.settings.profile_refresh_enabled:
+        background_tasks.append(asyncio.create_task(user_tasks.run_profile_refresher()))
+    if config.settings.user_search_index_enabled:
+        background_tasks.append(asyncio.create_task(user_tasks.run_search_index_refresher()))
+    background_tasks.append(asyncio.create_task(standings_tasks.run_standings_listener()))
+
     yield
+
+    for task in background_tasks:
+        task.cancel()
     await auth_client.close()  # Close connection pool
 
 
@@ -98,10 +118,15 @@ app.state.auth_client = auth_client
 # Instrument FastAPI for OpenTelemetry tracing
 instrument_fastapi(app)
 
+# Count SQL statements per request (see QueryBudgetMiddleware)
+instrument_query_counter(db.async_engine)
+
 # Expose Prometheus /metrics endpoint
 Instrumentator().instrument(app).expose(app)
 
 app.include_router(router)
+if config.settings.profiling_enabled:
+    app.include_router(profiling_router(dependencies=[Depends(auth.require_role("admin"))]))
 app.add_middleware(CacheDeleteMiddleware)
 app.add_middleware(CacheEtagMiddleware)
 app.add_middleware(CacheRequestControlMiddleware)
@@ -115,6 +140,12 @@ app.add_middleware(
 
 # Observability middleware (order matters: last added = first executed)
 app.add_middleware(ExceptionMiddleware)  # Innermost
+app.add_middleware(
+    QueryBudgetMiddleware,
+    budget=config.settings.query_budget,
+    n_plus_one_threshold=config.settings.query_budget_n_plus_one_threshold,
+    strict=config.settings.query_budget_strict,
+)  # Counts statements of handled errors too
 app.add_middleware(TimeMiddleware)  # Middle - logs request time
 app.add_middleware(CorrelationIdMiddleware)  # Outermost - sets correlation ID first
 
@@ -27,6 +27,9 @@ class Settings(BaseSettings):
     auth_service_url: str = "http://auth:8001"
     auth_service_timeout: float = 5.0
     auth_service_max_retries: int = 2
+    # Verify access tokens against the auth-service JWKS; RBAC cached per user
+    auth_local_validation: bool = True
+    auth_rbac_cache_ttl: float = 60.0
 
     # Circuit Breaker
     circuit_breaker_failure_threshold: int = 5
@@ -45,6 +48,11 @@ class Settings(BaseSettings):
     otlp_endpoint: str | None = None  # e.g., "http://jaeger:4317"
     tracing_enabled: bool = False
     json_logging: bool = True  # True for production JSON logs
+    profiling_enabled: bool = False  # Admin-only POST /debug/profile sampling profiler
+    # SQL statements per request before it is logged; strict mode raises instead (enabled in tests)
+    query_budget: int = 50
+    query_budget_n_plus_one_threshold: int = 20
+    query_budget_strict: bool = False
 
     # Postgres
     postgres_user: str
@@ -65,6 +73,17 @@ class Settings(BaseSettings):
     encounters_cache_ttl: int = 60 * 5
     achievements_cache_ttl: int = 60 * 5
 
+    # Materialized user profiles
+    profile_refresh_enabled: bool = True
+    profile_refresh_interval: float = 5.0
+    profile_refresh_batch_size: int = 50
+    # Seconds before a claimed snapshot whose rebuild did not finish is retried
+    profile_refresh_lease: float = 300.0
+
+    # In-memory battle tag search index
+    user_search_index_enabled: bool = True
+    user_search_index_refresh_interval: float = 30.0
+
     @property
     def db_url_asyncpg(self):
         url = (
@@ -1,4 +1,10 @@
+import base64
+import binascii
+import datetime
+import decimal
+import json
 import typing
+from collections.abc import Callable, Sequence
 from dataclasses import dataclass, field
 from enum import Enum
 from typing import Any, Generic, TypedDict, TypeVar
@@ -7,6 +13,8 @@ import sqlalchemy as sa
 from fastapi import Query
 from pydantic import BaseModel, Field
 from sqlalchemy import UnaryExpression
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import InstrumentedAttribute
 
 from . import db, errors
@@ -14,8 +22,11 @@ from . import db, errors
 __all__ = (
     "Paginated",
     "PaginationSortQueryParams",
+    "KeysetPaginationSortQueryParams",
+    "KeysetPaginationSortSearchQueryParams",
     "PaginationDict",
     "SortOrder",
+    "CountMode",
 )
 
 
@@ -34,8 +45,9 @@ class PaginationDict(TypedDict, Generic[ModelType]):
 class Paginated(BaseModel, Generic[SchemaType]):
     page: int
     per_page: int
-    total: int
+    total: int | None
     results: list[SchemaType]
+    next_cursor: str | None = None
 
 
 class SortOrder(Enum):
@@ -43,6 +55,84 @@ class SortOrder(Enum):
     DESC = "desc"
 
 
+class CountMode(Enum):
+    EXACT = "exact"
+    ESTIMATE = "estimate"
+    NONE = "none"
+
+
+def _invalid_cursor(msg: str = "Invalid cursor") -> errors.ApiHTTPException:
+    return errors.ApiHTTPException(
+        status_code=400,
+        detail=[errors.ApiExc(code="invalid_cursor", msg=msg)],
+    )
+
+
+def encode_cursor(sort: str, order: str, value: Any, id: int) -> str:
+    if isinstance(value, Enum):
+        value = value.name
+    elif isinstance(value, (datetime.date, datetime.time)):
+        value = value.isoformat()
+    payload = json.dumps({"s": sort, "o": order, "v": value, "id": id}, separators=(",", ":"), default=str)
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> dict[str, Any]:
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (binascii.Error, ValueError) as e:
+        raise _invalid_cursor() from e
+    if not isinstance(payload, dict) or not {"s", "o", "v", "id"} <= payload.keys():
+        raise _invalid_cursor()
+    return payload
+
+
+def decode_cursor_value(sort_column: sa.ColumnElement, value: Any) -> Any:
+    """Converts a cursor's sort value back to the Python type of `sort_column`."""
+    if value is None:
+        return None
+    enum_class = getattr(sort_column.type, "enum_class", None)
+    if enum_class is not None:
+        try:
+            return enum_class[value]
+        except KeyError as e:
+            raise _invalid_cursor() from e
+
+    try:
+        python_type = sort_column.type.python_type
+    except NotImplementedError:
+        return value
+    try:
+        if issubclass(python_type, (datetime.date, datetime.time)):
+            return python_type.fromisoformat(value)
+        if not isinstance(value, python_type):
+            return python_type(value)
+    except (TypeError, ValueError, decimal.InvalidOperation) as e:
+        raise _invalid_cursor() from e
+    return value
+
+
+async def estimate_count(session: AsyncSession, query: sa.Select) -> int:
+    """Row estimate from the planner instead of running `count(*)`.
+
+    Args:
+        session: An SQLAlchemy `AsyncSession` for database interaction.
+        query: The filtered, unpaginated row query.
+
+    Returns:
+        The planner's estimate of rows the query would return.
+    """
+    sql = query.order_by(None).limit(None).offset(None).compile(
+        dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+    )
+    connection = await session.connection()
+    result = await connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}")
+    plan = result.scalar_one()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
 def apply_search(
     model: type[db.Base], query: sa.Select, query_str: str, fields: list[str]
 ) -> sa.Select:
@@ -62,6 +152,22 @@ class PaginationSortQueryParams(PaginationQueryParams, Generic[SortType]):
     order: SortOrder = SortOrder.ASC
 
 
+class KeysetQueryParams(BaseModel):
+    cursor: str | None = Field(
+        default=None,
+        description="Opaque keyset cursor (`next_cursor` of the previous page). "
+        "Pass an empty value to request the first page in cursor mode; `page` is ignored then.",
+    )
+    count: CountMode = Field(
+        default=CountMode.EXACT,
+        description="How `total` is computed: exact `count(*)`, planner estimate, or not at all.",
+    )
+
+
+class KeysetPaginationSortQueryParams(PaginationSortQueryParams[SortType], KeysetQueryParams, Generic[SortType]):
+    """Sort query params of the lists that also support keyset pagination and optional totals."""
+
+
 @dataclass
 class PaginationParams:
     page: int = 1
@@ -89,6 +195,113 @@ class PaginationParams:
 class PaginationSortParams(PaginationParams):
     sort: str = "id"
     order: SortOrder | typing.Literal["asc", "desc"] = SortOrder.ASC
+    cursor: str | None = None
+    count: CountMode = CountMode.EXACT
+
+    @property
+    def is_keyset(self) -> bool:
+        return self.cursor is not None
+
+    @property
+    def _order_value(self) -> str:
+        return self.order.value if isinstance(self.order, SortOrder) else self.order
+
+    def keyset_sort_column(
+        self, model: type[db.Base], extra: dict[str, sa.ColumnElement] | None = None
+    ) -> sa.ColumnElement:
+        """Resolves the sort key for keyset pagination (plain columns or `extra` expressions only)."""
+        if extra and self.sort in extra:
+            return extra[self.sort]
+        if "." in self.sort or ":" in self.sort:
+            raise errors.ApiHTTPException(
+                status_code=400,
+                detail=[
+                    errors.ApiExc(
+                        code="invalid_sort",
+                        msg=f"Sorting by {self.sort} is not supported with cursor pagination.",
+                    )
+                ],
+            )
+        return model.get_column(self.sort)
+
+    def apply_keyset(self, query: sa.Select, sort_column: sa.ColumnElement, id_column: sa.ColumnElement) -> sa.Select:
+        """Orders by (sort_column, id_column), seeks past the cursor and fetches one extra row.
+
+        NULL sort values follow PostgreSQL's defaults: last when ascending, first when descending.
+        """
+        descending = self._order_value == "desc"
+        if descending:
+            query = query.order_by(sort_column.desc(), id_column.desc())
+        else:
+            query = query.order_by(sort_column.asc(), id_column.asc())
+
+        if self.cursor:
+            cursor = decode_cursor(self.cursor)
+            if cursor["s"] != self.sort or cursor["o"] != self._order_value:
+                raise _invalid_cursor("Cursor was issued for a different sort order")
+
+            value, last_id = decode_cursor_value(sort_column, cursor["v"]), cursor["id"]
+
+            if descending:
+                if value is None:
+                    query = query.where(sa.or_(sort_column.is_not(None), id_column < last_id))
+                else:
+                    query = query.where(
+                        sa.or_(sort_column < value, sa.and_(sort_column == value, id_column < last_id))
+                    )
+            else:
+                if value is None:
+                    query = query.where(sa.and_(sort_column.is_(None), id_column > last_id))
+                else:
+                    query = query.where(
+                        sa.or_(
+                            sort_column > value,
+                            sa.and_(sort_column == value, id_column > last_id),
+                            sort_column.is_(None),
+                        )
+                    )
+
+        if self.per_page == -1:
+            return query
+        return query.limit(self.per_page + 1)
+
+    def keyset_page(
+        self, rows: Sequence[Any], key: Callable[[Any], tuple[Any, int]]
+    ) -> tuple[list[Any], str | None]:
+        """Trims the extra row fetched by `apply_keyset` and builds the next cursor.
+
+        Args:
+            rows: Rows returned by a query built with `apply_keyset`.
+            key: Returns the (sort value, id) pair of a row.
+
+        Returns:
+            The page rows and the cursor for the next page (None on the last page).
+        """
+        if self.per_page == -1 or len(rows) <= self.per_page:
+            return list(rows), None
+        rows = list(rows[: self.per_page])
+        value, last_id = key(rows[-1])
+        return rows, encode_cursor(self.sort, self._order_value, value, last_id)
+
+    async def fetch_total(
+        self, session: AsyncSession, total_query: sa.Select, estimate_query: sa.Select | None = None
+    ) -> int | None:
+        """Computes `total` according to `count`.
+
+        Args:
+            session: An SQLAlchemy `AsyncSession` for database interaction.
+            total_query: The exact `count(...)` query.
+            estimate_query: Filtered row query to estimate; required for `CountMode.ESTIMATE`.
+
+        Returns:
+            The total, or None when counting was not requested.
+        """
+        if self.count == CountMode.NONE:
+            return None
+        if self.count == CountMode.ESTIMATE and estimate_query is not None:
+            return await estimate_count(session, estimate_query)
+        result = await session.execute(total_query)
+        return result.scalar_one()
 
     def apply_sort(
         self, query: sa.Select, model: type[db.Base] | None = None
@@ -129,6 +342,10 @@ class PaginationSortSearchQueryParams(PaginationSortQueryParams):
         return apply_search(model, query, self.query, self.fields)
 
 
+class KeysetPaginationSortSearchQueryParams(PaginationSortSearchQueryParams, KeysetQueryParams):
+    """Search query params of the lists that also support keyset pagination and optional totals."""
+
+
 @dataclass
 class PaginationSortSearchParams(PaginationSortParams):
     query: str = ""
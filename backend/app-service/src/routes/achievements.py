@@ -25,7 +25,7 @@ router = APIRouter(prefix="/achievements", tags=[enums.RouteTag.ACHIEVEMENTS])
 )
 async def get_all(
     session: AsyncSession = Depends(db.get_async_session),
-    params: pagination.PaginationSortQueryParams[
+    params: pagination.KeysetPaginationSortQueryParams[
         typing.Literal["id", "name", "slug", "rarity", "similarity:name", "similarity:slug"]
     ] = Depends(),
 ):
@@ -29,6 +29,7 @@ async def get_all_matches(
             "encounter_id",
             "map_id",
             "log_name",
+            "created_at",
         ]
     ] = Depends(),
 ):
@@ -2,7 +2,7 @@ import typing
 
 from cashews import cache
 from cashews.contrib.fastapi import cache_control_ttl
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from starlette.requests import Request
 
@@ -23,7 +23,9 @@ router = APIRouter(prefix="/users", tags=[enums.RouteTag.USER])
     summary="Search for users",
 )
 async def get_all(
-    params: pagination.PaginationSortSearchQueryParams[typing.Literal["id", "name", "similarity:name"]] = Depends(),
+    params: pagination.KeysetPaginationSortSearchQueryParams[
+        typing.Literal["id", "name", "similarity:name"]
+    ] = Depends(),
     session=Depends(db.get_async_session),
 ):
     return await user_flows.get_all(session, pagination.PaginationSortSearchParams.from_query_params(params))
@@ -118,8 +120,10 @@ async def get_by_name(
     ttl=cache_control_ttl(default=config.settings.users_cache_ttl),
     key="fastapi:{request.url.path}",
 )
-async def get_profile(request: Request, id: int, session=Depends(db.get_async_session)):
-    profile = await user_flows.get_profile(session, id)
+async def get_profile(
+    request: Request, id: int, background_tasks: BackgroundTasks, session=Depends(db.get_async_session)
+):
+    profile = await user_flows.get_profile(session, id, background_tasks)
     return profile
 
 
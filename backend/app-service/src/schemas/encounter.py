@@ -85,7 +85,7 @@ class EncounterSearchParams(pagination.PaginationSortSearchParams):
         return query.where(sa.or_(*criteria))
 
 
-class EncounterSearchQueryParams(pagination.PaginationSortSearchQueryParams):
+class EncounterSearchQueryParams(pagination.KeysetPaginationSortSearchQueryParams):
     tournament_id: int | None = None
 
 
@@ -106,7 +106,7 @@ class MatchSearchParams(pagination.PaginationSortSearchParams):
         return query.where(sa.or_(*criteria))
 
 
-class MatchSearchQueryParams(pagination.PaginationSortSearchQueryParams):
+class MatchSearchQueryParams(pagination.KeysetPaginationSortSearchQueryParams):
     tournament_id: int | None = None
     home_team_id: int | None = None
     away_team_id: int | None = None
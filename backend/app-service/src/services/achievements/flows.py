@@ -131,12 +131,13 @@ async def get_all(
     Returns:
         pagination.Paginated[schemas.AchievementRead]: A paginated list of Pydantic schemas representing the achievements.
     """
-    achievements, total = await service.get_all(session, params)
+    achievements, total, next_cursor = await service.get_all(session, params)
     return pagination.Paginated(
         total=total,
         per_page=params.per_page,
         page=params.page,
         results=await bulk_to_pydantic(session, achievements, params.entities),
+        next_cursor=next_cursor,
     )
 
 
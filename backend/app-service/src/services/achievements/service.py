@@ -78,7 +78,7 @@ async def get(session: AsyncSession, id: int, entities: list[str]) -> tuple[mode
 
 async def get_all(
     session: AsyncSession, params: pagination.PaginationSortParams
-) -> tuple[typing.Sequence[tuple[models.Achievement, float]], int]:
+) -> tuple[typing.Sequence[tuple[models.Achievement, float]], int | None, str | None]:
     """
     Retrieves a paginated list of all achievements along with their rarity and the total count of achievements.
 
@@ -87,9 +87,10 @@ async def get_all(
         params (pagination.PaginationSortParams): Pagination and sorting parameters.
 
     Returns:
-        tuple[typing.Sequence[tuple[models.Achievement, float]], int]: A tuple containing:
+        tuple[typing.Sequence[tuple[models.Achievement, float]], int | None, str | None]: A tuple containing:
             - A list of tuples, each containing an Achievement object and its rarity.
-            - The total count of achievements.
+            - The total count of achievements (None if not requested).
+            - The cursor of the next page (keyset pagination only).
     """
     count_query = sa.select(sa.func.count(models.Achievement.id))
     rarity_subq = get_rarity_subq()
@@ -98,10 +99,24 @@ async def get_all(
         .options(*achievement_entity(params.entities))
         .join(rarity_subq, models.Achievement.id == rarity_subq.c.achievement_id)
     )
-    query = params.apply_pagination_sort(query)
-    count = await session.execute(count_query)
-    results = await session.execute(query)
-    return results.all(), count.scalar()  # type: ignore
+    if params.is_keyset:
+        sort_column = params.keyset_sort_column(models.Achievement, {"rarity": rarity_subq.c.rarity})
+        query = params.apply_keyset(query, sort_column, models.Achievement.id)
+    else:
+        query = params.apply_pagination_sort(query)
+
+    results = (await session.execute(query)).all()
+    total = await params.fetch_total(session, count_query, sa.select(models.Achievement.id))
+    next_cursor = None
+    if params.is_keyset:
+
+        def keyset_key(row: tuple[models.Achievement, float]) -> tuple[typing.Any, int]:
+            achievement, rarity = row
+            value = rarity if params.sort == "rarity" else getattr(achievement, sort_column.key)
+            return value, achievement.id
+
+        results, next_cursor = params.keyset_page(results, keyset_key)
+    return results, total, next_cursor  # type: ignore
 
 
 async def get_count_users_achievements(session: AsyncSession, achievements_ids: list[int]) -> dict[int, int]:
@@ -158,7 +158,7 @@ async def get_all_encounters(
     Returns:
         pagination.Paginated[schemas.EncounterRead]: A paginated list of Pydantic schemas representing the encounters.
     """
-    encounters, total = await service.get_all_encounters(session, params)
+    encounters, total, next_cursor = await service.get_all_encounters(session, params)
     return pagination.Paginated(
         total=total,
         per_page=params.per_page,
@@ -167,6 +167,7 @@ async def get_all_encounters(
             await to_pydantic(session, encounter, params.entities)
             for encounter in encounters
         ],
+        next_cursor=next_cursor,
     )
 
 
@@ -183,7 +184,7 @@ async def get_all_matches(
     Returns:
         pagination.Paginated[schemas.MatchRead]: A paginated list of Pydantic schemas representing the matches.
     """
-    matches, total = await service.get_all_matches(session, params)
+    matches, total, next_cursor = await service.get_all_matches(session, params)
     return pagination.Paginated(
         total=total,
         per_page=params.per_page,
@@ -192,6 +193,7 @@ async def get_all_matches(
             await to_pydantic_match(session, match, params.entities)
             for match in matches
         ],
+        next_cursor=next_cursor,
     )
 
 
@@ -430,7 +430,7 @@ async def get_encounter(
 
 async def get_all_encounters(
     session: AsyncSession, params: schemas.EncounterSearchParams
-) -> tuple[typing.Sequence[models.Encounter], int]:
+) -> tuple[typing.Sequence[models.Encounter], int | None, str | None]:
     """
     Retrieves a paginated list of encounters based on search parameters.
 
@@ -439,9 +439,10 @@ async def get_all_encounters(
         params (schemas.EncounterSearchParams): Search, pagination, and sorting parameters.
 
     Returns:
-        tuple[typing.Sequence[models.Encounter], int]: A tuple containing:
+        tuple[typing.Sequence[models.Encounter], int | None, str | None]: A tuple containing:
             - A sequence of Encounter objects.
-            - The total count of encounters.
+            - The total count of encounters (None if not requested).
+            - The cursor of the next page (keyset pagination only).
     """
     query = sa.select(models.Encounter).options(*encounter_entities(params.entities))
     total_query = sa.select(sa.func.count(models.Encounter.id))
@@ -455,11 +456,22 @@ async def get_all_encounters(
         query = query.where(sa.and_(models.Encounter.tournament_id == params.tournament_id))
         total_query = total_query.where(sa.and_(models.Encounter.tournament_id == params.tournament_id))
 
-    query = params.apply_pagination_sort(query)
+    estimate_query = total_query.with_only_columns(models.Encounter.id).distinct()
+    if params.is_keyset:
+        sort_column = params.keyset_sort_column(models.Encounter)
+        query = params.apply_keyset(query, sort_column, models.Encounter.id)
+    else:
+        query = params.apply_pagination_sort(query)
 
     result = await session.execute(query)
-    result_total = await session.execute(total_query)
-    return result.unique().scalars().all(), result_total.scalar_one()
+    encounters = result.unique().scalars().all()
+    total = await params.fetch_total(session, total_query, estimate_query)
+    next_cursor = None
+    if params.is_keyset:
+        encounters, next_cursor = params.keyset_page(
+            encounters, lambda encounter: (getattr(encounter, sort_column.key), encounter.id)
+        )
+    return encounters, total, next_cursor
 
 
 async def get_match_stats_for_user(
@@ -591,7 +603,7 @@ async def get_by_team_group(
 
 async def get_all_matches(
     session: AsyncSession, params: schemas.MatchSearchParams
-) -> tuple[typing.Sequence[models.Match], int]:
+) -> tuple[typing.Sequence[models.Match], int | None, str | None]:
     """
     Retrieves a paginated list of matches based on search parameters.
 
@@ -600,9 +612,10 @@ async def get_all_matches(
         params (schemas.MatchSearchParams): Search, pagination, and sorting parameters.
 
     Returns:
-        tuple[typing.Sequence[models.Match], int]: A tuple containing:
+        tuple[typing.Sequence[models.Match], int | None, str | None]: A tuple containing:
             - A sequence of Match objects.
-            - The total count of matches.
+            - The total count of matches (None if not requested).
+            - The cursor of the next page (keyset pagination only).
     """
     query = sa.select(models.Match).options(*match_entities(params.entities))
     total_query = sa.select(sa.func.count(models.Match.id))
@@ -649,11 +662,22 @@ async def get_all_matches(
             sa.and_(models.Match.away_team_id == params.away_team_id)
         )
 
-    query = params.apply_pagination_sort(query, models.Match)
+    estimate_query = total_query.with_only_columns(models.Match.id).distinct()
+    if params.is_keyset:
+        sort_column = params.keyset_sort_column(models.Match)
+        query = params.apply_keyset(query, sort_column, models.Match.id)
+    else:
+        query = params.apply_pagination_sort(query, models.Match)
 
     result = await session.execute(query)
-    result_total = await session.execute(total_query)
-    return result.unique().scalars().all(), result_total.scalar_one()
+    matches = result.unique().scalars().all()
+    total = await params.fetch_total(session, total_query, estimate_query)
+    next_cursor = None
+    if params.is_keyset:
+        matches, next_cursor = params.keyset_page(
+            matches, lambda match: (getattr(match, sort_column.key), match.id)
+        )
+    return matches, total, next_cursor
 
 
 async def get_match_bulk(
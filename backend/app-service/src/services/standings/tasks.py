@@ -0,0 +1,49 @@
+import asyncio
+
+import redis.asyncio as aioredis
+from cashews import cache
+from loguru import logger
+from shared.schemas.events import STANDINGS_CHANGED_CHANNEL, StandingsChangedEvent
+
+from src.core import config
+
+# Cached responses built from standings rows (tournament statistics, league tables, team pages).
+STANDINGS_CACHE_PATTERNS = (
+    "fastapi:*/tournaments/*",
+    "fastapi:*/statistics/*",
+    "fastapi:*/teams/*",
+)
+
+
+async def invalidate_standings_cache() -> None:
+    for pattern in STANDINGS_CACHE_PATTERNS:
+        await cache.delete_match(pattern)
+
+
+async def run_standings_listener() -> None:
+    """Drops cached standings responses on every StandingsChangedEvent until cancelled."""
+    while True:
+        client = aioredis.from_url(str(config.settings.redis_url))
+        try:
+            async with client.pubsub() as pubsub:
+                await pubsub.subscribe(STANDINGS_CHANGED_CHANNEL)
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    try:
+                        event = StandingsChangedEvent.model_validate_json(message["data"])
+                    except ValueError:
+                        logger.warning("Ignoring malformed standings change event")
+                        continue
+                    await invalidate_standings_cache()
+                    logger.info(
+                        f"Standings of tournament {event.tournament_id} changed (groups {event.group_ids}), "
+                        "cached responses dropped"
+                    )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Standings change listener disconnected: {e}")
+            await asyncio.sleep(5)
+        finally:
+            await client.aclose()
@@ -2,10 +2,12 @@ import typing
 from datetime import UTC, datetime
 from statistics import mean
 
+from fastapi import BackgroundTasks
+from loguru import logger
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src import models, schemas
-from src.core import enums, errors, pagination
+from src.core import config, db, enums, errors, pagination
 from src.services.encounter import flows as encounter_flows
 from src.services.encounter import service as encounter_service
 from src.services.hero import flows as hero_flows
@@ -15,7 +17,7 @@ from src.services.team import flows as team_flows
 from src.services.team import service as team_service
 from src.services.tournament import flows as tournament_flows
 
-from . import service
+from . import search, service
 
 tournament_stats = [
     enums.LogStatsName.HeroDamageDealt,
@@ -240,12 +242,13 @@ async def get_all(
     Returns:
         A `Paginated` instance containing `UserRead` schemas.
     """
-    users, total = await service.get_all(session, params)
+    users, total, next_cursor = await service.get_all(session, params)
     return pagination.Paginated(
         page=params.page,
         per_page=params.per_page,
         total=total,
         results=[await to_pydantic(session, user, params.entities) for user in users],
+        next_cursor=next_cursor,
     )
 
 
@@ -623,6 +626,11 @@ async def search_by_name(session: AsyncSession, name: str, fields: list[str]) ->
     Returns:
         A `UserSearch` schema instance.
     """
+    index = search.get_index() if config.settings.user_search_index_enabled else None
+    if index is not None and set(fields or ["battle_tag"]) <= search.SEARCHABLE_FIELDS:
+        entries = index.search(name)
+        return [schemas.UserSearch(id=entry.user_id, name=entry.battle_tag) for entry in entries]
+
     users = await service.search_by_name(session, name, fields)
     return [schemas.UserSearch(id=user.user_id, name=user.battle_tag) for user in users]
 
@@ -667,13 +675,13 @@ async def get_roles(session: AsyncSession, user_id: int) -> list[schemas.UserRol
     ]
 
 
-async def get_profile(session: AsyncSession, id: int) -> schemas.UserProfile:
+async def build_profile(session: AsyncSession, id: int) -> schemas.UserProfile:
     """
-    Retrieves a user's profile, including statistics, roles, and tournament history.
+    Builds a user's profile from scratch, including statistics, roles, and tournament history.
 
     Args:
         session: An SQLAlchemy `AsyncSession` for database interaction.
-        id: The ID of the user to retrieve the profile for.
+        id: The ID of the user to build the profile for.
 
     Returns:
         A `UserProfile` schema instance.
@@ -734,6 +742,71 @@ async def get_profile(session: AsyncSession, id: int) -> schemas.UserProfile:
     )
 
 
+async def get_profile(session: AsyncSession, id: int, background_tasks: BackgroundTasks) -> schemas.UserProfile:
+    """
+    Retrieves a user's profile from its materialized snapshot.
+
+    Without a snapshot the profile is built directly and stored by a background task once the
+    response is sent, so the request itself does not write. Afterwards the snapshot is kept up to
+    date by the background refresher, so a stale document may be served until it catches up.
+
+    Args:
+        session: An SQLAlchemy `AsyncSession` for database interaction.
+        id: The ID of the user to retrieve the profile for.
+        background_tasks: The request's background tasks, used to store a newly built snapshot.
+
+    Returns:
+        A `UserProfile` schema instance.
+    """
+    snapshot = await service.get_profile_snapshot(session, id)
+    if snapshot is not None and snapshot.data is not None:
+        return schemas.UserProfile.model_validate(snapshot.data)
+
+    profile = await build_profile(session, id)
+    background_tasks.add_task(store_profile_snapshot, id, profile)
+    return profile
+
+
+async def store_profile_snapshot(user_id: int, profile: schemas.UserProfile) -> None:
+    """
+    Stores a profile built by `get_profile` as the user's snapshot, in a session of its own.
+
+    Args:
+        user_id: The ID of the user the profile belongs to.
+        profile: The built profile.
+    """
+    try:
+        async with db.async_session_maker() as session:
+            await service.insert_profile_snapshot(session, user_id, profile.model_dump(mode="json"))
+    except Exception:
+        logger.exception(f"Failed to store profile snapshot for user {user_id}")
+
+
+async def refresh_stale_profiles(session: AsyncSession, limit: int, lease: float) -> int:
+    """
+    Rebuilds the profile snapshots flagged as stale.
+
+    A snapshot whose rebuild fails keeps its stale flag and is retried once its claim's lease expires.
+
+    Args:
+        session: An SQLAlchemy `AsyncSession` for database interaction.
+        limit: The maximum number of snapshots to rebuild in one pass.
+        lease: Seconds a claimed snapshot is reserved for this pass.
+
+    Returns:
+        The number of snapshots that were claimed.
+    """
+    claims = await service.claim_stale_profile_snapshots(session, limit, lease)
+    for user_id, claimed_at in claims:
+        try:
+            profile = await build_profile(session, user_id)
+            await service.upsert_profile_snapshot(session, user_id, profile.model_dump(mode="json"), claimed_at)
+        except Exception:
+            logger.exception(f"Failed to rebuild profile snapshot for user {user_id}")
+            await session.rollback()
+    return len(claims)
+
+
 async def get_tournaments(session: AsyncSession, id: int) -> list[schemas.UserTournament]:
     """
     Retrieves a user's tournament history, including statistics and encounters.
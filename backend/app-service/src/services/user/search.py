@@ -0,0 +1,265 @@
+"""In-memory battle tag search index.
+
+Keeps every `UserBattleTag` in process memory with prefix and trigram posting
+indexes so the search box can be answered without hitting Postgres on every
+keystroke. Ranking follows `service.search_by_name`: exact match, then prefix
+match, then substring/trigram similarity.
+"""
+
+import asyncio
+import bisect
+import heapq
+import math
+import re
+import typing
+from array import array
+from collections import Counter
+from dataclasses import dataclass
+
+import sqlalchemy as sa
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src import models
+
+__all__ = (
+    "SEARCHABLE_FIELDS",
+    "BattleTagEntry",
+    "BattleTagSearchIndex",
+    "get_index",
+    "refresh_index",
+)
+
+# Fields the index can answer; anything else falls back to SQL.
+SEARCHABLE_FIELDS = frozenset({"battle_tag", "name"})
+
+# Same default threshold as pg_trgm's `%` operator.
+SIMILARITY_THRESHOLD = 0.3
+
+_WORD_RE = re.compile(r"[^\W_]+")
+
+
+@dataclass(frozen=True, slots=True)
+class BattleTagEntry:
+    user_id: int
+    battle_tag: str
+    name: str
+
+
+def _raw_trigrams(value: str) -> set[str]:
+    return {value[i : i + 3] for i in range(len(value) - 2)}
+
+
+def _word_trigrams(value: str) -> frozenset[str]:
+    """pg_trgm style trigrams: per alphanumeric word, padded with two leading and one trailing space."""
+    trigrams: set[str] = set()
+    for word in _WORD_RE.findall(value):
+        padded = f"  {word} "
+        trigrams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return frozenset(trigrams)
+
+
+class BattleTagSearchIndex:
+    """Immutable search index; build a new one and swap it in to refresh.
+
+    Results are produced in tiers, each one only consulted while the previous
+    tiers have not filled `limit`:
+
+    1. exact `battle_tag` / `name` match,
+    2. prefix match, shortest tag first,
+    3. substring match, shortest tag first,
+    4. pg_trgm style similarity above `SIMILARITY_THRESHOLD`, most similar first.
+    """
+
+    # Prefixes up to this length get their top results precomputed, since
+    # their ranges in the sorted tag list are too large to rank per keystroke.
+    PRECOMPUTED_PREFIX_LENGTH = 3
+    PRECOMPUTED_LIMIT = 10
+
+    def __init__(self, entries: typing.Iterable[BattleTagEntry], fingerprint: typing.Any = None) -> None:
+        self.fingerprint = fingerprint
+        self._entries = list(entries)
+        self._tags = [entry.battle_tag.lower() for entry in self._entries]
+
+        self._exact: dict[str, list[int]] = {}
+        for position, entry in enumerate(self._entries):
+            self._exact.setdefault(self._tags[position], []).append(position)
+            name = entry.name.lower()
+            if name != self._tags[position]:
+                self._exact.setdefault(name, []).append(position)
+
+        # Positions ordered by (length, tag): the order within tiers 2 and 3.
+        self._order = sorted(
+            range(len(self._tags)),
+            key=lambda position: (len(self._tags[position]), self._tags[position]),
+        )
+        self._rank = array("I", bytes(4 * len(self._tags)))
+        for rank, position in enumerate(self._order):
+            self._rank[position] = rank
+
+        self._sorted = sorted(range(len(self._tags)), key=self._tags.__getitem__)
+        self._sorted_keys = [self._tags[position] for position in self._sorted]
+
+        self._top_prefix: dict[str, list[int]] = {}
+        for position in self._order:
+            tag = self._tags[position]
+            for length in range(2, min(len(tag), self.PRECOMPUTED_PREFIX_LENGTH) + 1):
+                top = self._top_prefix.setdefault(tag[:length], [])
+                if len(top) < self.PRECOMPUTED_LIMIT:
+                    top.append(position)
+
+        self._word_trigrams: list[frozenset[str]] = []
+        raw: dict[str, array] = {}
+        words: dict[str, array] = {}
+        for position, tag in enumerate(self._tags):
+            for trigram in _raw_trigrams(tag):
+                raw.setdefault(trigram, array("I")).append(position)
+            trigrams = _word_trigrams(tag)
+            self._word_trigrams.append(trigrams)
+            for trigram in trigrams:
+                words.setdefault(trigram, array("I")).append(position)
+        self._raw_postings = raw
+        self._word_postings = words
+        self._trigram_counts = array("I", map(len, self._word_trigrams))
+        self._min_trigrams = min(self._trigram_counts, default=0)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _prefix_positions(self, query: str, limit: int) -> list[int]:
+        if len(query) <= self.PRECOMPUTED_PREFIX_LENGTH and limit <= self.PRECOMPUTED_LIMIT:
+            return self._top_prefix.get(query, [])[:limit]
+
+        start = bisect.bisect_left(self._sorted_keys, query)
+        end = bisect.bisect_left(self._sorted_keys, query + "\U0010ffff", lo=start)
+        return heapq.nsmallest(limit, self._sorted[start:end], key=self._rank.__getitem__)
+
+    def _substring_positions(self, query: str, limit: int) -> list[int]:
+        postings = []
+        for trigram in _raw_trigrams(query):
+            posting = self._raw_postings.get(trigram)
+            if posting is None:
+                return []
+            postings.append(posting)
+        postings.sort(key=len)
+
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            if len(candidates) < 64:
+                break  # Cheaper to verify the few remaining candidates directly.
+            candidates.intersection_update(posting)
+
+        matches = (position for position in candidates if query in self._tags[position])
+        return heapq.nsmallest(limit, matches, key=self._rank.__getitem__)
+
+    def _similar_positions(self, query: str, limit: int) -> list[int]:
+        query_trigrams = _word_trigrams(query)
+        if not query_trigrams:
+            return []
+
+        # sim = c / (|q| + |t| - c) >= T  <=>  c >= T * (|q| + |t|) / (1 + T), so every
+        # match shares at least `needed` trigrams with the query (|t| >= the shortest
+        # indexed tag). Such a match must then appear in one of the rarest
+        # `|q| - needed + 1` postings: the most common trigrams (digits, word starts)
+        # are only checked for candidates found through rarer ones.
+        size = len(query_trigrams)
+        factor = SIMILARITY_THRESHOLD / (1 + SIMILARITY_THRESHOLD)
+        needed = max(1, math.ceil(factor * (size + self._min_trigrams)))
+        skipped = min(needed - 1, size - 1)
+        postings = sorted((self._word_postings.get(trigram, ()) for trigram in query_trigrams), key=len)
+
+        probed: Counter[int] = Counter()
+        for posting in postings[: size - skipped]:
+            probed.update(posting)
+
+        scored = []
+        for position, count in probed.items():
+            # Cheap upper bound before computing the exact overlap.
+            if count + skipped < factor * (size + self._trigram_counts[position]):
+                continue
+            trigrams = self._word_trigrams[position]
+            shared = len(query_trigrams & trigrams) if skipped else count
+            score = shared / (size + len(trigrams) - shared)
+            if score >= SIMILARITY_THRESHOLD:
+                scored.append((-score, self._rank[position], position))
+        return [position for _, _, position in heapq.nsmallest(limit, scored)]
+
+    def search(self, query: str, limit: int = 10) -> list[BattleTagEntry]:
+        """Rank entries for a search box query.
+
+        Args:
+            query: Raw user input; `-` is accepted in place of `#`.
+            limit: Maximum number of entries to return.
+
+        Returns:
+            Best matching entries, best first.
+        """
+        query = query.strip().replace("-", "#").lower()
+        if len(query) < 2:
+            return []
+
+        found: list[int] = []
+        seen: set[int] = set()
+
+        def extend(positions: typing.Iterable[int]) -> bool:
+            for position in positions:
+                if position not in seen:
+                    seen.add(position)
+                    found.append(position)
+            return len(found) >= limit
+
+        # `name` is always a prefix of `battle_tag`, so tiers 2-4 only need the tag.
+        done = extend(sorted(self._exact.get(query, []), key=self._rank.__getitem__))
+        if not done:
+            done = extend(self._prefix_positions(query, limit + len(found)))
+        if not done and len(query) >= 3:
+            done = extend(self._substring_positions(query, limit + len(found)))
+        if not done and len(query) >= 3:
+            extend(self._similar_positions(query, limit + len(found)))
+
+        return [self._entries[position] for position in found[:limit]]
+
+
+_index: BattleTagSearchIndex | None = None
+_refresh_lock = asyncio.Lock()
+
+
+def get_index() -> BattleTagSearchIndex | None:
+    """Current index, or None until the first refresh completed."""
+    return _index
+
+
+async def _fingerprint(session: AsyncSession) -> tuple:
+    result = await session.execute(
+        sa.select(
+            sa.func.count(models.UserBattleTag.id),
+            sa.func.max(models.UserBattleTag.id),
+            sa.func.max(sa.func.coalesce(models.UserBattleTag.updated_at, models.UserBattleTag.created_at)),
+        )
+    )
+    return tuple(result.one())
+
+
+async def refresh_index(session: AsyncSession, force: bool = False) -> bool:
+    """Rebuild the index when battle tags changed since the last build.
+
+    Args:
+        session: An SQLAlchemy `AsyncSession` for database interaction.
+        force: Rebuild even if the table fingerprint is unchanged.
+
+    Returns:
+        True if a new index was swapped in.
+    """
+    global _index
+
+    async with _refresh_lock:
+        fingerprint = await _fingerprint(session)
+        if not force and _index is not None and _index.fingerprint == fingerprint:
+            return False
+
+        result = await session.execute(
+            sa.select(models.UserBattleTag.user_id, models.UserBattleTag.battle_tag, models.UserBattleTag.name)
+        )
+        entries = [BattleTagEntry(user_id, battle_tag, name) for user_id, battle_tag, name in result.all()]
+        # Building is CPU bound; keep the event loop responsive.
+        _index = await asyncio.to_thread(BattleTagSearchIndex, entries, fingerprint)
+        return True
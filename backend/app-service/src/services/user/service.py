@@ -1,8 +1,10 @@
 import typing
 from collections import defaultdict
+from datetime import datetime, timedelta
 
 import sqlalchemy as sa
 from cashews import cache
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import aliased, selectinload
 from sqlalchemy.orm.strategy_options import _AbstractLoad
@@ -690,7 +692,7 @@ async def get(session: AsyncSession, user_id: int, entities: list[str]) -> model
 
 async def get_all(
     session: AsyncSession, params: pagination.PaginationSortSearchParams
-) -> tuple[typing.Sequence[models.User], int]:
+) -> tuple[typing.Sequence[models.User], int | None, str | None]:
     """
     Retrieves a paginated list of `User` model instances based on filtering and sorting parameters.
 
@@ -701,7 +703,8 @@ async def get_all(
     Returns:
         A tuple containing:
         1. A sequence of `User` model instances.
-        2. The total count of users matching the filtering criteria.
+        2. The total count of users matching the filtering criteria (None if not requested).
+        3. The cursor of the next page (keyset pagination only).
     """
     query = sa.select(models.User).options(*user_entities(params.entities))
     total_query = sa.select(sa.func.count(sa.distinct(models.User.id)))
@@ -715,11 +718,20 @@ async def get_all(
         query = params.apply_search(query, models.User)
         total_query = params.apply_search(total_query, models.User)
 
-    query = params.apply_pagination_sort(query, models.User)
+    estimate_query = total_query.with_only_columns(models.User.id).distinct()
+    if params.is_keyset:
+        sort_column = params.keyset_sort_column(models.User)
+        query = params.apply_keyset(query, sort_column, models.User.id)
+    else:
+        query = params.apply_pagination_sort(query, models.User)
 
     result = await session.execute(query)
-    result_total = await session.execute(total_query)
-    return result.unique().scalars().all(), result_total.scalar_one()
+    users = result.unique().scalars().all()
+    total = await params.fetch_total(session, total_query, estimate_query)
+    next_cursor = None
+    if params.is_keyset:
+        users, next_cursor = params.keyset_page(users, lambda user: (getattr(user, sort_column.key), user.id))
+    return users, total, next_cursor
 
 
 async def get_overview_users(
@@ -2197,3 +2209,115 @@ async def get_best_teammates(
     result = await session.execute(query)
     count_result = await session.execute(count_query)
     return result.all(), count_result.scalar_one()  # type: ignore
+
+
+async def get_profile_snapshot(session: AsyncSession, user_id: int) -> models.UserProfileSnapshot | None:
+    """
+    Retrieves the materialized profile document of a user.
+
+    Args:
+        session: An SQLAlchemy `AsyncSession` for database interaction.
+        user_id: The ID of the user to retrieve the snapshot for.
+
+    Returns:
+        A `UserProfileSnapshot` model instance if one was built, otherwise `None`.
+    """
+    query = sa.select(models.UserProfileSnapshot).where(models.UserProfileSnapshot.user_id == user_id)
+    result = await session.scalars(query)
+    return result.one_or_none()
+
+
+async def upsert_profile_snapshot(
+    session: AsyncSession, user_id: int, data: dict[str, typing.Any], claimed_at: datetime
+) -> None:
+    """
+    Stores a freshly built profile document for a user and clears its stale flag.
+
+    The flag and the claim are only cleared while the row still carries the claim the document was built
+    under, so a snapshot invalidated again during the rebuild stays stale.
+
+    Args:
+        session: An SQLAlchemy `AsyncSession` for database interaction.
+        user_id: The ID of the user the document belongs to.
+        data: The JSON-serializable profile document.
+        claimed_at: The claim returned by `claim_stale_profile_snapshots` for this rebuild.
+    """
+    snapshot = models.UserProfileSnapshot
+    unchanged = snapshot.claimed_at.is_not_distinct_from(claimed_at)
+    stmt = pg_insert(snapshot).values(user_id=user_id, data=data, is_stale=False)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[snapshot.user_id],
+        set_={
+            "data": stmt.excluded.data,
+            "is_stale": sa.case((unchanged, False), else_=snapshot.is_stale),
+            "claimed_at": sa.case((unchanged, None), else_=snapshot.claimed_at),
+            "updated_at": sa.func.now(),
+        },
+    )
+    await session.execute(stmt)
+    await session.commit()
+
+
+async def insert_profile_snapshot(session: AsyncSession, user_id: int, data: dict[str, typing.Any]) -> None:
+    """
+    Stores a profile document built on a read, unless the user already has one.
+
+    An existing row keeps its stale flag and claim, so a snapshot invalidated while the document was
+    being built is still rebuilt by the refresher.
+
+    Args:
+        session: An SQLAlchemy `AsyncSession` for database interaction.
+        user_id: The ID of the user the document belongs to.
+        data: The JSON-serializable profile document.
+    """
+    snapshot = models.UserProfileSnapshot
+    stmt = pg_insert(snapshot).values(user_id=user_id, data=data, is_stale=False)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[snapshot.user_id],
+        set_={"data": stmt.excluded.data, "updated_at": sa.func.now()},
+        where=snapshot.data.is_(None),
+    )
+    await session.execute(stmt)
+    await session.commit()
+
+
+async def claim_stale_profile_snapshots(
+    session: AsyncSession, limit: int, lease: float
+) -> list[tuple[int, datetime]]:
+    """
+    Claims up to `limit` stale snapshots for rebuilding.
+
+    The stale flag stays set until `upsert_profile_snapshot` stores the rebuilt document under the claim,
+    so a rebuild that fails (or a worker that dies) only delays the snapshot until the lease runs out.
+    Rows locked by another worker are skipped, so several app-service replicas can refresh concurrently.
+
+    Args:
+        session: An SQLAlchemy `AsyncSession` for database interaction.
+        limit: The maximum number of snapshots to claim.
+        lease: Seconds after which an unfinished claim may be taken over.
+
+    Returns:
+        A list of (user ID, claim) pairs whose profile must be rebuilt.
+    """
+    snapshot = models.UserProfileSnapshot
+    stale = (
+        sa.select(snapshot.id)
+        .where(
+            snapshot.is_stale.is_(True),
+            sa.or_(snapshot.claimed_at.is_(None), snapshot.claimed_at < sa.func.now() - timedelta(seconds=lease)),
+        )
+        .order_by(snapshot.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    query = (
+        sa.update(snapshot)
+        .where(snapshot.id.in_(stale))
+        .values(claimed_at=sa.func.now())
+        .returning(snapshot.user_id, snapshot.claimed_at)
+    )
+    result = await session.execute(query)
+    claims = [(user_id, claimed_at) for user_id, claimed_at in result.all()]
+    await session.commit()
+    return claims
@@ -0,0 +1,40 @@
+import asyncio
+
+from loguru import logger
+
+from src.core import config, db
+
+from . import flows, search
+
+
+async def run_profile_refresher() -> None:
+    """Continuously rebuilds stale user profile snapshots until cancelled."""
+    batch_size = config.settings.profile_refresh_batch_size
+    while True:
+        refreshed = 0
+        try:
+            async with db.async_session_maker() as session:
+                refreshed = await flows.refresh_stale_profiles(
+                    session, batch_size, config.settings.profile_refresh_lease
+                )
+            if refreshed:
+                logger.info(f"Rebuilt {refreshed} user profile snapshots")
+        except Exception:
+            logger.exception("Profile refresher pass failed")
+
+        # A full batch means there is likely more work queued, so keep draining without waiting.
+        if refreshed < batch_size:
+            await asyncio.sleep(config.settings.profile_refresh_interval)
+
+
+async def run_search_index_refresher() -> None:
+    """Keeps the in-memory battle tag search index in sync with the database until cancelled."""
+    while True:
+        try:
+            async with db.async_session_maker() as session:
+                if await search.refresh_index(session):
+                    logger.info(f"Rebuilt battle tag search index ({len(search.get_index())} entries)")
+        except Exception:
+            logger.exception("Search index refresh failed")
+
+        await asyncio.sleep(config.settings.user_search_index_refresh_interval)
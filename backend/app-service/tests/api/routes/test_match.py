@@ -0,0 +1,22 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from src.core import config
+
+pytestmark = pytest.mark.db
+
+
+def test_get_matches_second_page_sorted_by_datetime(client: TestClient) -> None:
+    url = f"{config.settings.api_v1_str}/matches"
+    params = {"cursor": "", "sort": "created_at", "order": "desc", "per_page": 2, "count": "none"}
+
+    first = client.get(url, params=params)
+    assert first.status_code == 200
+    next_cursor = first.json()["next_cursor"]
+    if next_cursor is None:
+        pytest.skip("Not enough matches in the database for a second page")
+
+    second = client.get(url, params={**params, "cursor": next_cursor})
+    assert second.status_code == 200
+    first_ids = {match["id"] for match in first.json()["results"]}
+    assert first_ids.isdisjoint(match["id"] for match in second.json()["results"])
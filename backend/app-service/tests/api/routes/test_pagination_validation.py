@@ -0,0 +1,86 @@
+import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src import models
+from src.core import config, errors, pagination
+
+pytestmark = pytest.mark.validation
+
+
+def test_cursor_round_trip() -> None:
+    cursor = pagination.encode_cursor("name", "asc", "Shadow#1234", 42)
+
+    assert pagination.decode_cursor(cursor) == {"s": "name", "o": "asc", "v": "Shadow#1234", "id": 42}
+
+
+def test_keyset_query_seeks_past_cursor_and_fetches_one_extra_row() -> None:
+    params = pagination.PaginationSortParams(
+        per_page=20, sort="name", order="desc", cursor=pagination.encode_cursor("name", "desc", "m", 7)
+    )
+
+    query = params.apply_keyset(models.User.__table__.select(), models.User.name, models.User.id)
+    sql = str(query.compile(compile_kwargs={"literal_binds": True}))
+
+    assert '"user".name < \'m\' OR "user".name = \'m\' AND "user".id < 7' in sql
+    assert 'ORDER BY "user".name DESC, "user".id DESC' in sql
+    assert "LIMIT 21" in sql
+
+
+def test_keyset_query_binds_datetime_cursor_as_datetime() -> None:
+    created_at = datetime.datetime(2024, 5, 1, 12, 30, tzinfo=datetime.UTC)
+    params = pagination.PaginationSortParams(per_page=1, sort="created_at", cursor="")
+    _, cursor = params.keyset_page([created_at, created_at], lambda row: (row, 7))
+
+    params.cursor = cursor
+    query = params.apply_keyset(models.Match.__table__.select(), models.Match.created_at, models.Match.id)
+
+    assert created_at in query.compile().params.values()
+
+
+def test_keyset_query_rejects_malformed_datetime_cursor() -> None:
+    params = pagination.PaginationSortParams(
+        sort="created_at", cursor=pagination.encode_cursor("created_at", "asc", "yesterday", 7)
+    )
+
+    with pytest.raises(errors.ApiHTTPException):
+        params.apply_keyset(models.Match.__table__.select(), models.Match.created_at, models.Match.id)
+
+
+def test_keyset_page_returns_next_cursor_only_when_more_rows_exist() -> None:
+    params = pagination.PaginationSortParams(per_page=2, sort="id", cursor="")
+
+    rows, next_cursor = params.keyset_page([1, 2, 3], lambda row: (row, row))
+    assert rows == [1, 2]
+    assert pagination.decode_cursor(next_cursor)["id"] == 2
+
+    rows, next_cursor = params.keyset_page([1, 2], lambda row: (row, row))
+    assert rows == [1, 2]
+    assert next_cursor is None
+
+
+def test_get_users_rejects_malformed_cursor(client: TestClient) -> None:
+    response = client.get(f"{config.settings.api_v1_str}/users", params={"cursor": "not-a-cursor"})
+
+    assert response.status_code == 400
+    assert response.json()["detail"][0]["code"] == "invalid_cursor"
+
+
+def test_get_users_rejects_cursor_from_other_sort(client: TestClient) -> None:
+    cursor = pagination.encode_cursor("id", "asc", 10, 10)
+    response = client.get(f"{config.settings.api_v1_str}/users", params={"cursor": cursor, "sort": "name"})
+
+    assert response.status_code == 400
+    assert response.json()["detail"][0]["code"] == "invalid_cursor"
+
+
+def test_get_users_rejects_similarity_sort_in_cursor_mode(client: TestClient) -> None:
+    response = client.get(
+        f"{config.settings.api_v1_str}/users",
+        params={"cursor": "", "sort": "similarity:name", "query": "a", "fields": "name"},
+    )
+
+    assert response.status_code == 400
+    assert response.json()["detail"][0]["code"] == "invalid_sort"
+
@@ -1,4 +1,5 @@
 import pytest
+import sqlalchemy as sa
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
 
@@ -865,6 +866,19 @@ def test_get_user_profile(client: TestClient, user_id: int) -> None:
     assert content["tournaments"].__len__() >= 0
 
 
+def test_get_user_profile_is_materialized(client: TestClient, db: Session) -> None:
+    user_id = 599
+    response = client.get(f"{config.settings.api_v1_str}/users/{user_id}/profile", headers={"Cache-Control": "no-cache"})
+    assert response.status_code == 200
+
+    snapshot = db.scalars(
+        sa.select(models.UserProfileSnapshot).where(models.UserProfileSnapshot.user_id == user_id)
+    ).one_or_none()
+    assert snapshot is not None
+    assert snapshot.data is not None
+    assert snapshot.data["tournaments_count"] == response.json()["tournaments_count"]
+
+
 @pytest.mark.parametrize(
     ("user_id",),
     [
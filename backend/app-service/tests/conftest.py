@@ -1,10 +1,15 @@
+import os
 from collections.abc import Generator
 
 import pytest
-from fastapi.testclient import TestClient
-from main import app
-from sqlalchemy.orm import Session
-from src.core import db as _db
+
+# Requests over the SQL query budget or with N+1 statement patterns fail the tests.
+os.environ.setdefault("QUERY_BUDGET_STRICT", "true")
+
+from fastapi.testclient import TestClient  # noqa: E402
+from main import app  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+from src.core import db as _db  # noqa: E402
 
 
 @pytest.fixture(scope="session", autouse=True)
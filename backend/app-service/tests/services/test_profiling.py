@@ -0,0 +1,69 @@
+import threading
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from shared.observability import profiler, profiling_router
+
+pytestmark = pytest.mark.validation
+
+
+def _spin(seconds: float) -> None:
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        sum(range(1000))
+
+
+@pytest.fixture(scope="module")
+def client() -> TestClient:
+    app = FastAPI()
+    app.include_router(profiling_router(max_seconds=5))
+
+    @app.get("/heroes/{hero_id}")
+    async def hero(hero_id: int) -> dict[str, int]:
+        _spin(0.2)
+        return {"id": hero_id}
+
+    with TestClient(app) as c:
+        yield c
+
+
+def test_capture_roots_stacks_at_the_route(client: TestClient) -> None:
+    load = threading.Thread(target=lambda: [client.get(f"/heroes/{i}") for i in range(4)])
+    load.start()
+    response = client.post("/debug/profile", params={"seconds": 0.6, "hz": 200, "format": "json"})
+    load.join()
+
+    body = response.json()
+    assert response.status_code == 200
+    assert body["routes"]["GET /heroes/{hero_id}"] > 0
+    assert any(stack.startswith("GET /heroes/{hero_id};") and "_spin" in stack for stack in body["stacks"])
+
+
+def test_folded_output_is_one_stack_and_count_per_line(client: TestClient) -> None:
+    load = threading.Thread(target=lambda: client.get("/heroes/1"))
+    load.start()
+    response = client.post("/debug/profile", params={"seconds": 0.2})
+    load.join()
+
+    assert response.headers["content-type"].startswith("text/plain")
+    for line in response.text.splitlines():
+        stack, count = line.rsplit(" ", 1)
+        assert ";" in stack and int(count) > 0
+
+
+def test_concurrent_capture_is_rejected(client: TestClient) -> None:
+    capture = threading.Thread(target=profiler.capture, args=(0.5,))
+    capture.start()
+    while not profiler.running:
+        time.sleep(0.01)
+    response = client.post("/debug/profile", params={"seconds": 0.1})
+    capture.join()
+
+    assert response.status_code == 409
+
+
+def test_capture_window_is_bounded(client: TestClient) -> None:
+    assert client.post("/debug/profile", params={"seconds": 60}).status_code == 422
@@ -0,0 +1,95 @@
+import pytest
+import sqlalchemy as sa
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from shared.observability import QueryBudgetExceeded, QueryBudgetMiddleware, instrument_query_counter, track_queries
+from shared.observability.query_budget import statement_shape
+
+pytestmark = pytest.mark.validation
+
+
+@pytest.fixture(scope="module")
+def engine() -> sa.Engine:
+    # One shared connection: each in-memory SQLite connection is its own database.
+    engine = sa.create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=sa.StaticPool)
+    instrument_query_counter(engine)
+    with engine.begin() as conn:
+        conn.execute(sa.text("CREATE TABLE item (id INTEGER PRIMARY KEY, name TEXT)"))
+        conn.execute(sa.text("INSERT INTO item (id, name) VALUES (1, 'a'), (2, 'b'), (3, 'c')"))
+    return engine
+
+
+def _client(engine: sa.Engine, **options) -> TestClient:
+    app = FastAPI()
+    app.add_middleware(QueryBudgetMiddleware, **options)
+
+    @app.get("/items")
+    def items() -> list[str]:
+        with engine.connect() as conn:
+            return [row.name for row in conn.execute(sa.text("SELECT name FROM item"))]
+
+    @app.get("/items/one-by-one")
+    def items_one_by_one() -> list[str]:
+        with engine.connect() as conn:
+            return [conn.execute(sa.text(f"SELECT name FROM item WHERE id = {i}")).scalar_one() for i in (1, 2, 3)]
+
+    return TestClient(app)
+
+
+def test_statement_shape_collapses_literals_and_parameters() -> None:
+    assert statement_shape("SELECT * FROM t WHERE id = 5 AND name = 'x''y'") == (
+        "SELECT * FROM t WHERE id = ? AND name = ?"
+    )
+    assert statement_shape("SELECT * FROM t WHERE id IN ($1::INTEGER, $2::INTEGER,\n $3::INTEGER)") == (
+        "SELECT * FROM t WHERE id IN (?)"
+    )
+    assert statement_shape("SELECT x::text FROM t WHERE id = %(id_1)s") == "SELECT x::text FROM t WHERE id = ?"
+
+
+def test_track_queries_counts_statements_and_repeated_shapes(engine: sa.Engine) -> None:
+    with track_queries() as stats, engine.connect() as conn:
+        for i in range(4):
+            conn.execute(sa.text(f"SELECT name FROM item WHERE id = {i}"))
+        conn.execute(sa.text("SELECT count(*) FROM item"))
+
+    assert stats.count == 5
+    assert stats.duration > 0
+    assert stats.repeated(3) == [("SELECT name FROM item WHERE id = ?", 4)]
+
+
+def test_statements_outside_track_queries_are_not_counted(engine: sa.Engine) -> None:
+    with track_queries() as stats:
+        pass
+    with engine.connect() as conn:
+        conn.execute(sa.text("SELECT 1"))
+
+    assert stats.count == 0
+
+
+def test_middleware_reports_query_headers(engine: sa.Engine) -> None:
+    response = _client(engine).get("/items")
+
+    assert response.json() == ["a", "b", "c"]
+    assert response.headers["X-DB-Query-Count"] == "1"
+    assert float(response.headers["X-DB-Query-Time"]) >= 0
+
+
+def test_strict_middleware_fails_n_plus_one_requests(engine: sa.Engine) -> None:
+    client = _client(engine, n_plus_one_threshold=3, strict=True)
+
+    assert client.get("/items").status_code == 200
+    with pytest.raises(QueryBudgetExceeded, match="N\\+1 candidate x3"):
+        client.get("/items/one-by-one")
+
+
+def test_strict_middleware_fails_requests_over_budget(engine: sa.Engine) -> None:
+    with pytest.raises(QueryBudgetExceeded, match="3 statements \\(budget 2\\)"):
+        _client(engine, budget=2, strict=True).get("/items/one-by-one")
+
+
+def test_lenient_middleware_only_logs(engine: sa.Engine) -> None:
+    response = _client(engine, budget=2, n_plus_one_threshold=3).get("/items/one-by-one")
+
+    assert response.status_code == 200
+    assert response.headers["X-DB-Query-Count"] == "3"
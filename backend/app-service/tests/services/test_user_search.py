@@ -0,0 +1,61 @@
+import random
+
+import pytest
+
+from src.services.user.search import (
+    SIMILARITY_THRESHOLD,
+    BattleTagEntry,
+    BattleTagSearchIndex,
+    _word_trigrams,
+)
+
+pytestmark = pytest.mark.validation
+
+
+def _entry(user_id: int, battle_tag: str) -> BattleTagEntry:
+    return BattleTagEntry(user_id=user_id, battle_tag=battle_tag, name=battle_tag.split("#")[0])
+
+
+@pytest.fixture(scope="module")
+def index() -> BattleTagSearchIndex:
+    tags = ["Shadow#1234", "Shadowfax#2222", "DarkShadow#1111", "Shad#9999", "Sha#4444", "Mercy#1111", "Mercyful#2"]
+    return BattleTagSearchIndex(_entry(i, tag) for i, tag in enumerate(tags, start=1))
+
+
+def test_exact_name_ranks_before_prefix_and_substring(index: BattleTagSearchIndex) -> None:
+    results = [entry.battle_tag for entry in index.search("shadow")]
+
+    assert results[:3] == ["Shadow#1234", "Shadowfax#2222", "DarkShadow#1111"]
+
+
+def test_short_queries_use_prefix_matches_shortest_first(index: BattleTagSearchIndex) -> None:
+    results = [entry.battle_tag for entry in index.search("sh")]
+
+    assert results == ["Sha#4444", "Shad#9999", "Shadow#1234", "Shadowfax#2222"]
+
+
+def test_dash_is_accepted_instead_of_hash(index: BattleTagSearchIndex) -> None:
+    assert [entry.user_id for entry in index.search("Mercy-1111", limit=1)] == [6]
+
+
+def test_typos_fall_back_to_trigram_similarity(index: BattleTagSearchIndex) -> None:
+    assert "Mercyful#2" in [entry.battle_tag for entry in index.search("mercyfull")]
+
+
+def test_similarity_tier_matches_brute_force() -> None:
+    rng = random.Random(7)
+    letters = "abcdefghij"
+    tags = sorted({"".join(rng.choices(letters, k=rng.randint(3, 8))) + f"#{rng.randint(1, 999)}" for _ in range(500)})
+    index = BattleTagSearchIndex(_entry(i, tag) for i, tag in enumerate(tags))
+
+    for _ in range(50):
+        query = "".join(rng.choices(letters, k=rng.randint(3, 6)))
+        query_trigrams = _word_trigrams(query)
+        expected = set()
+        for position, tag in enumerate(tags):
+            tag_trigrams = _word_trigrams(tag.lower())
+            shared = len(query_trigrams & tag_trigrams)
+            if shared / len(query_trigrams | tag_trigrams) >= SIMILARITY_THRESHOLD:
+                expected.add(position)
+
+        assert set(index._similar_positions(query, len(tags))) == expected
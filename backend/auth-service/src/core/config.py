@@ -35,6 +35,14 @@ class Settings(BaseSettings):
     JWT_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 30
+    # Asymmetric signing (RS*/ES* algorithms). When set, the public key is
+    # published at /.well-known/jwks.json so services can verify tokens locally.
+    JWT_PRIVATE_KEY: str | None = None
+    JWT_PUBLIC_KEY: str | None = None
+    JWT_KEY_ID: str = "auth-1"
+
+    # Redis pub/sub used to broadcast RBAC changes to token-validating services
+    REDIS_URL: str | None = None
 
     # Service-to-service (client credentials)
     # Example:
@@ -111,6 +119,11 @@ class Settings(BaseSettings):
     proxy_username: str | None = None
     proxy_password: str | None = None
 
+    @property
+    def jwt_is_asymmetric(self) -> bool:
+        """Whether tokens are signed with a private key (RS*/ES*)."""
+        return self.JWT_ALGORITHM[:2] in ("RS", "ES") and self.JWT_PRIVATE_KEY is not None
+
     @property
     def db_url_asyncpg(self):
         """Get async database URL"""
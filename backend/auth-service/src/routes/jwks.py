@@ -0,0 +1,14 @@
+"""
+Public key discovery for local token verification
+"""
+from fastapi import APIRouter
+
+from src.services import auth_service
+
+router = APIRouter(tags=["Auth"])
+
+
+@router.get("/.well-known/jwks.json")
+async def jwks() -> dict:
+    """Public keys used to sign access tokens (empty for HS* algorithms)"""
+    return auth_service.AuthService.get_jwks()
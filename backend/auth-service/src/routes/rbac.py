@@ -11,7 +11,7 @@ from sqlalchemy.orm import selectinload
 from src.core import db
 from loguru import logger
 from src import schemas, models
-from src.services import auth_service
+from src.services import auth_service, rbac_events
 from shared.models.rbac import Role, Permission
 
 router = APIRouter(prefix="/rbac", tags=["RBAC"])
@@ -81,6 +81,7 @@ async def delete_permission(
     await session.delete(permission)
     await session.commit()
     logger.info(f"Permission deleted: {permission.name}")
+    await rbac_events.publish_rbac_changed()
 
 
 # Role Routes
@@ -208,6 +209,7 @@ async def update_role(
     await session.refresh(role)
     
     logger.info(f"Role updated: {role.name}")
+    await rbac_events.publish_rbac_changed()
     return role
 
 
@@ -238,6 +240,7 @@ async def delete_role(
     await session.delete(role)
     await session.commit()
     logger.info(f"Role deleted: {role.name}")
+    await rbac_events.publish_rbac_changed()
 
 
 # User Role Assignment Routes
@@ -280,6 +283,7 @@ async def assign_role_to_user(
     user.roles.append(role)
     await session.commit()
     logger.info(f"Role {role.name} assigned to user {user.email}")
+    await rbac_events.publish_rbac_changed(user.id)
 
 
 @router.post("/users/remove-role", status_code=status.HTTP_204_NO_CONTENT)
@@ -323,6 +327,7 @@ async def remove_role_from_user(
     user.roles.remove(role)
     await session.commit()
     logger.info(f"Role {role.name} removed from user {user.email}")
+    await rbac_events.publish_rbac_changed(user.id)
 
 
 @router.get("/users/{user_id}/roles", response_model=list[schemas.RoleRead])
@@ -7,7 +7,7 @@ from typing import Annotated
 import bcrypt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from jose import JWTError, jwt
+from jose import JWTError, jwk, jwt
 from loguru import logger
 from shared.models.rbac import role_permissions, user_roles
 from sqlalchemy import insert, select
@@ -55,8 +55,7 @@ class AuthService:
             expire = datetime.now(UTC) + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
 
         to_encode.update({"exp": expire, "type": "access"})
-        encoded_jwt = jwt.encode(to_encode, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
-        return encoded_jwt
+        return AuthService._encode(to_encode)
 
     @staticmethod
     def create_service_token(data: dict, expires_delta: timedelta | None = None) -> str:
@@ -68,8 +67,40 @@ class AuthService:
             expire = datetime.now(UTC) + timedelta(minutes=settings.SERVICE_ACCESS_TOKEN_EXPIRE_MINUTES)
 
         to_encode.update({"exp": expire, "type": "service"})
-        encoded_jwt = jwt.encode(to_encode, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
-        return encoded_jwt
+        return AuthService._encode(to_encode)
+
+    @staticmethod
+    def _encode(claims: dict) -> str:
+        """Sign claims with the configured key (private key for RS*/ES*, shared secret otherwise)."""
+        if settings.jwt_is_asymmetric:
+            return jwt.encode(
+                claims,
+                settings.JWT_PRIVATE_KEY,
+                algorithm=settings.JWT_ALGORITHM,
+                headers={"kid": settings.JWT_KEY_ID},
+            )
+        return jwt.encode(claims, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
+
+    @staticmethod
+    def _verification_key() -> str:
+        if settings.jwt_is_asymmetric:
+            return settings.JWT_PUBLIC_KEY or settings.JWT_PRIVATE_KEY
+        return settings.JWT_SECRET_KEY
+
+    @staticmethod
+    def get_jwks() -> dict:
+        """Public signing keys in JWKS format.
+
+        Empty for symmetric algorithms: the shared secret must never leave
+        auth-service, so consumers fall back to calling `/validate`.
+        """
+        if not settings.jwt_is_asymmetric:
+            return {"keys": []}
+
+        key = jwk.construct(AuthService._verification_key(), algorithm=settings.JWT_ALGORITHM)
+        jwk_dict = key.public_key().to_dict()
+        jwk_dict.update({"kid": settings.JWT_KEY_ID, "use": "sig", "alg": settings.JWT_ALGORITHM})
+        return {"keys": [jwk_dict]}
 
     @staticmethod
     def get_user_roles_and_permissions(user: models.AuthUser) -> tuple[list[str], list[dict[str, str]]]:
@@ -146,7 +177,7 @@ class AuthService:
         try:
             payload = jwt.decode(
                 token,
-                settings.JWT_SECRET_KEY,
+                AuthService._verification_key(),
                 algorithms=[settings.JWT_ALGORITHM],
                 options={"verify_aud": False},
             )
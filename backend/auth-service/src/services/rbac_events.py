@@ -0,0 +1,38 @@
+"""Broadcast RBAC changes so token-validating services drop cached roles/permissions."""
+
+import redis.asyncio as aioredis
+from loguru import logger
+from shared.schemas.events import RBAC_CHANGED_CHANNEL, RbacChangedEvent
+
+from src.core.config import settings
+
+__all__ = ["publish_rbac_changed"]
+
+_redis: aioredis.Redis | None = None
+
+
+def _get_redis() -> aioredis.Redis | None:
+    global _redis
+    if _redis is None and settings.REDIS_URL:
+        _redis = aioredis.from_url(settings.REDIS_URL)
+    return _redis
+
+
+async def publish_rbac_changed(user_id: int | None = None) -> None:
+    """Publish an RbacChangedEvent.
+
+    Failures are logged and swallowed: the change is already committed and
+    consumers expire their cache entries on a short TTL anyway.
+
+    Args:
+        user_id: Affected user, or None when a role/permission change may affect anyone.
+    """
+    client = _get_redis()
+    if client is None:
+        return
+
+    event = RbacChangedEvent(user_id=user_id)
+    try:
+        await client.publish(RBAC_CHANGED_CHANNEL, event.model_dump_json())
+    except Exception as e:
+        logger.warning(f"Failed to publish RBAC change event: {e}")
@@ -0,0 +1,98 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+import rsa
+
+
+def _ensure_test_env() -> None:
+    env = {
+        "POSTGRES_HOST": "localhost",
+        "POSTGRES_PORT": "5432",
+        "POSTGRES_DB": "auth_test",
+        "POSTGRES_USER": "postgres",
+        "POSTGRES_PASSWORD": "postgres",
+        "JWT_SECRET_KEY": "test-secret",
+        "DISCORD_CLIENT_ID": "discord-client",
+        "DISCORD_CLIENT_SECRET": "discord-secret",
+        "TWITCH_CLIENT_ID": "twitch-client",
+        "TWITCH_CLIENT_SECRET": "twitch-secret",
+        "BATTLENET_CLIENT_ID": "battlenet-client",
+        "BATTLENET_CLIENT_SECRET": "battlenet-secret",
+        "OAUTH_REDIRECT": "http://localhost:3000/auth/callback",
+    }
+    for key, value in env.items():
+        os.environ.setdefault(key, value)
+
+
+_ensure_test_env()
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from shared.clients import AuthClient
+from src.services.auth_service import AuthService
+
+
+@pytest.fixture(scope="module")
+def rsa_keys() -> tuple[str, str]:
+    public_key, private_key = rsa.newkeys(1024)
+    return private_key.save_pkcs1().decode(), public_key.save_pkcs1().decode()
+
+
+@pytest.fixture
+def asymmetric_settings(monkeypatch: pytest.MonkeyPatch, rsa_keys: tuple[str, str]) -> None:
+    private_key, public_key = rsa_keys
+    monkeypatch.setattr("src.services.auth_service.settings.JWT_ALGORITHM", "RS256")
+    monkeypatch.setattr("src.services.auth_service.settings.JWT_PRIVATE_KEY", private_key)
+    monkeypatch.setattr("src.services.auth_service.settings.JWT_PUBLIC_KEY", public_key)
+    monkeypatch.setattr("src.services.auth_service.settings.JWT_KEY_ID", "test-kid")
+
+
+def test_jwks_is_empty_for_symmetric_algorithm(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr("src.services.auth_service.settings.JWT_ALGORITHM", "HS256")
+
+    assert AuthService.get_jwks() == {"keys": []}
+
+
+def test_jwks_publishes_only_public_key(asymmetric_settings: None) -> None:
+    (key,) = AuthService.get_jwks()["keys"]
+
+    assert key["kid"] == "test-kid"
+    assert key["alg"] == "RS256"
+    assert key["use"] == "sig"
+    assert "d" not in key
+
+
+def test_auth_client_verifies_access_token_with_jwks(asymmetric_settings: None) -> None:
+    token = AuthService.create_access_token({"sub": "42", "email": "a@b.c", "username": "a"})
+    client = AuthClient(base_url="http://auth:8001", local_validation=True)
+    client._jwks = {key["kid"]: key for key in AuthService.get_jwks()["keys"]}
+
+    claims = client._decode_locally(token)
+
+    assert claims is not None
+    assert claims["sub"] == "42"
+    assert AuthService.decode_token(token)["sub"] == "42"
+
+
+def test_auth_client_rejects_service_and_tampered_tokens(asymmetric_settings: None) -> None:
+    client = AuthClient(base_url="http://auth:8001", local_validation=True)
+    client._jwks = {key["kid"]: key for key in AuthService.get_jwks()["keys"]}
+
+    service_token = AuthService.create_service_token({"sub": "discord-service"})
+    access_token = AuthService.create_access_token({"sub": "42"})
+    header, payload, signature = access_token.split(".")
+    tampered = f"{header}.{payload}.{signature[::-1]}"
+
+    assert client._decode_locally(service_token) is None
+    assert client._decode_locally(tampered) is None
+
+
+def test_auth_client_raises_lookup_error_for_unknown_key(asymmetric_settings: None) -> None:
+    client = AuthClient(base_url="http://auth:8001", local_validation=True)
+    token = AuthService.create_access_token({"sub": "42"})
+
+    with pytest.raises(LookupError):
+        client._decode_locally(token)
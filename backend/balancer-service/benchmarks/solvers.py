@@ -0,0 +1,84 @@
+"""Compare the balancer's optimizer backends on generated instances.
+
+Every instance is solved by each backend; the table reports the mean final cost
+and runtime per team count, how often each backend matched the best cost, and
+how many of its results the exact backend proved optimal.
+
+Usage (from balancer-service/):
+    PYTHONPATH=.:.. python -m benchmarks.solvers --teams 2 4 6 8 12 --instances 5
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+from src.core.config import AlgorithmConfig
+from src.service import SOLVER_BACKENDS, Player, assign_captains, calculate_cost
+
+ROLES = ("Tank", "Damage", "Support")
+
+
+def make_players(count: int, mask: dict[str, int], rng: random.Random) -> list[Player]:
+    """Players with a main role weighted by the mask, and sometimes one or two secondary roles."""
+    weights = [mask[role] for role in ROLES]
+    players = []
+    for index in range(count):
+        main = rng.choices(ROLES, weights=weights)[0]
+        others = [role for role in ROLES if role != main]
+        rng.shuffle(others)
+        preferences = [main] + others[: rng.choice((0, 0, 1, 2))]
+        skill = rng.gauss(1500, 450)
+        ratings = {
+            role: int(min(max(skill - 150 * rank + rng.gauss(0, 80), 100), 4500))
+            for rank, role in enumerate(preferences)
+        }
+        players.append(Player(f"player-{index}", ratings, preferences, f"uuid-{index}", mask))
+    return players
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--teams", type=int, nargs="+", default=[2, 4, 6, 8])
+    parser.add_argument("--instances", type=int, default=5)
+    parser.add_argument("--bench", type=int, default=3, help="Extra players per instance who may sit out")
+    parser.add_argument("--backends", nargs="+", default=list(SOLVER_BACKENDS), choices=list(SOLVER_BACKENDS))
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    config = AlgorithmConfig()
+    mask = config.DEFAULT_MASK
+    team_size = sum(mask.values())
+
+    print(f"{'teams':>5} {'backend':<13} {'mean cost':>10} {'mean time':>10} {'max time':>9} {'best':>6} {'proven':>7}")
+    for num_teams in args.teams:
+        costs: dict[str, list[float]] = {name: [] for name in args.backends}
+        timings: dict[str, list[float]] = {name: [] for name in args.backends}
+        proven = 0
+        for instance in range(args.instances):
+            for name in args.backends:
+                # Same instance and same random stream for every backend.
+                rng = random.Random(args.seed * 1000 + num_teams * 100 + instance)
+                players = make_players(num_teams * team_size + args.bench, mask, rng)
+                assign_captains(players, num_teams)
+                random.seed(args.seed + instance)
+
+                started = time.perf_counter()
+                optimizer = SOLVER_BACKENDS[name](players, num_teams, config)
+                teams = optimizer.run()
+                timings[name].append(time.perf_counter() - started)
+                costs[name].append(calculate_cost(teams, config))
+                proven += bool(getattr(optimizer, "proven_optimal", False))
+
+        best = [min(costs[name][i] for name in args.backends) for i in range(args.instances)]
+        for name in args.backends:
+            hits = sum(1 for cost, low in zip(costs[name], best, strict=True) if cost <= low + 1e-6)
+            print(
+                f"{num_teams:>5} {name:<13} {statistics.fmean(costs[name]):>10.2f} "
+                f"{statistics.fmean(timings[name]):>9.3f}s {max(timings[name]):>8.3f}s {hits:>3}/{len(best)}"
+                + (f" {proven:>4}/{len(best)}" if name == "exact" else "")
+            )
+
+
+if __name__ == "__main__":
+    main()
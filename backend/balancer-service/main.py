@@ -33,6 +33,9 @@ logger = setup_logging(
 auth_client = AuthClient(
     base_url=config.AUTH_SERVICE_URL,
     timeout=config.AUTH_SERVICE_TIMEOUT,
+    local_validation=config.AUTH_LOCAL_VALIDATION,
+    rbac_cache_ttl=config.AUTH_RBAC_CACHE_TTL,
+    redis_url=config.REDIS_URL,
 )
 
 
@@ -1,15 +1,27 @@
 import asyncio
+import functools
+import multiprocessing
+import os
+import queue
+import signal
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing.managers import SyncManager
+from pathlib import Path
 from typing import Any
 
 from faststream import FastStream
-from faststream.rabbit import RabbitBroker
+from faststream.rabbit import Channel, RabbitBroker
+from prometheus_client import start_http_server
 from pydantic import ValidationError
 from src.core.config import config
-from src.core.job_store import JobStatus, get_job_store
-from src.service import balance_teams
+from src.core.job_store import TERMINAL_STATUSES, BalancerJobStore, JobStatus, get_job_store
+from src.schemas import BalanceResponse
+from src.service import BalancerCancelled, run_balancer_job
 
 from shared.messaging.config import BALANCER_JOBS_QUEUE
-from shared.observability import setup_logging
+from shared.observability import histogram, install_profiling_signal, setup_logging, stage
 from shared.schemas.events import BalancerJobEvent
 
 # Setup structured logging for this standalone FastStream worker.
@@ -24,8 +36,132 @@ logger = setup_logging(
 broker = RabbitBroker(config.RABBITMQ_URL, logger=logger)
 app = FastStream(broker)
 
+# Optimizer metrics. Jobs run in pool processes nobody scrapes, so the worker
+# derives them from the progress updates it receives (see `OptimizerMetrics`).
+GENERATIONS_PER_SECOND = histogram(
+    "balancer_generations_per_second",
+    "Genetic optimizer generations per second between progress updates",
+    buckets=(5.0, 10.0, 25.0, 50.0, 100.0, 250.0, 500.0, 1000.0, 2500.0),
+)
+BEST_COST = histogram(
+    "balancer_best_cost",
+    "Best solution cost reported by the optimizer, by stage and share of the run completed",
+    ["stage", "progress"],
+    buckets=(0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 25.0, 50.0, 100.0, 250.0, 1000.0),
+)
+
+
+class OptimizerMetrics:
+    """Records throughput and the cost trajectory of one job from its progress updates."""
+
+    def __init__(self) -> None:
+        self._last_generation: tuple[int, float] | None = None
+
+    def observe(self, update: dict[str, Any]) -> None:
+        progress = update.get("progress") or {}
+        best_cost = progress.get("best_cost")
+        if best_cost is None:
+            return
+        stage_name = str(update.get("stage", "running"))
+        if BEST_COST is not None:
+            # Quartiles keep the label set small: 0, 25, 50, 75 and 100 percent done.
+            quartile = int(min(float(progress.get("percent") or 0.0), 100.0) // 25 * 25)
+            BEST_COST.labels(stage_name, str(quartile)).observe(best_cost)
+
+        if stage_name != "evolving" or progress.get("current") is None:
+            return
+        generation, now = int(progress["current"]), time.monotonic()
+        if self._last_generation is not None and GENERATIONS_PER_SECOND is not None:
+            last_generation, last_time = self._last_generation
+            if generation > last_generation and now > last_time:
+                GENERATIONS_PER_SECOND.observe((generation - last_generation) / (now - last_time))
+        self._last_generation = (generation, now)
+
+
+# Jobs run in worker processes so they don't share the GIL; the manager provides
+# the progress queues and cancel flags shared with them.
+_executor: ProcessPoolExecutor | None = None
+_manager: SyncManager | None = None
+
+
+def _install_profiling() -> functools.partial | None:
+    """SIGUSR2 handler installer for the worker and its job processes, when profiling is enabled."""
+    if not config.BALANCER_WORKER_PROFILING_ENABLED:
+        return None
+    return functools.partial(
+        install_profiling_signal,
+        Path(config.LOGS_ROOT_PATH) / "profiles",
+        seconds=config.BALANCER_WORKER_PROFILING_SECONDS,
+        hz=config.BALANCER_WORKER_PROFILING_HZ,
+    )
+
+
+def _forward_profiling_signal() -> None:
+    # The optimizer runs in the pool processes, so they are profiled alongside the worker.
+    if _executor is None:
+        return
+    for process in list(_executor._processes.values()):
+        try:
+            os.kill(process.pid, signal.SIGUSR2)
+        except ProcessLookupError:
+            continue
+
+
+def _create_executor() -> ProcessPoolExecutor:
+    return ProcessPoolExecutor(
+        max_workers=config.BALANCER_WORKER_SLOTS,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_install_profiling(),
+    )
+
+
+@app.on_startup
+async def start_worker_pool() -> None:
+    global _executor, _manager
+    _manager = multiprocessing.get_context("spawn").Manager()
+    _executor = _create_executor()
+    logger.info(f"Balancer worker pool started with {config.BALANCER_WORKER_SLOTS} slots")
+    if install_profiling := _install_profiling():
+        install_profiling(on_signal=_forward_profiling_signal)
+        logger.info(f"Profiling enabled: send SIGUSR2 to pid {os.getpid()} to capture a profile")
+    if config.BALANCER_WORKER_METRICS_PORT:
+        start_http_server(config.BALANCER_WORKER_METRICS_PORT)
+        logger.info(f"Balancer worker metrics served on port {config.BALANCER_WORKER_METRICS_PORT}")
+
+
+@app.after_shutdown
+async def stop_worker_pool() -> None:
+    global _executor, _manager
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+    if _manager is not None:
+        _manager.shutdown()
+        _manager = None
+
 
-@broker.subscriber(BALANCER_JOBS_QUEUE)
+# Returned by `next_progress_update` when no update arrived in time.
+NO_UPDATE: dict[str, Any] = {}
+
+
+def next_progress_update(progress_queue: Any, timeout: float | None) -> dict[str, Any] | None:
+    """Blocking read of the next progress update; runs in a thread."""
+    try:
+        return progress_queue.get(timeout=timeout)
+    except queue.Empty:
+        return NO_UPDATE
+
+
+async def watch_cancellation(job_store: BalancerJobStore, job_id: str, cancel_event: Any) -> None:
+    """Forward a cancellation request from Redis to the job's worker process."""
+    while not await job_store.is_cancel_requested(job_id):
+        await asyncio.sleep(config.BALANCER_CANCEL_POLL_SECONDS)
+    logger.info(f"Cancellation requested for balancer job {job_id}")
+    cancel_event.set()
+
+
+# Prefetch matches the pool size, so a worker holds at most one message per free slot.
+@broker.subscriber(BALANCER_JOBS_QUEUE, channel=Channel(prefetch_count=config.BALANCER_WORKER_SLOTS))
 async def process_balancer_job(body: dict[str, Any]) -> None:
     try:
         event = BalancerJobEvent.model_validate(body)
@@ -41,49 +177,87 @@ async def process_balancer_job(body: dict[str, Any]) -> None:
         return
 
     current_meta = await job_store.get_job_meta(event.job_id)
-    if current_meta and current_meta.get("status") in {"succeeded", "failed"}:
+    if current_meta and current_meta.get("status") in TERMINAL_STATUSES:
         logger.info(f"Skipping already completed balancer job {event.job_id}")
         return
+    if await job_store.is_cancel_requested(event.job_id):
+        await job_store.mark_cancelled(event.job_id, "Balancer job cancelled before it started")
+        return
 
     await job_store.mark_running(event.job_id)
 
-    event_queue: asyncio.Queue[dict[str, Any] | None] = asyncio.Queue()
-    loop = asyncio.get_running_loop()
+    global _executor
+    assert _executor is not None and _manager is not None, "Worker pool is not started"
+    progress_queue = _manager.Queue()
+    cancel_event = _manager.Event()
+
+    min_interval = 1.0 / config.BALANCER_PROGRESS_MAX_RATE
+    optimizer_metrics = OptimizerMetrics()
+
+    async def write_progress_event(update: dict[str, Any]) -> None:
+        stage = str(update.get("stage", "running"))
+        status_value = str(update.get("status", "running"))
+        if status_value == "queued":
+            status: JobStatus = "queued"
+        elif status_value == "succeeded":
+            status = "succeeded"
+        elif status_value == "failed":
+            status = "failed"
+        else:
+            status = "running"
+        message = str(update.get("message", ""))
+        level = str(update.get("level", "info"))
+        progress = update.get("progress")
 
-    def progress_callback(progress_payload: dict[str, Any]) -> None:
-        loop.call_soon_threadsafe(event_queue.put_nowait, progress_payload)
+        await job_store.append_event(
+            event.job_id,
+            status=status,
+            stage=stage,
+            message=message,
+            level=level,
+            progress=progress,
+            update_meta=True,
+        )
 
     async def consume_progress_events() -> None:
+        # Progress updates of a stage are coalesced: within `min_interval` of the
+        # last write only the newest one is kept, and it is written once the
+        # interval passes. Updates without progress are always written.
+        pending: dict[str, Any] | None = None
+        last_write = float("-inf")
+
         while True:
-            update = await event_queue.get()
-            if update is None:
+            timeout = None if pending is None else max(0.0, last_write + min_interval - time.monotonic())
+            update = await asyncio.to_thread(next_progress_update, progress_queue, timeout)
+            if update:
+                optimizer_metrics.observe(update)
+            if update is NO_UPDATE:
+                update, pending = pending, None
+            elif update is None:
+                if pending is not None:
+                    await write_progress_event(pending)
                 break
+            elif (
+                "progress" in update
+                and (pending is None or pending.get("stage") == update.get("stage"))
+                and time.monotonic() - last_write < min_interval
+            ):
+                pending = update
+                continue
+            elif pending is not None:
+                await write_progress_event(pending)
+                pending = None
 
-            stage = str(update.get("stage", "running"))
-            status_value = str(update.get("status", "running"))
-            if status_value == "queued":
-                status: JobStatus = "queued"
-            elif status_value == "succeeded":
-                status = "succeeded"
-            elif status_value == "failed":
-                status = "failed"
-            else:
-                status = "running"
-            message = str(update.get("message", ""))
-            level = str(update.get("level", "info"))
-            progress = update.get("progress")
-
-            await job_store.append_event(
-                event.job_id,
-                status=status,
-                stage=stage,
-                message=message,
-                level=level,
-                progress=progress,
-                update_meta=True,
-            )
+            await write_progress_event(update)
+            last_write = time.monotonic()
 
     consume_task = asyncio.create_task(consume_progress_events())
+    cancel_task = asyncio.create_task(watch_cancellation(job_store, event.job_id, cancel_event))
+
+    async def finish_progress_events() -> None:
+        cancel_task.cancel()
+        progress_queue.put(None)
+        await consume_task
 
     try:
         input_data = payload.get("data")
@@ -92,17 +266,32 @@ async def process_balancer_job(body: dict[str, Any]) -> None:
         if not isinstance(input_data, dict):
             raise ValueError("Job payload does not contain valid player data")
 
-        result = await asyncio.to_thread(balance_teams, input_data, config_overrides, progress_callback)
+        loop = asyncio.get_running_loop()
+        with stage("balancer", "job", job_id=event.job_id):
+            result = await loop.run_in_executor(
+                _executor, run_balancer_job, input_data, config_overrides, progress_queue, cancel_event
+            )
 
-        await event_queue.put(None)
-        await consume_task
+        await finish_progress_events()
 
+        # Validated once here; the result endpoint serves the stored bytes as they are.
+        result = BalanceResponse.model_validate(result).model_dump()
         await job_store.mark_succeeded(event.job_id, result)
         logger.success(f"Balancer job completed: {event.job_id}")
+    except BalancerCancelled as exc:
+        logger.info(f"Balancer job cancelled ({event.job_id}): {exc}")
+
+        await finish_progress_events()
+
+        await job_store.mark_cancelled(event.job_id, f"Balancer job cancelled: {exc}")
     except Exception as exc:  # pragma: no cover - defensive worker guard
         logger.exception(f"Balancer job failed ({event.job_id}): {exc}")
 
-        await event_queue.put(None)
-        await consume_task
+        if isinstance(exc, BrokenProcessPool):
+            # A crashed worker process breaks the whole pool; later jobs need a fresh one.
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = _create_executor()
+
+        await finish_progress_events()
 
         await job_store.mark_failed(event.job_id, f"Balancer job failed: {exc}")
@@ -0,0 +1,223 @@
+"""
+Hard roster constraints for the balancer.
+
+Constraints are checked incrementally while a solution is built and mutated
+(see `service.create_random_solution` and `service.mutate`), so every solution
+the optimizer keeps satisfies them; nothing is generated only to be rejected.
+
+A `together` group is placed as a whole when a random solution is created and
+keeps that team afterwards: mutations only move single players, and moving one
+member would split the group. Which team a group ends up on therefore varies
+between the random initial solutions of the population, not during evolution.
+"""
+
+from __future__ import annotations
+
+import typing
+from collections import Counter
+from dataclasses import dataclass, field
+
+from pydantic import ValidationError
+from src.schemas import BalancerConstraints
+
+if typing.TYPE_CHECKING:
+    from src.service import Player, Team
+
+
+def fits_team(players: typing.Sequence[Player], mask: dict[str, int]) -> bool:
+    """Whether the players can all take a role slot of one team at the same time."""
+    free = {role: count for role, count in mask.items() if count > 0}
+
+    def assign(index: int) -> bool:
+        if index == len(players):
+            return True
+        for role, count in free.items():
+            if count and players[index].can_play(role):
+                free[role] -= 1
+                if assign(index + 1):
+                    return True
+                free[role] += 1
+        return False
+
+    return assign(0)
+
+
+def rank_to_division(rank: int) -> int:
+    """Division of a rating: 20 below 200, one division per 100 points up to 1 from 2000."""
+    return min(20, max(1, 20 - (rank - 100) // 100))
+
+
+@dataclass(slots=True)
+class Constraints:
+    """Validated constraints, indexed by player uuid.
+
+    Attributes:
+        home: Team index (0-based) a player is fixed to: pinned players and the
+            members of a pinned `together` group.
+        clusters: Members of each player's `together` group, including the player.
+        apart: Players each player must not share a team with.
+        division_limits: Maximum players of a division per team.
+        divisions: Division of every player, only filled when division limits exist.
+    """
+
+    home: dict[str, int] = field(default_factory=dict)
+    clusters: dict[str, frozenset[str]] = field(default_factory=dict)
+    apart: dict[str, frozenset[str]] = field(default_factory=dict)
+    division_limits: dict[int, int] = field(default_factory=dict)
+    divisions: dict[str, int] = field(default_factory=dict)
+
+    @property
+    def is_empty(self) -> bool:
+        return not (self.home or self.clusters or self.apart or self.division_limits)
+
+    @classmethod
+    def from_input(
+        cls,
+        raw: dict[str, typing.Any] | None,
+        players: typing.Sequence[Player],
+        num_teams: int,
+        mask: dict[str, int],
+    ) -> Constraints:
+        """Validate the `constraints` input against the players and the team layout.
+
+        Raises:
+            ValueError: If the input is malformed or the constraints contradict each other.
+        """
+        if not raw:
+            return cls()
+        try:
+            parsed = BalancerConstraints.model_validate(raw)
+        except ValidationError as exc:
+            raise ValueError(f"Invalid constraints: {exc.errors()}") from exc
+
+        by_uuid = {player.uuid: player for player in players}
+
+        def known(uuid: str) -> str:
+            if uuid not in by_uuid:
+                raise ValueError(f"Constraint references unknown or unplayable player '{uuid}'")
+            return uuid
+
+        # Union overlapping `together` groups into clusters.
+        parent: dict[str, str] = {}
+
+        def find(uuid: str) -> str:
+            while parent.get(uuid, uuid) != uuid:
+                uuid = parent[uuid]
+            return uuid
+
+        for group in parsed.together:
+            members = [known(uuid) for uuid in group]
+            for uuid in members[1:]:
+                parent[find(uuid)] = find(members[0])
+        grouped: dict[str, set[str]] = {}
+        for uuid in parent:
+            grouped.setdefault(find(uuid), set()).add(uuid)
+        for root in list(grouped):
+            grouped[root].add(root)
+
+        constraints = cls()
+        for members in grouped.values():
+            if not fits_team([by_uuid[uuid] for uuid in members], mask):
+                raise ValueError(f"Together group {sorted(members)} does not fit the role slots of one team {mask}")
+            cluster = frozenset(members)
+            for uuid in cluster:
+                constraints.clusters[uuid] = cluster
+
+        for pin in parsed.pins:
+            uuid = known(pin.player)
+            if pin.team > num_teams:
+                raise ValueError(f"Player '{uuid}' is pinned to team {pin.team}, but only {num_teams} teams are formed")
+            for member in constraints.clusters.get(uuid, (uuid,)):
+                if constraints.home.get(member, pin.team - 1) != pin.team - 1:
+                    raise ValueError(f"Player '{member}' is pinned to more than one team")
+                constraints.home[member] = pin.team - 1
+
+        apart: dict[str, set[str]] = {}
+        for group in parsed.apart:
+            members = {known(uuid) for uuid in group}
+            if len(members) > num_teams:
+                raise ValueError(f"Apart group {sorted(members)} has more players than there are teams ({num_teams})")
+            for uuid in members:
+                cluster = constraints.clusters.get(uuid, frozenset((uuid,)))
+                if len(cluster & members) > 1:
+                    raise ValueError(f"Players {sorted(cluster & members)} must be both together and apart")
+                apart.setdefault(uuid, set()).update(members - {uuid})
+        for group in parsed.apart:
+            teams = [constraints.home[uuid] for uuid in group if uuid in constraints.home]
+            if len(teams) != len(set(teams)):
+                raise ValueError(f"Apart group {sorted(group)} has players pinned to the same team")
+        constraints.apart = {uuid: frozenset(others) for uuid, others in apart.items()}
+
+        constraints.division_limits = {limit.division: limit.max_per_team for limit in parsed.max_per_division}
+        if constraints.division_limits:
+            constraints.divisions = {player.uuid: rank_to_division(player.max_rating) for player in players}
+            pinned = Counter((team, constraints.divisions[uuid]) for uuid, team in constraints.home.items())
+            for (team, division), count in pinned.items():
+                if count > constraints.division_limits.get(division, count):
+                    raise ValueError(f"Team {team + 1} has more pinned division {division} players than allowed")
+        return constraints
+
+    def is_movable(self, player: Player) -> bool:
+        """Whether the player may change teams without breaking a pin or a together group.
+
+        Members of a together group are never movable, so the group stays on
+        the team its initial solution placed it on (see the module docstring).
+        """
+        return player.uuid not in self.home and player.uuid not in self.clusters
+
+    def can_join(self, player: Player, team_index: int, team: Team, leaving: Player | None = None) -> bool:
+        """Whether `player` may be placed on `team` (while `leaving` moves off it)."""
+        home = self.home.get(player.uuid)
+        if home is not None and home != team_index:
+            return False
+
+        partners = self.apart.get(player.uuid)
+        limit = self.division_limits.get(self.divisions.get(player.uuid, 0)) if self.division_limits else None
+        if partners is None and limit is None:
+            return True
+
+        division = self.divisions.get(player.uuid)
+        same_division = 0
+        for members in team.roster.values():
+            for member in members:
+                if member is leaving:
+                    continue
+                if partners is not None and member.uuid in partners:
+                    return False
+                if limit is not None and self.divisions.get(member.uuid) == division:
+                    same_division += 1
+        return limit is None or same_division < limit
+
+    def can_swap(self, t1_index: int, t1: Team, p1: Player, t2_index: int, t2: Team, p2: Player) -> bool:
+        """Whether `p1` (on `t1`) and `p2` (on `t2`) may trade teams."""
+        if not (self.is_movable(p1) and self.is_movable(p2)):
+            return False
+        return self.can_join(p2, t1_index, t1, leaving=p1) and self.can_join(p1, t2_index, t2, leaving=p2)
+
+    def violations(self, teams: typing.Sequence[Team]) -> list[str]:
+        """Describe every constraint the solution breaks (pinned players left out included)."""
+        team_of: dict[str, int] = {}
+        for index, team in enumerate(teams):
+            for members in team.roster.values():
+                for member in members:
+                    team_of[member.uuid] = index
+
+        problems = []
+        for uuid, home in self.home.items():
+            if team_of.get(uuid) != home:
+                problems.append(f"player '{uuid}' is not on team {home + 1}")
+        for cluster in set(self.clusters.values()):
+            if len({team_of.get(uuid) for uuid in cluster}) > 1:
+                problems.append(f"players {sorted(cluster)} are not together")
+        for uuid, partners in self.apart.items():
+            if uuid in team_of and any(team_of.get(other) == team_of[uuid] for other in partners if other > uuid):
+                problems.append(f"player '{uuid}' shares a team with a player it must be kept apart from")
+        if self.division_limits:
+            for index, team in enumerate(teams):
+                counts = Counter(
+                    self.divisions.get(member.uuid) for members in team.roster.values() for member in members
+                )
+                for division, limit in self.division_limits.items():
+                    if counts[division] > limit:
+                        problems.append(f"team {index + 1} has {counts[division]} division {division} players")
+        return problems
@@ -59,6 +59,19 @@ class AlgorithmConfig(BaseSettings):
         description="Weight for maximum discomfort penalty (higher = avoid worst-case role assignments)",
     )
 
+    # Solver selection
+    SOLVER: typing.Literal["auto", "genetic", "local_search", "exact"] = Field(
+        default="auto",
+        description="Optimizer backend; 'auto' uses the exact or local search solver for small instances "
+        "and the genetic one otherwise",
+    )
+    EXACT_MAX_TEAMS: int = Field(
+        default=2, ge=0, le=32, description="Largest team count 'auto' hands to the exact solver"
+    )
+    SMALL_INSTANCE_MAX_TEAMS: int = Field(
+        default=8, ge=0, le=32, description="Largest team count 'auto' hands to the local search solver"
+    )
+
     # Strategy configuration
     USE_CAPTAINS: bool = Field(default=True, description="Whether to enable captain assignment for teams")
     DEFAULT_ROLE_MAPPING: dict[str, str] = Field(
@@ -102,6 +115,12 @@ class Settings(BaseSettings):
     AUTH_SERVICE_URL: str = Field(default="http://auth:8001", description="Auth service base URL")
     AUTH_SERVICE_TIMEOUT: float = Field(default=5.0, ge=0.1, description="Auth service timeout in seconds")
     AUTH_SERVICE_MAX_RETRIES: int = Field(default=2, ge=0, description="Max retries for auth service calls")
+    AUTH_LOCAL_VALIDATION: bool = Field(
+        default=True, description="Verify access tokens locally against the auth service JWKS"
+    )
+    AUTH_RBAC_CACHE_TTL: float = Field(
+        default=60.0, ge=0.0, description="Seconds a user's roles/permissions are served from cache"
+    )
 
     # Circuit Breaker
     CIRCUIT_BREAKER_FAILURE_THRESHOLD: int = Field(
@@ -127,6 +146,25 @@ class Settings(BaseSettings):
     BALANCER_JOB_TTL_SECONDS: int = Field(
         default=86400, ge=60, le=604800, description="How long balancer jobs are retained in Redis"
     )
+    BALANCER_WORKER_SLOTS: int = Field(
+        default=2, ge=1, le=32, description="Balancer jobs a worker runs at once, each in its own process"
+    )
+    BALANCER_PROGRESS_MAX_RATE: float = Field(
+        default=4.0, gt=0.0, description="Maximum progress updates per second written for a running job"
+    )
+    BALANCER_CANCEL_POLL_SECONDS: float = Field(
+        default=1.0, gt=0.0, description="How often a worker checks running jobs for cancellation requests"
+    )
+    BALANCER_WORKER_PROFILING_ENABLED: bool = Field(
+        default=False, description="Capture a sampling profile of the worker and its job processes on SIGUSR2"
+    )
+    BALANCER_WORKER_PROFILING_SECONDS: float = Field(
+        default=30.0, gt=0.0, le=600.0, description="Length of a profile capture started by SIGUSR2"
+    )
+    BALANCER_WORKER_PROFILING_HZ: int = Field(default=100, ge=1, le=1000, description="Profile samples per second")
+    BALANCER_WORKER_METRICS_PORT: int = Field(
+        default=8006, ge=0, le=65535, description="Port of the worker's Prometheus metrics endpoint (0 disables it)"
+    )
 
     # Logging configuration
     LOG_LEVEL: str = Field(default="INFO", description="Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)")
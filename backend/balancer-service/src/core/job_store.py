@@ -1,26 +1,53 @@
 from __future__ import annotations
 
+import gzip
 import json
 import time
 import uuid
 from typing import Any, Literal
 
+import orjson
 import redis.asyncio as redis
 from src.core.config import config
 
-JobStatus = Literal["queued", "running", "succeeded", "failed"]
+JobStatus = Literal["queued", "running", "succeeded", "failed", "cancelled"]
+
+TERMINAL_STATUSES: frozenset[str] = frozenset({"succeeded", "failed", "cancelled"})
+
+GZIP_MAGIC = b"\x1f\x8b"
+
+
+def pack_document(value: Any) -> bytes:
+    """Encode a JSON document for storage: orjson bytes, gzip compressed."""
+    return gzip.compress(orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS), compresslevel=6)
+
+
+def unpack_document(raw: bytes) -> bytes:
+    """JSON bytes of a stored document; documents stored before compression are returned as is."""
+    return gzip.decompress(raw) if raw.startswith(GZIP_MAGIC) else raw
 
 
 class BalancerJobStore:
-    """Redis-backed storage for balancer jobs, events, and results."""
+    """Redis-backed storage for balancer jobs, events, and results.
+
+    Payloads and results are large, write-once documents: they are stored as
+    gzip compressed JSON bytes (see `pack_document`) through a client without
+    response decoding, so results can be served without being parsed.
+
+    Job meta lives in a hash (one JSON encoded value per field), so updates only
+    write the fields that change. Every state change (meta fields, the event
+    describing it, TTL refresh) is sent as one MULTI/EXEC pipeline: a single
+    round trip that concurrent writers cannot interleave with.
+    """
 
     def __init__(self, redis_url: str, ttl_seconds: int) -> None:
         self._redis = redis.from_url(redis_url, decode_responses=True)
+        self._documents = redis.from_url(redis_url)
         self._ttl_seconds = ttl_seconds
 
     @staticmethod
     def _meta_key(job_id: str) -> str:
-        return f"balancer:job:{job_id}:meta"
+        return f"balancer:job:{job_id}:state"
 
     @staticmethod
     def _payload_key(job_id: str) -> str:
@@ -35,79 +62,144 @@ class BalancerJobStore:
         return f"balancer:job:{job_id}:events"
 
     @staticmethod
-    def _event_sequence_key(job_id: str) -> str:
-        return f"balancer:job:{job_id}:event_seq"
+    def _cancel_key(job_id: str) -> str:
+        return f"balancer:job:{job_id}:cancel"
 
-    async def _refresh_ttl(self, job_id: str) -> None:
-        pipe = self._redis.pipeline()
-        for key in (
+    def _keys(self, job_id: str) -> tuple[str, ...]:
+        return (
             self._meta_key(job_id),
             self._payload_key(job_id),
             self._result_key(job_id),
             self._events_key(job_id),
-            self._event_sequence_key(job_id),
-        ):
+            self._cancel_key(job_id),
+        )
+
+    @staticmethod
+    def _encode_meta(fields: dict[str, Any]) -> dict[str, str]:
+        return {key: json.dumps(value) for key, value in fields.items()}
+
+    @staticmethod
+    def _decode_meta(raw: dict[str, str]) -> dict[str, Any]:
+        meta: dict[str, Any] = {
+            "started_at": None,
+            "finished_at": None,
+            "progress": None,
+            "error": None,
+        }
+        meta.update((key, json.loads(value)) for key, value in raw.items())
+        return meta
+
+    def _write(
+        self,
+        pipe: redis.client.Pipeline,
+        job_id: str,
+        *,
+        meta: dict[str, Any] | None = None,
+        event: dict[str, Any] | None = None,
+    ) -> None:
+        """Queue a state change on `pipe`: meta fields, the event, and the TTL refresh.
+
+        Events are stored without their id; it is their 1-based position in the
+        list, which RPUSH returns and `get_events_since` restores.
+        """
+        if event is not None:
+            pipe.rpush(self._events_key(job_id), json.dumps(event))
+        if meta:
+            pipe.hset(self._meta_key(job_id), mapping=self._encode_meta(meta))
+            if meta.get("status") == "running":
+                pipe.hsetnx(self._meta_key(job_id), "started_at", json.dumps(time.time()))
+        for key in self._keys(job_id):
             pipe.expire(key, self._ttl_seconds)
-        await pipe.execute()
 
-    async def _save_meta(self, job_id: str, meta: dict[str, Any]) -> None:
-        await self._redis.set(self._meta_key(job_id), json.dumps(meta), ex=self._ttl_seconds)
+    async def _commit(
+        self,
+        job_id: str,
+        *,
+        meta: dict[str, Any] | None = None,
+        event: dict[str, Any] | None = None,
+        result: dict[str, Any] | None = None,
+    ) -> int | None:
+        """Apply a state change atomically and return the id of the appended event."""
+        pipe = self._redis.pipeline(transaction=True)
+        self._write(pipe, job_id, meta=meta, event=event)
+        if result is not None:
+            pipe.set(self._result_key(job_id), pack_document(result), ex=self._ttl_seconds)
+        replies = await pipe.execute()
+        # The RPUSH is queued first and replies with the new list length.
+        return int(replies[0]) if event is not None else None
+
+    @staticmethod
+    def _event(
+        status: JobStatus,
+        stage: str,
+        message: str,
+        level: str = "info",
+        progress: dict[str, Any] | None = None,
+    ) -> dict[str, Any]:
+        return {
+            "timestamp": time.time(),
+            "level": level,
+            "status": status,
+            "stage": stage,
+            "message": message,
+            "progress": progress,
+        }
+
+    async def _require(self, job_id: str) -> None:
+        if not await self._redis.exists(self._meta_key(job_id)):
+            raise KeyError(job_id)
 
     async def create_job(self, input_data: dict[str, Any], config_overrides: dict[str, Any] | None) -> str:
         job_id = uuid.uuid4().hex
-        now = time.time()
-
         meta = {
             "job_id": job_id,
             "status": "queued",
             "stage": "queued",
-            "created_at": now,
-            "started_at": None,
-            "finished_at": None,
-            "progress": None,
-            "error": None,
+            "created_at": time.time(),
         }
         payload = {
             "data": input_data,
             "config": config_overrides,
         }
 
-        pipe = self._redis.pipeline()
-        pipe.set(self._meta_key(job_id), json.dumps(meta), ex=self._ttl_seconds)
-        pipe.set(self._payload_key(job_id), json.dumps(payload), ex=self._ttl_seconds)
-        pipe.set(self._event_sequence_key(job_id), 0, ex=self._ttl_seconds)
-        await pipe.execute()
-
-        await self.append_event(
+        pipe = self._redis.pipeline(transaction=True)
+        pipe.set(self._payload_key(job_id), pack_document(payload), ex=self._ttl_seconds)
+        self._write(
+            pipe,
             job_id,
-            status="queued",
-            stage="queued",
-            level="info",
-            message="Balancer job accepted and queued",
-            update_meta=True,
+            meta=meta,
+            event=self._event("queued", "queued", "Balancer job accepted and queued"),
         )
+        await pipe.execute()
         return job_id
 
     async def get_job_meta(self, job_id: str) -> dict[str, Any] | None:
-        raw = await self._redis.get(self._meta_key(job_id))
-        if raw is None:
+        pipe = self._redis.pipeline(transaction=False)
+        pipe.hgetall(self._meta_key(job_id))
+        pipe.llen(self._events_key(job_id))
+        raw, events_count = await pipe.execute()
+        if not raw:
             return None
 
-        meta = json.loads(raw)
-        meta["events_count"] = await self._redis.llen(self._events_key(job_id))
+        meta = self._decode_meta(raw)
+        meta["events_count"] = events_count
         return meta
 
     async def get_job_payload(self, job_id: str) -> dict[str, Any] | None:
-        raw = await self._redis.get(self._payload_key(job_id))
+        raw = await self._documents.get(self._payload_key(job_id))
         if raw is None:
             return None
-        return json.loads(raw)
+        return orjson.loads(unpack_document(raw))
 
     async def get_job_result(self, job_id: str) -> dict[str, Any] | None:
-        raw = await self._redis.get(self._result_key(job_id))
+        raw = await self.get_job_result_raw(job_id)
         if raw is None:
             return None
-        return json.loads(raw)
+        return orjson.loads(unpack_document(raw))
+
+    async def get_job_result_raw(self, job_id: str) -> bytes | None:
+        """Stored result bytes: gzip compressed JSON, or plain JSON for results stored before compression."""
+        return await self._documents.get(self._result_key(job_id))
 
     async def append_event(
         self,
@@ -120,53 +212,25 @@ class BalancerJobStore:
         progress: dict[str, Any] | None = None,
         update_meta: bool = False,
     ) -> dict[str, Any]:
-        event_id = await self._redis.incr(self._event_sequence_key(job_id))
-        event = {
-            "event_id": event_id,
-            "timestamp": time.time(),
-            "level": level,
-            "status": status,
-            "stage": stage,
-            "message": message,
-            "progress": progress,
-        }
-
-        await self._redis.rpush(self._events_key(job_id), json.dumps(event))
+        event = self._event(status, stage, message, level, progress)
 
+        meta: dict[str, Any] | None = None
         if update_meta:
-            meta = await self.get_job_meta(job_id)
-            if meta is not None:
-                meta["status"] = status
-                meta["stage"] = stage
-                if progress is not None:
-                    meta["progress"] = progress
-                if status == "running" and meta.get("started_at") is None:
-                    meta["started_at"] = time.time()
-                if status in {"failed", "succeeded"}:
-                    meta["finished_at"] = time.time()
-                await self._save_meta(job_id, meta)
-
-        await self._refresh_ttl(job_id)
-        return event
-
-    async def mark_running(self, job_id: str) -> None:
-        meta = await self.get_job_meta(job_id)
-        if meta is None:
-            raise KeyError(job_id)
+            meta = {"status": status, "stage": stage}
+            if progress is not None:
+                meta["progress"] = progress
+            if status in TERMINAL_STATUSES:
+                meta["finished_at"] = time.time()
 
-        meta["status"] = "running"
-        meta["stage"] = "running"
-        meta["started_at"] = time.time()
-        meta["error"] = None
-        await self._save_meta(job_id, meta)
+        event_id = await self._commit(job_id, meta=meta, event=event)
+        return {"event_id": event_id, **event}
 
-        await self.append_event(
+    async def mark_running(self, job_id: str) -> None:
+        await self._require(job_id)
+        await self._commit(
             job_id,
-            status="running",
-            stage="running",
-            level="info",
-            message="Balancer job started",
-            update_meta=False,
+            meta={"status": "running", "stage": "running", "started_at": time.time(), "error": None},
+            event=self._event("running", "running", "Balancer job started"),
         )
 
     async def update_runtime_state(
@@ -177,67 +241,57 @@ class BalancerJobStore:
         status: JobStatus = "running",
         progress: dict[str, Any] | None = None,
     ) -> None:
-        meta = await self.get_job_meta(job_id)
-        if meta is None:
-            raise KeyError(job_id)
-
-        meta["status"] = status
-        meta["stage"] = stage
+        await self._require(job_id)
+        meta: dict[str, Any] = {"status": status, "stage": stage}
         if progress is not None:
             meta["progress"] = progress
-        await self._save_meta(job_id, meta)
+        await self._commit(job_id, meta=meta)
 
     async def mark_succeeded(self, job_id: str, result: dict[str, Any]) -> None:
-        meta = await self.get_job_meta(job_id)
-        if meta is None:
-            raise KeyError(job_id)
-
-        meta["status"] = "succeeded"
-        meta["stage"] = "completed"
-        meta["finished_at"] = time.time()
-        meta["error"] = None
-
-        pipe = self._redis.pipeline()
-        pipe.set(self._meta_key(job_id), json.dumps(meta), ex=self._ttl_seconds)
-        pipe.set(self._result_key(job_id), json.dumps(result), ex=self._ttl_seconds)
-        await pipe.execute()
-
-        await self.append_event(
+        await self._require(job_id)
+        await self._commit(
             job_id,
-            status="succeeded",
-            stage="completed",
-            level="success",
-            message="Balancer job completed successfully",
-            update_meta=False,
+            meta={"status": "succeeded", "stage": "completed", "finished_at": time.time(), "error": None},
+            event=self._event("succeeded", "completed", "Balancer job completed successfully", "success"),
+            result=result,
         )
 
     async def mark_failed(self, job_id: str, error_message: str) -> None:
-        meta = await self.get_job_meta(job_id)
-        if meta is None:
-            raise KeyError(job_id)
+        await self._require(job_id)
+        await self._commit(
+            job_id,
+            meta={"status": "failed", "stage": "failed", "finished_at": time.time(), "error": error_message},
+            event=self._event("failed", "failed", error_message, "error"),
+        )
+
+    async def request_cancel(self, job_id: str) -> None:
+        """Flag a job for cancellation; the worker running it stops at the next generation."""
+        await self._redis.set(self._cancel_key(job_id), 1, ex=self._ttl_seconds)
 
-        meta["status"] = "failed"
-        meta["stage"] = "failed"
-        meta["finished_at"] = time.time()
-        meta["error"] = error_message
-        await self._save_meta(job_id, meta)
+    async def is_cancel_requested(self, job_id: str) -> bool:
+        return bool(await self._redis.exists(self._cancel_key(job_id)))
 
-        await self.append_event(
+    async def mark_cancelled(self, job_id: str, message: str = "Balancer job cancelled") -> None:
+        await self._require(job_id)
+        await self._commit(
             job_id,
-            status="failed",
-            stage="failed",
-            level="error",
-            message=error_message,
-            update_meta=False,
+            meta={"status": "cancelled", "stage": "cancelled", "finished_at": time.time(), "error": None},
+            event=self._event("cancelled", "cancelled", message, "warning"),
         )
 
     async def get_events_since(self, job_id: str, after_event_id: int = 0) -> list[dict[str, Any]]:
         start_index = max(after_event_id, 0)
         raw_events = await self._redis.lrange(self._events_key(job_id), start_index, -1)
-        return [json.loads(item) for item in raw_events]
+        events = []
+        for event_id, item in enumerate(raw_events, start=start_index + 1):
+            event = json.loads(item)
+            event.setdefault("event_id", event_id)
+            events.append(event)
+        return events
 
     async def close(self) -> None:
         await self._redis.aclose()
+        await self._documents.aclose()
 
 
 _job_store: BalancerJobStore | None = None
@@ -1,27 +1,33 @@
 from .balancer import (
     BalancerConfigResponse,
+    BalancerConstraints,
     BalanceRequest,
     BalanceResponse,
     ConfigOverrides,
     CreateJobResponse,
+    DivisionLimit,
     JobEvent,
     JobProgress,
     JobStatusResponse,
     PlayerData,
     Statistics,
     TeamData,
+    TeamPin,
 )
 
 __all__ = [
     "BalanceRequest",
     "BalanceResponse",
     "BalancerConfigResponse",
+    "BalancerConstraints",
     "ConfigOverrides",
     "CreateJobResponse",
+    "DivisionLimit",
     "JobStatusResponse",
     "JobProgress",
     "JobEvent",
     "TeamData",
     "PlayerData",
     "Statistics",
+    "TeamPin",
 ]
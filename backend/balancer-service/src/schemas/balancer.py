@@ -28,6 +28,17 @@ class ConfigOverrides(BaseModel):
     INTRA_TEAM_VAR_WEIGHT: float | None = Field(None, ge=0, description="Weight for variance within teams")
     MAX_DISCOMFORT_WEIGHT: float | None = Field(None, ge=0, description="Weight for maximum discomfort penalty")
 
+    # Solver selection
+    SOLVER: Literal["auto", "genetic", "local_search", "exact"] | None = Field(
+        None, description="Optimizer backend ('auto' picks by instance size)"
+    )
+    EXACT_MAX_TEAMS: int | None = Field(
+        None, ge=0, le=32, description="Largest team count 'auto' hands to the exact solver"
+    )
+    SMALL_INSTANCE_MAX_TEAMS: int | None = Field(
+        None, ge=0, le=32, description="Largest team count 'auto' hands to the local search solver"
+    )
+
     # Strategy configuration
     USE_CAPTAINS: bool | None = Field(None, description="Whether to use captain assignment")
     ROLE_MAPPING: dict[str, str] | None = Field(
@@ -37,6 +48,39 @@ class ConfigOverrides(BaseModel):
     )
 
 
+class TeamPin(BaseModel):
+    """Place a player on a fixed team"""
+
+    player: str = Field(..., description="Player uuid")
+    team: int = Field(..., ge=1, description="1-based team number")
+
+
+class DivisionLimit(BaseModel):
+    """Cap the number of players of one division on every team"""
+
+    division: int = Field(..., ge=1, le=20, description="Division of the player's main role rating")
+    max_per_team: int = Field(..., ge=0, description="Maximum players of this division per team")
+
+
+class BalancerConstraints(BaseModel):
+    """Hard roster constraints, sent as the `constraints` key of the uploaded player data"""
+
+    model_config = ConfigDict(extra="forbid")
+
+    pins: list[TeamPin] = Field(default_factory=list, description="Players fixed to a team")
+    apart: list[list[str]] = Field(
+        default_factory=list, description="Groups of player uuids that must all end up on different teams"
+    )
+    together: list[list[str]] = Field(
+        default_factory=list,
+        description=(
+            "Groups of player uuids that must end up on the same team. A group is placed on a random team it fits "
+            "and is not moved by the optimizer afterwards"
+        ),
+    )
+    max_per_division: list[DivisionLimit] = Field(default_factory=list, description="Per-team division caps")
+
+
 class BalanceRequest(BaseModel):
     """Request schema for team balancing"""
 
@@ -75,6 +119,7 @@ class Statistics(BaseModel):
     mmrStdDev: float
     totalTeams: int
     playersPerTeam: int
+    solver: str | None = None
 
 
 class BalanceResponse(BaseModel):
@@ -97,13 +142,14 @@ class JobProgress(BaseModel):
     current: int | None = None
     total: int | None = None
     percent: float | None = None
+    best_cost: float | None = None
 
 
 class JobEvent(BaseModel):
     event_id: int
     timestamp: float
     level: str
-    status: Literal["queued", "running", "succeeded", "failed"]
+    status: Literal["queued", "running", "succeeded", "failed", "cancelled"]
     stage: str
     message: str
     progress: JobProgress | None = None
@@ -111,7 +157,7 @@ class JobEvent(BaseModel):
 
 class CreateJobResponse(BaseModel):
     job_id: str
-    status: Literal["queued", "running", "succeeded", "failed"]
+    status: Literal["queued", "running", "succeeded", "failed", "cancelled"]
     status_url: str
     result_url: str
     stream_url: str
@@ -119,7 +165,7 @@ class CreateJobResponse(BaseModel):
 
 class JobStatusResponse(BaseModel):
     job_id: str
-    status: Literal["queued", "running", "succeeded", "failed"]
+    status: Literal["queued", "running", "succeeded", "failed", "cancelled"]
     stage: str | None = None
     created_at: float
     started_at: float | None = None
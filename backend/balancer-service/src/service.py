@@ -17,10 +17,25 @@ from pathlib import Path
 
 from loguru import logger
 from src.config_presets import ConfigPresets
+from src.constraints import Constraints, fits_team
 from src.core.config import AlgorithmConfig
 
 ProgressPayload = dict[str, typing.Any]
 ProgressCallback = Callable[[ProgressPayload], None]
+StopCallback = Callable[[], bool]
+
+
+NO_CONSTRAINTS = Constraints()
+
+# How many placed players one placement may shift along an augmenting path.
+AUGMENTING_PATH_DEPTH = 3
+
+# Failed constructions tolerated while building the initial population.
+INIT_EXTRA_ATTEMPTS = 20
+
+
+class BalancerCancelled(Exception):
+    """Raised when the optimizer is asked to stop before finishing."""
 
 
 def _sample_stdev_from_sums(sum_x: float, sum_x2: float, n: int) -> float:
@@ -339,92 +354,191 @@ def assign_captains(players: list[Player], count: int) -> None:
 
 
 def create_random_solution(
-    players: list[Player], num_teams: int, mask: dict[str, int], use_captains: bool
+    players: list[Player],
+    num_teams: int,
+    mask: dict[str, int],
+    use_captains: bool,
+    constraints: Constraints | None = None,
 ) -> list[Team]:
     """Create a random team assignment solution.
 
-    Teams are initially formed by grouping players with the same preferred role,
-    then remaining slots are filled with other available players.
+    Players are placed one at a time into a free (team, role) slot, trying their
+    preferred roles first. When every slot a player could take is occupied, an
+    augmenting path moves already placed players into other slots they can fill
+    (bipartite matching), so a full roster is found in one pass whenever the
+    role pool allows one. Captains, pinned and grouped players are placed first
+    and stay on their team; constraints are checked on every placement.
     """
+    constraints = constraints or NO_CONSTRAINTS
     teams = [Team(i + 1, mask) for i in range(num_teams)]
-    captains = [p for p in players if p.is_captain]
-    pool = [p for p in players if not p.is_captain]
-    random.shuffle(captains)
-    random.shuffle(pool)
+    roles = [role for role, count in mask.items() if count > 0]
+    fixed = dict(constraints.home)
 
-    # Step 1: Assign captains if enabled
-    if use_captains:
-        for team in teams:
-            if not captains:
+    by_uuid = {p.uuid: p for p in players}
+
+    # Step 1: Give every team at most one captain
+    captains = [p for p in players if p.is_captain] if use_captains else []
+    random.shuffle(captains)
+    captain_teams = {fixed[cap.uuid] for cap in captains if cap.uuid in fixed}
+    open_teams = [i for i in range(num_teams) if i not in captain_teams]
+    random.shuffle(open_teams)
+    for cap in captains:
+        if cap.uuid in fixed:
+            continue
+        for team_index in open_teams:
+            # The captain (and its group) must fit next to the players pinned there.
+            joining = [by_uuid[uuid] for uuid in constraints.clusters.get(cap.uuid, (cap.uuid,))]
+            pinned = [by_uuid[uuid] for uuid, home in fixed.items() if home == team_index]
+            if fits_team(pinned + joining, mask):
+                open_teams.remove(team_index)
+                for player in joining:
+                    fixed[player.uuid] = team_index
                 break
-            cap = captains.pop()
-            assigned = False
-            for role in cap.preferences:
-                if role in mask and team.add_player(role, cap):
-                    assigned = True
-                    break
-            if not assigned:
-                for role in mask:
-                    if cap.can_play(role) and team.add_player(role, cap):
-                        assigned = True
-                        break
-            if not assigned:
-                pool.append(cap)
-        pool.extend(captains)
-        random.shuffle(pool)
-
-    # Step 2: Group players by their top preferred role
-    players_by_pref = {}
-    for player in pool:
-        if player.preferences:
-            top_pref = player.preferences[0]
-            if top_pref not in players_by_pref:
-                players_by_pref[top_pref] = []
-            players_by_pref[top_pref].append(player)
-
-    # Shuffle each preference group
-    for role_list in players_by_pref.values():
-        random.shuffle(role_list)
-
-    # Step 3: Assign players with same preferred role to teams first
-    assigned_players = set()
-    for role in mask.keys():
-        if role not in players_by_pref or mask[role] == 0:
+
+    # Step 2: Give every remaining together group a team it fits on
+    for cluster in {constraints.clusters[p.uuid] for p in players if p.uuid in constraints.clusters}:
+        if any(uuid in fixed for uuid in cluster):
             continue
+        joining = [by_uuid[uuid] for uuid in cluster]
+        team_order = list(range(num_teams))
+        random.shuffle(team_order)
+        for team_index in team_order:
+            if fits_team([by_uuid[uuid] for uuid, home in fixed.items() if home == team_index] + joining, mask):
+                for player in joining:
+                    fixed[player.uuid] = team_index
+                break
 
-        same_pref_players = players_by_pref[role]
-        for team in teams:
-            needed = mask[role] - len(team.roster[role])
-            for _ in range(needed):
-                if not same_pref_players:
-                    break
-                player = same_pref_players.pop()
-                if team.add_player(role, player):
-                    assigned_players.add(player)
+    order = list(players)
+    random.shuffle(order)
+    # Step 3: Order players: fixed first, then those kept apart, then the rest
+    order.sort(key=lambda p: 0 if p.uuid in fixed else 1 if p.uuid in constraints.apart else 2)
 
-    # Step 4: Fill remaining slots with any available players
-    remaining_pool = [p for p in pool if p not in assigned_players]
-    random.shuffle(remaining_pool)
+    def candidate_slots(player: Player) -> list[tuple[int, str]]:
+        if player.uuid in fixed:
+            team_order = [fixed[player.uuid]]
+        else:
+            team_order = list(range(num_teams))
+            random.shuffle(team_order)
+        role_order = [r for r in player.preferences if r in roles]
+        role_order += [r for r in roles if r not in role_order and player.can_play(r)]
+        return [(t, r) for r in role_order for t in team_order]
+
+    def move(player: Player, source: tuple[int, str], target: tuple[int, str]) -> None:
+        teams[source[0]].roster[source[1]].remove(player)
+        teams[source[0]]._is_dirty = True
+        teams[target[0]].add_player(target[1], player)
+
+    def relocate(player: Player, source: tuple[int, str], visited: set[tuple[int, str]], depth: int) -> bool:
+        """Move a placed player out of `source` into another slot, displacing others if needed."""
+        allowed = [
+            slot
+            for slot in candidate_slots(player)
+            if slot != source
+            and slot not in visited
+            and (slot[0] == source[0] or constraints.can_join(player, slot[0], teams[slot[0]]))
+        ]
+        for slot in allowed:
+            if len(teams[slot[0]].roster[slot[1]]) < mask[slot[1]]:
+                move(player, source, slot)
+                return True
+        if depth == 0:
+            return False
+        for slot in allowed:
+            visited.add(slot)
+            for occupant in list(teams[slot[0]].roster[slot[1]]):
+                if relocate(occupant, slot, visited, depth - 1):
+                    move(player, source, slot)
+                    return True
+        return False
 
-    for role, count in mask.items():
-        if count == 0:
+    def place(player: Player) -> int | None:
+        slots = [slot for slot in candidate_slots(player) if constraints.can_join(player, slot[0], teams[slot[0]])]
+        for team_index, role in slots:
+            if teams[team_index].add_player(role, player):
+                return team_index
+        visited: set[tuple[int, str]] = set()
+        for slot in slots:
+            visited.add(slot)
+            for occupant in list(teams[slot[0]].roster[slot[1]]):
+                if relocate(occupant, slot, visited, AUGMENTING_PATH_DEPTH):
+                    teams[slot[0]].add_player(slot[1], player)
+                    return slot[0]
+        return None
+
+    # Step 4: Fill the slots; players left over once every team is full sit out
+    open_slots = num_teams * sum(mask[r] for r in roles)
+    for player in order:
+        if open_slots == 0:
+            break
+        team_index = place(player)
+        if team_index is None:
             continue
-        candidates = [p for p in remaining_pool if p.can_play(role)]
-        random.shuffle(candidates)
-        for team in teams:
-            needed = count - len(team.roster[role])
-            for _ in range(needed):
-                if not candidates:
-                    break
-                player = candidates.pop()
-                if team.add_player(role, player):
-                    remaining_pool.remove(player)
+        open_slots -= 1
+        for uuid in constraints.clusters.get(player.uuid, ()):
+            fixed.setdefault(uuid, team_index)
 
     return teams
 
 
-def mutate(teams: list[Team], mask: dict[str, int], mutation_strength: int, use_captains: bool) -> list[Team]:
-    """Apply mutations to team configuration."""
+def is_feasible(teams: list[Team], constraints: Constraints | None = None) -> bool:
+    """Whether every slot is filled and no constraint is broken."""
+    if not all(t.is_full() for t in teams):
+        return False
+    return constraints is None or constraints.is_empty or not constraints.violations(teams)
+
+
+def describe_construction_failure(
+    players: list[Player],
+    num_teams: int,
+    mask: dict[str, int],
+    attempts: int,
+    partial_solutions: list[list[Team]],
+    constraints: Constraints,
+) -> str:
+    """Error message for an optimizer that could not build a single feasible solution."""
+    role_stats = {}
+    for role in mask.keys():
+        role_players = [p for p in players if p.can_play(role)]
+        role_stats[role] = len(role_players)
+
+    error_msg = (
+        f"Unable to create valid team configurations after {attempts} attempts. "
+        f"Teams needed: {num_teams}, Players: {len(players)}, "
+        f"Required roles per team: {mask}, "
+        f"Available players per role: {role_stats}"
+    )
+
+    if partial_solutions:
+        first_sol = partial_solutions[0]
+        incomplete_teams = [t for t in first_sol if not t.is_full()]
+        if incomplete_teams:
+            missing = {}
+            for team in incomplete_teams[:3]:
+                for role, count in mask.items():
+                    needed = count - len(team.roster[role])
+                    if needed > 0:
+                        missing[role] = missing.get(role, 0) + needed
+            error_msg += f". Example missing slots: {missing}"
+        elif not constraints.is_empty:
+            error_msg += f". Broken constraints: {'; '.join(constraints.violations(first_sol)[:3])}"
+
+    return error_msg
+
+
+def mutate(
+    teams: list[Team],
+    mask: dict[str, int],
+    mutation_strength: int,
+    use_captains: bool,
+    constraints: Constraints | None = None,
+) -> list[Team]:
+    """Apply mutations to team configuration.
+
+    With constraints, an inter-team swap picks its second player among those the
+    swap keeps feasible (a repair step) instead of discarding infeasible swaps,
+    so mutated solutions satisfy the constraints whenever their parent did.
+    """
+    constrained = constraints is not None and not constraints.is_empty
     # Copy-on-write: most mutations touch only 1-2 teams.
     new_teams_list = list(teams)
     copied = [False] * len(new_teams_list)
@@ -454,7 +568,20 @@ def mutate(teams: list[Team], mask: dict[str, int], mutation_strength: int, use_
                 continue
 
             idx1 = random.randrange(len(r1_list))
-            idx2 = random.randrange(len(r2_list))
+            if constrained:
+                p1 = r1_list[idx1]
+                if use_captains and p1.is_captain:
+                    continue
+                partners = [
+                    i
+                    for i, p in enumerate(r2_list)
+                    if not (use_captains and p.is_captain) and constraints.can_swap(t1_idx, t1, p1, t2_idx, t2, p)
+                ]
+                if not partners:
+                    continue
+                idx2 = random.choice(partners)
+            else:
+                idx2 = random.randrange(len(r2_list))
             p1, p2 = r1_list[idx1], r2_list[idx2]
             if use_captains and (p1.is_captain or p2.is_captain):
                 continue
@@ -498,13 +625,17 @@ class GeneticOptimizer:
         num_teams: int,
         config: AlgorithmConfig,
         progress_callback: ProgressCallback | None = None,
+        should_stop: StopCallback | None = None,
+        constraints: Constraints | None = None,
     ) -> None:
         self.players = players
         self.num_teams = num_teams
         self.config = config
+        self.constraints = constraints or NO_CONSTRAINTS
         self.population: list[tuple[float, list[Team]]] = []
         self.mask = config.DEFAULT_MASK
         self.progress_callback = progress_callback
+        self.should_stop = should_stop
 
     def run(self) -> list[Team]:
         """Run the genetic algorithm optimization."""
@@ -517,14 +648,17 @@ class GeneticOptimizer:
         )
         logger.info(f"Initializing population with {self.config.POPULATION_SIZE} solutions...")
 
-        # Create initial population
+        # Create initial population. Construction is feasible by design, so a
+        # failed attempt means the role pool or the constraints leave no room.
         attempts = 0
-        max_attempts = self.config.POPULATION_SIZE * 10
+        max_attempts = self.config.POPULATION_SIZE + INIT_EXTRA_ATTEMPTS
         partial_solutions = []
 
         while len(self.population) < self.config.POPULATION_SIZE and attempts < max_attempts:
-            sol = create_random_solution(self.players, self.num_teams, self.mask, self.config.USE_CAPTAINS)
-            if all(t.is_full() for t in sol):
+            sol = create_random_solution(
+                self.players, self.num_teams, self.mask, self.config.USE_CAPTAINS, self.constraints
+            )
+            if is_feasible(sol, self.constraints):
                 self.population.append((calculate_cost(sol, self.config), sol))
             else:
                 if len(partial_solutions) < 5:
@@ -532,30 +666,9 @@ class GeneticOptimizer:
             attempts += 1
 
         if not self.population:
-            role_stats = {}
-            for role in self.mask.keys():
-                role_players = [p for p in self.players if p.can_play(role)]
-                role_stats[role] = len(role_players)
-
-            error_msg = (
-                f"Unable to create valid team configurations after {attempts} attempts. "
-                f"Teams needed: {self.num_teams}, Players: {len(self.players)}, "
-                f"Required roles per team: {self.mask}, "
-                f"Available players per role: {role_stats}"
+            error_msg = describe_construction_failure(
+                self.players, self.num_teams, self.mask, attempts, partial_solutions, self.constraints
             )
-
-            if partial_solutions:
-                first_sol = partial_solutions[0]
-                incomplete_teams = [t for t in first_sol if not t.is_full()]
-                if incomplete_teams:
-                    missing = {}
-                    for team in incomplete_teams[:3]:
-                        for role, count in self.mask.items():
-                            needed = count - len(team.roster[role])
-                            if needed > 0:
-                                missing[role] = missing.get(role, 0) + needed
-                    error_msg += f". Example missing slots: {missing}"
-
             logger.error(error_msg)
             raise ValueError(error_msg)
 
@@ -576,6 +689,10 @@ class GeneticOptimizer:
 
         # Evolution loop
         for gen in range(self.config.GENERATIONS):
+            if self.should_stop is not None and self.should_stop():
+                logger.info(f"Optimization cancelled at generation {gen}")
+                raise BalancerCancelled(f"Cancelled at generation {gen}/{self.config.GENERATIONS}")
+
             self.population.sort(key=lambda x: x[0])
 
             if gen % 25 == 0:
@@ -590,6 +707,7 @@ class GeneticOptimizer:
                         "current": gen,
                         "total": total_generations,
                         "percent": round((gen / total_generations) * 100, 2),
+                        "best_cost": round(self.population[0][0], 4),
                     },
                 )
 
@@ -605,6 +723,7 @@ class GeneticOptimizer:
                         "current": gen,
                         "total": self.config.GENERATIONS,
                         "percent": round((gen / max(self.config.GENERATIONS, 1)) * 100, 2),
+                        "best_cost": round(self.population[0][0], 4),
                     },
                 )
                 break
@@ -621,7 +740,13 @@ class GeneticOptimizer:
 
                 # Apply mutation
                 if random.random() < self.config.MUTATION_RATE:
-                    child = mutate(p_teams, self.mask, self.config.MUTATION_STRENGTH, self.config.USE_CAPTAINS)
+                    child = mutate(
+                        p_teams,
+                        self.mask,
+                        self.config.MUTATION_STRENGTH,
+                        self.config.USE_CAPTAINS,
+                        self.constraints,
+                    )
                 else:
                     # Avoid deep copying teams when no mutation happened.
                     child = list(p_teams)
@@ -638,12 +763,485 @@ class GeneticOptimizer:
             status="running",
             stage="finalizing",
             message=f"Optimization completed in {elapsed:.2f}s",
-            progress={"current": self.config.GENERATIONS, "total": self.config.GENERATIONS, "percent": 100.0},
+            progress={
+                "current": self.config.GENERATIONS,
+                "total": self.config.GENERATIONS,
+                "percent": 100.0,
+                "best_cost": round(self.population[0][0], 4),
+            },
         )
 
         return self.population[0][1]
 
 
+# --- Small Instance Solvers ---
+
+# Restarts of the local search, each descending from a fresh construction.
+LOCAL_SEARCH_RESTARTS = 8
+
+# Search nodes the branch-and-bound expands before returning its best solution unproven.
+EXACT_NODE_LIMIT = 20_000
+
+# Nodes between two cancellation checks of the branch-and-bound.
+EXACT_STOP_CHECK_INTERVAL = 2048
+
+COST_EPSILON = 1e-9
+
+
+class LocalSearchOptimizer:
+    """Multi-start local search for small instances.
+
+    Every restart builds a solution with `create_random_solution` and descends
+    with first-improvement moves, scanned in a fixed order: two players of one
+    role trading teams, two teammates trading roles, and a player trading places
+    with one who sits out. A restart ends at a local optimum, where no single
+    move lowers the cost.
+    """
+
+    def __init__(
+        self,
+        players: list[Player],
+        num_teams: int,
+        config: AlgorithmConfig,
+        progress_callback: ProgressCallback | None = None,
+        should_stop: StopCallback | None = None,
+        constraints: Constraints | None = None,
+        restarts: int = LOCAL_SEARCH_RESTARTS,
+    ) -> None:
+        self.players = players
+        self.num_teams = num_teams
+        self.config = config
+        self.constraints = constraints or NO_CONSTRAINTS
+        self.mask = config.DEFAULT_MASK
+        self.progress_callback = progress_callback
+        self.should_stop = should_stop
+        self.restarts = restarts
+
+    def run(self) -> list[Team]:
+        """Run the local search and return the best local optimum found."""
+        start_time = time.time()
+        best_cost = float("inf")
+        best: list[Team] | None = None
+        partial_solutions = []
+
+        for restart in range(self.restarts):
+            if self.should_stop is not None and self.should_stop():
+                raise BalancerCancelled(f"Cancelled at restart {restart}/{self.restarts}")
+
+            teams = create_random_solution(
+                self.players, self.num_teams, self.mask, self.config.USE_CAPTAINS, self.constraints
+            )
+            if not is_feasible(teams, self.constraints):
+                partial_solutions.append(teams)
+                continue
+
+            cost = self.descend(teams)
+            if cost < best_cost:
+                best_cost, best = cost, teams
+            emit_progress(
+                self.progress_callback,
+                status="running",
+                stage="optimizing",
+                message=f"Local search restart {restart + 1}/{self.restarts}, best cost {best_cost:.2f}",
+                progress={
+                    "current": restart + 1,
+                    "total": self.restarts,
+                    "percent": round((restart + 1) / self.restarts * 100, 2),
+                    "best_cost": round(best_cost, 4),
+                },
+            )
+
+        if best is None:
+            error_msg = describe_construction_failure(
+                self.players, self.num_teams, self.mask, self.restarts, partial_solutions, self.constraints
+            )
+            logger.error(error_msg)
+            raise ValueError(error_msg)
+
+        logger.success(f"Local search completed in {time.time() - start_time:.2f} seconds. Final cost: {best_cost:.2f}")
+        return best
+
+    def descend(self, teams: list[Team]) -> float:
+        """Improve `teams` in place until no move lowers the cost; return the final cost."""
+        cost = calculate_cost(teams, self.config)
+        placed = {p.uuid for t in teams for members in t.roster.values() for p in members}
+        bench = [p for p in self.players if p.uuid not in placed]
+
+        improved = True
+        while improved:
+            improved = False
+            for first, second in self._moves(teams, bench):
+                self._swap(teams, bench, first, second)
+                new_cost = calculate_cost(teams, self.config)
+                if new_cost < cost - COST_EPSILON:
+                    cost = new_cost
+                    improved = True
+                else:
+                    self._swap(teams, bench, first, second)
+        return cost
+
+    @staticmethod
+    def _player_at(teams: list[Team], bench: list[Player], position: tuple[int, str, int]) -> Player:
+        team_index, role, index = position
+        return bench[index] if team_index < 0 else teams[team_index].roster[role][index]
+
+    def _swap(
+        self, teams: list[Team], bench: list[Player], first: tuple[int, str, int], second: tuple[int, str, int]
+    ) -> None:
+        p1 = self._player_at(teams, bench, first)
+        p2 = self._player_at(teams, bench, second)
+        for (team_index, role, index), player in ((first, p2), (second, p1)):
+            if team_index < 0:
+                bench[index] = player
+            else:
+                teams[team_index].replace_player(role, index, player)
+
+    def _moves(
+        self, teams: list[Team], bench: list[Player]
+    ) -> typing.Iterator[tuple[tuple[int, str, int], tuple[int, str, int]]]:
+        """Yield the allowed swaps of the current solution, as pairs of (team, role, index) positions.
+
+        Benched players use team index -1. Allowance is checked lazily, so every
+        yielded move is valid for the solution as it is when the move is taken.
+        """
+        use_captains = self.config.USE_CAPTAINS
+        constraints = self.constraints
+        constrained = not constraints.is_empty
+        roles = [r for r, c in self.mask.items() if c > 0]
+
+        def stays(player: Player) -> bool:
+            return use_captains and player.is_captain
+
+        # Two players of one role trade teams.
+        for role in roles:
+            for t1 in range(len(teams)):
+                for t2 in range(t1 + 1, len(teams)):
+                    for i1 in range(len(teams[t1].roster[role])):
+                        for i2 in range(len(teams[t2].roster[role])):
+                            p1, p2 = teams[t1].roster[role][i1], teams[t2].roster[role][i2]
+                            if stays(p1) or stays(p2):
+                                continue
+                            if constrained and not constraints.can_swap(t1, teams[t1], p1, t2, teams[t2], p2):
+                                continue
+                            yield (t1, role, i1), (t2, role, i2)
+
+        # Two teammates trade roles.
+        for t in range(len(teams)):
+            for a, r1 in enumerate(roles):
+                for r2 in roles[a + 1 :]:
+                    for i1 in range(len(teams[t].roster[r1])):
+                        for i2 in range(len(teams[t].roster[r2])):
+                            p1, p2 = teams[t].roster[r1][i1], teams[t].roster[r2][i2]
+                            if p1.can_play(r2) and p2.can_play(r1):
+                                yield (t, r1, i1), (t, r2, i2)
+
+        # A player trades places with one who sits out.
+        for b in range(len(bench)):
+            for t in range(len(teams)):
+                for role in roles:
+                    for i in range(len(teams[t].roster[role])):
+                        incoming, leaving = bench[b], teams[t].roster[role][i]
+                        if not incoming.can_play(role) or stays(leaving):
+                            continue
+                        if constrained and not (
+                            constraints.is_movable(leaving)
+                            and constraints.is_movable(incoming)
+                            and constraints.can_join(incoming, t, teams[t], leaving=leaving)
+                        ):
+                            continue
+                        yield (-1, "", b), (t, role, i)
+
+
+class BranchAndBoundOptimizer:
+    """Depth-first branch-and-bound over role slots for small instances.
+
+    Slots are filled team by team in mask order. The incumbent comes from
+    `LocalSearchOptimizer`, and a branch is cut once its lower bound reaches the
+    incumbent's cost. The bound is built from parts of the cost that can only grow:
+    discomfort of the placed players plus the cheapest discomfort still able to
+    fill each open slot (which also bounds the worst discomfort), the spread
+    of completed teams' MMR and their internal variance.
+
+    Interchangeable teams (no pinned players) are explored in one canonical order,
+    as are players sharing a role on a team. The search proves optimality when it
+    finishes within `node_limit`; otherwise the best solution found is returned.
+    """
+
+    def __init__(
+        self,
+        players: list[Player],
+        num_teams: int,
+        config: AlgorithmConfig,
+        progress_callback: ProgressCallback | None = None,
+        should_stop: StopCallback | None = None,
+        constraints: Constraints | None = None,
+        node_limit: int = EXACT_NODE_LIMIT,
+    ) -> None:
+        self.players = players
+        self.num_teams = num_teams
+        self.config = config
+        self.constraints = constraints or NO_CONSTRAINTS
+        self.mask = config.DEFAULT_MASK
+        self.progress_callback = progress_callback
+        self.should_stop = should_stop
+        self.node_limit = node_limit
+        self.nodes = 0
+        self.proven_optimal = False
+
+    def run(self) -> list[Team]:
+        """Run the search and return the best solution found."""
+        start_time = time.time()
+        best = LocalSearchOptimizer(
+            self.players, self.num_teams, self.config, self.progress_callback, self.should_stop, self.constraints
+        ).run()
+        self.best_cost = calculate_cost(best, self.config)
+        self.best = best
+        emit_progress(
+            self.progress_callback,
+            status="running",
+            stage="optimizing",
+            message=f"Branch and bound from cost {self.best_cost:.2f}",
+        )
+
+        self._prepare()
+        self.nodes = 0
+        self.proven_optimal = self._search(0, 0.0, 0)
+
+        elapsed = time.time() - start_time
+        outcome = "proven optimal" if self.proven_optimal else f"node limit {self.node_limit} reached"
+        logger.success(
+            f"Branch and bound completed in {elapsed:.2f} seconds ({self.nodes} nodes, {outcome}). "
+            f"Final cost: {self.best_cost:.2f}"
+        )
+        emit_progress(
+            self.progress_callback,
+            status="running",
+            stage="finalizing",
+            message=f"Branch and bound {outcome} in {elapsed:.2f}s, cost {self.best_cost:.2f}",
+            progress={
+                "current": self.nodes,
+                "total": self.node_limit,
+                "percent": 100.0,
+                "best_cost": round(self.best_cost, 4),
+            },
+        )
+        return self.best
+
+    def _prepare(self) -> None:
+        cfg = self.config
+        roles = [r for r, c in self.mask.items() if c > 0]
+        players = self.players
+        self.roles = roles
+        self.teams = [Team(i + 1, self.mask) for i in range(self.num_teams)]
+        # Slots as (team, role, index within the role), filled in this order.
+        self.slots = [(t, r, i) for t in range(self.num_teams) for r in roles for i in range(self.mask[r])]
+        self.team_size = sum(self.mask[r] for r in roles)
+        self.open_slots = {r: self.mask[r] * self.num_teams for r in roles}
+        self.assigned = [False] * len(players)
+        self.team_of = [-1] * len(players)
+        self.slot_player = [-1] * len(self.slots)
+        self.captains = [0] * self.num_teams
+        self.needs_captain = self.config.USE_CAPTAINS and any(p.is_captain for p in players)
+        self.index = {p.uuid: i for i, p in enumerate(players)}
+        pinned_teams = set(self.constraints.home.values())
+        self.interchangeable = [t not in pinned_teams for t in range(self.num_teams)]
+        self.pinned_to = {t: [self.index[u] for u, h in self.constraints.home.items() if h == t] for t in pinned_teams}
+
+        self.by_discomfort = {
+            r: sorted(
+                (i for i, p in enumerate(players) if p.can_play(r)), key=lambda i, r=r: players[i].get_discomfort(r)
+            )
+            for r in roles
+        }
+        # Candidates per role: least discomfort first, then ratings near the role's average.
+        self.candidates = {}
+        for r in roles:
+            able = self.by_discomfort[r]
+            average = statistics.fmean(players[i].get_rating(r) for i in able) if able else 0.0
+            self.candidates[r] = sorted(
+                able, key=lambda i, r=r, a=average: (players[i].get_discomfort(r), abs(players[i].get_rating(r) - a))
+            )
+
+        # Running sums of completed teams: MMR, MMR^2, internal stdev.
+        self.done_mmr = 0.0
+        self.done_mmr2 = 0.0
+        self.done_intra = 0.0
+        self.done_count = 0
+        self.weights = (
+            cfg.MMR_DIFF_WEIGHT,
+            cfg.DISCOMFORT_WEIGHT,
+            cfg.INTRA_TEAM_VAR_WEIGHT,
+            cfg.MAX_DISCOMFORT_WEIGHT,
+        )
+
+    def _bound(self, discomfort: float, max_pain: int, team: Team | None) -> float:
+        """Lower bound on the cost of every completion of the current partial solution."""
+        players = self.players
+        assigned = self.assigned
+        for role in self.roles:
+            needed = self.open_slots[role]
+            if needed == 0:
+                continue
+            for i in self.by_discomfort[role]:
+                if assigned[i]:
+                    continue
+                d = players[i].get_discomfort(role)
+                discomfort += d
+                needed -= 1
+                if needed == 0:
+                    max_pain = max(max_pain, d)
+                    break
+            if needed:
+                return float("inf")
+
+        w_mmr, w_discomfort, w_intra, w_pain = self.weights
+        n = self.num_teams
+        spread = 0.0
+        if self.done_count > 1 and n > 1:
+            sum_squares = self.done_mmr2 - self.done_mmr * self.done_mmr / self.done_count
+            spread = math.sqrt(max(sum_squares, 0.0) / (n - 1))
+
+        # Ratings already on the team being filled spread at least as much once it is full.
+        intra = self.done_intra
+        if team is not None:
+            ratings = [p.get_rating(r) for r, members in team.roster.items() for p in members]
+            if len(ratings) > 1:
+                mean = sum(ratings) / len(ratings)
+                intra += math.sqrt(sum((x - mean) ** 2 for x in ratings) / (self.team_size - 1))
+        return spread * w_mmr + discomfort / n * w_discomfort + intra / n * w_intra + max_pain * w_pain
+
+    def _can_take(self, slot_index: int, i: int) -> bool:
+        t, role, k = self.slots[slot_index]
+        player = self.players[i]
+        if k > 0 and i < self.slot_player[slot_index - 1]:
+            return False
+        if (
+            k == 0
+            and role == self.roles[0]
+            and t > 0
+            and self.interchangeable[t]
+            and self.interchangeable[t - 1]
+            and i < self.slot_player[slot_index - self.team_size]
+        ):
+            return False
+        if self.config.USE_CAPTAINS and player.is_captain and self.captains[t]:
+            return False
+        constraints = self.constraints
+        if constraints.is_empty:
+            return True
+        for uuid in constraints.clusters.get(player.uuid, ()):
+            if self.team_of[self.index[uuid]] not in (-1, t):
+                return False
+        return constraints.can_join(player, t, self.teams[t])
+
+    def _team_complete(self, t: int) -> bool:
+        """Whether the just completed team `t` keeps the solution feasible."""
+        if self.needs_captain and not self.captains[t]:
+            return False
+        constraints = self.constraints
+        if any(self.team_of[i] != t for i in self.pinned_to.get(t, ())):
+            return False
+        for members in self.teams[t].roster.values():
+            for member in members:
+                for uuid in constraints.clusters.get(member.uuid, ()):
+                    if self.team_of[self.index[uuid]] != t:
+                        return False
+        return True
+
+    def _search(self, slot_index: int, discomfort: float, max_pain: int) -> bool:
+        """Fill slots from `slot_index` on; False when the node limit cut the search short."""
+        if slot_index == len(self.slots):
+            cost = calculate_cost(self.teams, self.config)
+            if cost < self.best_cost - COST_EPSILON:
+                self.best_cost = cost
+                self.best = [t.copy() for t in self.teams]
+            return True
+
+        self.nodes += 1
+        if self.nodes > self.node_limit:
+            return False
+        if self.nodes % EXACT_STOP_CHECK_INTERVAL == 0 and self.should_stop is not None and self.should_stop():
+            raise BalancerCancelled(f"Cancelled after {self.nodes} search nodes")
+
+        t, role, _ = self.slots[slot_index]
+        team = self.teams[t]
+        completes_team = slot_index + 1 == len(self.slots) or self.slots[slot_index + 1][0] != t
+        finished = True
+
+        for i in self.candidates[role]:
+            if self.assigned[i] or not self._can_take(slot_index, i):
+                continue
+            player = self.players[i]
+            pain = player.get_discomfort(role)
+
+            self.assigned[i] = True
+            self.team_of[i] = t
+            self.slot_player[slot_index] = i
+            self.open_slots[role] -= 1
+            team.roster[role].append(player)
+            team._is_dirty = True
+            if player.is_captain:
+                self.captains[t] += 1
+
+            feasible = True
+            if completes_team:
+                feasible = self._team_complete(t)
+                if feasible:
+                    team.calculate_stats()
+                    self.done_mmr += team._cached_mmr
+                    self.done_mmr2 += team._cached_mmr * team._cached_mmr
+                    self.done_intra += team._cached_intra_std
+                    self.done_count += 1
+
+            if feasible:
+                new_discomfort, new_max_pain = discomfort + pain, max(max_pain, pain)
+                partial = None if completes_team else team
+                if self._bound(new_discomfort, new_max_pain, partial) < self.best_cost - COST_EPSILON:
+                    finished = self._search(slot_index + 1, new_discomfort, new_max_pain) and finished
+                if completes_team:
+                    self.done_mmr -= team._cached_mmr
+                    self.done_mmr2 -= team._cached_mmr * team._cached_mmr
+                    self.done_intra -= team._cached_intra_std
+                    self.done_count -= 1
+
+            if player.is_captain:
+                self.captains[t] -= 1
+            team.roster[role].pop()
+            team._is_dirty = True
+            self.open_slots[role] += 1
+            self.slot_player[slot_index] = -1
+            self.team_of[i] = -1
+            self.assigned[i] = False
+
+            if not finished:
+                return False
+
+        return finished
+
+
+SOLVER_BACKENDS: dict[str, type[GeneticOptimizer | LocalSearchOptimizer | BranchAndBoundOptimizer]] = {
+    "genetic": GeneticOptimizer,
+    "local_search": LocalSearchOptimizer,
+    "exact": BranchAndBoundOptimizer,
+}
+
+
+def select_solver(config: AlgorithmConfig, num_teams: int) -> str:
+    """Backend for an instance: the configured one, or by size when set to 'auto'.
+
+    Branch-and-bound only finishes within its node budget for very few teams;
+    past that it rarely improves on its local search start, so 'auto' uses
+    local search directly up to `SMALL_INSTANCE_MAX_TEAMS` teams.
+    """
+    if config.SOLVER == "auto":
+        if num_teams <= config.EXACT_MAX_TEAMS:
+            return "exact"
+        return "local_search" if num_teams <= config.SMALL_INSTANCE_MAX_TEAMS else "genetic"
+    if config.SOLVER not in SOLVER_BACKENDS:
+        raise ValueError(f"Unknown solver '{config.SOLVER}', expected one of {['auto', *SOLVER_BACKENDS]}")
+    return config.SOLVER
+
+
 # --- JSON Conversion ---
 
 
@@ -729,6 +1327,8 @@ CONFIG_LIMITS: dict[str, dict[str, int | float]] = {
     "DISCOMFORT_WEIGHT": {"min": 0.0, "max": 100.0},
     "INTRA_TEAM_VAR_WEIGHT": {"min": 0.0, "max": 100.0},
     "MAX_DISCOMFORT_WEIGHT": {"min": 0.0, "max": 100.0},
+    "EXACT_MAX_TEAMS": {"min": 0, "max": 32},
+    "SMALL_INSTANCE_MAX_TEAMS": {"min": 0, "max": 32},
 }
 
 
@@ -770,21 +1370,10 @@ def get_balancer_config_payload() -> dict[str, typing.Any]:
     }
 
 
-def balance_teams(
-    input_data: dict[str, typing.Any],
-    config_overrides: dict[str, typing.Any] | None = None,
-    progress_callback: ProgressCallback | None = None,
-) -> dict[str, typing.Any]:
+def build_algorithm_config(config_overrides: dict[str, typing.Any] | None) -> tuple[AlgorithmConfig, bool]:
+    """The default algorithm config with `config_overrides` applied, and whether any override applied."""
     config = AlgorithmConfig()
     has_applied_overrides = False
-
-    emit_progress(
-        progress_callback,
-        status="running",
-        stage="validating_input",
-        message="Validating request payload",
-    )
-
     if config_overrides:
         normalized_config_overrides = normalize_config_overrides(config_overrides)
         logger.info(f"Applying configuration overrides: {list(normalized_config_overrides.keys())}")
@@ -799,18 +1388,17 @@ def balance_teams(
                 has_applied_overrides = True
             else:
                 logger.warning(f"Unknown config parameter '{key}' ignored")
+    return config, has_applied_overrides
 
-    mask = config.DEFAULT_MASK
-    role_mapping = config.DEFAULT_ROLE_MAPPING
 
-    emit_progress(
-        progress_callback,
-        status="running",
-        stage="loading_players",
-        message=f"Loading players with role mask {mask}",
-    )
-    logger.info(f"Loading players with mask: {mask}")
+def load_valid_players(
+    input_data: dict[str, typing.Any], mask: dict[str, int], role_mapping: dict[str, str]
+) -> list[Player]:
+    """Players of the input that can take at least one role slot of `mask`.
 
+    Raises:
+        ValueError: If there are none.
+    """
     all_players = load_players_from_dict(input_data, mask, role_mapping)
     needed_roles = [r for r, c in mask.items() if c > 0]
     valid_players = [p for p in all_players if any(p.can_play(r) for r in needed_roles)]
@@ -818,14 +1406,15 @@ def balance_teams(
     if not valid_players:
         logger.error("No valid players found after filtering")
         raise ValueError("No valid players found")
+    return valid_players
 
-    # Check role availability
-    emit_progress(
-        progress_callback,
-        status="running",
-        stage="checking_roles",
-        message="Checking role availability constraints",
-    )
+
+def count_teams(valid_players: list[Player], mask: dict[str, int]) -> int:
+    """Number of full teams the players can form given the role availability.
+
+    Raises:
+        ValueError: If no full team can be formed.
+    """
     for role, count in mask.items():
         if count > 0:
             role_players = [p for p in valid_players if p.can_play(role)]
@@ -857,6 +1446,58 @@ def balance_teams(
         role_stats = {role: len([p for p in valid_players if p.can_play(role)]) for role in mask.keys()}
         raise ValueError(f"Cannot form any valid teams. Role availability: {role_stats}, Required per team: {mask}")
 
+    return num_teams
+
+
+def validate_input(input_data: dict[str, typing.Any], config_overrides: dict[str, typing.Any] | None = None) -> None:
+    """Run the checks `balance_teams` makes before optimizing, constraints included.
+
+    Lets the API reject a job up front instead of failing it in the worker.
+
+    Raises:
+        ValueError: If the input cannot be balanced as sent.
+    """
+    config, _ = build_algorithm_config(config_overrides)
+    mask = config.DEFAULT_MASK
+    valid_players = load_valid_players(input_data, mask, config.DEFAULT_ROLE_MAPPING)
+    Constraints.from_input(input_data.get("constraints"), valid_players, count_teams(valid_players, mask), mask)
+
+
+def balance_teams(
+    input_data: dict[str, typing.Any],
+    config_overrides: dict[str, typing.Any] | None = None,
+    progress_callback: ProgressCallback | None = None,
+    should_stop: StopCallback | None = None,
+) -> dict[str, typing.Any]:
+    emit_progress(
+        progress_callback,
+        status="running",
+        stage="validating_input",
+        message="Validating request payload",
+    )
+    config, has_applied_overrides = build_algorithm_config(config_overrides)
+
+    mask = config.DEFAULT_MASK
+    role_mapping = config.DEFAULT_ROLE_MAPPING
+
+    emit_progress(
+        progress_callback,
+        status="running",
+        stage="loading_players",
+        message=f"Loading players with role mask {mask}",
+    )
+    logger.info(f"Loading players with mask: {mask}")
+    valid_players = load_valid_players(input_data, mask, role_mapping)
+
+    # Check role availability
+    emit_progress(
+        progress_callback,
+        status="running",
+        stage="checking_roles",
+        message="Checking role availability constraints",
+    )
+    num_teams = count_teams(valid_players, mask)
+
     logger.info(f"Forming {num_teams} teams with {len(valid_players)} players")
     emit_progress(
         progress_callback,
@@ -877,18 +1518,22 @@ def balance_teams(
             message=f"Assigned {captain_count} captains",
         )
 
-    # Run genetic optimizer
+    # Run the optimizer backend picked for the instance
+    solver = select_solver(config, num_teams)
     emit_progress(
         progress_callback,
         status="running",
         stage="optimizing",
-        message="Running genetic optimizer",
+        message=f"Running {solver} optimizer",
     )
-    opt = GeneticOptimizer(valid_players, num_teams, config, progress_callback)
+    logger.info(f"Using {solver} optimizer for {num_teams} teams")
+    constraints = Constraints.from_input(input_data.get("constraints"), valid_players, num_teams, mask)
+    opt = SOLVER_BACKENDS[solver](valid_players, num_teams, config, progress_callback, should_stop, constraints)
     result = opt.run()
 
     # Convert to JSON
     response_payload = teams_to_json(result, mask)
+    response_payload["statistics"]["solver"] = solver
 
     if has_applied_overrides:
         response_payload["appliedConfig"] = serialize_algorithm_config(config)
@@ -903,6 +1548,21 @@ def balance_teams(
     return response_payload
 
 
+def run_balancer_job(
+    input_data: dict[str, typing.Any],
+    config_overrides: dict[str, typing.Any] | None,
+    progress_queue: typing.Any,
+    cancel_event: typing.Any,
+) -> dict[str, typing.Any]:
+    """Entry point of a balancer job inside a worker process.
+
+    `progress_queue` and `cancel_event` are `multiprocessing.Manager` proxies
+    shared with the worker's event loop: progress payloads are put on the queue
+    and setting the event stops the optimizer at its next generation.
+    """
+    return balance_teams(input_data, config_overrides, progress_queue.put, cancel_event.is_set)
+
+
 def export_teams_to_json_file(teams_data: dict[str, typing.Any], output_path: str | Path) -> None:
     """
     Export balanced teams data to a JSON file.
@@ -2,16 +2,24 @@ import asyncio
 import json
 from json import JSONDecodeError
 
+import orjson
+
 from fastapi import APIRouter, Depends, File, Form, Header, HTTPException, Query, Request, UploadFile, status
-from fastapi.responses import StreamingResponse
+from fastapi.responses import Response, StreamingResponse
 from faststream.rabbit.fastapi import RabbitRouter
 from loguru import logger
 from pydantic import ValidationError
 from src.core.config import config
 from src.core.auth import require_any_role
-from src.core.job_store import get_job_store
-from src.schemas import BalancerConfigResponse, BalanceResponse, ConfigOverrides, CreateJobResponse, JobStatusResponse
-from src.service import get_balancer_config_payload
+from src.core.job_store import GZIP_MAGIC, TERMINAL_STATUSES, get_job_store, unpack_document
+from src.schemas import (
+    BalancerConfigResponse,
+    BalanceResponse,
+    ConfigOverrides,
+    CreateJobResponse,
+    JobStatusResponse,
+)
+from src.service import get_balancer_config_payload, validate_input
 
 from shared.messaging.config import BALANCER_JOBS_QUEUE
 from shared.schemas.events import BalancerJobEvent
@@ -23,9 +31,6 @@ router = APIRouter(
 )
 task_router = RabbitRouter(config.RABBITMQ_URL, logger=logger)
 
-TERMINAL_STATUSES = {"succeeded", "failed"}
-
-
 def parse_config_overrides(config_raw: str | None) -> dict | None:
     """Parse and validate config overrides from multipart form data."""
     if not config_raw:
@@ -57,8 +62,8 @@ async def parse_player_data_from_file(file: UploadFile | None) -> dict:
     logger.info(f"Processing uploaded file: {file.filename}")
     content = await file.read()
     try:
-        player_data = json.loads(content.decode("utf-8"))
-    except json.JSONDecodeError as exc:
+        player_data = orjson.loads(content)
+    except orjson.JSONDecodeError as exc:
         raise ValueError(f"Invalid JSON in uploaded file: {exc}") from exc
 
     logger.info("Successfully parsed data from uploaded file")
@@ -78,6 +83,8 @@ async def enqueue_balancer_job(file: UploadFile | None, config_raw: str | None)
 
     player_data = await parse_player_data_from_file(file)
     config_overrides = parse_config_overrides(config_raw)
+    # Unknown players and contradicting constraints are rejected here rather than failing the job.
+    validate_input(player_data, config_overrides)
 
     job_store = get_job_store()
     job_id = await job_store.create_job(player_data, config_overrides)
@@ -132,8 +139,39 @@ async def get_balancer_job_status(job_id: str) -> dict:
     return meta
 
 
-@router.get("/jobs/{job_id}/result", response_model=BalanceResponse, status_code=status.HTTP_200_OK)
-async def get_balancer_job_result(job_id: str) -> dict:
+@router.delete("/jobs/{job_id}", response_model=JobStatusResponse, status_code=status.HTTP_200_OK)
+async def cancel_balancer_job(job_id: str) -> dict:
+    """Cancel a job. A running job stops at the optimizer's next generation."""
+    job_store = get_job_store()
+    meta = await job_store.get_job_meta(job_id)
+    if meta is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Balancer job not found")
+
+    status_value = meta.get("status")
+    if status_value in TERMINAL_STATUSES:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Balancer job is already {status_value}",
+        )
+
+    await job_store.request_cancel(job_id)
+    if status_value == "queued":
+        await job_store.mark_cancelled(job_id, "Balancer job cancelled before it started")
+    logger.info(f"Cancellation requested for balancer job {job_id}")
+    return await job_store.get_job_meta(job_id) or meta
+
+
+@router.get(
+    "/jobs/{job_id}/result",
+    response_model=BalanceResponse,
+    status_code=status.HTTP_200_OK,
+    response_class=Response,
+)
+async def get_balancer_job_result(
+    job_id: str,
+    accept_encoding: str = Header(default="", alias="Accept-Encoding"),
+) -> Response:
+    """Serve the stored result bytes; validated when the job finished, so they are not parsed here."""
     job_store = get_job_store()
     meta = await job_store.get_job_meta(job_id)
     if meta is None:
@@ -145,16 +183,24 @@ async def get_balancer_job_result(job_id: str) -> dict:
             status_code=status.HTTP_409_CONFLICT,
             detail=meta.get("error") or "Balancer job failed",
         )
+    if status_value == "cancelled":
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Balancer job was cancelled")
     if status_value != "succeeded":
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail=f"Balancer job is still {status_value}",
         )
 
-    result = await job_store.get_job_result(job_id)
-    if result is None:
+    raw = await job_store.get_job_result_raw(job_id)
+    if raw is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Balancer job result not found")
-    return result
+
+    headers = {"Vary": "Accept-Encoding"}
+    if raw.startswith(GZIP_MAGIC) and "gzip" in accept_encoding.lower():
+        headers["Content-Encoding"] = "gzip"
+    else:
+        raw = unpack_document(raw)
+    return Response(content=raw, media_type="application/json", headers=headers)
 
 
 @router.get("/jobs/{job_id}/stream", status_code=status.HTTP_200_OK)
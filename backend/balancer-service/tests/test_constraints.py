@@ -0,0 +1,124 @@
+import random
+
+import pytest
+
+from src.constraints import Constraints
+from src.core.config import AlgorithmConfig
+from src.service import SOLVER_BACKENDS, Player, Team
+
+MASK = {"Tank": 1, "Damage": 1, "Support": 1}
+NUM_TEAMS = 3
+
+
+def make_players(count: int = NUM_TEAMS * 3 + 2) -> list[Player]:
+    rng = random.Random(7)
+    players = []
+    for index in range(count):
+        preferences = rng.sample(list(MASK), len(MASK))
+        ratings = {role: rng.randint(800, 2800) for role in preferences}
+        players.append(Player(f"player-{index}", ratings, preferences, f"uuid-{index}", MASK))
+    return players
+
+
+def team_of(teams: list[Team]) -> dict[str, int]:
+    return {
+        member.uuid: index for index, team in enumerate(teams) for members in team.roster.values() for member in members
+    }
+
+
+def solve(backend: str, players: list[Player], constraints: Constraints) -> list[Team]:
+    config = AlgorithmConfig(DEFAULT_MASK=MASK, POPULATION_SIZE=20, GENERATIONS=20, USE_CAPTAINS=False)
+    random.seed(3)
+    teams = SOLVER_BACKENDS[backend](players, NUM_TEAMS, config, constraints=constraints).run()
+    assert all(team.is_full() for team in teams)
+    assert constraints.violations(teams) == []
+    return teams
+
+
+@pytest.fixture(params=list(SOLVER_BACKENDS))
+def backend(request: pytest.FixtureRequest) -> str:
+    return request.param
+
+
+def test_together_group_ends_up_on_one_team(backend: str) -> None:
+    players = make_players()
+    constraints = Constraints.from_input({"together": [["uuid-0", "uuid-1"]]}, players, NUM_TEAMS, MASK)
+
+    placed = team_of(solve(backend, players, constraints))
+
+    assert placed["uuid-0"] == placed["uuid-1"]
+
+
+def test_apart_group_ends_up_on_different_teams(backend: str) -> None:
+    # No bench, so every member of the group plays.
+    players = make_players(NUM_TEAMS * 3)
+    group = ["uuid-0", "uuid-1", "uuid-2"]
+    constraints = Constraints.from_input({"apart": [group]}, players, NUM_TEAMS, MASK)
+
+    placed = team_of(solve(backend, players, constraints))
+
+    assert len({placed[uuid] for uuid in group}) == len(group)
+
+
+def test_pinned_players_stay_on_their_team(backend: str) -> None:
+    players = make_players()
+    raw = {"pins": [{"player": "uuid-0", "team": 3}, {"player": "uuid-1", "team": 1}]}
+    constraints = Constraints.from_input(raw, players, NUM_TEAMS, MASK)
+
+    placed = team_of(solve(backend, players, constraints))
+
+    assert placed["uuid-0"] == 2
+    assert placed["uuid-1"] == 0
+
+
+def test_pinned_together_group_moves_with_its_pin(backend: str) -> None:
+    players = make_players()
+    raw = {"together": [["uuid-0", "uuid-1"]], "pins": [{"player": "uuid-1", "team": 2}]}
+    constraints = Constraints.from_input(raw, players, NUM_TEAMS, MASK)
+
+    placed = team_of(solve(backend, players, constraints))
+
+    assert placed["uuid-0"] == placed["uuid-1"] == 1
+
+
+def test_together_members_are_not_movable() -> None:
+    players = make_players()
+    constraints = Constraints.from_input({"together": [["uuid-0", "uuid-1"]]}, players, NUM_TEAMS, MASK)
+
+    assert not constraints.is_movable(players[0])
+    assert not constraints.is_movable(players[1])
+    assert constraints.is_movable(players[2])
+
+
+@pytest.mark.parametrize(
+    ("raw", "message"),
+    [
+        ({"together": [["uuid-0", "uuid-404"]]}, "unknown or unplayable player 'uuid-404'"),
+        ({"together": [["uuid-0", "uuid-1", "uuid-2", "uuid-3"]]}, "does not fit the role slots of one team"),
+        ({"pins": [{"player": "uuid-0", "team": 4}]}, "only 3 teams are formed"),
+        ({"apart": [["uuid-0", "uuid-1", "uuid-2", "uuid-3"]]}, "has more players than there are teams"),
+        ({"together": [["uuid-0", "uuid-1"]], "apart": [["uuid-0", "uuid-1"]]}, "must be both together and apart"),
+        (
+            {
+                "pins": [{"player": "uuid-0", "team": 1}, {"player": "uuid-1", "team": 1}],
+                "apart": [["uuid-0", "uuid-1"]],
+            },
+            "pinned to the same team",
+        ),
+        ({"unknown": []}, "Invalid constraints"),
+    ],
+)
+def test_contradicting_constraints_are_rejected(raw: dict, message: str) -> None:
+    with pytest.raises(ValueError, match=message):
+        Constraints.from_input(raw, make_players(), NUM_TEAMS, MASK)
+
+
+def test_unsatisfiable_constraints_fail_construction(backend: str) -> None:
+    players = make_players()
+    tanks = [Player(f"tank-{index}", {"Tank": 2000}, ["Tank"], f"tank-{index}", MASK) for index in range(2)]
+    raw = {"pins": [{"player": "tank-0", "team": 1}, {"player": "tank-1", "team": 1}]}
+    constraints = Constraints.from_input(raw, players + tanks, NUM_TEAMS, MASK)
+
+    config = AlgorithmConfig(DEFAULT_MASK=MASK, POPULATION_SIZE=10, GENERATIONS=10, USE_CAPTAINS=False)
+    with pytest.raises(ValueError, match="Unable to create valid team configurations"):
+        SOLVER_BACKENDS[backend](players + tanks, NUM_TEAMS, config, constraints=constraints).run()
@@ -0,0 +1,72 @@
+import itertools
+import random
+
+import pytest
+
+from src.core.config import AlgorithmConfig
+from src.service import BranchAndBoundOptimizer, Player, Team, calculate_cost, select_solver
+
+ROLES = ("Tank", "Damage", "Support")
+
+
+def make_players(count: int, mask: dict[str, int], seed: int) -> list[Player]:
+    rng = random.Random(seed)
+    roles = [role for role in ROLES if role in mask]
+    players = []
+    for index in range(count):
+        preferences = rng.sample(roles, rng.randint(1, len(roles)))
+        ratings = {role: rng.randint(800, 2800) for role in preferences}
+        players.append(Player(f"player-{index}", ratings, preferences, f"uuid-{index}", mask))
+    return players
+
+
+def brute_force_cost(players: list[Player], num_teams: int, config: AlgorithmConfig) -> float:
+    """Cost of the best assignment, by trying every ordering of players over the role slots."""
+    mask = config.DEFAULT_MASK
+    slots = [(team, role) for team in range(num_teams) for role, count in mask.items() for _ in range(count)]
+    best = float("inf")
+    for chosen in itertools.permutations(players, len(slots)):
+        if not all(player.can_play(role) for player, (_, role) in zip(chosen, slots, strict=True)):
+            continue
+        teams = [Team(index + 1, mask) for index in range(num_teams)]
+        for player, (team, role) in zip(chosen, slots, strict=True):
+            teams[team].add_player(role, player)
+        best = min(best, calculate_cost(teams, config))
+    return best
+
+
+@pytest.mark.parametrize(
+    ("mask", "num_teams"),
+    [({"Tank": 1, "Damage": 2}, 2), ({"Tank": 1, "Damage": 1, "Support": 1}, 2), ({"Tank": 1, "Damage": 1}, 3)],
+)
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_branch_and_bound_matches_brute_force(mask: dict[str, int], num_teams: int, seed: int) -> None:
+    config = AlgorithmConfig(DEFAULT_MASK=mask, USE_CAPTAINS=False)
+    players = make_players(num_teams * sum(mask.values()) + 1, mask, seed)
+    random.seed(seed)
+
+    optimizer = BranchAndBoundOptimizer(players, num_teams, config)
+    teams = optimizer.run()
+
+    assert optimizer.proven_optimal
+    assert calculate_cost(teams, config) == pytest.approx(brute_force_cost(players, num_teams, config))
+
+
+@pytest.mark.parametrize(
+    ("num_teams", "expected"),
+    [(1, "exact"), (2, "exact"), (3, "local_search"), (8, "local_search"), (9, "genetic"), (16, "genetic")],
+)
+def test_auto_selects_solver_by_team_count(num_teams: int, expected: str) -> None:
+    assert select_solver(AlgorithmConfig(), num_teams) == expected
+
+
+def test_configured_solver_overrides_auto() -> None:
+    assert select_solver(AlgorithmConfig(SOLVER="genetic"), 2) == "genetic"
+    assert select_solver(AlgorithmConfig(SOLVER="exact"), 8) == "exact"
+
+
+def test_auto_limits_are_configurable() -> None:
+    config = AlgorithmConfig(EXACT_MAX_TEAMS=0, SMALL_INSTANCE_MAX_TEAMS=4)
+
+    assert select_solver(config, 2) == "local_search"
+    assert select_solver(config, 5) == "genetic"
@@ -13,6 +13,8 @@ from pydantic import ValidationError
 
 from src.core.config import settings
 from src.core.db import async_session_maker
+from src.core.s3 import log_storage
+from src.services import ledger
 
 from shared.observability import setup_logging
 
@@ -24,8 +26,8 @@ logger = setup_logging(
     json_output=settings.json_logging,
 )
 from shared.models import Tournament, TournamentDiscordChannel
-from shared.schemas.events import DiscordCommandEvent
-from shared.messaging.config import DISCORD_COMMANDS_QUEUE
+from shared.schemas.events import DiscordCommandEvent, ProcessMatchLogEvent
+from shared.messaging.config import DISCORD_COMMANDS_QUEUE, PROCESS_MATCH_LOG_QUEUE
 
 
 intents = discord.Intents.default()
@@ -48,6 +50,12 @@ rabbit_broker: RabbitBroker | None = None
 active_channels: Dict[int, int] = {}  # channel_id -> tournament_id
 processing_messages: Set[int] = set()  # message IDs being processed
 
+# Bounds concurrent attachment downloads (and uploads) across all channels
+attachment_semaphore = asyncio.Semaphore(settings.attachment_concurrency)
+
+# Shared HTTP clients, one connection pool per destination
+_http_clients: dict[str, httpx.AsyncClient] = {}
+
 _service_token: str | None = None
 _service_token_expires_at: float = 0.0
 _service_token_lock = asyncio.Lock()
@@ -93,18 +101,31 @@ async def get_service_token() -> str:
         return token
 
 
-async def get_httpx_client(destination: str = "internal") -> httpx.AsyncClient:
-    """Create HTTP client for parser service"""
-    headers: dict[str, str] = {}
-    if destination == "internal":
-        headers["Authorization"] = f"Bearer {await get_service_token()}"
+def get_http_client(destination: str = "internal") -> httpx.AsyncClient:
+    """
+    Shared HTTP client: "internal" for the parser service, "discord" for attachment downloads
+    Clients live for the whole bot lifetime so connections are reused.
+    """
+    http_client = _http_clients.get(destination)
+    if http_client is None:
+        http_client = httpx.AsyncClient(
+            base_url=settings.parser_url if destination == "internal" else "",
+            proxy=httpx.Proxy(url=PROXY_CONF) if PROXY_CONF and destination != "internal" else None,
+            timeout=httpx.Timeout(30, read=60),
+            limits=httpx.Limits(max_connections=settings.http_max_connections),
+        )
+        _http_clients[destination] = http_client
+    return http_client
 
-    return httpx.AsyncClient(
-        base_url=settings.parser_url,
-        headers=headers,
-        proxy=httpx.Proxy(url=PROXY_CONF) if PROXY_CONF and destination != "internal" else None,
-        timeout=httpx.Timeout(30, read=60),
-    )
+
+async def close_http_clients() -> None:
+    for http_client in _http_clients.values():
+        await http_client.aclose()
+    _http_clients.clear()
+
+
+async def get_internal_headers() -> dict[str, str]:
+    return {"Authorization": f"Bearer {await get_service_token()}"}
 
 
 async def get_tournament_discord_channels(tournament_id: int) -> list[int]:
@@ -166,91 +187,120 @@ async def load_active_channels():
         logger.success(f"✅ Loaded {len(active_channels)} active channels")
 
 
+async def request_processing(tournament_id: int, filename: str) -> bool:
+    """
+    Queue an uploaded log for parsing on PROCESS_MATCH_LOG_QUEUE
+    Without RabbitMQ the parser's synchronous endpoint is called instead.
+    """
+    if rabbit_broker is not None:
+        event = ProcessMatchLogEvent(tournament_id=tournament_id, filename=filename)
+        await rabbit_broker.publish(event.model_dump(), PROCESS_MATCH_LOG_QUEUE)
+        logger.success(f"✅ {filename} queued for processing")
+        return True
+
+    process_response = await get_http_client("internal").post(
+        f"logs/{tournament_id}/{filename}", headers=await get_internal_headers()
+    )
+
+    if process_response.status_code == 400:
+        process_data = process_response.json()
+        if process_data["detail"][0]["code"] == "match_not_finished":
+            return True
+
+    if process_response.status_code != 200:
+        logger.error(
+            f"❌ Processing failed for {filename}: "
+            f"{process_response.status_code} - {process_response.text}"
+        )
+        return False
+
+    logger.success(f"✅ {filename} processed successfully")
+    return True
+
+
 async def process_attachment(
+    message: discord.Message,
     tournament_id: int,
     attachment: discord.Attachment,
 ) -> bool:
     """
-    Download and process a single attachment
-    Returns True if successful
+    Stream a single attachment from Discord to S3 and queue it for processing
+    The outcome is recorded in the ledger. Returns True if successful
     """
+    error: str | None = None
     try:
-        logger.info(f"📥 Downloading {attachment.filename} for tournament {tournament_id}")
-        async with await get_httpx_client(destination="discord") as http_client:
-            # Download file from Discord
-            response = await http_client.get(attachment.url)
-            response.raise_for_status()
-
-        async with await get_httpx_client(destination="internal") as http_client:
-            # Upload to parser service
-            files = {"file": (attachment.filename, response.content, attachment.content_type)}
-
-            upload_response = await http_client.post(f"logs/{tournament_id}/upload", files=files)
-
-            if upload_response.status_code != 200:
-                logger.error(
-                    f"❌ Upload failed for {attachment.filename}: "
-                    f"{upload_response.status_code} - {upload_response.text}"
-                )
-                return False
-
-            logger.success(f"✅ {attachment.filename} uploaded")
-
-            # Process the uploaded file
-            process_response = await http_client.post(f"logs/{tournament_id}/{attachment.filename}")
+        async with attachment_semaphore:
+            logger.info(f"📥 Downloading {attachment.filename} ({attachment.size} bytes) for tournament {tournament_id}")
+            async with get_http_client("discord").stream("GET", attachment.url) as response:
+                response.raise_for_status()
+                await log_storage.upload_log_stream(tournament_id, attachment.filename, response.aiter_bytes())
 
-            if process_response.status_code == 400:
-                process_data = process_response.json()
-                if not process_data["detail"][0]["code"] == "match_not_finished":
-                    logger.error(
-                        f"❌ Processing failed for {attachment.filename}: "
-                        f"{process_response.status_code} - {process_response.text}"
-                    )
-                    return False
-
-            if process_response.status_code != 200:
-                logger.error(
-                    f"❌ Processing failed for {attachment.filename}: "
-                    f"{process_response.status_code} - {process_response.text}"
-                )
-                return False
-
-        logger.success(f"✅ {attachment.filename} processed successfully")
-        return True
+        logger.success(f"✅ {attachment.filename} uploaded")
+        if not await request_processing(tournament_id, attachment.filename):
+            error = "Processing request failed"
 
     except httpx.HTTPError as e:
         logger.error(f"❌ HTTP error processing {attachment.filename}: {e}")
-        return False
+        error = f"HTTP error: {e}"
     except Exception as e:
         logger.error(f"❌ Unexpected error processing {attachment.filename}: {e}")
-        return False
+        error = f"Unexpected error: {e}"
+
+    try:
+        await ledger.record_outcome(
+            message.channel.id, message.id, tournament_id, attachment, succeeded=error is None, error=error
+        )
+    except Exception as e:
+        logger.error(f"❌ Failed to record {attachment.filename} in the ledger: {e}")
+
+    return error is None
 
 
-async def process_message(message: discord.Message, tournament_id: int) -> None:
+async def process_message(
+    message: discord.Message,
+    tournament_id: int,
+    force: bool = False,
+    succeeded: set[ledger.AttachmentKey] | None = None,
+) -> bool | None:
     """
     Process a single message and its attachments
-    Adds reactions to indicate status
+    Adds reactions to indicate status. Attachments the ledger records as
+    processed are skipped unless forced; `succeeded` saves the ledger lookup
+    when the caller already made it. Returns False if an attachment failed,
+    and None if the message is already being processed by another call.
     """
     if message.id in processing_messages:
-        return  # Already processing
+        return None  # Already processing, the outcome is not known yet
 
     if not message.attachments:
-        return  # No attachments to process
+        return True  # No attachments to process
 
     processing_messages.add(message.id)
 
     try:
-        results = []
+        log_attachments = []
         for attachment in message.attachments:
             # Only process log files
             if attachment.filename.lower().endswith((".txt", ".log", ".json")):
-                success = await process_attachment(tournament_id, attachment)
-                results.append(success)
+                log_attachments.append(attachment)
             else:
                 logger.info(f"⏭️ Skipping non-log file: {attachment.filename}")
 
-        if not results:
-            return
+        if not force:
+            if succeeded is None:
+                succeeded = await ledger.get_succeeded(message.channel.id, [message.id])
+            log_attachments = [
+                attachment
+                for attachment in log_attachments
+                if ledger.attachment_key(message.id, attachment) not in succeeded
+            ]
+
+        if not log_attachments:
+            return True
+
+        results = await asyncio.gather(
+            *(process_attachment(message, tournament_id, attachment) for attachment in log_attachments)
+        )
 
         # Update reactions based on results
         try:
@@ -271,14 +321,24 @@ async def process_message(message: discord.Message, tournament_id: int) -> None:
         except discord.HTTPException as e:
             logger.warning(f"⚠️ Failed to add reaction: {e}")
 
+        return all(results)
+
     finally:
         processing_messages.discard(message.id)
 
 
 async def process_channel_history(channel_id: int, tournament_id: int, limit: int = 10):
     """
-    Process recent message history in a channel
-    Used when bot starts or channel is newly added
+    Process message history in a channel
+    Used when bot starts or channel is newly added. Only messages newer than the
+    channel checkpoint are fetched (the newest `limit` ones without a checkpoint),
+    attachments already in the ledger are skipped, and messages are processed
+    concurrently (downloads bounded by attachment_semaphore). The checkpoint then
+    moves up to the newest scanned message, stopping before the oldest message
+    still being processed elsewhere (e.g. by on_message) and the oldest failure
+    that has not yet used up its `attachment_max_attempts`. Failures past that
+    limit are logged and skipped so they cannot stall the channel; they can
+    still be retried with a process_message command.
     """
     try:
         channel = await get_text_channel(channel_id)
@@ -286,15 +346,43 @@ async def process_channel_history(channel_id: int, tournament_id: int, limit: in
             logger.error(f"❌ Channel {channel_id} not found")
             return
 
-        logger.info(f"🔍 Processing last {limit} messages in channel {channel_id}")
-
-        processed = 0
-        async for message in channel.history(limit=limit):
+        checkpoint = await ledger.get_checkpoint(channel_id)
+        if checkpoint:
+            logger.info(f"🔍 Processing up to {limit} messages after {checkpoint} in channel {channel_id}")
+            history = channel.history(limit=limit, after=discord.Object(id=checkpoint))
+        else:
+            logger.info(f"🔍 Processing last {limit} messages in channel {channel_id}")
+            history = channel.history(limit=limit)
+
+        newest = checkpoint or 0
+        messages = []
+        async for message in history:
+            newest = max(newest, message.id)
             if message.attachments:
-                await process_message(message, tournament_id)
-                processed += 1
+                messages.append(message)
+
+        succeeded = await ledger.get_succeeded(channel_id, [message.id for message in messages])
+        async with asyncio.TaskGroup() as tasks:
+            outcomes = {
+                message.id: tasks.create_task(process_message(message, tournament_id, succeeded=succeeded))
+                for message in messages
+            }
+
+        failed = [message_id for message_id, task in outcomes.items() if task.result() is False]
+        in_flight = [message_id for message_id, task in outcomes.items() if task.result() is None]
+        exhausted = await ledger.get_exhausted(channel_id, failed, settings.attachment_max_attempts)
+        for message_id in sorted(exhausted):
+            logger.error(
+                f"🚨 Giving up on message {message_id} in channel {channel_id} after "
+                f"{settings.attachment_max_attempts} failed attempts, the checkpoint moves past it"
+            )
+        held = [message_id for message_id in failed if message_id not in exhausted] + in_flight
+        if held:
+            newest = min(held) - 1
+        if newest > (checkpoint or 0):
+            await ledger.save_checkpoint(channel_id, newest)
 
-        logger.success(f"✅ Processed {processed} messages with attachments")
+        logger.success(f"✅ Processed {len(messages)} messages with attachments ({len(failed)} failed)")
 
     except discord.Forbidden:
         logger.error(f"❌ No permission to read channel {channel_id}")
@@ -328,8 +416,12 @@ def register_rabbit_handlers(broker: RabbitBroker) -> None:
                     f"📩 RabbitMQ command: process_all for tournament {event.tournament_id} "
                     f"({len(channel_ids)} channel(s))"
                 )
-                for channel_id in channel_ids:
-                    await process_channel_history(channel_id, event.tournament_id, limit=500)
+                await asyncio.gather(
+                    *(
+                        process_channel_history(channel_id, event.tournament_id, limit=settings.history_scan_limit)
+                        for channel_id in channel_ids
+                    )
+                )
 
                 await msg.ack()
                 return
@@ -361,7 +453,7 @@ def register_rabbit_handlers(broker: RabbitBroker) -> None:
                 f"📩 RabbitMQ command: process_message channel={event.channel_id} message={event.message_id} "
                 f"tournament={event.tournament_id}"
             )
-            await process_message(fetched_message, event.tournament_id)
+            await process_message(fetched_message, event.tournament_id, force=True)
             await msg.ack()
 
         except Exception as e:
@@ -417,8 +509,12 @@ async def on_ready():
     await load_active_channels()
 
     # Process recent history for all active channels
-    for channel_id, tournament_id in active_channels.items():
-        await process_channel_history(channel_id, tournament_id, limit=500)
+    await asyncio.gather(
+        *(
+            process_channel_history(channel_id, tournament_id, limit=settings.history_scan_limit)
+            for channel_id, tournament_id in active_channels.items()
+        )
+    )
 
     # Start background monitor task
     client.loop.create_task(channel_monitor_task())
@@ -456,7 +552,7 @@ async def on_message_edit(before: discord.Message, after: discord.Message):
     # Check if attachments were added
     if len(after.attachments) > len(before.attachments):
         logger.info(f"📝 Message edited with new attachments")
-        await process_message(after, tournament_id)
+        await process_message(after, tournament_id, force=True)
 
 
 @client.event
@@ -476,6 +572,7 @@ async def main():
     try:
         logger.info("🚀 Starting Discord Log Collection Bot...")
         await start_rabbitmq_listener()
+        await log_storage.start()
         await client.start(settings.discord_token)
     except KeyboardInterrupt:
         logger.info("⏸️ Shutting down bot...")
@@ -484,6 +581,8 @@ async def main():
     finally:
         await stop_rabbitmq_listener()
         await client.close()
+        await close_http_clients()
+        await log_storage.close()
         logger.info("👋 Bot stopped")
 
 
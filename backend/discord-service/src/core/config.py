@@ -27,6 +27,19 @@ class Settings(BaseSettings):
     # Parser Service
     parser_url: str
 
+    # S3 (match logs are written straight to the parser's bucket)
+    s3_access_key: str
+    s3_secret_key: str
+    s3_endpoint_url: str
+    s3_bucket_name: str
+
+    # Attachment ingestion
+    attachment_concurrency: int = 4
+    http_max_connections: int = 20
+    history_scan_limit: int = 500
+    # Failed attempts after which an attachment no longer holds back the channel checkpoint
+    attachment_max_attempts: int = 5
+
     # Auth Service (service-to-service token)
     auth_service_url: str = "http://auth:8001"
     service_client_id: str
@@ -0,0 +1,98 @@
+"""
+S3 storage for match logs collected from Discord
+"""
+from collections.abc import AsyncIterator
+from contextlib import AsyncExitStack
+
+from aiobotocore.session import get_session
+from botocore.exceptions import ClientError
+from loguru import logger
+
+from src.core.config import settings
+
+# S3 requires every part of a multipart upload but the last to be at least 5 MiB.
+MULTIPART_PART_SIZE = 8 * 1024 * 1024
+
+
+class S3LogStorage:
+    """Writes match logs to the bucket the parser reads them from (`logs/{tournament_id}/{filename}`).
+
+    One client (and its connection pool) is kept open for the lifetime of the bot.
+    """
+
+    def __init__(self, bucket_name: str) -> None:
+        self.bucket_name = bucket_name
+        self._exit_stack: AsyncExitStack | None = None
+        self._client = None
+
+    async def start(self) -> None:
+        if self._client is not None:
+            return
+        self._exit_stack = AsyncExitStack()
+        self._client = await self._exit_stack.enter_async_context(
+            get_session().create_client(
+                "s3",
+                aws_access_key_id=settings.s3_access_key,
+                aws_secret_access_key=settings.s3_secret_key,
+                endpoint_url=settings.s3_endpoint_url,
+            )
+        )
+
+    async def close(self) -> None:
+        if self._exit_stack is not None:
+            await self._exit_stack.aclose()
+        self._exit_stack = None
+        self._client = None
+
+    async def upload_log_stream(self, tournament_id: int, filename: str, chunks: AsyncIterator[bytes]) -> int:
+        """
+        Stream a log into the bucket without holding the whole file in memory
+        Small files are sent with one PUT, larger ones as a multipart upload.
+        Returns the number of bytes written.
+        """
+        await self.start()
+        key = f"logs/{tournament_id}/{filename}"
+        buffer = bytearray()
+        upload_id: str | None = None
+        parts: list[dict] = []
+        size = 0
+
+        try:
+            async for chunk in chunks:
+                buffer += chunk
+                size += len(chunk)
+                if len(buffer) < MULTIPART_PART_SIZE:
+                    continue
+                if upload_id is None:
+                    response = await self._client.create_multipart_upload(Bucket=self.bucket_name, Key=key)
+                    upload_id = response["UploadId"]
+                parts.append(await self._upload_part(key, upload_id, len(parts) + 1, bytes(buffer)))
+                buffer.clear()
+
+            if upload_id is None:
+                await self._client.put_object(Bucket=self.bucket_name, Key=key, Body=bytes(buffer))
+            else:
+                if buffer:
+                    parts.append(await self._upload_part(key, upload_id, len(parts) + 1, bytes(buffer)))
+                await self._client.complete_multipart_upload(
+                    Bucket=self.bucket_name, Key=key, UploadId=upload_id, MultipartUpload={"Parts": parts}
+                )
+        except BaseException:
+            if upload_id is not None:
+                try:
+                    await self._client.abort_multipart_upload(Bucket=self.bucket_name, Key=key, UploadId=upload_id)
+                except ClientError as e:
+                    logger.warning(f"⚠️ Failed to abort multipart upload of {key}: {e}")
+            raise
+
+        logger.info(f"Uploaded file to {key} ({size} bytes)")
+        return size
+
+    async def _upload_part(self, key: str, upload_id: str, part_number: int, body: bytes) -> dict:
+        response = await self._client.upload_part(
+            Bucket=self.bucket_name, Key=key, UploadId=upload_id, PartNumber=part_number, Body=body
+        )
+        return {"ETag": response["ETag"], "PartNumber": part_number}
+
+
+log_storage = S3LogStorage(bucket_name=settings.s3_bucket_name)
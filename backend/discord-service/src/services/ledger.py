@@ -0,0 +1,114 @@
+"""
+Persistent ledger of processed Discord attachments and per channel scan checkpoints
+"""
+import discord
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from shared.models import DiscordProcessedAttachment, TournamentDiscordChannel
+from src.core.db import async_session_maker
+
+# (message id, attachment id, size): an attachment replaced under the same id counts as new
+AttachmentKey = tuple[int, int, int]
+
+
+def attachment_key(message_id: int, attachment: discord.Attachment) -> AttachmentKey:
+    return message_id, attachment.id, attachment.size
+
+
+async def get_succeeded(channel_id: int, message_ids: list[int]) -> set[AttachmentKey]:
+    """Keys of the attachments of these messages that were processed successfully"""
+    if not message_ids:
+        return set()
+    async with async_session_maker() as session:
+        result = await session.execute(
+            sa.select(
+                DiscordProcessedAttachment.message_id,
+                DiscordProcessedAttachment.attachment_id,
+                DiscordProcessedAttachment.size,
+            ).where(
+                DiscordProcessedAttachment.channel_id == channel_id,
+                DiscordProcessedAttachment.message_id.in_(message_ids),
+                DiscordProcessedAttachment.status == "succeeded",
+            )
+        )
+        return {tuple(row) for row in result.all()}
+
+
+async def get_exhausted(channel_id: int, message_ids: list[int], max_attempts: int) -> set[int]:
+    """Messages whose failed attachments all failed at least `max_attempts` times"""
+    if not message_ids:
+        return set()
+    async with async_session_maker() as session:
+        result = await session.scalars(
+            sa.select(DiscordProcessedAttachment.message_id)
+            .where(
+                DiscordProcessedAttachment.channel_id == channel_id,
+                DiscordProcessedAttachment.message_id.in_(message_ids),
+                DiscordProcessedAttachment.status == "failed",
+            )
+            .group_by(DiscordProcessedAttachment.message_id)
+            .having(sa.func.min(DiscordProcessedAttachment.attempts) >= max_attempts)
+        )
+        return set(result.all())
+
+
+async def record_outcome(
+    channel_id: int,
+    message_id: int,
+    tournament_id: int,
+    attachment: discord.Attachment,
+    succeeded: bool,
+    error: str | None = None,
+) -> None:
+    """Store the outcome of processing an attachment, counting repeated attempts"""
+    statement = pg_insert(DiscordProcessedAttachment).values(
+        channel_id=channel_id,
+        message_id=message_id,
+        attachment_id=attachment.id,
+        size=attachment.size,
+        tournament_id=tournament_id,
+        filename=attachment.filename,
+        status="succeeded" if succeeded else "failed",
+        error=error,
+        attempts=1,
+        created_at=sa.func.now(),
+    )
+    statement = statement.on_conflict_do_update(
+        constraint="uq_discord_processed_attachment",
+        set_={
+            "tournament_id": statement.excluded.tournament_id,
+            "status": statement.excluded.status,
+            "error": statement.excluded.error,
+            "attempts": DiscordProcessedAttachment.attempts + 1,
+            "updated_at": sa.func.now(),
+        },
+    )
+    async with async_session_maker() as session:
+        await session.execute(statement)
+        await session.commit()
+
+
+async def get_checkpoint(channel_id: int) -> int | None:
+    async with async_session_maker() as session:
+        return await session.scalar(
+            sa.select(TournamentDiscordChannel.last_message_id).where(
+                TournamentDiscordChannel.channel_id == channel_id
+            )
+        )
+
+
+async def save_checkpoint(channel_id: int, message_id: int) -> None:
+    """Move the channel checkpoint forward (never back) to `message_id`"""
+    async with async_session_maker() as session:
+        await session.execute(
+            sa.update(TournamentDiscordChannel)
+            .where(TournamentDiscordChannel.channel_id == channel_id)
+            .values(
+                last_message_id=sa.func.greatest(
+                    sa.func.coalesce(TournamentDiscordChannel.last_message_id, 0), message_id
+                ),
+                updated_at=sa.func.now(),
+            )
+        )
+        await session.commit()
@@ -0,0 +1,51 @@
+"""Add materialized user profile snapshots
+
+Revision ID: b3e8d51c0f27
+Revises: 7c1b9f4e2aa1
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "b3e8d51c0f27"
+down_revision: str | None = "7c1b9f4e2aa1"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "user_profile_snapshot",
+        sa.Column("id", sa.BigInteger(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("user_id", sa.BigInteger(), nullable=False),
+        sa.Column("data", postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column("is_stale", sa.Boolean(), server_default=sa.text("true"), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["user.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_user_profile_snapshot_user_id"),
+        "user_profile_snapshot",
+        ["user_id"],
+        unique=True,
+    )
+    op.create_index(
+        "ix_user_profile_snapshot_stale",
+        "user_profile_snapshot",
+        ["id"],
+        postgresql_where=sa.text("is_stale IS TRUE"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_user_profile_snapshot_stale", table_name="user_profile_snapshot")
+    op.drop_index(op.f("ix_user_profile_snapshot_user_id"), table_name="user_profile_snapshot")
+    op.drop_table("user_profile_snapshot")
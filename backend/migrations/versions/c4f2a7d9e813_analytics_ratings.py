@@ -0,0 +1,61 @@
+"""Add per tournament analytics rating state
+
+Revision ID: c4f2a7d9e813
+Revises: b3e8d51c0f27
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "c4f2a7d9e813"
+down_revision: str | None = "b3e8d51c0f27"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "analytics_ratings",
+        sa.Column("id", sa.BigInteger(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("tournament_id", sa.BigInteger(), nullable=False),
+        sa.Column("algorithm_id", sa.BigInteger(), nullable=False),
+        sa.Column("user_id", sa.BigInteger(), nullable=False),
+        sa.Column(
+            "role",
+            postgresql.ENUM("tank", "damage", "support", name="heroclass", create_type=False),
+            nullable=True,
+        ),
+        sa.Column("div", sa.Integer(), nullable=True),
+        sa.Column("changes", sa.Integer(), nullable=True),
+        sa.Column("shift", sa.Float(), nullable=True),
+        sa.Column("mu", sa.Float(), nullable=True),
+        sa.Column("sigma", sa.Float(), nullable=True),
+        sa.ForeignKeyConstraint(["tournament_id"], ["tournament.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["algorithm_id"], ["analytics_algorithms.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["user_id"], ["user.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_analytics_ratings_lookup",
+        "analytics_ratings",
+        ["algorithm_id", "user_id", "role", "tournament_id"],
+    )
+    op.create_index(
+        "ix_analytics_ratings_tournament",
+        "analytics_ratings",
+        ["algorithm_id", "tournament_id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_analytics_ratings_tournament", table_name="analytics_ratings")
+    op.drop_index("ix_analytics_ratings_lookup", table_name="analytics_ratings")
+    op.drop_table("analytics_ratings")
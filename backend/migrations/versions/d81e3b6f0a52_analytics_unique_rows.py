@@ -0,0 +1,37 @@
+"""Make analytics rows unique per tournament for bulk upserts
+
+Revision ID: d81e3b6f0a52
+Revises: c4f2a7d9e813
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d81e3b6f0a52"
+down_revision: str | None = "c4f2a7d9e813"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+# (table, constraint, columns)
+CONSTRAINTS = (
+    ("analytics_tournament", "uq_analytics_tournament_player", ("tournament_id", "player_id")),
+    ("analytics_shifts", "uq_analytics_shift_player", ("algorithm_id", "tournament_id", "player_id")),
+    ("analytics_predictions", "uq_analytics_prediction_team", ("algorithm_id", "tournament_id", "team_id")),
+)
+
+
+def upgrade() -> None:
+    for table, name, columns in CONSTRAINTS:
+        # Keep the newest row of any duplicates left by earlier recalculations.
+        same_key = " AND ".join(f"older.{column} = newer.{column}" for column in columns)
+        op.execute(f"DELETE FROM {table} AS older USING {table} AS newer WHERE older.id < newer.id AND {same_key}")
+        op.create_unique_constraint(name, table, list(columns))
+
+
+def downgrade() -> None:
+    for table, name, _ in reversed(CONSTRAINTS):
+        op.drop_constraint(name, table, type_="unique")
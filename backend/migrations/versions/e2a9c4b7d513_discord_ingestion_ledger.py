@@ -0,0 +1,47 @@
+"""Add the Discord attachment ledger and per channel checkpoints
+
+Revision ID: e2a9c4b7d513
+Revises: d81e3b6f0a52
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e2a9c4b7d513"
+down_revision: str | None = "d81e3b6f0a52"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.add_column("tournament_discord_channel", sa.Column("last_message_id", sa.BigInteger(), nullable=True))
+    op.create_table(
+        "discord_processed_attachment",
+        sa.Column("id", sa.BigInteger(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("channel_id", sa.BigInteger(), nullable=False),
+        sa.Column("message_id", sa.BigInteger(), nullable=False),
+        sa.Column("attachment_id", sa.BigInteger(), nullable=False),
+        sa.Column("size", sa.BigInteger(), nullable=False),
+        sa.Column("tournament_id", sa.BigInteger(), nullable=False),
+        sa.Column("filename", sa.String(length=255), nullable=False),
+        sa.Column("status", sa.String(length=20), nullable=False),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["tournament_id"], ["tournament.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint(
+            "channel_id", "message_id", "attachment_id", "size", name="uq_discord_processed_attachment"
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("discord_processed_attachment")
+    op.drop_column("tournament_discord_channel", "last_message_id")
@@ -0,0 +1,26 @@
+"""Add the rebuild claim of user profile snapshots
+
+Revision ID: f4c7a2e9d186
+Revises: e2a9c4b7d513
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "f4c7a2e9d186"
+down_revision: str | None = "e2a9c4b7d513"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.add_column("user_profile_snapshot", sa.Column("claimed_at", sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("user_profile_snapshot", "claimed_at")
@@ -1,7 +1,7 @@
 from contextlib import asynccontextmanager
 from datetime import datetime, UTC
 
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
 from fastapi.encoders import jsonable_encoder
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
@@ -21,9 +21,10 @@ from shared.observability import (
     check_postgres,
     check_redis,
     check_rabbitmq,
+    profiling_router,
 )
 from src import routes
-from src.core import config, db
+from src.core import auth, config, db
 from src.middlewares.exception import ExceptionMiddleware
 from starlette.requests import Request
 
@@ -39,6 +40,9 @@ logger = setup_logging(
 auth_client = AuthClient(
     base_url=config.settings.auth_service_url,
     timeout=config.settings.auth_service_timeout,
+    local_validation=config.settings.auth_local_validation,
+    rbac_cache_ttl=config.settings.auth_rbac_cache_ttl,
+    redis_url=str(config.settings.redis_url),
 )
 
 
@@ -111,6 +115,9 @@ app.add_middleware(TimeMiddleware)
 app.add_middleware(CorrelationIdMiddleware)
 
 app.include_router(routes.router)
+if config.settings.profiling_enabled:
+    # Also samples the RabbitMQ consumers, which run in this process.
+    app.include_router(profiling_router(dependencies=[Depends(auth.require_role("admin"))]))
 
 
 @app.get("/health")
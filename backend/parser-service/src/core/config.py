@@ -27,6 +27,9 @@ class AppConfig(BaseSettings):
     auth_service_url: str = "http://auth:8001"  # CRITICAL FIX: was using wrong port 8080
     auth_service_timeout: float = 5.0
     auth_service_max_retries: int = 2
+    # Verify access tokens against the auth-service JWKS; RBAC cached per user
+    auth_local_validation: bool = True
+    auth_rbac_cache_ttl: float = 60.0
 
     # Circuit Breaker
     circuit_breaker_failure_threshold: int = 5
@@ -47,6 +50,7 @@ class AppConfig(BaseSettings):
     otlp_endpoint: str | None = None  # e.g., "http://jaeger:4317"
     tracing_enabled: bool = False
     json_logging: bool = True  # True for production JSON logs
+    profiling_enabled: bool = False  # Admin-only POST /debug/profile sampling profiler
 
     # Postgres
     postgres_user: str
@@ -57,6 +61,8 @@ class AppConfig(BaseSettings):
 
     challonge_username: str
     challonge_api_key: str
+    challonge_requests_per_second: float = 4.0
+    challonge_max_concurrency: int = 4
 
     s3_access_key: str
     s3_secret_key: str
@@ -70,6 +76,12 @@ class AppConfig(BaseSettings):
 
     rabbitmq_url: str | None = None
 
+    # Achievements
+    achievement_max_concurrency: int = 4
+
+    # Analytics
+    analytics_workers: int = 2
+
     @property
     def db_url_asyncpg(self):
         url = (
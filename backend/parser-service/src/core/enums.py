@@ -22,6 +22,23 @@ class RouteTag(StrEnum):
     ACHIEVEMENT = " Achievement"
 
 
+class AchievementScope(StrEnum):
+    """Granularity an achievement rule is calculated at"""
+
+    GLOBAL = "global"
+    TOURNAMENT = "tournament"
+    MATCH = "match"
+
+
+class AchievementInput(StrEnum):
+    """Source data an achievement rule reads"""
+
+    ROSTERS = "rosters"  # players, teams
+    STANDINGS = "standings"
+    MATCHES = "matches"  # encounters, matches
+    MATCH_STATISTICS = "match_statistics"
+
+
 game_mode_dict = {
     "Осада": "Assault",
     "Натиск": "Push",
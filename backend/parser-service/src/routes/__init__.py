@@ -13,6 +13,7 @@ from src.routes.tournament import router as tournament_router
 from src.routes.analytics import router as analytics_router
 from src.routes.user import router as user_router
 from .achievement import router as achievement_router
+from .achievement import task_router as achievement_task_router
 
 router = APIRouter()
 router.include_router(tournament_router)
@@ -24,6 +25,7 @@ router.include_router(logs_task_router)
 router.include_router(challonge_router)
 router.include_router(analytics_router)
 router.include_router(achievement_router)
+router.include_router(achievement_task_router)
 router.include_router(user_router)
 router.include_router(gamemode_router)
 router.include_router(hero_router)
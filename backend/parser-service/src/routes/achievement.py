@@ -1,7 +1,14 @@
+import uuid
+
 from fastapi import APIRouter, Depends
+from faststream.rabbit.fastapi import RabbitRouter
+from loguru import logger
+from shared.messaging.config import ACHIEVEMENT_EVENTS_QUEUE
+from shared.observability.correlation import correlation_id_ctx
+from shared.schemas.events import MatchProcessedEvent, StandingsCalculatedEvent, TournamentFinishedEvent
 
 from src import schemas
-from src.core import auth, db, enums
+from src.core import auth, config, db, enums
 from src.services.achievement import flows as achievement_flows
 
 router = APIRouter(
@@ -9,6 +16,27 @@ router = APIRouter(
     tags=[enums.RouteTag.ACHIEVEMENT],
     dependencies=[Depends(auth.require_role("admin"))],
 )
+task_router = RabbitRouter(config.settings.broker_url, logger=logger)
+
+event_types: dict[str, type[achievement_flows.AchievementEvent]] = {
+    "match_processed": MatchProcessedEvent,
+    "standings_calculated": StandingsCalculatedEvent,
+    "tournament_finished": TournamentFinishedEvent,
+}
+
+
+async def publish_event(event: achievement_flows.AchievementEvent) -> None:
+    """Queue an incremental achievement recalculation.
+
+    Best effort: the data change that triggered the event is already committed,
+    and `/achievement/calculate` can always catch up, so a broker failure is
+    logged instead of failing the caller.
+    """
+    event.correlation_id = event.correlation_id or correlation_id_ctx.get()
+    try:
+        await task_router.broker.publish(event.model_dump(), ACHIEVEMENT_EVENTS_QUEUE)
+    except Exception:
+        logger.exception(f"Failed to publish {event.event_type} for tournament {event.tournament_id}")
 
 
 @router.post(path="/calculate", response_model=schemas.AchievementCalculateResponse)
@@ -17,7 +45,7 @@ async def calculate_achievements(
     session=Depends(db.get_async_session),
 ):
     payload = payload or schemas.AchievementCalculateRequest()
-    executed = await achievement_flows.calculate_registered_achievements(
+    results = await achievement_flows.calculate_registered_achievements(
         session,
         tournament_id=None,
         slugs=payload.slugs,
@@ -25,7 +53,8 @@ async def calculate_achievements(
     )
     return schemas.AchievementCalculateResponse(
         tournament_id=None,
-        executed=executed,
+        executed=[result.slug for result in results],
+        results=results,
         message="Achievement calculation finished",
     )
 
@@ -37,7 +66,7 @@ async def calculate_achievements_for_tournament(
     session=Depends(db.get_async_session),
 ):
     payload = payload or schemas.AchievementCalculateRequest()
-    executed = await achievement_flows.calculate_registered_achievements(
+    results = await achievement_flows.calculate_registered_achievements(
         session,
         tournament_id=tournament_id,
         slugs=payload.slugs,
@@ -45,6 +74,21 @@ async def calculate_achievements_for_tournament(
     )
     return schemas.AchievementCalculateResponse(
         tournament_id=tournament_id,
-        executed=executed,
+        executed=[result.slug for result in results],
+        results=results,
         message="Achievement calculation finished",
     )
+
+
+@task_router.subscriber(ACHIEVEMENT_EVENTS_QUEUE)
+async def recalculate_achievements(data: dict):
+    event = event_types[data["event_type"]].model_validate(data)
+    correlation_id_ctx.set(event.correlation_id or str(uuid.uuid4()))
+    logger.bind(tournament_id=event.tournament_id).info(f"Recalculating achievements for {event.event_type}")
+    try:
+        async with db.async_session_maker() as session:
+            await achievement_flows.recalculate_for_event(session, event)
+    except Exception:
+        # Re-raise so FastStream nacks the message into achievement_events.dlq.
+        logger.exception(f"Failed to recalculate achievements for {event.event_type} tournament_id={event.tournament_id}")
+        raise
@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends
 
 from src.core import enums, db, auth
 
+from src.services.analytics import backfill as analytics_backfill
 from src.services.analytics import flows as analytics_flows
 
 router = APIRouter(
@@ -28,3 +29,13 @@ async def create_analytics_tournament_analytics(
     await analytics_flows.get_analytics_openskill(session, tournament_id)
     await analytics_flows.get_predictions_openskill(session, tournament_id)
     return {"message": "Analytics calculated successfully"}
+
+
+@router.post(path="/backfill")
+async def backfill_analytics(
+    start_range: int,
+    end_range: int,
+    session=Depends(db.get_async_session),
+):
+    written = await analytics_backfill.backfill(session, start_range, end_range)
+    return {"message": "Analytics recalculated successfully", **written}
@@ -24,7 +24,8 @@ async def bulk_create_from_challonge(
 async def create_from_challonge(
     tournament_id: int,
     skip_finals: bool = False,  # Thanks 4 tournament
+    force: bool = False,
     session: AsyncSession = Depends(db.get_async_session),
 ):
-    await encounter_flows.bulk_create_for_tournament_from_challonge(session, tournament_id)
+    await encounter_flows.bulk_create_for_tournament_from_challonge(session, tournament_id, force=force)
     return {"message": "Encounters created successfully"}
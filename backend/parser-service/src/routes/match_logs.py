@@ -11,11 +11,13 @@ from shared.messaging.config import (
 from shared.observability.correlation import correlation_id_ctx
 from shared.schemas.events import (
     DiscordCommandEvent,
+    MatchProcessedEvent,
     ProcessMatchLogEvent,
     ProcessTournamentLogsEvent,
 )
 
 from src.core import auth, config, db, enums
+from src.routes.achievement import publish_event as publish_achievement_event
 from src.services.match_logs import flows as logs_flows
 from src.services.s3 import service as s3_service
 from src.services.tournament import flows as tournaments_flows
@@ -104,7 +106,9 @@ async def process_logs_discord_message(
 
 @router.post("/{tournament_id}/{filename}")
 async def process_match_log(tournament_id: int, filename: str, session=Depends(db.get_async_session)):
-    await logs_flows.process_match_log(session, tournament_id, filename, is_raise=True)
+    match = await logs_flows.process_match_log(session, tournament_id, filename, is_raise=True)
+    if match:
+        await publish_achievement_event(MatchProcessedEvent(tournament_id=tournament_id, match_id=match.id))
     return {"message": f"Match log '{filename}' for tournament {tournament_id} processed successfully."}
 
 
@@ -118,7 +122,9 @@ async def process_match_log_async(data: dict):
     logger.bind(tournament_id=event.tournament_id, filename=event.filename).info("Processing match log from queue")
     try:
         async with db.async_session_maker() as session:
-            await logs_flows.process_match_log(session, event.tournament_id, event.filename, is_raise=True)
+            match = await logs_flows.process_match_log(session, event.tournament_id, event.filename, is_raise=True)
+        if match:
+            await publish_achievement_event(MatchProcessedEvent(tournament_id=event.tournament_id, match_id=match.id))
     except Exception:
         # Re-raise so FastStream nacks the message; with x-dead-letter-exchange configured
         # on PROCESS_MATCH_LOG_QUEUE, the message will be routed to process_match_log.dlq.
@@ -137,8 +143,14 @@ async def process_tournament_log(data: dict):
         async with db.async_session_maker() as session:
             tournament = await tournaments_flows.get(session, event.tournament_id, [])
 
+            processed = False
             for log in await s3_service.async_client.get_logs_by_tournament(tournament.id):
-                await logs_flows.process_match_log(session, tournament.id, log, is_raise=False)
+                if await logs_flows.process_match_log(session, tournament.id, log, is_raise=False):
+                    processed = True
+
+        # One recalculation for the whole batch instead of one per match.
+        if processed:
+            await publish_achievement_event(MatchProcessedEvent(tournament_id=event.tournament_id))
 
         logger.info(f"All logs for tournament {event.tournament_id} are queued for processing.")
     except Exception:
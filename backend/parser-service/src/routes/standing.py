@@ -1,7 +1,9 @@
 from fastapi import APIRouter, Depends
+from shared.schemas.events import StandingsCalculatedEvent
 
 from src import schemas
 from src.core import db, enums, auth
+from src.routes.achievement import publish_event as publish_achievement_event
 
 from src.services.standings import flows as standing_flows
 
@@ -18,7 +20,10 @@ async def create_from_tournament(
     rewrite: bool = False,
     session=Depends(db.get_async_session),
 ):
-    return await standing_flows.bulk_create_for_tournament(session, tournament_id, rewrite)
+    standings = await standing_flows.bulk_create_for_tournament(session, tournament_id, rewrite)
+    if standings:
+        await publish_achievement_event(StandingsCalculatedEvent(tournament_id=tournament_id))
+    return standings
 
 
 @router.post(path="/create/bulk")
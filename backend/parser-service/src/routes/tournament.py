@@ -1,9 +1,11 @@
 from datetime import datetime, date
 
 from fastapi import APIRouter, Depends, Query
+from shared.schemas.events import TournamentFinishedEvent
 
 from src import schemas
 from src.core import db, enums, auth
+from src.routes.achievement import publish_event as publish_achievement_event
 
 from src.services.tournament import flows as tournament_flows
 
@@ -42,3 +44,11 @@ async def create_with_groups(
     return await tournament_flows.create_with_groups(
         session, number, is_league, start_date, end_date, challonge_slug
     )
+
+
+@router.post(path="/{tournament_id}/finish", response_model=schemas.TournamentRead)
+async def finish(tournament_id: int, session=Depends(db.get_async_session)):
+    tournament, changed = await tournament_flows.finish(session, tournament_id)
+    if changed:
+        await publish_achievement_event(TournamentFinishedEvent(tournament_id=tournament.id))
+    return await tournament_flows.to_pydantic(session, tournament, [])
@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends, UploadFile
 
+from src import schemas
 from src.core import db, enums, auth
 
 from src.services.user import flows as user_flows
@@ -11,7 +12,7 @@ router = APIRouter(
 )
 
 
-@router.post(path="/create/csv")
+@router.post(path="/create/csv", response_model=schemas.UserCSVImportReport)
 async def bulk_create_users_from_csv(
     data: UploadFile,
     battle_tag_row: int,
@@ -26,10 +27,10 @@ async def bulk_create_users_from_csv(
     session=Depends(db.get_async_session),
 ):
     text = await data.read()
-    await user_flows.bulk_create_users_from_csv(
+    return await user_flows.bulk_create_users_from_csv(
         session,
         data.filename,
-        text.decode("utf-8").split("\n"),
+        text.decode("utf-8").splitlines(),
         start_row,
         battle_tag_row=battle_tag_row,
         discord_row=discord_row,
@@ -40,6 +41,5 @@ async def bulk_create_users_from_csv(
         has_smurf=has_smurf,
         has_twitch=has_twitch,
     )
-    return {"success": True}
 
 
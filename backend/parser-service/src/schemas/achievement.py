@@ -2,15 +2,17 @@ import typing
 
 from pydantic import BaseModel
 
+from src.core import enums
+
 __all__ = (
     "AchievementCreate",
     "AchievementFunction",
+    "AchievementRuleResult",
     "AchievementCalculateRequest",
     "AchievementCalculateResponse",
 )
 
 
-
 class AchievementCreate(BaseModel):
     name: str
     slug: str
@@ -20,8 +22,29 @@ class AchievementCreate(BaseModel):
 
 class AchievementFunction(BaseModel):
     slug: str
-    tournament_required: bool
+    scope: enums.AchievementScope
+    inputs: frozenset[enums.AchievementInput]
     function: typing.Callable
+    # Slugs that must finish before this rule starts when both are scheduled
+    depends_on: tuple[str, ...] = ()
+    finished_only: bool = False
+    # Declarative `service.rules.Rule` behind `function`; such rules are
+    # evaluated together, one grouped query per source and scope
+    rule: typing.Any = None
+
+    @property
+    def tournament_required(self) -> bool:
+        return self.scope != enums.AchievementScope.GLOBAL
+
+
+class AchievementRuleResult(BaseModel):
+    slug: str
+    scope: enums.AchievementScope
+    tournaments: int
+    inserted: int
+    deleted: int
+    kept: int
+    duration_ms: float
 
 
 class AchievementCalculateRequest(BaseModel):
@@ -32,4 +55,5 @@ class AchievementCalculateRequest(BaseModel):
 class AchievementCalculateResponse(BaseModel):
     tournament_id: int | None
     executed: list[str]
+    results: list[AchievementRuleResult] = []
     message: str
@@ -4,6 +4,8 @@ from src.schemas import BaseRead
 
 __all__ = (
     "UserCSV",
+    "UserCSVSkippedRow",
+    "UserCSVImportReport",
     "UserRead",
     "UserDiscordRead",
     "UserTwitchRead",
@@ -20,6 +22,22 @@ class UserCSV(BaseModel):
     smurfs: list[str]
 
 
+class UserCSVSkippedRow(BaseModel):
+    row: int
+    reason: str
+    battle_tag: str | None = None
+
+
+class UserCSVImportReport(BaseModel):
+    rows: int = 0
+    created: int = 0
+    updated: int = 0
+    battle_tags: int = 0
+    discords: int = 0
+    twitches: int = 0
+    skipped: list[UserCSVSkippedRow] = []
+
+
 class UserDasha(BaseModel):
     id: int
     battle_tag: str
@@ -0,0 +1,211 @@
+"""Concurrent runner for registered achievement rules.
+
+Every rule writes only its own `AchievementUser` rows, so rules without a
+declared dependency between them are independent and can run side by side.
+Each rule gets its own session (an `AsyncSession` must not be shared between
+concurrent tasks) and the number of rules in flight is bounded so a full
+recalculation does not exhaust the connection pool.
+
+Declarative rules (see `service.rules`) running for the same tournaments are
+batched into one task, so their shared sources are scanned once per batch.
+"""
+
+import asyncio
+import time
+import typing
+
+from loguru import logger
+from shared.observability import stage
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src import models, schemas
+from src.core import db
+
+from . import service
+from .service import rules as declarative
+
+__all__ = (
+    "order_rules",
+    "run_rules",
+)
+
+
+def order_rules(rules: typing.Sequence[schemas.AchievementFunction]) -> list[schemas.AchievementFunction]:
+    """Order rules so every rule comes after the scheduled rules it depends on.
+
+    Dependencies on rules that are not part of `rules` are ignored: those rules
+    are not recalculated in this run, so their current rows are already final.
+
+    Args:
+        rules: Rules selected for this run.
+
+    Returns:
+        The same rules in dependency order, otherwise keeping the given order.
+
+    Raises:
+        ValueError: If the dependencies form a cycle.
+    """
+    by_slug = {rule.slug: rule for rule in rules}
+    ordered: list[schemas.AchievementFunction] = []
+    state: dict[str, typing.Literal["visiting", "done"]] = {}
+
+    def visit(slug: str, path: tuple[str, ...]) -> None:
+        if state.get(slug) == "done":
+            return
+        if state.get(slug) == "visiting":
+            raise ValueError(f"Achievement rule dependency cycle: {' -> '.join((*path, slug))}")
+
+        state[slug] = "visiting"
+        for dependency in by_slug[slug].depends_on:
+            if dependency in by_slug:
+                visit(dependency, (*path, slug))
+        state[slug] = "done"
+        ordered.append(by_slug[slug])
+
+    for rule in rules:
+        visit(rule.slug, ())
+    return ordered
+
+
+async def _run_rule(
+    session_factory: async_sessionmaker[AsyncSession],
+    rule: schemas.AchievementFunction,
+    tournaments: typing.Sequence[models.Tournament],
+) -> schemas.AchievementRuleResult:
+    started = time.perf_counter()
+
+    with stage("achievements", rule.slug, scope=rule.scope):
+        async with session_factory() as session:
+            if rule.tournament_required:
+                for tournament in tournaments:
+                    await rule.function(session, tournament)
+            else:
+                await rule.function(session)
+            # Some rules return early after clearing their rows; keep that change.
+            await service.commit_user_achievements(session)
+            stats = service.user_achievement_stats(session)
+
+    result = schemas.AchievementRuleResult(
+        slug=rule.slug,
+        scope=rule.scope,
+        tournaments=len(tournaments) if rule.tournament_required else 0,
+        inserted=stats["inserted"],
+        deleted=stats["deleted"],
+        kept=stats["kept"],
+        duration_ms=round((time.perf_counter() - started) * 1000, 2),
+    )
+    logger.info(
+        f"Achievement rule '{rule.slug}' finished in {result.duration_ms}ms "
+        f"(+{result.inserted} -{result.deleted} ={result.kept} rows, {result.tournaments} tournaments)"
+    )
+    return result
+
+
+async def _run_batch(
+    session_factory: async_sessionmaker[AsyncSession],
+    batch: typing.Sequence[schemas.AchievementFunction],
+    tournaments: typing.Sequence[models.Tournament],
+) -> list[schemas.AchievementRuleResult]:
+    started = time.perf_counter()
+
+    # Declarative rules share one evaluation, so the batch is timed as a whole.
+    with stage("achievements", "declarative_batch", rules=len(batch)):
+        async with session_factory() as session:
+            stats = await declarative.evaluate(
+                session, [rule.rule for rule in batch], [tournament.id for tournament in tournaments]
+            )
+            await session.commit()
+
+    duration_ms = round((time.perf_counter() - started) * 1000, 2)
+    results = [
+        schemas.AchievementRuleResult(
+            slug=rule.slug,
+            scope=rule.scope,
+            tournaments=len(tournaments) if rule.tournament_required else 0,
+            inserted=stats[rule.rule.slug]["inserted"],
+            deleted=stats[rule.rule.slug]["deleted"],
+            kept=stats[rule.rule.slug]["kept"],
+            duration_ms=duration_ms,
+        )
+        for rule in batch
+    ]
+    logger.info(
+        f"Declarative achievement rules {', '.join(rule.slug for rule in batch)} finished together in "
+        f"{duration_ms}ms (+{sum(r.inserted for r in results)} -{sum(r.deleted for r in results)} "
+        f"={sum(r.kept for r in results)} rows, {len(tournaments)} tournaments)"
+    )
+    return results
+
+
+def _units(
+    rules: typing.Sequence[schemas.AchievementFunction],
+    tournaments: typing.Callable[[schemas.AchievementFunction], typing.Sequence[models.Tournament]],
+) -> list[list[schemas.AchievementFunction]]:
+    """Split ordered rules into scheduling units: declarative batches and single rules.
+
+    Only declarative rules without dependencies are batched, so a batch never
+    has to wait for a rule that itself waits for the batch.
+    """
+    units: list[list[schemas.AchievementFunction]] = []
+    batches: dict[tuple[int, ...], list[schemas.AchievementFunction]] = {}
+    for rule in rules:
+        if rule.rule is None or rule.depends_on:
+            units.append([rule])
+            continue
+        key = tuple(tournament.id for tournament in tournaments(rule)) if rule.tournament_required else ()
+        if key not in batches:
+            batches[key] = []
+            units.append(batches[key])
+        batches[key].append(rule)
+    return units
+
+
+async def run_rules(
+    rules: typing.Sequence[schemas.AchievementFunction],
+    tournaments: typing.Callable[[schemas.AchievementFunction], typing.Sequence[models.Tournament]],
+    *,
+    max_concurrency: int,
+    session_factory: async_sessionmaker[AsyncSession] = db.async_session_maker,
+) -> list[schemas.AchievementRuleResult]:
+    """Run rules concurrently, respecting their declared dependencies.
+
+    A rule starts once every scheduled rule it depends on has finished and a
+    concurrency slot is free. The first failing rule cancels the rest of the run.
+
+    Args:
+        rules: Rules to run.
+        tournaments: Returns the tournaments a tournament scoped rule runs for.
+        max_concurrency: Maximum number of rules (or declarative batches)
+            running at the same time.
+        session_factory: Creates the session each rule runs in.
+
+    Returns:
+        Per-rule timing and written row counts, in dependency order.
+    """
+    ordered = order_rules(rules)
+    finished = {rule.slug: asyncio.Event() for rule in ordered}
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def run(unit: list[schemas.AchievementFunction]) -> list[schemas.AchievementRuleResult]:
+        for rule in unit:
+            for dependency in rule.depends_on:
+                if dependency in finished:
+                    await finished[dependency].wait()
+        async with semaphore:
+            if len(unit) == 1 and unit[0].rule is None:
+                results = [await _run_rule(session_factory, unit[0], tournaments(unit[0]))]
+            else:
+                results = await _run_batch(session_factory, unit, tournaments(unit[0]))
+        for rule in unit:
+            finished[rule.slug].set()
+        return results
+
+    tasks = [asyncio.create_task(run(unit)) for unit in _units(ordered, tournaments)]
+    try:
+        by_slug = {result.slug: result for results in await asyncio.gather(*tasks) for result in results}
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+    return [by_slug[rule.slug] for rule in ordered]
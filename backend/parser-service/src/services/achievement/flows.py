@@ -1,26 +1,31 @@
+from loguru import logger
+from shared.schemas.events import MatchProcessedEvent, StandingsCalculatedEvent, TournamentFinishedEvent
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src import schemas
-from src.core import errors
+from src import models, schemas
+from src.core import config, enums, errors
 from src.services.tournament import flows as tournament_flows
 from src.services.tournament import service as tournament_service
 
-from . import service
+from . import engine, service
 
 function_hero_map: dict[str, schemas.AchievementFunction] = {
     "freak": schemas.AchievementFunction(
         slug="freak",
-        tournament_required=True,
+        scope=enums.AchievementScope.TOURNAMENT,
+        inputs=frozenset({enums.AchievementInput.MATCHES, enums.AchievementInput.MATCH_STATISTICS}),
         function=service.calculate_freak_achievements,
     ),
     "mystery-heroes": schemas.AchievementFunction(
         slug="mystery-heroes",
-        tournament_required=True,
+        scope=enums.AchievementScope.TOURNAMENT,
+        inputs=frozenset({enums.AchievementInput.MATCHES, enums.AchievementInput.MATCH_STATISTICS}),
         function=service.calculate_mystery_heroes_achievements,
     ),
     "swiss-knife": schemas.AchievementFunction(
         slug="swiss-knife",
-        tournament_required=False,
+        scope=enums.AchievementScope.GLOBAL,
+        inputs=frozenset({enums.AchievementInput.MATCHES, enums.AchievementInput.MATCH_STATISTICS}),
         function=service.create_swiss_knife_achievements,
     ),
 }
@@ -29,137 +34,264 @@ function_hero_map: dict[str, schemas.AchievementFunction] = {
 function_overall_map: dict[str, schemas.AchievementFunction] = {
     "welcome": schemas.AchievementFunction(
         slug="welcome",
-        tournament_required=False,
+        scope=enums.AchievementScope.GLOBAL,
+        inputs=frozenset({enums.AchievementInput.ROSTERS}),
         function=service.calculate_welcome_to_club_achievements,
     ),
     "honor-and-glory": schemas.AchievementFunction(
         slug="honor-and-glory",
-        tournament_required=False,
+        scope=enums.AchievementScope.GLOBAL,
+        inputs=frozenset({enums.AchievementInput.ROSTERS, enums.AchievementInput.STANDINGS}),
         function=service.calculate_honor_and_glory_achievements,
     ),
     "versatile-player": schemas.AchievementFunction(
         slug="versatile-player",
-        tournament_required=False,
+        scope=enums.AchievementScope.GLOBAL,
+        inputs=frozenset({enums.AchievementInput.ROSTERS, enums.AchievementInput.STANDINGS}),
         function=service.calculate_versatile_player_achievements,
     ),
     "two-wins-players": schemas.AchievementFunction(
         slug="two-wins-players",
-        tournament_required=False,
+        scope=enums.AchievementScope.GLOBAL,
+        inputs=frozenset({enums.AchievementInput.ROSTERS, enums.AchievementInput.STANDINGS}),
         function=service.calculate_two_wins_players_achievements,
     ),
     "three-wins-players": schemas.AchievementFunction(
         slug="three-wins-players",
-        tournament_required=False,
+        scope=enums.AchievementScope.GLOBAL,
+        inputs=frozenset({enums.AchievementInput.ROSTERS, enums.AchievementInput.STANDINGS}),
         function=service.calculate_three_wins_players_achievements,
     ),
     "sisyphus-and-stone": schemas.AchievementFunction(
         slug="sisyphus-and-stone",
-        tournament_required=False,
+        scope=enums.AchievementScope.GLOBAL,
+        inputs=frozenset({enums.AchievementInput.ROSTERS, enums.AchievementInput.STANDINGS}),
         function=service.calculate_sisyphus_and_stone_achievements,
     ),
     "old": schemas.AchievementFunction(
         slug="old",
-        tournament_required=False,
+        scope=enums.AchievementScope.GLOBAL,
+        inputs=frozenset({enums.AchievementInput.ROSTERS}),
         function=service.calculate_old_achievements,
     ),
     "young-blood": schemas.AchievementFunction(
         slug="young-blood",
-        tournament_required=False,
+        scope=enums.AchievementScope.GLOBAL,
+        inputs=frozenset({enums.AchievementInput.ROSTERS}),
         function=service.calculate_young_blood_achievements,
     ),
     "dahao": schemas.AchievementFunction(
         slug="dahao",
-        tournament_required=False,
+        scope=enums.AchievementScope.GLOBAL,
+        inputs=frozenset({enums.AchievementInput.ROSTERS, enums.AchievementInput.STANDINGS}),
         function=service.calculate_dahao_achievements,
     ),
     "pathological-sucker": schemas.AchievementFunction(
         slug="pathological-sucker",
-        tournament_required=False,
+        scope=enums.AchievementScope.GLOBAL,
+        inputs=frozenset({enums.AchievementInput.ROSTERS, enums.AchievementInput.STANDINGS}),
         function=service.calculate_pathological_sucker_achievements,
     ),
     "lord-of-all-the-elements": schemas.AchievementFunction(
         slug="lord-of-all-the-elements",
-        tournament_required=False,
+        scope=enums.AchievementScope.GLOBAL,
+        inputs=frozenset({enums.AchievementInput.ROSTERS, enums.AchievementInput.STANDINGS}),
         function=service.calculate_lord_of_all_the_elements_achievements,
     ),
     "backyard-cyber-athlete": schemas.AchievementFunction(
         slug="backyard-cyber-athlete",
-        tournament_required=False,
+        scope=enums.AchievementScope.GLOBAL,
+        inputs=frozenset({enums.AchievementInput.ROSTERS}),
         function=service.calculate_backyard_cyber_athlete_achievements,
     ),
     "its-genetics": schemas.AchievementFunction(
         slug="its-genetics",
-        tournament_required=False,
+        scope=enums.AchievementScope.GLOBAL,
+        inputs=frozenset({enums.AchievementInput.MATCHES, enums.AchievementInput.MATCH_STATISTICS}),
         function=service.calculate_its_genetics_achievements,
     ),
     "captain-jack-sparrow": schemas.AchievementFunction(
         slug="captain-jack-sparrow",
-        tournament_required=False,
+        scope=enums.AchievementScope.GLOBAL,
+        inputs=frozenset({enums.AchievementInput.ROSTERS}),
         function=service.calculate_captain_jack_sparrow_achievements,
     ),
     "worst-player-winrate": schemas.AchievementFunction(
         slug="worst-player-winrate",
-        tournament_required=False,
+        scope=enums.AchievementScope.GLOBAL,
+        inputs=frozenset({enums.AchievementInput.ROSTERS, enums.AchievementInput.MATCHES}),
         function=service.calculate_worst_player_winrate_achievements,
     ),
     "best-player-winrate": schemas.AchievementFunction(
         slug="best-player-winrate",
-        tournament_required=False,
+        scope=enums.AchievementScope.GLOBAL,
+        inputs=frozenset({enums.AchievementInput.ROSTERS, enums.AchievementInput.MATCHES}),
         function=service.calculate_best_player_winrate_achievements,
     ),
     "consistent-winner": schemas.AchievementFunction(
         slug="consistent-winner",
-        tournament_required=False,
+        scope=enums.AchievementScope.GLOBAL,
+        inputs=frozenset({enums.AchievementInput.ROSTERS, enums.AchievementInput.MATCHES}),
         function=service.calculate_consistent_winner_achievements,
     ),
     "just-shooting": schemas.AchievementFunction(
         slug="just-shooting",
-        tournament_required=False,
+        scope=enums.AchievementScope.GLOBAL,
+        inputs=frozenset({enums.AchievementInput.ROSTERS, enums.AchievementInput.STANDINGS, enums.AchievementInput.MATCHES}),
         function=service.calculate_just_shooting_achievements,
     ),
     "ill-definitely-survive": schemas.AchievementFunction(
         slug="ill-definitely-survive",
-        tournament_required=True,
+        scope=enums.AchievementScope.TOURNAMENT,
+        inputs=frozenset({enums.AchievementInput.MATCHES, enums.AchievementInput.MATCH_STATISTICS}),
         function=service.calculate_ill_definitely_survive_achievements,
+        rule=service.rules.RULES["ill-definitely-survive"],
     ),
     "killer-machine": schemas.AchievementFunction(
         slug="killer-machine",
-        tournament_required=True,
+        scope=enums.AchievementScope.TOURNAMENT,
+        inputs=frozenset({enums.AchievementInput.MATCHES, enums.AchievementInput.MATCH_STATISTICS}),
         function=service.calculate_killer_machine_achievements,
+        rule=service.rules.RULES["killer-machine"],
     ),
     "just-shoot-in-the-head": schemas.AchievementFunction(
         slug="just-shoot-in-the-head",
-        tournament_required=True,
+        scope=enums.AchievementScope.TOURNAMENT,
+        inputs=frozenset({enums.AchievementInput.MATCHES, enums.AchievementInput.MATCH_STATISTICS}),
         function=service.calculate_just_shoot_in_the_head_achievements,
+        rule=service.rules.RULES["just-shoot-in-the-head"],
     ),
     "poop-forever": schemas.AchievementFunction(
         slug="poop-forever",
-        tournament_required=True,
+        scope=enums.AchievementScope.TOURNAMENT,
+        inputs=frozenset({enums.AchievementInput.MATCHES, enums.AchievementInput.MATCH_STATISTICS}),
         function=service.calculate_poop_forever_achievements,
+        rule=service.rules.RULES["poop_forever"],
     ),
     "one-shot-one-kill": schemas.AchievementFunction(
         slug="one-shot-one-kill",
-        tournament_required=True,
+        scope=enums.AchievementScope.TOURNAMENT,
+        inputs=frozenset({enums.AchievementInput.MATCHES, enums.AchievementInput.MATCH_STATISTICS}),
         function=service.calculate_one_shot_one_kill_achievements,
+        rule=service.rules.RULES["one-shot-one-kill"],
     ),
     "space-created": schemas.AchievementFunction(
         slug="space-created",
-        tournament_required=False,
+        scope=enums.AchievementScope.GLOBAL,
+        inputs=frozenset({enums.AchievementInput.MATCH_STATISTICS}),
         function=service.create_space_created_achievements,
+        rule=service.rules.RULES["space-created"],
     ),
     "fucking-casino-mouth": schemas.AchievementFunction(
         slug="fucking-casino-mouth",
-        tournament_required=False,
+        scope=enums.AchievementScope.GLOBAL,
+        inputs=frozenset({enums.AchievementInput.ROSTERS, enums.AchievementInput.STANDINGS}),
         function=service.calculate_fucking_casino_mouth,
     ),
     "regular-boar": schemas.AchievementFunction(
         slug="regular-boar",
-        tournament_required=False,
+        scope=enums.AchievementScope.GLOBAL,
+        inputs=frozenset({enums.AchievementInput.ROSTERS, enums.AchievementInput.STANDINGS}),
         function=service.calculate_regular_boar_achievements,
     ),
 }
 
 
+function_match_map: dict[str, schemas.AchievementFunction] = {
+    "friendly": schemas.AchievementFunction(
+        slug="friendly",
+        scope=enums.AchievementScope.MATCH,
+        inputs=frozenset({enums.AchievementInput.MATCHES, enums.AchievementInput.MATCH_STATISTICS}),
+        function=service.calculate_friendly_achievements,
+        rule=service.rules.RULES["friendly"],
+    ),
+    "boris-dick": schemas.AchievementFunction(
+        slug="boris-dick",
+        scope=enums.AchievementScope.MATCH,
+        inputs=frozenset({enums.AchievementInput.MATCHES, enums.AchievementInput.MATCH_STATISTICS}),
+        function=service.calculate_boris_dick_achievements,
+        rule=service.rules.RULES["boris_dick"],
+    ),
+    "just-dont-fuck-around": schemas.AchievementFunction(
+        slug="just-dont-fuck-around",
+        scope=enums.AchievementScope.MATCH,
+        inputs=frozenset({enums.AchievementInput.MATCHES, enums.AchievementInput.MATCH_STATISTICS}),
+        function=service.calculate_just_dont_fuck_around_achievements,
+        rule=service.rules.RULES["just_dont_fuck_around"],
+    ),
+    "john-wick": schemas.AchievementFunction(
+        slug="john-wick",
+        scope=enums.AchievementScope.MATCH,
+        inputs=frozenset({enums.AchievementInput.MATCHES, enums.AchievementInput.MATCH_STATISTICS}),
+        function=service.calculate_john_wick_achievements,
+        rule=service.rules.RULES["john_wick"],
+    ),
+    "the-shift-factory-is-done": schemas.AchievementFunction(
+        slug="the-shift-factory-is-done",
+        scope=enums.AchievementScope.MATCH,
+        inputs=frozenset({enums.AchievementInput.MATCHES, enums.AchievementInput.MATCH_STATISTICS}),
+        function=service.calculate_the_shift_factory_is_done_achievements,
+        rule=service.rules.RULES["the-shift-factory-is-done"],
+    ),
+    "shooting-and-screaming": schemas.AchievementFunction(
+        slug="shooting-and-screaming",
+        scope=enums.AchievementScope.MATCH,
+        inputs=frozenset({enums.AchievementInput.MATCHES, enums.AchievementInput.MATCH_STATISTICS}),
+        function=service.calculate_shooting_and_screaming_achievements,
+        rule=service.rules.RULES["shooting_and_screaming"],
+    ),
+    "fiasko": schemas.AchievementFunction(
+        slug="fiasko",
+        scope=enums.AchievementScope.MATCH,
+        inputs=frozenset({enums.AchievementInput.MATCHES, enums.AchievementInput.MATCH_STATISTICS}),
+        function=service.calculate_fiasko_achievements,
+        rule=service.rules.RULES["fiasko"],
+    ),
+    "boop-master": schemas.AchievementFunction(
+        slug="boop-master",
+        scope=enums.AchievementScope.MATCH,
+        inputs=frozenset({enums.AchievementInput.MATCHES, enums.AchievementInput.MATCH_STATISTICS}),
+        function=service.calculate_boop_master_achievements,
+        rule=service.rules.RULES["boop_master"],
+    ),
+    "bullet-is-not-stupid": schemas.AchievementFunction(
+        slug="bullet-is-not-stupid",
+        scope=enums.AchievementScope.MATCH,
+        inputs=frozenset({enums.AchievementInput.MATCHES, enums.AchievementInput.MATCH_STATISTICS}),
+        function=service.calculate_bullet_is_not_stupid_achievements,
+        rule=service.rules.RULES["bullet-is-not-stupid"],
+    ),
+    "balanced": schemas.AchievementFunction(
+        slug="balanced",
+        scope=enums.AchievementScope.MATCH,
+        inputs=frozenset({enums.AchievementInput.ROSTERS, enums.AchievementInput.MATCHES}),
+        function=service.calculate_balanced_achievements,
+        rule=service.rules.RULES["balanced"],
+    ),
+    "hard-game": schemas.AchievementFunction(
+        slug="hard-game",
+        scope=enums.AchievementScope.MATCH,
+        inputs=frozenset({enums.AchievementInput.ROSTERS, enums.AchievementInput.MATCHES}),
+        function=service.calculate_hard_game_achievements,
+        rule=service.rules.RULES["hard_game"],
+    ),
+    "7-years-in-azkaban": schemas.AchievementFunction(
+        slug="7-years-in-azkaban",
+        scope=enums.AchievementScope.MATCH,
+        inputs=frozenset({enums.AchievementInput.ROSTERS, enums.AchievementInput.MATCHES}),
+        function=service.calculate_7_years_in_azkaban_achievements,
+        rule=service.rules.RULES["7_years_in_azkaban"],
+    ),
+    "fast": schemas.AchievementFunction(
+        slug="fast",
+        scope=enums.AchievementScope.MATCH,
+        inputs=frozenset({enums.AchievementInput.ROSTERS, enums.AchievementInput.MATCHES}),
+        function=service.calculate_fast_game_achievements,
+        rule=service.rules.RULES["fast"],
+    ),
+}
+
+
 async def create_hero_kd_achievements(session: AsyncSession) -> None:
     for tournament in await tournament_service.get_all(session, is_finished=True):
         if tournament.id >= 1:
@@ -343,6 +475,7 @@ async def calculate_dirty_smurf_achievements(session: AsyncSession) -> None:
 async def calculate_win_with_20_div_achievement(session: AsyncSession) -> None:
     for tournament in await tournament_service.get_all(session):
         await service.calculate_win_with_20_div_achievement(session, tournament)
+    await service.commit_user_achievements(session)
 
 
 async def calculate_freak_achievements(session: AsyncSession) -> None:
@@ -444,33 +577,40 @@ async def calculate_achievements(session: AsyncSession) -> None:
     # await calculate_well_balanced_achievements(session)
 
 
+registry: dict[str, schemas.AchievementFunction] = {
+    **function_overall_map,
+    **function_hero_map,
+    **function_match_map,
+    "hero-kd": schemas.AchievementFunction(
+        slug="hero-kd",
+        scope=enums.AchievementScope.TOURNAMENT,
+        inputs=frozenset({enums.AchievementInput.MATCHES, enums.AchievementInput.MATCH_STATISTICS}),
+        function=service.create_hero_kd_achievements,
+        finished_only=True,
+    ),
+}
+
+
 async def calculate_registered_achievements(
     session: AsyncSession,
     *,
     tournament_id: int | None,
     slugs: list[str] | None = None,
     ensure_created: bool = True,
-) -> list[str]:
+) -> list[schemas.AchievementRuleResult]:
     """Calculate achievements via a stable registry.
 
     - If `tournament_id` is provided, tournament-scoped achievement functions run only for that tournament.
     - If `tournament_id` is omitted, tournament-scoped achievement functions run for all tournaments.
     - If `slugs` is omitted, all registered functions are executed.
+
+    Independent rules run concurrently, each in its own session, at most
+    `achievement_max_concurrency` at a time.
     """
 
     if ensure_created:
         await service.bulk_initial_create_achievements(session)
 
-    registry: dict[str, schemas.AchievementFunction] = {
-        **function_overall_map,
-        **function_hero_map,
-        "hero-kd": schemas.AchievementFunction(
-            slug="hero-kd",
-            tournament_required=True,
-            function=service.create_hero_kd_achievements,
-        ),
-    }
-
     slugs_to_run = slugs or list(registry.keys())
 
     unknown = sorted(set(slugs_to_run) - set(registry.keys()))
@@ -485,31 +625,65 @@ async def calculate_registered_achievements(
             ],
         )
 
-    tournament = None
+    rules = [registry[slug] for slug in dict.fromkeys(slugs_to_run)]
+
+    all_tournaments: list[models.Tournament] = []
+    finished_tournaments: list[models.Tournament] = []
     if tournament_id is not None:
         tournament = await tournament_flows.get(session, tournament_id, [])
+        all_tournaments = finished_tournaments = [tournament]
+    else:
+        scoped = [rule for rule in rules if rule.tournament_required]
+        if any(not rule.finished_only for rule in scoped):
+            all_tournaments = list(await tournament_service.get_all(session))
+        if any(rule.finished_only for rule in scoped):
+            finished_tournaments = list(await tournament_service.get_all(session, is_finished=True))
+
+    return await engine.run_rules(
+        rules,
+        lambda rule: finished_tournaments if rule.finished_only else all_tournaments,
+        max_concurrency=config.settings.achievement_max_concurrency,
+    )
+
+
+AchievementEvent = MatchProcessedEvent | StandingsCalculatedEvent | TournamentFinishedEvent
+
+# Source data each event may have changed.
+event_inputs: dict[type[AchievementEvent], frozenset[enums.AchievementInput]] = {
+    MatchProcessedEvent: frozenset({enums.AchievementInput.MATCHES, enums.AchievementInput.MATCH_STATISTICS}),
+    StandingsCalculatedEvent: frozenset({enums.AchievementInput.STANDINGS}),
+    TournamentFinishedEvent: frozenset(enums.AchievementInput),
+}
 
-    executed: list[str] = []
-    for slug in slugs_to_run:
-        fn = registry[slug]
 
-        if not fn.tournament_required:
-            await fn.function(session)
-            executed.append(slug)
-            continue
+async def recalculate_for_event(session: AsyncSession, event: AchievementEvent) -> list[schemas.AchievementRuleResult]:
+    """Recalculate only the achievement rules an event may have affected.
 
-        if tournament is not None:
-            await fn.function(session, tournament)
-            executed.append(slug)
-            continue
+    Rules are selected by their declared inputs. Tournament-scoped rules run for
+    the event's tournament only; rules restricted to finished tournaments wait
+    for `TournamentFinishedEvent`. Global rules are recalculated as a whole, but
+    like every rule only write the difference to the existing rows.
 
-        tournaments = (
-            await tournament_service.get_all(session, is_finished=True)
-            if slug == "hero-kd"
-            else await tournament_service.get_all(session)
-        )
-        for t in tournaments:
-            await fn.function(session, t)
-        executed.append(slug)
+    Args:
+        session: An SQLAlchemy `AsyncSession` for database interaction.
+        event: The parser event that triggered the recalculation.
 
-    return executed
+    Returns:
+        Per-rule results of the rules that ran.
+    """
+    tournament = await tournament_flows.get(session, event.tournament_id, [])
+    changed = event_inputs[type(event)]
+
+    rules = [
+        rule
+        for rule in registry.values()
+        if rule.inputs & changed and (tournament.is_finished or not rule.finished_only)
+    ]
+    logger.info(
+        f"Recalculating {len(rules)} achievement rule(s) for {event.event_type} in tournament {tournament.id}"
+    )
+    return await engine.run_rules(
+        rules,
+        lambda rule: [tournament],
+        max_concurrency=config.settings.achievement_max_concurrency,
+    )
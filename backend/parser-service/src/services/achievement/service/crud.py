@@ -1,8 +1,10 @@
 import typing
+from collections import Counter
 
 import sqlalchemy as sa
 from loguru import logger
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
 
 from src import models
 
@@ -23,6 +25,11 @@ __all__ = (
     "get_achievement_or_log_error",
     "delete_user_achievements",
     "create_user_achievements",
+    "replace_user_achievements",
+    "replace_many_user_achievements",
+    "commit_user_achievements",
+    "lock_achievements",
+    "user_achievement_stats",
     "home_score_case",
     "away_score_case",
 )
@@ -114,16 +121,49 @@ async def get_achievement_or_log_error(session: AsyncSession, slug: str) -> mode
     return achievement
 
 
+# (user_id, tournament_id, match_id) of an AchievementUser row.
+UserAchievementKey = tuple[int, int | None, int | None]
+# (achievement_id, tournament_id or None for every tournament) being replaced.
+ReplaceScope = tuple[int, int | None]
+
+_PENDING_KEY = "achievement_user_pending"
+_STATS_KEY = "achievement_user_stats"
+_CHUNK_SIZE = 10_000
+
+
+def _pending(session: AsyncSession | Session) -> dict[ReplaceScope, Counter[UserAchievementKey]]:
+    return session.info.setdefault(_PENDING_KEY, {})
+
+
+async def lock_achievements(session: AsyncSession, achievement_ids: typing.Iterable[int]) -> None:
+    """Serialize rewrites of these achievements' rows until the transaction ends.
+
+    Diffs read the existing rows before writing, so two recalculations of the
+    same achievement running at once would both insert the missing awards.
+    Locks are taken in id order, so overlapping callers cannot deadlock.
+    """
+    for achievement_id in sorted(set(achievement_ids)):
+        await session.execute(sa.select(sa.func.pg_advisory_xact_lock(achievement_id)))
+
+
+def user_achievement_stats(session: AsyncSession) -> Counter[str]:
+    """`inserted` / `deleted` / `kept` AchievementUser rows committed through this session."""
+    return session.info.setdefault(_STATS_KEY, Counter())
+
+
 async def delete_user_achievements(
     session: AsyncSession,
     achievement: models.Achievement,
     tournament_id: int | None = None,
 ) -> None:
-    stmt = sa.delete(models.AchievementUser).where(sa.and_(models.AchievementUser.achievement_id == achievement.id))
-    if tournament_id is not None:
-        stmt = stmt.where(sa.and_(models.AchievementUser.tournament_id == tournament_id))
+    """Start replacing the achievement's rows, for one tournament or all of them.
 
-    await session.execute(stmt)
+    Nothing is deleted right away: rows passed to `create_user_achievements`
+    afterwards become the desired state of the scope, and
+    `commit_user_achievements` writes only the difference to the existing rows.
+    Unchanged rows keep their ids and timestamps.
+    """
+    _pending(session)[(achievement.id, tournament_id)] = Counter()
 
 
 async def create_user_achievements(
@@ -133,6 +173,14 @@ async def create_user_achievements(
     tournament_id: int | None = None,
     match_id: int | None = None,
 ) -> None:
+    pending = _pending(session)
+    scope = (achievement.id, tournament_id)
+    if scope not in pending:
+        scope = (achievement.id, None)
+    if scope in pending:
+        pending[scope].update((user_id, tournament_id, match_id) for user_id in users)
+        return
+
     for user_id in users:
         user_achievement = models.AchievementUser(
             user_id=user_id,
@@ -141,3 +189,196 @@ async def create_user_achievements(
             match_id=match_id,
         )
         session.add(user_achievement)
+    user_achievement_stats(session)["inserted"] += len(users)
+
+
+async def replace_user_achievements(
+    session: AsyncSession,
+    achievement: models.Achievement,
+    query: sa.Select,
+    tournament_id: int | None = None,
+) -> Counter[str]:
+    """Make the achievement's rows in scope match `query`, in one SQL statement.
+
+    The set-based counterpart of `delete_user_achievements` followed by
+    `create_user_achievements`: the desired rows never leave the database.
+
+    Args:
+        session: An SQLAlchemy `AsyncSession` for database interaction.
+        achievement: Achievement whose rows are replaced.
+        query: Select with a `user_id` column and optionally `tournament_id` and
+            `match_id` columns; missing ones default to `tournament_id` / NULL.
+        tournament_id: Only replace rows of this tournament; None replaces all.
+
+    Returns:
+        `inserted` / `deleted` / `kept` row counts.
+    """
+    source = query.subquery("source")
+    desired = sa.select(
+        sa.literal(achievement.id, sa.BigInteger()).label("achievement_id"),
+        source.c.user_id.label("user_id"),
+        (
+            source.c.tournament_id if "tournament_id" in source.c else sa.literal(tournament_id, sa.BigInteger())
+        ).label("tournament_id"),
+        (source.c.match_id if "match_id" in source.c else sa.cast(sa.null(), sa.BigInteger())).label("match_id"),
+    )
+    stats = await replace_many_user_achievements(
+        session, [achievement.id], desired, None if tournament_id is None else [tournament_id]
+    )
+    return stats[achievement.id]
+
+
+async def replace_many_user_achievements(
+    session: AsyncSession,
+    achievement_ids: typing.Collection[int],
+    query: sa.Select,
+    tournament_ids: typing.Collection[int] | None = None,
+) -> dict[int, Counter[str]]:
+    """Make the rows of several achievements match `query`, in one SQL statement.
+
+    Existing and desired rows are paired by (achievement_id, user_id,
+    tournament_id, match_id) and their ordinal among equal keys, so duplicate
+    awards are kept as well. Only unpaired rows are deleted or inserted.
+
+    Args:
+        session: An SQLAlchemy `AsyncSession` for database interaction.
+        achievement_ids: Achievements whose rows are replaced.
+        query: Select of `achievement_id`, `user_id`, `tournament_id` and `match_id`.
+        tournament_ids: Only replace rows of these tournaments; None replaces all.
+
+    Returns:
+        `inserted` / `deleted` / `kept` row counts per achievement id.
+    """
+    pending = _pending(session)
+    for achievement_id in achievement_ids:
+        for tournament_id in tournament_ids or [None]:
+            pending.pop((achievement_id, tournament_id), None)
+    await lock_achievements(session, achievement_ids)
+
+    key_columns = ("achievement_id", "user_id", "tournament_id", "match_id")
+    source = query.subquery("source")
+    desired = sa.select(
+        *(source.c[name] for name in key_columns),
+        sa.func.row_number().over(partition_by=[source.c[name] for name in key_columns]).label("rn"),
+    ).cte("desired")
+
+    existing_query = sa.select(
+        models.AchievementUser.id,
+        *(models.AchievementUser.__table__.c[name] for name in key_columns),
+        sa.func.row_number()
+        .over(
+            partition_by=[models.AchievementUser.__table__.c[name] for name in key_columns],
+            order_by=models.AchievementUser.id,
+        )
+        .label("rn"),
+    ).where(models.AchievementUser.achievement_id.in_(list(achievement_ids)))
+    if tournament_ids is not None:
+        existing_query = existing_query.where(models.AchievementUser.tournament_id.in_(list(tournament_ids)))
+    existing = existing_query.cte("existing")
+
+    def same_row(left, right) -> sa.ColumnElement[bool]:
+        return sa.and_(
+            left.c.achievement_id == right.c.achievement_id,
+            left.c.user_id == right.c.user_id,
+            left.c.tournament_id.is_not_distinct_from(right.c.tournament_id),
+            left.c.match_id.is_not_distinct_from(right.c.match_id),
+            left.c.rn == right.c.rn,
+        )
+
+    deleted = (
+        sa.delete(models.AchievementUser)
+        .where(
+            models.AchievementUser.id.in_(
+                sa.select(existing.c.id).where(~sa.exists().where(same_row(desired, existing)))
+            )
+        )
+        .returning(models.AchievementUser.achievement_id)
+        .cte("deleted")
+    )
+    inserted = (
+        sa.insert(models.AchievementUser)
+        .from_select(
+            list(key_columns),
+            sa.select(*(desired.c[name] for name in key_columns)).where(~sa.exists().where(same_row(existing, desired))),
+        )
+        .returning(models.AchievementUser.achievement_id)
+        .cte("inserted")
+    )
+
+    changes = sa.union_all(
+        sa.select(inserted.c.achievement_id, sa.literal("inserted").label("kind")),
+        sa.select(deleted.c.achievement_id, sa.literal("deleted").label("kind")),
+        sa.select(existing.c.achievement_id, sa.literal("existing").label("kind")),
+    ).subquery("changes")
+    result = await session.execute(
+        sa.select(changes.c.achievement_id, changes.c.kind, sa.func.count()).group_by(
+            changes.c.achievement_id, changes.c.kind
+        )
+    )
+
+    counts: dict[int, Counter[str]] = {achievement_id: Counter() for achievement_id in achievement_ids}
+    for achievement_id, kind, count in result.all():
+        counts[achievement_id][kind] = count
+
+    stats: dict[int, Counter[str]] = {}
+    session_stats = user_achievement_stats(session)
+    for achievement_id, count in counts.items():
+        stats[achievement_id] = Counter(
+            inserted=count["inserted"], deleted=count["deleted"], kept=count["existing"] - count["deleted"]
+        )
+        session_stats.update(stats[achievement_id])
+    return stats
+
+
+def _apply_diff(session: Session, scope: ReplaceScope, desired: Counter[UserAchievementKey]) -> Counter[str]:
+    achievement_id, tournament_id = scope
+    query = sa.select(
+        models.AchievementUser.id,
+        models.AchievementUser.user_id,
+        models.AchievementUser.tournament_id,
+        models.AchievementUser.match_id,
+    ).where(models.AchievementUser.achievement_id == achievement_id)
+    if tournament_id is not None:
+        query = query.where(models.AchievementUser.tournament_id == tournament_id)
+
+    existing: dict[UserAchievementKey, list[int]] = {}
+    for row_id, user_id, row_tournament_id, match_id in session.execute(query):
+        existing.setdefault((user_id, row_tournament_id, match_id), []).append(row_id)
+
+    stale: list[int] = []
+    missing: Counter[UserAchievementKey] = Counter(desired)
+    kept = 0
+    for key, row_ids in existing.items():
+        keep = min(len(row_ids), desired[key])
+        stale.extend(row_ids[keep:])
+        missing[key] -= keep
+        kept += keep
+
+    for start in range(0, len(stale), _CHUNK_SIZE):
+        session.execute(
+            sa.delete(models.AchievementUser).where(models.AchievementUser.id.in_(stale[start : start + _CHUNK_SIZE]))
+        )
+
+    rows = [
+        {"user_id": user_id, "achievement_id": achievement_id, "tournament_id": row_tournament_id, "match_id": match_id}
+        for (user_id, row_tournament_id, match_id), count in missing.items()
+        for _ in range(count)
+    ]
+    for start in range(0, len(rows), _CHUNK_SIZE):
+        session.execute(sa.insert(models.AchievementUser), rows[start : start + _CHUNK_SIZE])
+
+    return Counter(inserted=len(rows), deleted=len(stale), kept=kept)
+
+
+async def commit_user_achievements(session: AsyncSession) -> None:
+    """Write the rows staged since `delete_user_achievements` and commit.
+
+    Achievement rules commit through this instead of `session.commit()`; a
+    plain commit leaves the staged rows pending.
+    """
+    stats = user_achievement_stats(session)
+    pending = session.info.pop(_PENDING_KEY, {})
+    await lock_achievements(session, (achievement_id for achievement_id, _ in pending))
+    for scope, desired in pending.items():
+        stats.update(await session.run_sync(_apply_diff, scope, desired))
+    await session.commit()
@@ -25,7 +25,7 @@ async def calculate_i_need_more_power_achievements(session: AsyncSession, tourna
     users = result.all()
 
     await crud.create_user_achievements(session, achievement, users, tournament.id)
-    await session.commit()
+    await crud.commit_user_achievements(session)
     logger.info(f"Achievements 'I need more power' for tournament {tournament.name} created successfully")
 
 
@@ -59,17 +59,15 @@ async def calculate_captains_with_5_division_and_above_achievements(
     for team in result.unique().all():
         for player in team.players:
             if player.user_id == team.captain_id and player.div <= 5:
-                for player_ in team.players:
-                    if player_.user_id != team.captain_id:
-                        user_achievement = models.AchievementUser(
-                            user_id=player_.user_id,
-                            achievement_id=achievement_map[player.role].id,
-                            tournament_id=tournament.id,
-                        )
-                        session.add(user_achievement)
+                await crud.create_user_achievements(
+                    session,
+                    achievement_map[player.role],
+                    [player_.user_id for player_ in team.players if player_.user_id != team.captain_id],
+                    tournament.id,
+                )
                 break
 
-    await session.commit()
+    await crud.commit_user_achievements(session)
     logger.info(
         f"Achievements 'Captains with 5 division and above' for tournament {tournament.name} created successfully"
     )
@@ -118,13 +116,11 @@ async def calculate_div_achievements(
     result = await session.execute(main_query)
     rows = result.all()
 
-    to_insert = []
     for user_id, t_id in rows:
-        to_insert.append(models.AchievementUser(user_id=user_id, achievement_id=achievement.id, tournament_id=t_id))
-    session.add_all(to_insert)
+        await crud.create_user_achievements(session, achievement, [user_id], t_id)
 
-    await session.commit()
-    logger.info(f"Achievements '{slug}' created successfully for {len(to_insert)} users.")
+    await crud.commit_user_achievements(session)
+    logger.info(f"Achievements '{slug}' created successfully for {len(rows)} users.")
 
 
 async def calculate_my_strength_is_growing_achievements(session: AsyncSession) -> None:
@@ -162,7 +158,7 @@ async def calculate_my_drill_will_pierce_the_sky_achievements(
     result = await session.execute(query)
     users = result.scalars().all()
     await crud.create_user_achievements(session, achievement, users)
-    await session.commit()
+    await crud.commit_user_achievements(session)
     logger.info("Achievements 'My drill will pierce the sky' created successfully")
 
 
@@ -242,6 +238,6 @@ async def calculate_im_fine_with_that_achievements(session: AsyncSession) -> Non
     user_ids = result.scalars().all()
 
     await crud.create_user_achievements(session, achievement, user_ids)
-    await session.commit()
+    await crud.commit_user_achievements(session)
 
     logger.info(f"Achievements 'im-fine-with-that' created successfully for {len(user_ids)} user(s).")
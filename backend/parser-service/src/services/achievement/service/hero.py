@@ -90,15 +90,10 @@ async def create_hero_kd_achievements(session: AsyncSession, tournament: models.
         if not top_user:
             logger.warning(f"No qualifying user found for hero K/D achievement on '{hero.slug}'. Skipping.")
             continue
-        user_achievement = models.AchievementUser(
-            user_id=top_user[0].id,
-            achievement_id=achievement.id,
-            tournament_id=tournament.id,
-        )
-        session.add(user_achievement)
+        await crud.create_user_achievements(session, achievement, [top_user[0].id], tournament.id)
         logger.info(f"Achievement for '{hero.slug}' K/D granted to user [ID={top_user[0].id} name={top_user[0].name}].")
 
-    await session.commit()
+    await crud.commit_user_achievements(session)
     logger.info(f"Hero K/D achievements for tournament '{tournament.name}' created successfully.")
 
 
@@ -168,7 +163,7 @@ async def calculate_freak_achievements(session: AsyncSession, tournament: models
 
     await crud.create_user_achievements(session, achievement, user_ids, tournament.id)
 
-    await session.commit()
+    await crud.commit_user_achievements(session)
     logger.info(f"Achievements 'freak' created for {len(user_ids)} users in tournament '{tournament.name}'.")
 
 
@@ -191,7 +186,7 @@ async def calculate_mystery_heroes_achievements(session: AsyncSession, tournamen
     result = await session.scalars(query)
     users_ids = result.all()
     await crud.create_user_achievements(session, achievement, users_ids, tournament.id)
-    await session.commit()
+    await crud.commit_user_achievements(session)
 
     logger.info(f"Achievements 'mystery-heroes' created for {len(users_ids)} users in tournament '{tournament.name}'")
 
@@ -222,5 +217,5 @@ async def create_swiss_knife_achievements(session: AsyncSession) -> None:
     for user_id in users_ids:
         await crud.create_user_achievements(session, achievement, [user_id])
 
-    await session.commit()
+    await crud.commit_user_achievements(session)
     logger.info(f"Achievements 'swiss-knife' created for {len(users_ids)} users in tournament")
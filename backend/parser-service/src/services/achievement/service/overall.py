@@ -7,20 +7,15 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from src import models
 from src.core import enums
 
-from . import crud
+from . import crud, rules
 
 
 async def calculate_welcome_to_club_achievements(session: AsyncSession) -> None:
     if not (achievement := await crud.get_achievement_or_log_error(session, "welcome")):
         return
 
-    await crud.delete_user_achievements(session, achievement)
-
-    query = sa.select(models.Player.user_id.distinct()).order_by(models.Player.user_id)
-    result = await session.execute(query)
-    users = result.scalars().all()
-
-    await crud.create_user_achievements(session, achievement, users)
+    query = sa.select(models.Player.user_id).distinct()
+    await crud.replace_user_achievements(session, achievement, query)
     await session.commit()
     logger.info("Achievements 'Welcome to club' created successfully")
 
@@ -29,18 +24,15 @@ async def calculate_captain_jack_sparrow_achievements(session: AsyncSession) ->
     if not (achievement := await crud.get_achievement_or_log_error(session, "captain-jack-sparrow")):
         return
 
-    await crud.delete_user_achievements(session, achievement)
-
     query = (
         sa.select(models.Player.user_id)
+        .distinct()
         .select_from(models.Player)
         .join(models.Team, models.Player.team_id == models.Team.id)
         .where(models.Team.captain_id == models.Player.user_id)
     )
 
-    result = await session.execute(query)
-    users = result.unique().scalars().all()
-    await crud.create_user_achievements(session, achievement, users)
+    await crud.replace_user_achievements(session, achievement, query)
     await session.commit()
     logger.info("Achievements 'Captain Jack Sparrow' created successfully")
 
@@ -51,13 +43,12 @@ async def calculate_player_winrate_achievements(
     if not (achievement := await crud.get_achievement_or_log_error(session, slug)):
         return
 
-    await crud.delete_user_achievements(session, achievement)
     sum_home = sa.func.sum(crud.encounter_query.c.home_score)
     sum_away = sa.func.sum(crud.encounter_query.c.away_score)
     winrate = sum_home / (sum_home + sum_away)
 
     query = (
-        sa.select(models.User.id)
+        sa.select(models.User.id.label("user_id"))
         .select_from(models.Player)
         .join(models.User, models.User.id == models.Player.user_id)
         .join(crud.encounter_query, crud.encounter_query.c.id == models.Player.id)
@@ -74,11 +65,9 @@ async def calculate_player_winrate_achievements(
         .limit(limit)
     )
 
-    result = await session.execute(query)
-    user_ids = result.scalars().all()
-    await crud.create_user_achievements(session, achievement, user_ids)
+    stats = await crud.replace_user_achievements(session, achievement, query)
     await session.commit()
-    logger.info(f"Achievements '{slug}' assigned successfully to {len(user_ids)} users.")
+    logger.info(f"Achievements '{slug}' assigned successfully to {stats['inserted'] + stats['kept']} users.")
 
 
 async def calculate_best_player_winrate_achievements(session: AsyncSession) -> None:
@@ -103,8 +92,6 @@ async def calculate_wins_achievement(
     if not (achievement := await crud.get_achievement_or_log_error(session, slug)):
         return
 
-    await crud.delete_user_achievements(session, achievement)
-
     if count_by == "user":
         count_expr = sa.func.count(models.Player.user_id)
     elif count_by == "role":
@@ -176,22 +163,9 @@ async def calculate_wins_achievement(
     if count_by == "win":
         query = query.join(crud.encounter_query, crud.encounter_query.c.id == models.Player.id)
 
-    result = await session.execute(query)
-    user_ids = result.all()
-
-    if group_by == "tournament":
-        for user_id, tournament_id in user_ids:
-            user_achievement = models.AchievementUser(
-                user_id=user_id,
-                achievement_id=achievement.id,
-                tournament_id=tournament_id,
-            )
-            session.add(user_achievement)
-    else:
-        await crud.create_user_achievements(session, achievement, [user_id[0] for user_id in user_ids])
-
+    stats = await crud.replace_user_achievements(session, achievement, query)
     await session.commit()
-    logger.info(f"Achievements '{slug}' created successfully for {len(user_ids)} users.")
+    logger.info(f"Achievements '{slug}' created successfully for {stats['inserted'] + stats['kept']} users.")
 
 
 async def calculate_honor_and_glory_achievements(session: AsyncSession) -> None:
@@ -317,17 +291,14 @@ async def calculate_old_achievements(session: AsyncSession) -> None:
     if not (achievement := await crud.get_achievement_or_log_error(session, "old")):
         return
 
-    await crud.delete_user_achievements(session, achievement)
-
     query = (
-        sa.select(models.Player.user_id.distinct())
+        sa.select(models.Player.user_id)
+        .distinct()
         .join(models.Tournament, models.Tournament.id == models.Player.tournament_id)
         .where(sa.and_(models.Tournament.is_league.is_(False), models.Tournament.number <= 18))
     )
 
-    result = await session.execute(query)
-    users = result.scalars().all()
-    await crud.create_user_achievements(session, achievement, users)
+    await crud.replace_user_achievements(session, achievement, query)
     await session.commit()
     logger.info("Achievements 'Old' created successfully")
 
@@ -336,17 +307,14 @@ async def calculate_young_blood_achievements(session: AsyncSession) -> None:
     if not (achievement := await crud.get_achievement_or_log_error(session, "young-blood")):
         return
 
-    await crud.delete_user_achievements(session, achievement)
-
     query = (
-        sa.select(models.Player.user_id.distinct())
+        sa.select(models.Player.user_id)
+        .distinct()
         .join(models.Tournament, models.Tournament.id == models.Player.tournament_id)
         .where(sa.and_(models.Tournament.is_league.is_(False), models.Tournament.number > 18))
     )
 
-    result = await session.execute(query)
-    users = result.scalars().all()
-    await crud.create_user_achievements(session, achievement, users)
+    await crud.replace_user_achievements(session, achievement, query)
     await session.commit()
     logger.info("Achievements 'Young blood' created successfully")
 
@@ -355,10 +323,9 @@ async def calculate_backyard_cyber_athlete_achievements(session: AsyncSession) -
     if not (achievement := await crud.get_achievement_or_log_error(session, "backyard-cyber-athlete")):
         return
 
-    await crud.delete_user_achievements(session, achievement)
-
     query = (
-        sa.select(models.Player.user_id.distinct())
+        sa.select(models.Player.user_id)
+        .distinct()
         .join(models.Tournament, models.Tournament.id == models.Player.tournament_id)
         .where(
             models.Tournament.is_league.is_(True),
@@ -366,9 +333,7 @@ async def calculate_backyard_cyber_athlete_achievements(session: AsyncSession) -
         )
     )
 
-    result = await session.execute(query)
-    users = result.scalars().all()
-    await crud.create_user_achievements(session, achievement, users)
+    await crud.replace_user_achievements(session, achievement, query)
     await session.commit()
     logger.info("Achievements 'Backyard cyber athlete' created successfully")
 
@@ -379,8 +344,6 @@ async def calculate_its_genetics_achievements(session: AsyncSession) -> None:
         logger.error("Achievement Its genetics not found. Aborting...")
         return
 
-    await crud.delete_user_achievements(session, achievement)
-
     query = (
         sa.select(models.MatchStatistics.user_id)
         .join(models.Match, models.Match.id == models.MatchStatistics.match_id)
@@ -402,9 +365,7 @@ async def calculate_its_genetics_achievements(session: AsyncSession) -> None:
         )
     )
 
-    result = await session.execute(query)
-    users = result.scalars().all()
-    await crud.create_user_achievements(session, achievement, users)
+    await crud.replace_user_achievements(session, achievement, query)
     await session.commit()
     logger.info("Achievements 'Its genetics' created successfully")
 
@@ -416,110 +377,35 @@ async def calculate_best_in_logs(
     tournament: models.Tournament,
     order_by: typing.Literal["desc", "asc"] = "desc",
 ) -> None:
-    achievement = await crud.get_achievement_or_log_error(session, achievement_slug)
-    if not achievement:
-        return
-
-    await crud.delete_user_achievements(session, achievement, tournament.id)
-
-    log_value = sa.func.sum(
-        sa.case(
-            (
-                sa.and_(models.MatchStatistics.name == log_stat_name),
-                models.MatchStatistics.value,
-            ),
-            else_=0,
-        )
-    )
-    time_value = sa.func.sum(
-        sa.case(
-            (
-                sa.and_(models.MatchStatistics.name == enums.LogStatsName.HeroTimePlayed),
-                models.MatchStatistics.value,
-            ),
-            else_=0,
-        )
-    )
-
-    order = sa.desc if order_by == "desc" else sa.asc
-
-    query = (
-        sa.select(models.MatchStatistics.user_id)
-        .join(models.Match, models.Match.id == models.MatchStatistics.match_id)
-        .join(models.Encounter, models.Encounter.id == models.Match.encounter_id)
-        .where(
-            sa.and_(
-                models.MatchStatistics.name.in_([log_stat_name, enums.LogStatsName.HeroTimePlayed]),
-                models.Encounter.tournament_id == tournament.id,
-                models.MatchStatistics.round == 0,
-                models.MatchStatistics.hero_id.is_(None),
-            )
-        )
-        .group_by(models.MatchStatistics.user_id)
-        .order_by(order(log_value / time_value))
-        .limit(1)
+    """Award the tournament's best user by `log_stat_name` per time played."""
+    rule = rules.Rule(
+        achievement_slug,
+        enums.AchievementScope.TOURNAMENT,
+        rules.LogStat(log_stat_name, per=enums.LogStatsName.HeroTimePlayed),
+        order=order_by,
+        limit=1,
     )
-
-    result = await session.execute(query)
-    user_id = result.scalar()
-
-    if not user_id:
-        logger.info(f"No user found for achievement '{achievement_slug}'.")
-        return
-
-    await crud.create_user_achievements(session, achievement, [user_id], tournament.id)
-    await session.commit()
-    logger.info(f"Achievements '{achievement_slug}' created successfully for 1 user(s).")
+    await rules.run_rule(session, rule, tournament)
 
 
 async def calculate_ill_definitely_survive_achievements(session: AsyncSession, tournament: models.Tournament) -> None:
-    await calculate_best_in_logs(
-        session,
-        "ill-definitely-survive",
-        enums.LogStatsName.Deaths,
-        tournament,
-        order_by="asc",
-    )
+    await rules.run_rule(session, rules.RULES["ill-definitely-survive"], tournament)
 
 
 async def calculate_killer_machine_achievements(session: AsyncSession, tournament: models.Tournament) -> None:
-    await calculate_best_in_logs(
-        session,
-        "killer-machine",
-        enums.LogStatsName.Eliminations,
-        tournament,
-        order_by="desc",
-    )
+    await rules.run_rule(session, rules.RULES["killer-machine"], tournament)
 
 
 async def calculate_just_shoot_in_the_head_achievements(session: AsyncSession, tournament: models.Tournament) -> None:
-    await calculate_best_in_logs(
-        session,
-        "just-shoot-in-the-head",
-        enums.LogStatsName.CriticalHitAccuracy,
-        tournament,
-        order_by="desc",
-    )
+    await rules.run_rule(session, rules.RULES["just-shoot-in-the-head"], tournament)
 
 
 async def calculate_poop_forever_achievements(session: AsyncSession, tournament: models.Tournament) -> None:
-    await calculate_best_in_logs(
-        session,
-        "poop_forever",
-        enums.LogStatsName.HeroDamageDealt,
-        tournament,
-        order_by="desc",
-    )
+    await rules.run_rule(session, rules.RULES["poop_forever"], tournament)
 
 
 async def calculate_one_shot_one_kill_achievements(session: AsyncSession, tournament: models.Tournament) -> None:
-    await calculate_best_in_logs(
-        session,
-        "one-shot-one-kill",
-        enums.LogStatsName.ScopedCriticalHitAccuracy,
-        tournament,
-        order_by="desc",
-    )
+    await rules.run_rule(session, rules.RULES["one-shot-one-kill"], tournament)
 
 
 async def calculate_sum_in_logs(
@@ -529,36 +415,15 @@ async def calculate_sum_in_logs(
     operator: typing.Literal["==", ">=", ">", "<=", "<"],
     value: int,
 ) -> None:
-    achievement = await crud.get_achievement_or_log_error(session, achievement_slug)
-    if not achievement:
-        return
-
-    await crud.delete_user_achievements(session, achievement)
-
-    query = (
-        sa.select(models.MatchStatistics.user_id)
-        .where(
-            sa.and_(
-                models.MatchStatistics.name == log_stat_name,
-                models.MatchStatistics.round == 0,
-                models.MatchStatistics.hero_id.is_(None),
-            )
-        )
-        .group_by(models.MatchStatistics.user_id)
-        .having(crud.operators[operator](sa.func.sum(models.MatchStatistics.value), value))
+    """Award users whose `log_stat_name` summed over every match meets the criterion."""
+    rule = rules.Rule(
+        achievement_slug,
+        enums.AchievementScope.GLOBAL,
+        rules.LogStat(log_stat_name),
+        threshold=(operator, value),
     )
-
-    result = await session.execute(query)
-    user_ids = result.scalars().all()
-
-    if not user_ids:
-        logger.info(f"No user found for achievement '{achievement_slug}'.")
-        return
-
-    await crud.create_user_achievements(session, achievement, user_ids)
-    await session.commit()
-    logger.info(f"Achievements '{achievement_slug}' created successfully for {len(user_ids)} users.")
+    await rules.run_rule(session, rule)
 
 
 async def create_space_created_achievements(session: AsyncSession) -> None:
-    await calculate_sum_in_logs(session, "space-created", enums.LogStatsName.Deaths, ">=", 1000)
+    await rules.run_rule(session, rules.RULES["space-created"])
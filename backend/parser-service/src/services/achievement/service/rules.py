@@ -0,0 +1,371 @@
+"""Declarative achievement rules compiled to grouped SQL.
+
+A `Rule` states what earns an achievement: a metric aggregated at a scope
+(per user, per user and tournament, or per user and match), compared to a
+threshold and/or ranked and cut at a limit. `evaluate` compiles every rule
+sharing a source into one grouped query per (user, tournament, match) that
+each scope is rolled up from, so a batch of log based rules scans
+`MatchStatistics` once instead of once per rule and tournament, and writes
+all their rows with a single `replace_many_user_achievements`.
+"""
+
+import typing
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+
+import sqlalchemy as sa
+from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src import models
+from src.core import enums
+
+from . import crud
+
+__all__ = (
+    "LogStat",
+    "MatchValue",
+    "Rule",
+    "RULES",
+    "evaluate",
+    "run_rule",
+)
+
+Operator = typing.Literal["==", ">=", ">", "<=", "<"]
+
+
+@dataclass(frozen=True, slots=True)
+class LogStat:
+    """Sum of a log statistic, optionally divided by the sum of another one."""
+
+    name: enums.LogStatsName
+    per: enums.LogStatsName | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class MatchValue:
+    """A per match value, so only usable by match scoped rules."""
+
+    name: typing.Literal["closeness", "time"]
+
+
+Metric = LogStat | MatchValue
+
+
+@dataclass(frozen=True, slots=True)
+class Rule:
+    """What earns an achievement.
+
+    Attributes:
+        slug: Slug of the awarded achievement.
+        scope: Level the metric is aggregated at and the achievement awarded at.
+        metric: Value compared against `threshold` and ranked by `order`.
+        threshold: Operator and value the metric must satisfy.
+        order: Rank by the metric within each tournament (or match, or
+            globally) and keep the first `limit` users.
+        limit: Number of ranked users awarded; requires `order`.
+        won_only: Only count matches the user's team won.
+    """
+
+    slug: str
+    scope: enums.AchievementScope
+    metric: Metric
+    threshold: tuple[Operator, float] | None = None
+    order: typing.Literal["desc", "asc"] | None = None
+    limit: int | None = None
+    won_only: bool = False
+
+    def __post_init__(self) -> None:
+        if self.threshold is None and self.limit is None:
+            raise ValueError(f"Rule '{self.slug}' needs a threshold or a limit")
+        if (self.order is None) != (self.limit is None):
+            raise ValueError(f"Rule '{self.slug}' needs both order and limit to rank")
+        if isinstance(self.metric, MatchValue) and self.scope != enums.AchievementScope.MATCH:
+            raise ValueError(f"Rule '{self.slug}' uses a match value outside of match scope")
+
+
+def _team_won(team_id: sa.ColumnElement) -> sa.ColumnElement[bool]:
+    return sa.or_(
+        sa.and_(
+            models.Encounter.home_team_id == team_id,
+            models.Encounter.home_score > models.Encounter.away_score,
+        ),
+        sa.and_(
+            models.Encounter.away_team_id == team_id,
+            models.Encounter.away_score > models.Encounter.home_score,
+        ),
+    )
+
+
+def _base_query(
+    source: type[Metric],
+    rules: typing.Sequence[Rule],
+    tournament_ids: typing.Collection[int] | None,
+) -> tuple[sa.CTE, dict[str, str]]:
+    """The single scan of a source: its values per (user, tournament, match).
+
+    Every scope is rolled up from these rows, so rules of different scopes
+    still share one pass over the source tables.
+    """
+    if source is LogStat:
+        names = sorted(
+            {rule.metric.name for rule in rules} | {rule.metric.per for rule in rules if rule.metric.per}
+        )
+        values = {name: f"stat_{index}" for index, name in enumerate(names)}
+        user_id, team_id = models.MatchStatistics.user_id, models.MatchStatistics.team_id
+        query = (
+            sa.select(
+                *(
+                    # NULL for users without any row of the statistic.
+                    sa.func.sum(
+                        sa.case((models.MatchStatistics.name == name, models.MatchStatistics.value))
+                    ).label(column)
+                    for name, column in values.items()
+                )
+            )
+            .select_from(models.MatchStatistics)
+            .join(models.Match, models.Match.id == models.MatchStatistics.match_id)
+            .join(models.Encounter, models.Encounter.id == models.Match.encounter_id)
+            .where(
+                models.MatchStatistics.name.in_(names),
+                models.MatchStatistics.round == 0,
+                models.MatchStatistics.hero_id.is_(None),
+            )
+        )
+    else:
+        values = {"closeness": "closeness", "time": "time"}
+        # Every player of both teams, per match.
+        user_id, team_id = models.Player.user_id, models.Player.team_id
+        query = (
+            sa.select(
+                sa.func.max(models.Encounter.closeness).label("closeness"),
+                sa.func.max(models.Match.time).label("time"),
+            )
+            .select_from(models.Match)
+            .join(models.Encounter, models.Encounter.id == models.Match.encounter_id)
+            .join(models.Player, models.Player.team_id.in_([models.Match.home_team_id, models.Match.away_team_id]))
+        )
+
+    if tournament_ids is not None:
+        query = query.where(models.Encounter.tournament_id.in_(list(tournament_ids)))
+    query = query.add_columns(
+        user_id.label("user_id"),
+        models.Encounter.tournament_id.label("tournament_id"),
+        models.Match.id.label("match_id"),
+        sa.func.bool_or(_team_won(team_id)).label("won"),
+    ).group_by(user_id, models.Encounter.tournament_id, models.Match.id)
+    return query.cte("log_stats" if source is LogStat else "match_values"), values
+
+
+def _scope_query(
+    base: sa.CTE,
+    values: dict[str, str],
+    scope: enums.AchievementScope,
+    rules: typing.Sequence[Rule],
+) -> tuple[sa.CTE, dict[tuple[Metric, bool], str]]:
+    """Every metric of `rules`, rolled up from `base` per scope key."""
+    metrics = list(dict.fromkeys((rule.metric, rule.won_only) for rule in rules))
+    columns = {metric: f"metric_{index}" for index, metric in enumerate(metrics)}
+
+    def aggregate(function: typing.Callable, name: str, won_only: bool) -> sa.ColumnElement:
+        value = function(base.c[values[name]])
+        return value.filter(base.c.won) if won_only else value
+
+    expressions = []
+    for metric, won_only in metrics:
+        if isinstance(metric, MatchValue):
+            value = aggregate(sa.func.max, metric.name, won_only)
+        elif metric.per is None:
+            value = aggregate(sa.func.sum, metric.name, won_only)
+        else:
+            value = sa.func.coalesce(aggregate(sa.func.sum, metric.name, won_only), 0) / sa.func.nullif(
+                aggregate(sa.func.sum, metric.per, won_only), 0
+            )
+        expressions.append(value.label(columns[(metric, won_only)]))
+
+    keys = [base.c.user_id]
+    if scope != enums.AchievementScope.GLOBAL:
+        keys.append(base.c.tournament_id)
+    if scope == enums.AchievementScope.MATCH:
+        keys.append(base.c.match_id)
+
+    query = sa.select(*keys, *expressions).group_by(*keys)
+    return query.cte(f"{base.name}_{scope}"), columns
+
+
+def _rule_query(rule: Rule, achievement_id: int, metrics: sa.CTE, column: str) -> sa.Select:
+    """Rows of `rule`, as `replace_many_user_achievements` expects them."""
+    value = metrics.c[column]
+    query = sa.select(
+        sa.literal(achievement_id, sa.BigInteger()).label("achievement_id"),
+        metrics.c.user_id,
+        (
+            metrics.c.tournament_id
+            if rule.scope != enums.AchievementScope.GLOBAL
+            else sa.cast(sa.null(), sa.BigInteger())
+        ).label("tournament_id"),
+        (
+            metrics.c.match_id if rule.scope == enums.AchievementScope.MATCH else sa.cast(sa.null(), sa.BigInteger())
+        ).label("match_id"),
+    ).where(value.is_not(None))
+
+    if rule.threshold is not None:
+        operator, threshold = rule.threshold
+        query = query.where(crud.operators[operator](value, threshold))
+    if rule.limit is None:
+        return query
+
+    partition = []
+    if rule.scope == enums.AchievementScope.TOURNAMENT:
+        partition = [metrics.c.tournament_id]
+    elif rule.scope == enums.AchievementScope.MATCH:
+        partition = [metrics.c.match_id]
+    direction = sa.desc if rule.order == "desc" else sa.asc
+    ranked = query.add_columns(
+        sa.func.row_number()
+        .over(partition_by=partition, order_by=(direction(value).nulls_last(), metrics.c.user_id))
+        .label("rank")
+    ).subquery()
+    return sa.select(
+        ranked.c.achievement_id, ranked.c.user_id, ranked.c.tournament_id, ranked.c.match_id
+    ).where(ranked.c.rank <= rule.limit)
+
+
+def _desired_query(
+    rules: typing.Sequence[Rule],
+    achievement_ids: dict[str, int],
+    tournament_ids: typing.Collection[int] | None,
+) -> sa.Select:
+    sources: dict[type[Metric], list[Rule]] = defaultdict(list)
+    for rule in rules:
+        sources[type(rule.metric)].append(rule)
+
+    selects = []
+    for source, sourced in sources.items():
+        base, values = _base_query(source, sourced, tournament_ids)
+        scopes: dict[enums.AchievementScope, list[Rule]] = defaultdict(list)
+        for rule in sourced:
+            scopes[rule.scope].append(rule)
+        for scope, scoped in scopes.items():
+            metrics, columns = _scope_query(base, values, scope, scoped)
+            selects.extend(
+                _rule_query(rule, achievement_ids[rule.slug], metrics, columns[(rule.metric, rule.won_only)])
+                for rule in scoped
+            )
+    if len(selects) == 1:
+        return selects[0]
+    return sa.select(sa.union_all(*selects).subquery("desired_rows"))
+
+
+async def evaluate(
+    session: AsyncSession,
+    rules: typing.Sequence[Rule],
+    tournament_ids: typing.Collection[int] | None = None,
+) -> dict[str, Counter[str]]:
+    """Recalculate the rows of `rules` with one scan per source.
+
+    Rules whose achievement does not exist are logged and skipped. The caller
+    commits.
+
+    Args:
+        session: An SQLAlchemy `AsyncSession` for database interaction.
+        rules: Rules to evaluate.
+        tournament_ids: Tournaments tournament and match scoped rules are
+            recalculated for; None recalculates every tournament. Global rules
+            always cover everything.
+
+    Returns:
+        `inserted` / `deleted` / `kept` row counts per rule slug.
+    """
+    result = await session.execute(
+        sa.select(models.Achievement.slug, models.Achievement.id).where(
+            models.Achievement.slug.in_([rule.slug for rule in rules])
+        )
+    )
+    achievement_ids: dict[str, int] = dict(result.tuples().all())
+
+    stats: dict[str, Counter[str]] = {}
+    for rule in rules:
+        if rule.slug not in achievement_ids:
+            logger.error(f"Achievement '{rule.slug}' not found. Aborting...")
+            stats[rule.slug] = Counter()
+
+    found = [rule for rule in rules if rule.slug in achievement_ids]
+    scoped = [rule for rule in found if rule.scope != enums.AchievementScope.GLOBAL]
+    global_ = [rule for rule in found if rule.scope == enums.AchievementScope.GLOBAL]
+
+    for batch, replace_tournaments in ((global_, None), (scoped, tournament_ids)):
+        if not batch or (replace_tournaments is not None and not replace_tournaments):
+            continue
+        ids = {rule.slug: achievement_ids[rule.slug] for rule in batch}
+        counts = await crud.replace_many_user_achievements(
+            session, list(ids.values()), _desired_query(batch, ids, replace_tournaments), replace_tournaments
+        )
+        stats.update((slug, counts[achievement_id]) for slug, achievement_id in ids.items())
+    return stats
+
+
+async def run_rule(
+    session: AsyncSession, rule: Rule, tournament: models.Tournament | None = None
+) -> Counter[str]:
+    """Evaluate a single rule and commit, for the per-achievement service functions.
+
+    Args:
+        session: An SQLAlchemy `AsyncSession` for database interaction.
+        rule: Rule to evaluate.
+        tournament: Tournament a tournament or match scoped rule runs for; None for all.
+
+    Returns:
+        `inserted` / `deleted` / `kept` row counts.
+    """
+    stats = (await evaluate(session, [rule], None if tournament is None else [tournament.id]))[rule.slug]
+    await session.commit()
+
+    where = f" in {tournament.name}" if tournament is not None else ""
+    logger.info(
+        f"Achievements '{rule.slug}'{where} created successfully for {stats['inserted'] + stats['kept']} user(s)."
+    )
+    return stats
+
+
+def _best_in_logs(slug: str, name: enums.LogStatsName, order: typing.Literal["desc", "asc"]) -> Rule:
+    """The tournament's single best user by a statistic per time played."""
+    metric = LogStat(name, per=enums.LogStatsName.HeroTimePlayed)
+    return Rule(slug, enums.AchievementScope.TOURNAMENT, metric, order=order, limit=1)
+
+
+def _in_match(
+    slug: str, metric: Metric, operator: Operator, value: float, *, won_only: bool = False
+) -> Rule:
+    return Rule(slug, enums.AchievementScope.MATCH, metric, threshold=(operator, value), won_only=won_only)
+
+
+RULES: dict[str, Rule] = {
+    rule.slug: rule
+    for rule in (
+        _best_in_logs("ill-definitely-survive", enums.LogStatsName.Deaths, "asc"),
+        _best_in_logs("killer-machine", enums.LogStatsName.Eliminations, "desc"),
+        _best_in_logs("just-shoot-in-the-head", enums.LogStatsName.CriticalHitAccuracy, "desc"),
+        _best_in_logs("poop_forever", enums.LogStatsName.HeroDamageDealt, "desc"),
+        _best_in_logs("one-shot-one-kill", enums.LogStatsName.ScopedCriticalHitAccuracy, "desc"),
+        Rule(
+            "space-created",
+            enums.AchievementScope.GLOBAL,
+            LogStat(enums.LogStatsName.Deaths),
+            threshold=(">=", 1000),
+        ),
+        _in_match("friendly", LogStat(enums.LogStatsName.Eliminations), "<=", 0),
+        _in_match("boris_dick", LogStat(enums.LogStatsName.Deaths), "<=", 0, won_only=True),
+        _in_match("just_dont_fuck_around", LogStat(enums.LogStatsName.Deaths), ">=", 20),
+        _in_match("john_wick", LogStat(enums.LogStatsName.Eliminations), ">=", 60),
+        _in_match("the-shift-factory-is-done", LogStat(enums.LogStatsName.HealingDealt), ">=", 30000),
+        _in_match("shooting_and_screaming", LogStat(enums.LogStatsName.HeroDamageDealt), ">=", 35000),
+        _in_match("fiasko", LogStat(enums.LogStatsName.EnvironmentalDeaths), ">=", 3),
+        _in_match("boop_master", LogStat(enums.LogStatsName.EnvironmentalKills), ">=", 3),
+        _in_match("bullet-is-not-stupid", LogStat(enums.LogStatsName.ScopedCriticalHitKills), ">=", 10),
+        _in_match("balanced", MatchValue("closeness"), "==", 0),
+        _in_match("hard_game", MatchValue("closeness"), "==", 1),
+        _in_match("7_years_in_azkaban", MatchValue("time"), ">=", 25 * 60),
+        _in_match("fast", MatchValue("time"), "<=", 5 * 60),
+    )
+}
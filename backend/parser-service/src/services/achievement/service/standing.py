@@ -11,10 +11,9 @@ async def calculate_to_bottom_achievements(session: AsyncSession, tournament: mo
     if not (achievement := await crud.get_achievement_or_log_error(session, "to-the-bottom")):
         return
 
-    await crud.delete_user_achievements(session, achievement, tournament.id)
-
     query = (
-        sa.select(models.Player.user_id.distinct())
+        sa.select(models.Player.user_id)
+        .distinct()
         .select_from(models.Player)
         .join(models.Team, models.Player.team_id == models.Team.id)
         .join(models.Standing, models.Team.id == models.Standing.team_id)
@@ -28,11 +27,8 @@ async def calculate_to_bottom_achievements(session: AsyncSession, tournament: mo
         )
     )
 
-    result = await session.execute(query)
-    users = result.scalars().all()
-
-    await crud.create_user_achievements(session, achievement, users, tournament.id)
-    await session.commit()
+    await crud.replace_user_achievements(session, achievement, query, tournament.id)
+    await crud.commit_user_achievements(session)
     logger.info(f"Achievements 'To bottom' for tournament {tournament.name} created successfully")
 
 
@@ -70,15 +66,11 @@ async def calculate_beginners_are_lucky_achievements(session: AsyncSession, tour
 
     result = await session.scalars(query)
     for team in result.unique().all():
-        for player in team.players:
-            user_achievement = models.AchievementUser(
-                user_id=player.user_id,
-                achievement_id=achievement.id,
-                tournament_id=tournament.id,
-            )
-            session.add(user_achievement)
+        await crud.create_user_achievements(
+            session, achievement, [player.user_id for player in team.players], tournament.id
+        )
 
-    await session.commit()
+    await crud.commit_user_achievements(session)
     logger.info(f"Achievements 'Beginners are lucky' for tournament {tournament.name} created successfully")
 
 
@@ -106,7 +98,7 @@ async def calculate_dirty_smurf_achievements(session: AsyncSession, tournament:
 
     await crud.create_user_achievements(session, achievement, users, tournament.id)
 
-    await session.commit()
+    await crud.commit_user_achievements(session)
     logger.info(f"Achievements 'Beginners are lucky' in tournament {tournament.name} for {len(users)} users created")
 
 
@@ -144,7 +136,7 @@ async def calculate_samurai_has_no_purpose_achievements(session: AsyncSession) -
     result = await session.execute(query)
     users = result.scalars().all()
     await crud.create_user_achievements(session, achievement, users)
-    await session.commit()
+    await crud.commit_user_achievements(session)
     logger.info("Achievements 'Samurai has no purpose' created successfully")
 
 
@@ -177,7 +169,7 @@ async def calculate_consistent_winner_achievements(session: AsyncSession) -> Non
     result = await session.execute(query)
     user_ids = result.scalars().all()
     await crud.create_user_achievements(session, achievement, user_ids)
-    await session.commit()
+    await crud.commit_user_achievements(session)
     logger.info("Achievements 'Consistent winner' created successfully")
 
 
@@ -245,7 +237,7 @@ async def calculate_were_not_suckers_achievements(session: AsyncSession) -> None
 
     for tournament_id, user_ids in users.items():
         await crud.create_user_achievements(session, achievement, user_ids, tournament_id)
-    await session.commit()
+    await crud.commit_user_achievements(session)
     logger.info("Achievements 'We're not suckers' created successfully")
 
 
@@ -293,7 +285,7 @@ async def calculate_reverse_sweep_champion_achievements(session: AsyncSession, t
     user_ids = result.scalars().all()
 
     await crud.create_user_achievements(session, achievement, user_ids, tournament.id)
-    await session.commit()
+    await crud.commit_user_achievements(session)
 
     logger.info(
         f"Achievements 'win-lower-bracket' created successfully "
@@ -329,7 +321,7 @@ async def calculate_the_best_among_the_best_achievements(session: AsyncSession,
     result = await session.execute(query)
     users_ids = result.scalars().all()
     await crud.create_user_achievements(session, achievement, users_ids, tournament.id)
-    await session.commit()
+    await crud.commit_user_achievements(session)
     logger.info(
         f"Achievements 'the-best-among-the-best' created successfully "
         f"for tournament '{tournament.name}' for {len(users_ids)} users."
@@ -418,7 +410,7 @@ async def calculate_revenge_achievement(session: AsyncSession, tournament: model
             awarded_count += len(user_ids)
             await crud.create_user_achievements(session, achievement, user_ids, tournament.id)
 
-    await session.commit()
+    await crud.commit_user_achievements(session)
     logger.info(
         f"Achievement 'revenge-is-sweet': Found {len(revenge_encounters)} revenge matches, "
         f"awarded to {awarded_count} total user(s)."
@@ -426,6 +418,7 @@ async def calculate_revenge_achievement(session: AsyncSession, tournament: model
 
 
 async def calculate_win_with_20_div_achievement(session: AsyncSession, tournament: models.Tournament) -> None:
+    """Stage the tournament's 'anchor-in-my-throat' awards; the caller commits them once for all tournaments."""
     achievement = await crud.get_achievement_or_log_error(session, "anchor-in-my-throat")
     if not achievement:
         return
@@ -453,7 +446,6 @@ async def calculate_win_with_20_div_achievement(session: AsyncSession, tournamen
     if team:
         user_ids = [player.user_id for player in team.players]
         await crud.create_user_achievements(session, achievement, user_ids, tournament.id)
-        await session.commit()
         logger.info(
             f"Achievement 'anchor-in-my-throat' created for {len(user_ids)} users in tournament {tournament.name}"
         )
@@ -529,7 +521,7 @@ async def calculate_consecutive_wins_achievement(session: AsyncSession) -> None:
 
     await crud.create_user_achievements(session, achievement, user_ids)
 
-    await session.commit()
+    await crud.commit_user_achievements(session)
 
     logger.info(
         f"Achievement 'win-2-plus-consecutive': assigned to {len(user_ids)} user(s) who won 2+ tournaments in a row."
@@ -617,7 +609,7 @@ async def calculate_five_second_day_streak_achievement(session: AsyncSession) ->
         return
 
     await crud.create_user_achievements(session, achievement, user_ids)
-    await session.commit()
+    await crud.commit_user_achievements(session)
 
     logger.info(
         f"Achievement 'five-second-day-streak': assigned to {len(user_ids)} user(s) "
@@ -661,7 +653,7 @@ async def calculate_lower_bracket_run_achievement(session: AsyncSession, tournam
     result = await session.execute(query)
     user_ids = result.scalars().all()
     await crud.create_user_achievements(session, achievement, user_ids, tournament.id)
-    await session.commit()
+    await crud.commit_user_achievements(session)
 
     logger.info(f"Achievement 'i-killed-i-stole': assigned to {len(user_ids)} users in tournament {tournament.name}.")
 
@@ -691,5 +683,5 @@ async def calculate_well_balanced_achievements(session: AsyncSession, tournament
     result = await session.execute(query)
     user_ids = result.scalars().all()
     await crud.create_user_achievements(session, achievement, user_ids, tournament.id)
-    await session.commit()
+    await crud.commit_user_achievements(session)
     logger.info(f"Achievement 'well-balanced' created for tournament {tournament.name} for {len(user_ids)} users.")
@@ -34,12 +34,9 @@ async def calculate_lfs_4500_achievements(session: AsyncSession) -> None:
 
     result = await session.execute(query)
     for user_id_1, user_id_2, _ in result.all():
-        user_achievement = models.AchievementUser(user_id=user_id_1, achievement_id=achievement.id)
-        session.add(user_achievement)
-        user_achievement = models.AchievementUser(user_id=user_id_2, achievement_id=achievement.id)
-        session.add(user_achievement)
+        await crud.create_user_achievements(session, achievement, [user_id_1, user_id_2])
 
-    await session.commit()
+    await crud.commit_user_achievements(session)
     logger.info("Achievements 'LFS 4500' created successfully")
 
 
@@ -55,8 +52,6 @@ async def calculate_team_classes_achievements(
     if not (achievement := await crud.get_achievement_or_log_error(session, slug)):
         return
 
-    await crud.delete_user_achievements(session, achievement, tournament.id)
-
     clause = [
         models.Player.role == role,
         models.Player.is_substitution.is_(False),
@@ -68,26 +63,17 @@ async def calculate_team_classes_achievements(
     if secondary:
         clause.append(models.Player.secondary.is_(True))
 
-    query = (
-        sa.select(models.Team)
-        .options(sa.orm.joinedload(models.Team.players))
+    teams = (
+        sa.select(models.Team.id)
         .join(models.Player, models.Team.id == models.Player.team_id)
         .where(sa.and_(models.Team.tournament_id == tournament.id))
         .group_by(models.Team.id)
         .having(sa.func.sum(sa.case((sa.and_(*clause), 1), else_=0)) >= count)
     )
+    query = sa.select(models.Player.user_id).where(models.Player.team_id.in_(teams))
 
-    result = await session.scalars(query)
-    for team in result.unique().all():
-        for player in team.players:
-            user_achievement = models.AchievementUser(
-                user_id=player.user_id,
-                achievement_id=achievement.id,
-                tournament_id=tournament.id,
-            )
-            session.add(user_achievement)
-
-    await session.commit()
+    await crud.replace_user_achievements(session, achievement, query, tournament.id)
+    await crud.commit_user_achievements(session)
     logger.info(f"Achievements '{slug}' for tournament {tournament.name} created successfully")
 
 
@@ -181,7 +167,7 @@ async def calculate_im_screwed_run_achievements(session: AsyncSession, tournamen
     users = [row[0] for row in result.fetchall()]
 
     await crud.create_user_achievements(session, achievement, users, tournament.id)
-    await session.commit()
+    await crud.commit_user_achievements(session)
 
     logger.info(
         f"Achievements 'im-screwed-run' created successfully for tournament '{tournament.name}' for {len(users)} users."
@@ -216,7 +202,7 @@ async def calculate_we_work_with_what_we_have_achievements(
     user_ids = result.all()
 
     await crud.create_user_achievements(session, achievement, user_ids, tournament.id)
-    await session.commit()
+    await crud.commit_user_achievements(session)
 
     logger.info(
         f"Achievements 'we-work-with-what-we-have' created successfully "
@@ -257,7 +243,7 @@ async def calculate_were_so_fucked_achievements(session: AsyncSession, tournamen
     user_ids = result.all()
 
     await crud.create_user_achievements(session, achievement, user_ids, tournament.id)
-    await session.commit()
+    await crud.commit_user_achievements(session)
 
     logger.info(
         f"Achievements 'were-so-fucked' created successfully "
@@ -0,0 +1,241 @@
+"""Recalculate Points and Open Skill analytics for a range of tournaments.
+
+Both algorithms are CPU bound pandas / Open Skill work, so the computation runs
+in worker processes while the event loop only loads the input and writes the
+results. Open Skill ratings of a tournament start from the previous
+tournament's, which makes the chain itself sequential; the algorithms are
+independent of each other though, so they run side by side. Results are
+written with chunked upserts instead of per-tournament delete/insert rounds.
+"""
+
+import asyncio
+import multiprocessing
+import time
+import typing
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src import models
+from src.core import config, errors
+
+from . import flows, service
+
+__all__ = (
+    "backfill",
+    "compute_openskill",
+    "compute_points",
+)
+
+
+class PointsResult(typing.NamedTuple):
+    ratings: list[dict[str, typing.Any]]
+    # (tournament id, player id, shift)
+    shifts: list[tuple[int, int, float]]
+    players: list[dict[str, typing.Any]]
+
+
+def _optional(value: typing.Any) -> typing.Any:
+    return None if pd.isna(value) else value
+
+
+def compute_points(df: pd.DataFrame, start_range: int, end_range: int) -> PointsResult:
+    """Points state of every tournament up to `end_range`, shifts of the range.
+
+    Runs in a worker process, so it only takes and returns picklable values.
+    """
+    df = flows.points_shifts(df)
+    df = df[df["tournament_id"] <= end_range]
+    in_range = df[df["tournament_id"] >= start_range]
+
+    players = [
+        {
+            "tournament_id": int(tournament_id),
+            "player_id": int(player_id),
+            "wins": int(wins),
+            "losses": int(losses),
+            "shift_one": int(cost - previous_cost) if _optional(previous_cost) else None,
+            "shift_two": (
+                int(previous_cost - pre_previous_cost)
+                if _optional(previous_cost) and _optional(pre_previous_cost)
+                else None
+            ),
+            "shift": 0,
+        }
+        for tournament_id, player_id, wins, losses, cost, previous_cost, pre_previous_cost in zip(
+            in_range["tournament_id"],
+            in_range["player_id"],
+            in_range["wins"],
+            in_range["losses"],
+            in_range["cost"],
+            in_range["previous_cost"],
+            in_range["pre-previous_cost"],
+        )
+    ]
+    shifts = [
+        (int(tournament_id), int(player_id), float(shift))
+        for tournament_id, player_id, shift in zip(in_range["tournament_id"], in_range["player_id"], in_range["shift"])
+    ]
+    return PointsResult(flows._rating_rows(df), shifts, players)
+
+
+class OpenSkillResult(typing.NamedTuple):
+    # Ratings after each tournament: tournament id -> id_role -> (mu, sigma)
+    ratings: dict[int, dict[str, tuple[float, float]]]
+    # (tournament id, team id, predicted place)
+    predictions: list[tuple[int, int, int]]
+
+
+def compute_openskill(
+    tournaments: typing.Sequence[flows.OpenSkillTournament],
+    priors: dict[str, tuple[float, float]],
+) -> OpenSkillResult:
+    """Chain the tournaments' Open Skill ratings, starting from `priors`.
+
+    Predictions use the ratings after the tournament, like
+    `flows.get_predictions_openskill`. Runs in a worker process.
+    """
+    pl = flows.get_plackett_luce()
+    state = dict(priors)
+    ratings: dict[int, dict[str, tuple[float, float]]] = {}
+    predictions: list[tuple[int, int, int]] = []
+
+    for tournament in tournaments:
+        players_rating = flows.rate_tournament(pl, tournament, state)
+        after = {id_role: (rating.mu, rating.sigma) for id_role, rating in players_rating.items()}
+        state.update(after)
+        ratings[tournament.tournament_id] = after
+        predictions.extend(
+            (tournament.tournament_id, team_id, place)
+            for team_id, place in flows.predict_places(pl, tournament.teams, players_rating)
+        )
+    return OpenSkillResult(ratings, predictions)
+
+
+def _openskill_rating_rows(
+    tournaments: typing.Sequence[flows.OpenSkillTournament], result: OpenSkillResult
+) -> list[dict[str, typing.Any]]:
+    pl = flows.get_plackett_luce()
+    return [
+        row
+        for tournament in tournaments
+        for row in flows.openskill_rating_rows(
+            tournament,
+            {id_role: pl.rating(*rating) for id_role, rating in result.ratings[tournament.tournament_id].items()},
+        )
+    ]
+
+
+async def backfill(session: AsyncSession, start_range: int, end_range: int) -> dict[str, int]:
+    """Recalculate Points and Open Skill analytics of the tournaments in the range.
+
+    Args:
+        session: An SQLAlchemy `AsyncSession` for database interaction.
+        start_range: First tournament id to recalculate.
+        end_range: Last tournament id to recalculate.
+
+    Returns:
+        Number of rows written per table.
+
+    Raises:
+        ApiHTTPException: If the range is empty.
+    """
+    if start_range > end_range:
+        raise errors.ApiHTTPException(
+            status_code=400,
+            detail=[errors.ApiExc(code="invalid_range", msg="start_range must not be greater than end_range")],
+        )
+
+    started = time.perf_counter()
+    points = await service.get_algorithm(session, "Points")
+    openskill = await service.get_algorithm(session, "Open Skill")
+
+    df = await flows.get_data_frame(session)
+    # Like `flows.get_openskill_ratings`: the chain starts from stored state only when
+    # every tournament before the range is in it, otherwise from the first missing one.
+    if not await service.has_ratings_before(session, openskill.id, start_range):
+        first = start_range - flows.OPENSKILL_WARM_UP
+    elif unrated := await service.get_unrated_tournament_ids(session, openskill.id, start_range):
+        logger.info(f"Open Skill state before tournament {start_range} is incomplete, recalculating from {unrated[0]}")
+        first = unrated[0]
+    else:
+        first = start_range
+    previous = await service.get_previous_ratings(session, openskill.id, first)
+    priors = flows.openskill_priors(previous.values())
+    tournaments = await flows.load_openskill_tournaments(session, first, end_range)
+
+    loop = asyncio.get_running_loop()
+    with ProcessPoolExecutor(
+        max_workers=config.settings.analytics_workers, mp_context=multiprocessing.get_context("spawn")
+    ) as executor:
+        points_result, openskill_result = await asyncio.gather(
+            loop.run_in_executor(executor, compute_points, df, start_range, end_range),
+            loop.run_in_executor(executor, compute_openskill, tournaments, priors),
+        )
+
+    points_tournament_ids = sorted({int(tournament_id) for tournament_id in df["tournament_id"]})
+    await service.replace_ratings(
+        session,
+        points.id,
+        [tournament_id for tournament_id in points_tournament_ids if tournament_id <= end_range] or [end_range],
+        points_result.ratings,
+    )
+    await service.replace_ratings(
+        session,
+        openskill.id,
+        [tournament.tournament_id for tournament in tournaments] or [end_range],
+        _openskill_rating_rows(tournaments, openskill_result),
+    )
+
+    in_range = df[df["tournament_id"].between(start_range, end_range)]
+    openskill_shifts = [
+        (int(tournament_id), int(player_id), div - flows.rank_to_div(ratings[id_role][0]))
+        for tournament_id, player_id, id_role, div in zip(
+            in_range["tournament_id"], in_range["player_id"], in_range["id_role"], in_range["div"]
+        )
+        if id_role in (ratings := openskill_result.ratings.get(int(tournament_id), {}))
+    ]
+    shift_rows = [
+        {
+            "algorithm_id": algorithm.id,
+            "tournament_id": tournament_id,
+            "player_id": player_id,
+            "shift": round(shift, 2),
+        }
+        for algorithm, shifts in ((points, points_result.shifts), (openskill, openskill_shifts))
+        for tournament_id, player_id, shift in shifts
+    ]
+    prediction_rows = [
+        {"algorithm_id": openskill.id, "tournament_id": tournament_id, "team_id": team_id, "predicted_place": place}
+        for tournament_id, team_id, place in openskill_result.predictions
+        if tournament_id >= start_range
+    ]
+
+    await service.bulk_upsert(
+        session, models.AnalyticsShift, shift_rows, ("algorithm_id", "tournament_id", "player_id")
+    )
+    # `shift` of existing rows may have been adjusted by hand; only fill it in for new rows.
+    await service.bulk_upsert(
+        session,
+        models.AnalyticsPlayer,
+        points_result.players,
+        ("tournament_id", "player_id"),
+        update=("wins", "losses", "shift_one", "shift_two"),
+    )
+    await service.bulk_upsert(
+        session, models.AnalyticsPredictions, prediction_rows, ("algorithm_id", "tournament_id", "team_id")
+    )
+    await session.commit()
+
+    written = {
+        "shifts": len(shift_rows),
+        "players": len(points_result.players),
+        "predictions": len(prediction_rows),
+    }
+    logger.info(
+        f"Analytics of tournaments {start_range}-{end_range} recalculated in "
+        f"{round((time.perf_counter() - started) * 1000, 2)}ms ({written})"
+    )
+    return written
@@ -1,4 +1,5 @@
 import typing
+from dataclasses import dataclass, field
 
 import numpy as np
 import pandas as pd
@@ -8,7 +9,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from openskill.models import PlackettLuce, PlackettLuceRating
 
 from src import models
-from src.schemas.analytics import AnalyticsMatch
+from src.core import enums
 from src.services.team import service as team_service
 
 from . import service
@@ -17,6 +18,8 @@ COEF_NOVICE_FIRST = 1 / 0.15
 COEF_NOVICE_SECOND = 1 / 0.11
 COEF_REGULAR = 1 / 0.065
 mu = 1100
+# Tournaments replayed before the first Open Skill tournament, to warm up ratings.
+OPENSKILL_WARM_UP = 10
 
 
 async def get_data_frame(session: AsyncSession) -> pd.DataFrame:
@@ -29,6 +32,7 @@ async def get_data_frame(session: AsyncSession) -> pd.DataFrame:
                 "player_name": row[1].name,
                 "player_id": row[1].id,
                 "user_id": row[1].user_id,
+                "role": row[1].role,
                 "id_role": f"{row[1].user_id}-{row[1].role}",
                 "cost": row[1].rank,
                 "div": row[1].div,
@@ -48,75 +52,190 @@ async def get_data_frame(session: AsyncSession) -> pd.DataFrame:
     return df
 
 
-async def create_players_shifts_is_not_exists(session: AsyncSession, tournament_id: int) -> None:
-    df = await get_data_frame(session)
+async def create_players_shifts_is_not_exists(
+    session: AsyncSession, tournament_id: int, history: typing.Sequence[typing.Mapping[str, typing.Any]]
+) -> None:
     players = await service.get_players_by_tournament_id(session, tournament_id)
-    players_ids = [player.player_id for player in players]
-    final_df = df[df["tournament_id"] == tournament_id]
-    final_df = final_df.replace({np.nan: None})
-
-    for _, row in final_df.iterrows():
-        if row["player_id"] not in players_ids:
-            shift_one = row["cost"] - row["previous_cost"] if row["previous_cost"] else None
-            shift_two = row["previous_cost"] - row["pre-previous_cost"] if row["pre-previous_cost"] else None
-
-            analytics_item = models.AnalyticsPlayer(
-                tournament_id=row["tournament_id"],
-                player_id=row["player_id"],
-                wins=row["wins"],
-                losses=row["losses"],
-                shift_one=shift_one,
-                shift_two=shift_two,
-                shift=0,
+    players_ids = {player.player_id for player in players}
+
+    rows = [
+        {
+            "tournament_id": tournament_id,
+            "player_id": row["player_id"],
+            "wins": row["wins"],
+            "losses": row["losses"],
+            "shift_one": row["rank"] - row["previous_cost"] if row["previous_cost"] else None,
+            "shift_two": row["previous_cost"] - row["pre_previous_cost"] if row["pre_previous_cost"] else None,
+            "shift": 0,
+        }
+        for row in history
+        if row["player_id"] not in players_ids
+    ]
+    if rows:
+        await session.execute(sa.insert(models.AnalyticsPlayer), rows)
+
+
+async def replace_shifts(
+    session: AsyncSession, algorithm: models.AnalyticsAlgorithm, tournament_id: int, shifts: dict[int, float]
+) -> None:
+    """Replace the tournament's shifts of `algorithm` with `shifts` by player id."""
+    await session.execute(
+        sa.delete(models.AnalyticsShift).where(
+            sa.and_(
+                models.AnalyticsShift.tournament_id == tournament_id,
+                models.AnalyticsShift.algorithm_id == algorithm.id,
             )
-            session.add(analytics_item)
+        )
+    )
+    if shifts:
+        await session.execute(
+            sa.insert(models.AnalyticsShift),
+            [
+                {
+                    "algorithm_id": algorithm.id,
+                    "tournament_id": tournament_id,
+                    "player_id": player_id,
+                    "shift": round(shift, 2),
+                }
+                for player_id, shift in shifts.items()
+            ],
+        )
 
-    await session.commit()
 
+def points_contribution(points: pd.Series, changed: pd.Series, novice: pd.Series) -> pd.Series:
+    """A tournament's own share of the Points shift.
+
+    Novices get a larger coefficient; the first division change ends the
+    novice period. A regular player's division change counts twice and starts
+    a new running sum.
+    """
+    values = np.select(
+        [novice & changed, novice, changed],
+        [points / COEF_NOVICE_FIRST, points / COEF_NOVICE_SECOND, 2 * points / COEF_REGULAR],
+        points / COEF_REGULAR,
+    )
+    return pd.Series(values, index=points.index, dtype=float)
+
+
+def points_shifts(df: pd.DataFrame) -> pd.DataFrame:
+    """Points shifts of a whole history, as grouped cumulative sums.
+
+    Every division change starts a segment per (user, role); within a segment
+    the shift is the running sum of the tournaments' contributions. Rows before
+    the first change are novice rows and do not accumulate.
+
+    Args:
+        df: Rows of `get_data_frame`.
+
+    Returns:
+        `df` ordered by (id_role, tournament_id) with `changes` and `shift` set.
+    """
+    df = df.sort_values(["id_role", "tournament_id"], kind="stable").copy()
+    changed = df["is_changed"].astype(bool)
+    changes = changed.groupby(df["id_role"]).cumsum()
+    novice = (changes - changed) == 0
+
+    contribution = points_contribution(df["wins"] - df["losses"], changed, novice)
+    running = contribution.groupby([df["id_role"], changes]).cumsum()
+
+    df["changes"] = changes
+    df["shift"] = running.where(changes > 0, contribution)
+    return df
 
-async def get_analytics(session: AsyncSession, tournament_id: int):
-    df = await get_data_frame(session)
-    algorithm = await service.get_algorithm(session, "Points")
 
-    for id_role in df["id_role"].unique():
-        rows = df[df["id_role"] == id_role]
-        is_novice = True
-        for index, row in rows.iterrows():
-            if is_novice:
-                if row["is_changed"]:
-                    df.at[index, "shift"] = (row["wins"] - row["losses"]) / COEF_NOVICE_FIRST
-                    is_novice = False
-                else:
-                    df.at[index, "shift"] = (row["wins"] - row["losses"]) / COEF_NOVICE_SECOND
-            else:
-                df.at[index, "shift"] = (row["wins"] - row["losses"]) / COEF_REGULAR
-                if row["is_changed"]:
-                    df.at[index, "shift"] += (row["wins"] - row["losses"]) / COEF_REGULAR
-                else:
-                    df.at[index, "shift"] += df.at[rows.index[rows.index.get_loc(index) - 1], "shift"]
+def points_step(history: pd.DataFrame) -> pd.DataFrame:
+    """Points shifts of one tournament from the previous rating state.
 
+    Args:
+        history: Rows of `service.get_tournament_history` with the previous
+            state's `previous_changes` and `previous_shift` (0 without one).
+
+    Returns:
+        `history` with `changes` and `shift` set.
+    """
+    history = history.copy()
+    changed = (history["previous_div"].isna() | (history["previous_div"] != history["div"])).astype(bool)
+    novice = history["previous_changes"] == 0
+
+    contribution = points_contribution(history["wins"] - history["losses"], changed, novice)
+    continues = ~changed & ~novice
+
+    history["changes"] = history["previous_changes"] + changed
+    history["shift"] = contribution.where(~continues, contribution + history["previous_shift"])
+    return history
+
+
+def _rating_rows(frame: pd.DataFrame) -> list[dict[str, typing.Any]]:
+    return [
+        {
+            "tournament_id": int(row.tournament_id),
+            "user_id": int(row.user_id),
+            "role": row.role,
+            "div": int(row.div),
+            "changes": int(row.changes),
+            "shift": float(row.shift),
+        }
+        for row in frame.itertuples(index=False)
+    ]
+
+
+async def _rebuild_points(
+    session: AsyncSession, algorithm: models.AnalyticsAlgorithm, tournament_id: int
+) -> dict[int, float]:
+    """Recalculate Points over the whole history and store the state of every tournament."""
+    df = points_shifts(await get_data_frame(session))
+    df = df[df["tournament_id"] <= tournament_id]
+
+    await service.replace_ratings(
+        session, algorithm.id, df["tournament_id"].unique().tolist() or [tournament_id], _rating_rows(df)
+    )
     final_df = df[df["tournament_id"] == tournament_id]
-    final_df = final_df.replace({np.nan: None})
+    return dict(zip(final_df["player_id"].astype(int), final_df["shift"].astype(float)))
 
-    await session.execute(
-        sa.delete(models.AnalyticsShift).where(
-            sa.and_(
-                models.AnalyticsShift.tournament_id == tournament_id,
-                models.AnalyticsShift.algorithm_id == algorithm.id,
-            )
-        )
+
+async def get_analytics(session: AsyncSession, tournament_id: int):
+    """Calculate the tournament's Points shifts.
+
+    Starts from each (user, role)'s stored state after their previous
+    tournament, so only this tournament's results are read. Falls back to a
+    full, vectorized recalculation when the previous state is missing, e.g.
+    on the first run or after an earlier tournament was recalculated.
+    """
+    algorithm = await service.get_algorithm(session, "Points")
+    history = await service.get_tournament_history(session, tournament_id)
+    previous = await service.get_previous_ratings(
+        session, algorithm.id, tournament_id, {row["user_id"] for row in history}
     )
-    await session.commit()
-    await create_players_shifts_is_not_exists(session, tournament_id)
-
-    for _, row in final_df.iterrows():
-        analytics_item = models.AnalyticsShift(
-            algorithm_id=algorithm.id,
-            tournament_id=row["tournament_id"],
-            player_id=row["player_id"],
-            shift=round(row["shift"], 2),
+
+    complete = all(
+        row["previous_tournament_id"] is None
+        or (
+            (state := previous.get((row["user_id"], row["role"]))) is not None
+            and state.tournament_id == row["previous_tournament_id"]
         )
-        session.add(analytics_item)
+        for row in history
+    )
+    if not complete:
+        logger.info(f"Points state before tournament {tournament_id} is incomplete, recalculating the history")
+        shifts = await _rebuild_points(session, algorithm, tournament_id)
+    else:
+        frame = pd.DataFrame([dict(row) for row in history], columns=list(history[0].keys()) if history else None)
+        if not frame.empty:
+            frame["previous_div"] = frame["previous_div"].astype(float)
+            frame["previous_changes"] = [
+                state.changes if (state := previous.get((user_id, role))) else 0
+                for user_id, role in zip(frame["user_id"], frame["role"])
+            ]
+            frame["previous_shift"] = [
+                state.shift if (state := previous.get((user_id, role))) else 0.0
+                for user_id, role in zip(frame["user_id"], frame["role"])
+            ]
+            frame = points_step(frame)
+        await service.replace_ratings(session, algorithm.id, [tournament_id], [] if frame.empty else _rating_rows(frame))
+        shifts = {} if frame.empty else dict(zip(frame["player_id"].astype(int), frame["shift"].astype(float)))
+
+    await replace_shifts(session, algorithm, tournament_id, shifts)
+    await create_players_shifts_is_not_exists(session, tournament_id, history)
     await session.commit()
 
 
@@ -124,11 +243,11 @@ def get_plackett_luce():
     return PlackettLuce(mu=mu, sigma=mu / 6, beta=mu / 2.75, tau=mu / 300.0, balance=True)
 
 
-def get_id_role(player: models.Player) -> str:
+def get_id_role(player: "models.Player | RatedPlayer") -> str:
     return f"{player.user_id}-{player.role}"
 
 
-def get_player_rating(pl: PlackettLuce, player: models.Player) -> PlackettLuceRating:
+def get_player_rating(pl: PlackettLuce, player: "models.Player | RatedPlayer") -> PlackettLuceRating:
     if player.is_newcomer:
         return pl.rating(mu=player.rank, sigma=mu / 4.25)
     if player.is_newcomer_role:
@@ -136,71 +255,185 @@ def get_player_rating(pl: PlackettLuce, player: models.Player) -> PlackettLuceRa
     return pl.rating(mu=player.rank)
 
 
-def prepare_openskill_data(
-    df: pd.DataFrame,
-    pl: PlackettLuce,
-    teams: typing.Sequence[models.Team],
-    encounters: typing.Sequence[models.Encounter],
-) -> tuple[set[str], dict[str, PlackettLuceRating], list[AnalyticsMatch]]:
-    agents: set[str] = set()
-    players_rating: dict[str, PlackettLuceRating] = {}
-    ttt_matches: list[AnalyticsMatch] = []
-
-    for encounter in encounters:
-        home_team = list(map(lambda p: get_id_role(p), encounter.home_team.players))
-        away_team = list(map(lambda p: get_id_role(p), encounter.away_team.players))
-
-        for player in [*encounter.home_team.players, *encounter.away_team.players]:
-            id_role = get_id_role(player)
-            player_rating = players_rating.get(id_role)
-            if player_rating is None:
-                players_rating[id_role] = get_player_rating(pl, player)
-            # else:
-            #     if player.is_newcomer_role is False:
-            #         values = df[(df["id_role"] == id_role)]["previous_cost"].values
-            #         if values.any() and player.rank != values[-1]:
-            #             players_rating[id_role] = get_player_rating(pl, player)
-
-            # if id_role not in players_rating:
-            #     players_rating[id_role] = get_player_rating(pl, player)
-
-        agents = agents.union(set(home_team))
-        agents = agents.union(set(away_team))
-
-        ttt_matches.append(
-            AnalyticsMatch(
-                tournament_id=encounter.tournament_id,
-                home_team_id=encounter.home_team_id,
-                home_team_name=encounter.home_team.name,
-                away_team_id=encounter.away_team_id,
-                away_team_name=encounter.away_team.name,
-                home_players=home_team,
-                away_players=away_team,
+@dataclass(frozen=True, slots=True)
+class RatedPlayer:
+    """The fields of a `models.Player` Open Skill needs, picklable for worker processes."""
+
+    user_id: int
+    role: enums.HeroClass | None
+    rank: int
+    is_newcomer: bool
+    is_newcomer_role: bool
+
+    @classmethod
+    def from_player(cls, player: models.Player) -> "RatedPlayer":
+        return cls(player.user_id, player.role, player.rank, player.is_newcomer, player.is_newcomer_role)
+
+
+@dataclass(frozen=True, slots=True)
+class RatedEncounter:
+    home_players: tuple[str, ...]
+    away_players: tuple[str, ...]
+    home_score: int
+    away_score: int
+
+
+@dataclass(slots=True)
+class OpenSkillTournament:
+    """A tournament's rating input, in encounter order."""
+
+    tournament_id: int
+    players: dict[str, RatedPlayer] = field(default_factory=dict)
+    encounters: list[RatedEncounter] = field(default_factory=list)
+    # (team id, players' id_roles)
+    teams: list[tuple[int, tuple[str, ...]]] = field(default_factory=list)
+
+    def add_team(self, team: models.Team, in_roster: bool) -> tuple[str, ...]:
+        id_roles = tuple(get_id_role(player) for player in team.players)
+        for player in team.players:
+            self.players.setdefault(get_id_role(player), RatedPlayer.from_player(player))
+        if in_roster:
+            self.teams.append((team.id, id_roles))
+        return id_roles
+
+    def add_encounter(self, encounter: models.Encounter) -> None:
+        self.encounters.append(
+            RatedEncounter(
+                home_players=self.add_team(encounter.home_team, in_roster=False),
+                away_players=self.add_team(encounter.away_team, in_roster=False),
                 home_score=encounter.home_score,
                 away_score=encounter.away_score,
-                time=encounter.tournament.start_date,
             )
         )
 
-    for team in teams:
-        for player in team.players:
-            id_role = get_id_role(player)
-            if id_role not in players_rating:
-                players_rating[id_role] = get_player_rating(pl, player)
 
-    for encounter in ttt_matches:
-        home_team = [players_rating[i] for i in encounter.home_players]
-        away_team = [players_rating[i] for i in encounter.away_players]
-        rating_game = [home_team, away_team]
-        scores = [encounter.home_score, encounter.away_score]
+def rate_tournament(
+    pl: PlackettLuce, tournament: OpenSkillTournament, priors: typing.Mapping[str, tuple[float, float]]
+) -> dict[str, PlackettLuceRating]:
+    """Apply the tournament's encounters, in order, starting from `priors`.
 
-        rated_home_team, rated_away_team = pl.rate(rating_game, scores=scores)
-        for id_role in range(len(encounter.home_players)):
-            players_rating[encounter.home_players[id_role]] = rated_home_team[id_role]
-        for id_role in range(len(encounter.away_players)):
-            players_rating[encounter.away_players[id_role]] = rated_away_team[id_role]
+    Players without a prior start from their rank.
+
+    Returns:
+        Ratings after the tournament, by `get_id_role`.
+    """
+    players_rating: dict[str, PlackettLuceRating] = {}
+    for id_role, player in tournament.players.items():
+        if id_role in priors:
+            players_rating[id_role] = pl.rating(*priors[id_role])
+        else:
+            players_rating[id_role] = get_player_rating(pl, player)
+
+    for encounter in tournament.encounters:
+        rating_game = [
+            [players_rating[id_role] for id_role in encounter.home_players],
+            [players_rating[id_role] for id_role in encounter.away_players],
+        ]
+        rated_home_team, rated_away_team = pl.rate(rating_game, scores=[encounter.home_score, encounter.away_score])
+        players_rating.update(zip(encounter.home_players, rated_home_team))
+        players_rating.update(zip(encounter.away_players, rated_away_team))
+    return players_rating
+
+
+def openskill_rating_rows(
+    tournament: OpenSkillTournament, players_rating: typing.Mapping[str, PlackettLuceRating]
+) -> list[dict[str, typing.Any]]:
+    return [
+        {
+            "tournament_id": tournament.tournament_id,
+            "user_id": player.user_id,
+            "role": player.role,
+            "mu": players_rating[id_role].mu,
+            "sigma": players_rating[id_role].sigma,
+        }
+        for id_role, player in tournament.players.items()
+    ]
+
+
+def openskill_priors(
+    ratings: typing.Iterable[models.AnalyticsRating],
+) -> dict[str, tuple[float, float]]:
+    return {
+        f"{rating.user_id}-{rating.role}": (rating.mu, rating.sigma) for rating in ratings if rating.mu is not None
+    }
+
+
+async def load_openskill_tournaments(
+    session: AsyncSession, start_range: int, end_range: int
+) -> list[OpenSkillTournament]:
+    """Rating input of every tournament in the range, with two queries."""
+    tournaments: dict[int, OpenSkillTournament] = {}
+
+    def get(tournament_id: int) -> OpenSkillTournament:
+        return tournaments.setdefault(tournament_id, OpenSkillTournament(tournament_id))
+
+    for team in await service.get_teams_by_tournaments(session, range(start_range, end_range + 1)):
+        get(team.tournament_id).add_team(team, in_roster=True)
+    for encounter in await service.get_matches(session, start_range, end_range):
+        get(encounter.tournament_id).add_encounter(encounter)
+    return [tournaments[tournament_id] for tournament_id in sorted(tournaments)]
+
+
+async def rate_openskill(
+    session: AsyncSession, algorithm: models.AnalyticsAlgorithm, tournament_ids: typing.Sequence[int]
+) -> dict[str, PlackettLuceRating]:
+    """Apply the tournaments' encounters, in order, to the stored Open Skill ratings.
+
+    Ratings start from each (user, role)'s state before the first tournament,
+    or from the player's rank when there is none. The state after each
+    tournament is stored for the next one.
+
+    Returns:
+        Ratings after the last tournament, by `get_id_role`.
+    """
+    loaded = {
+        tournament.tournament_id: tournament
+        for tournament in await load_openskill_tournaments(session, tournament_ids[0], tournament_ids[-1])
+    }
+    tournaments = [loaded.get(tournament_id, OpenSkillTournament(tournament_id)) for tournament_id in tournament_ids]
+    previous = await service.get_previous_ratings(
+        session,
+        algorithm.id,
+        tournament_ids[0],
+        {player.user_id for tournament in tournaments for player in tournament.players.values()},
+    )
+
+    pl = get_plackett_luce()
+    state = openskill_priors(previous.values())
+    rows: list[dict[str, typing.Any]] = []
+    players_rating: dict[str, PlackettLuceRating] = {}
+    for tournament in tournaments:
+        players_rating = rate_tournament(pl, tournament, state)
+        state.update({id_role: (rating.mu, rating.sigma) for id_role, rating in players_rating.items()})
+        rows.extend(openskill_rating_rows(tournament, players_rating))
+
+    await service.replace_ratings(session, algorithm.id, tournament_ids, rows)
+    return players_rating
+
+
+async def get_openskill_ratings(
+    session: AsyncSession, algorithm: models.AnalyticsAlgorithm, tournament_id: int
+) -> dict[str, PlackettLuceRating]:
+    """Open Skill ratings after the tournament, calculating them if needed.
+
+    The first calculated tournament replays the `OPENSKILL_WARM_UP` tournaments
+    before it, as the full replay used to, so ratings do not start cold. When
+    an earlier tournament is missing from the rating chain (not calculated
+    yet, or dropped because a tournament before it was recalculated), the
+    chain is replayed from it instead of starting from a stale state.
+    """
+    if not await service.has_ratings_before(session, algorithm.id, tournament_id):
+        start = tournament_id - OPENSKILL_WARM_UP
+    elif unrated := await service.get_unrated_tournament_ids(session, algorithm.id, tournament_id):
+        logger.info(
+            f"Open Skill state before tournament {tournament_id} is incomplete, recalculating from {unrated[0]}"
+        )
+        start = unrated[0]
+    else:
+        return await rate_openskill(session, algorithm, [tournament_id])
 
-    return agents, players_rating, ttt_matches
+    chain = await service.get_warm_up_tournament_ids(session, start, tournament_id - 1)
+    return await rate_openskill(session, algorithm, [*chain, tournament_id])
 
 
 def rank_to_div(cost: int | float) -> float:
@@ -210,52 +443,61 @@ def rank_to_div(cost: int | float) -> float:
 
 
 async def get_analytics_openskill(session: AsyncSession, tournament_id: int) -> None:
-    matches = await service.get_matches(session, tournament_id - 10, tournament_id)
-    teams = await team_service.get_by_tournament(session, tournament_id, ["players", "players.user"])
     algorithm = await service.get_algorithm(session, "Open Skill")
-    df = await get_data_frame(session)
-    pl = get_plackett_luce()
-    agents, players_rating, ttt_matches = prepare_openskill_data(df, pl, teams, matches)
-
-    await session.execute(
-        sa.delete(models.AnalyticsShift).where(
-            sa.and_(
-                models.AnalyticsShift.tournament_id == tournament_id,
-                models.AnalyticsShift.algorithm_id == algorithm.id,
-            )
-        )
-    )
+    players_rating = await get_openskill_ratings(session, algorithm, tournament_id)
+    history = await service.get_tournament_history(session, tournament_id)
+
+    shifts = {
+        row["player_id"]: row["div"] - rank_to_div(players_rating[f"{row['user_id']}-{row['role']}"].mu)
+        for row in history
+    }
+    await replace_shifts(session, algorithm, tournament_id, shifts)
+    await create_players_shifts_is_not_exists(session, tournament_id, history)
     await session.commit()
-    await create_players_shifts_is_not_exists(session, tournament_id)
 
-    final_df = df[df["tournament_id"] == tournament_id]
-    final_df = final_df.replace({np.nan: None})
-
-    for _, row in final_df.iterrows():
-        analytics_item = models.AnalyticsShift(
-            algorithm_id=algorithm.id,
-            tournament_id=row["tournament_id"],
-            player_id=row["player_id"],
-            shift=round(row["div"] - rank_to_div(players_rating[row["id_role"]].mu), 2),
-        )
-        session.add(analytics_item)
-    await session.commit()
+
+def predict_places(
+    pl: PlackettLuce,
+    teams: typing.Sequence[tuple[int, tuple[str, ...]]],
+    players_rating: typing.Mapping[str, PlackettLuceRating],
+) -> list[tuple[int, int]]:
+    """Predicted (team id, place) of teams given by their players' id_roles."""
+    if not teams:
+        return []
+    predicted = pl.predict_rank([[players_rating[id_role] for id_role in id_roles] for _, id_roles in teams])
+    return [(team_id, predict[0]) for (team_id, _), predict in zip(teams, predicted)]
+
+
+def prediction_rows(
+    algorithm_id: int, tournament_id: int, places: typing.Iterable[tuple[int, int]]
+) -> list[dict[str, typing.Any]]:
+    return [
+        {
+            "algorithm_id": algorithm_id,
+            "tournament_id": tournament_id,
+            "team_id": team_id,
+            "predicted_place": place,
+        }
+        for team_id, place in places
+    ]
 
 
 async def get_predictions_openskill(session: AsyncSession, tournament_id: int) -> None:
-    df = await get_data_frame(session)
-    matches = await service.get_matches(session, tournament_id - 10, tournament_id)
     teams = await team_service.get_by_tournament(session, tournament_id, ["players", "players.user"])
     algorithm = await service.get_algorithm(session, "Open Skill")
     pl = get_plackett_luce()
-    agents, players_rating, ttt_matches = prepare_openskill_data(df, pl, teams, matches)
-    predicted_teams: list[tuple[str, list[PlackettLuceRating]]] = []
 
-    for team in teams:
-        team_players = [players_rating[get_id_role(player)] for player in team.players]
-        predicted_teams.append((team.name, team_players))
+    stored = await service.get_ratings(session, algorithm.id, tournament_id)
+    if stored:
+        players_rating = {
+            f"{rating.user_id}-{rating.role}": pl.rating(mu=rating.mu, sigma=rating.sigma) for rating in stored
+        }
+    else:
+        players_rating = await get_openskill_ratings(session, algorithm, tournament_id)
 
-    predicted = pl.predict_rank([p_team[1] for p_team in predicted_teams])
+    places = predict_places(
+        pl, [(team.id, tuple(map(get_id_role, team.players))) for team in teams], players_rating
+    )
 
     await session.execute(
         sa.delete(models.AnalyticsPredictions).where(
@@ -265,24 +507,10 @@ async def get_predictions_openskill(session: AsyncSession, tournament_id: int) -
             )
         )
     )
-    await session.commit()
-
-    for team_data, predict in zip(predicted_teams, predicted):
-        team: models.Team | None = None
-        for t in teams:
-            if t.name == team_data[0]:
-                team = t
-                break
-
-        session.add(
-            models.AnalyticsPredictions(
-                algorithm_id=algorithm.id,
-                tournament_id=tournament_id,
-                team_id=team.id,
-                predicted_place=predict[0],
-            )
+    if places:
+        await session.execute(
+            sa.insert(models.AnalyticsPredictions), prediction_rows(algorithm.id, tournament_id, places)
         )
-
     await session.commit()
 
 
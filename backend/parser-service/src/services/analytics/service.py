@@ -1,6 +1,8 @@
+import itertools
 import typing
 
 import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src import models
@@ -135,3 +137,222 @@ async def get_players_by_tournament_id(
     )
     result = await session.execute(query)
     return result.scalars().all()  # type: ignore
+
+
+async def get_tournament_history(session: AsyncSession, tournament_id: int) -> typing.Sequence[sa.RowMapping]:
+    """The tournament's players with their results and previous tournament.
+
+    Only the history of users playing in the tournament is read; `previous_*`
+    columns come from their latest earlier (user, role) participation.
+    """
+    users = sa.select(models.Player.user_id).where(models.Player.tournament_id == tournament_id)
+    role_history = (
+        sa.select(
+            models.Player.id.label("player_id"),
+            models.Player.team_id,
+            models.Player.tournament_id,
+            models.Player.user_id,
+            models.Player.role,
+            models.Player.rank,
+            models.Player.div,
+            *(
+                sa.func.lag(column, offset)
+                .over(partition_by=(models.Player.user_id, models.Player.role), order_by=models.Tournament.id)
+                .label(label)
+                for column, offset, label in (
+                    (models.Tournament.id, 1, "previous_tournament_id"),
+                    (models.Player.rank, 1, "previous_cost"),
+                    (models.Player.rank, 2, "pre_previous_cost"),
+                    (models.Player.div, 1, "previous_div"),
+                )
+            ),
+        )
+        .join(models.Tournament, models.Player.tournament_id == models.Tournament.id)
+        .where(
+            models.Tournament.id >= 1,
+            models.Tournament.is_league.is_(False),
+            models.Player.is_substitution.is_(False),
+            models.Player.user_id.in_(users),
+        )
+    ).subquery("role_history")
+
+    sides = sa.union_all(
+        sa.select(
+            models.Encounter.home_team_id.label("team_id"),
+            models.Encounter.home_score.label("wins"),
+            models.Encounter.away_score.label("losses"),
+        ).where(models.Encounter.tournament_id == tournament_id),
+        sa.select(
+            models.Encounter.away_team_id.label("team_id"),
+            models.Encounter.away_score.label("wins"),
+            models.Encounter.home_score.label("losses"),
+        ).where(models.Encounter.tournament_id == tournament_id),
+    ).subquery("sides")
+    results = (
+        sa.select(
+            sides.c.team_id,
+            sa.func.sum(sides.c.wins).label("wins"),
+            sa.func.sum(sides.c.losses).label("losses"),
+        ).group_by(sides.c.team_id)
+    ).subquery("results")
+
+    query = (
+        sa.select(
+            role_history,
+            sa.func.coalesce(results.c.wins, 0).label("wins"),
+            sa.func.coalesce(results.c.losses, 0).label("losses"),
+        )
+        .join(results, results.c.team_id == role_history.c.team_id, isouter=True)
+        .where(role_history.c.tournament_id == tournament_id)
+    )
+    result = await session.execute(query)
+    return result.mappings().all()
+
+
+async def get_previous_ratings(
+    session: AsyncSession, algorithm_id: int, tournament_id: int, user_ids: typing.Collection[int] | None = None
+) -> dict[tuple[int, typing.Any], models.AnalyticsRating]:
+    """Latest rating state before `tournament_id` per (user, role), for every user if `user_ids` is None."""
+    query = (
+        sa.select(models.AnalyticsRating)
+        .where(
+            models.AnalyticsRating.algorithm_id == algorithm_id,
+            models.AnalyticsRating.tournament_id < tournament_id,
+        )
+        .order_by(
+            models.AnalyticsRating.user_id,
+            models.AnalyticsRating.role,
+            models.AnalyticsRating.tournament_id.desc(),
+        )
+        .distinct(models.AnalyticsRating.user_id, models.AnalyticsRating.role)
+    )
+    if user_ids is not None:
+        query = query.where(models.AnalyticsRating.user_id.in_(list(user_ids)))
+    result = await session.scalars(query)
+    return {(rating.user_id, rating.role): rating for rating in result.all()}
+
+
+async def get_ratings(
+    session: AsyncSession, algorithm_id: int, tournament_id: int
+) -> typing.Sequence[models.AnalyticsRating]:
+    query = sa.select(models.AnalyticsRating).where(
+        models.AnalyticsRating.algorithm_id == algorithm_id,
+        models.AnalyticsRating.tournament_id == tournament_id,
+    )
+    result = await session.scalars(query)
+    return result.all()
+
+
+async def has_ratings_before(session: AsyncSession, algorithm_id: int, tournament_id: int) -> bool:
+    query = sa.select(
+        sa.exists().where(
+            models.AnalyticsRating.algorithm_id == algorithm_id,
+            models.AnalyticsRating.tournament_id < tournament_id,
+        )
+    )
+    return bool(await session.scalar(query))
+
+
+async def get_unrated_tournament_ids(
+    session: AsyncSession, algorithm_id: int, tournament_id: int
+) -> typing.Sequence[int]:
+    """Tournaments before `tournament_id` missing from the algorithm's rating chain.
+
+    These are the non-league tournaments with players, from the first rated
+    one on, without rating state: never calculated, or dropped by
+    `replace_ratings` when an earlier tournament was recalculated.
+    """
+    first_rated = (
+        sa.select(sa.func.min(models.AnalyticsRating.tournament_id))
+        .where(models.AnalyticsRating.algorithm_id == algorithm_id)
+        .scalar_subquery()
+    )
+    query = (
+        sa.select(models.Tournament.id)
+        .where(
+            models.Tournament.id >= first_rated,
+            models.Tournament.id < tournament_id,
+            models.Tournament.is_league.is_(False),
+            sa.exists().where(models.Player.tournament_id == models.Tournament.id),
+            ~sa.exists().where(
+                models.AnalyticsRating.algorithm_id == algorithm_id,
+                models.AnalyticsRating.tournament_id == models.Tournament.id,
+            ),
+        )
+        .order_by(models.Tournament.id)
+    )
+    result = await session.scalars(query)
+    return result.all()
+
+
+async def replace_ratings(
+    session: AsyncSession,
+    algorithm_id: int,
+    tournament_ids: typing.Collection[int],
+    rows: typing.Sequence[dict[str, typing.Any]],
+) -> None:
+    """Replace the rating state from the first of the tournaments on.
+
+    Later tournaments started from the replaced state, so their rows are
+    removed too and rebuilt when those tournaments are recalculated; see
+    `get_unrated_tournament_ids`.
+    """
+    await session.execute(
+        sa.delete(models.AnalyticsRating).where(
+            models.AnalyticsRating.algorithm_id == algorithm_id,
+            models.AnalyticsRating.tournament_id >= min(tournament_ids),
+        )
+    )
+    if rows:
+        await session.execute(sa.insert(models.AnalyticsRating), [{"algorithm_id": algorithm_id, **row} for row in rows])
+
+
+async def get_warm_up_tournament_ids(session: AsyncSession, start_range: int, end_range: int) -> typing.Sequence[int]:
+    query = (
+        sa.select(models.Tournament.id)
+        .where(
+            models.Tournament.id.between(start_range, end_range),
+            models.Tournament.is_league.is_(False),
+        )
+        .order_by(models.Tournament.id)
+    )
+    result = await session.scalars(query)
+    return result.all()
+
+
+async def get_teams_by_tournaments(
+    session: AsyncSession, tournament_ids: typing.Collection[int]
+) -> typing.Sequence[models.Team]:
+    query = (
+        sa.select(models.Team)
+        .options(sa.orm.selectinload(models.Team.players))
+        .where(models.Team.tournament_id.in_(list(tournament_ids)))
+        .order_by(models.Team.tournament_id, models.Team.id)
+    )
+    result = await session.scalars(query)
+    return result.all()
+
+
+async def bulk_upsert(
+    session: AsyncSession,
+    model: type[typing.Any],
+    rows: typing.Sequence[dict[str, typing.Any]],
+    index_elements: typing.Sequence[str],
+    update: typing.Sequence[str] | None = None,
+    chunk_size: int = 5000,
+) -> None:
+    """Insert `rows`, updating the `update` columns (default: all others) of rows that already exist."""
+    for chunk in itertools.batched(rows, chunk_size):
+        stmt = pg_insert(model).values(list(chunk))
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(index_elements),
+            set_={
+                **{
+                    column: stmt.excluded[column]
+                    for column in (update if update is not None else chunk[0])
+                    if column not in index_elements
+                },
+                "updated_at": sa.func.now(),
+            },
+        )
+        await session.execute(stmt)
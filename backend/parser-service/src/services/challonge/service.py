@@ -1,4 +1,12 @@
-from httpx import AsyncClient, BasicAuth, Proxy
+import asyncio
+import contextlib
+import hashlib
+import time
+import typing
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from httpx import AsyncClient, BasicAuth, Proxy, Response
 
 from src import schemas
 from src.core import config, errors
@@ -22,9 +30,111 @@ challonge_client = AsyncClient(
 )
 
 
-async def fetch_tournament(tournament_id: str) -> schemas.ChallongeTournament:
-    resp = await challonge_client.get(f"tournaments/{tournament_id}.json")
-    data = resp.json()
+class RateLimiter:
+    """Spaces requests to at most `rate` per second, with at most `concurrency` in flight."""
+
+    def __init__(self, rate: float, concurrency: int) -> None:
+        self._interval = 1 / rate
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+        self._semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    @contextlib.asynccontextmanager
+    async def __call__(self) -> typing.AsyncIterator[None]:
+        async with self._semaphore:
+            async with self._lock:
+                now = time.monotonic()
+                slot = max(now, self._next_slot)
+                self._next_slot = slot + self._interval
+            if slot > now:
+                await asyncio.sleep(slot - now)
+            yield
+
+
+limiter = RateLimiter(config.settings.challonge_requests_per_second, config.settings.challonge_max_concurrency)
+
+MAX_ATTEMPTS = 3
+
+
+@dataclass(slots=True)
+class CachedResponse:
+    etag: str | None
+    digest: str
+    data: typing.Any
+
+
+class ResponseCache:
+    """Last response per path, for conditional requests. Least recently used paths are dropped."""
+
+    def __init__(self, size: int = 512) -> None:
+        self._size = size
+        self._entries: OrderedDict[str, CachedResponse] = OrderedDict()
+
+    def get(self, path: str) -> CachedResponse | None:
+        entry = self._entries.get(path)
+        if entry is not None:
+            self._entries.move_to_end(path)
+        return entry
+
+    def put(self, path: str, entry: CachedResponse) -> None:
+        self._entries[path] = entry
+        self._entries.move_to_end(path)
+        while len(self._entries) > self._size:
+            self._entries.popitem(last=False)
+
+
+class SyncState:
+    """Digest of the response last applied to the database, per path.
+
+    Kept apart from the HTTP cache: plain reads (tournament creation, the
+    matches endpoint) refresh the cache without having synced anything, so
+    only a successful sync may record a digest here.
+    """
+
+    def __init__(self, size: int = 512) -> None:
+        self._size = size
+        self._digests: OrderedDict[str, str] = OrderedDict()
+
+    def is_applied(self, path: str, digest: str) -> bool:
+        return self._digests.get(path) == digest
+
+    def mark_applied(self, path: str, digest: str) -> None:
+        self._digests[path] = digest
+        self._digests.move_to_end(path)
+        while len(self._digests) > self._size:
+            self._digests.popitem(last=False)
+
+
+cache = ResponseCache()
+sync_state = SyncState()
+
+
+async def _request(path: str, headers: dict[str, str]) -> Response:
+    attempt = 1
+    while True:
+        async with limiter():
+            resp = await challonge_client.get(path, headers=headers)
+        if resp.status_code != 429 or attempt == MAX_ATTEMPTS:
+            return resp
+        await asyncio.sleep(float(resp.headers.get("Retry-After", attempt)))
+        attempt += 1
+
+
+async def get_json(path: str, tournament_id: int | str) -> tuple[typing.Any, str]:
+    """GET a Challonge resource, revalidating the cached copy.
+
+    The cached ETag is sent as `If-None-Match`; without one (or when the API
+    answers 200 anyway) the body is compared with the cached one instead.
+
+    Returns:
+        The decoded body and the digest of its raw bytes.
+    """
+    cached = cache.get(path)
+    headers = {"If-None-Match": cached.etag} if cached and cached.etag else {}
+    resp = await _request(path, headers)
+
+    if resp.status_code == 304 and cached is not None:
+        return cached.data, cached.digest
     if resp.status_code != 200:
         raise errors.ApiHTTPException(
             status_code=400,
@@ -35,36 +145,48 @@ async def fetch_tournament(tournament_id: str) -> schemas.ChallongeTournament:
                 )
             ],
         )
+
+    digest = hashlib.blake2b(resp.content, digest_size=16).hexdigest()
+    if cached is not None and cached.digest == digest:
+        cache.put(path, CachedResponse(resp.headers.get("ETag"), digest, cached.data))
+        return cached.data, digest
+
+    data = resp.json()
+    cache.put(path, CachedResponse(resp.headers.get("ETag"), digest, data))
+    return data, digest
+
+
+async def fetch_tournament(tournament_id: str) -> schemas.ChallongeTournament:
+    data, _ = await get_json(f"tournaments/{tournament_id}.json", tournament_id)
     return schemas.ChallongeTournament.model_validate(data["tournament"])
 
 
 async def fetch_participants(tournament_id: int) -> list[schemas.ChallongeParticipant]:
-    resp = await challonge_client.get(f"tournaments/{tournament_id}/participants.json")
-    data = resp.json()
-    if resp.status_code != 200:
-        raise errors.ApiHTTPException(
-            status_code=400,
-            detail=[
-                errors.ApiExc(
-                    code="not_found",
-                    msg=f"Tournament with id {tournament_id} not found.",
-                )
-            ],
-        )
+    data, _ = await get_json(f"tournaments/{tournament_id}/participants.json", tournament_id)
     return [schemas.ChallongeParticipant.model_validate(participant["participant"]) for participant in data]
 
 
+def matches_path(tournament_id: int) -> str:
+    return f"tournaments/{tournament_id}/matches.json"
+
+
 async def fetch_matches(tournament_id: int) -> list[schemas.ChallongeMatch]:
-    resp = await challonge_client.get(f"tournaments/{tournament_id}/matches.json")
-    data = resp.json()
-    if resp.status_code != 200:
-        raise errors.ApiHTTPException(
-            status_code=400,
-            detail=[
-                errors.ApiExc(
-                    code="not_found",
-                    msg=f"Tournament with id {tournament_id} not found.",
-                )
-            ],
-        )
+    data, _ = await get_json(matches_path(tournament_id), tournament_id)
     return [schemas.ChallongeMatch.model_validate(match["match"]) for match in data]
+
+
+async def fetch_matches_for_sync(
+    tournament_id: int, *, force: bool = False
+) -> tuple[list[schemas.ChallongeMatch] | None, str]:
+    """Like `fetch_matches`, for a sync.
+
+    Returns:
+        The matches, or None when they are the ones the last successful sync
+        applied (unless `force` is set), and the digest to pass to
+        `sync_state.mark_applied` once this sync succeeds.
+    """
+    path = matches_path(tournament_id)
+    data, digest = await get_json(path, tournament_id)
+    if not force and sync_state.is_applied(path, digest):
+        return None, digest
+    return [schemas.ChallongeMatch.model_validate(match["match"]) for match in data], digest
@@ -1,13 +1,19 @@
+import asyncio
+import typing
+
 from loguru import logger
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from src import models, schemas
-from src.core import enums, errors
+from src.core import config, db, enums, errors
 from src.services.challonge import service as challonge_service
-from src.services.team import flows as team_flows
+from src.services.standings import flows as standings_flows
+from src.services.standings import service as standings_service
+from src.services.team import service as team_service
 from src.services.tournament import flows as tournament_flows
 from src.services.tournament import service as tournament_service
+from src.services.user import service as user_service
 
 from . import service
 
@@ -49,85 +55,194 @@ def get_by_teams_ids_sync(session: Session, home_team_id: int, away_team_id: int
     return encounter
 
 
-async def _create_encounter_from_challonge(
-    session: AsyncSession,
-    tournament: models.Tournament,
-    group_id: int,
-    match: schemas.ChallongeMatch,
-) -> models.Encounter | None:
-    if match.state == "pending":
-        logger.info(f"Encounter [name={match.id}] is pending. Skipping...")
-        return None
-
-    home_team = await team_flows.get_by_tournament_challonge_id(session, tournament.id, match.player1_id, [])
-    away_team = await team_flows.get_by_tournament_challonge_id(session, tournament.id, match.player2_id, [])
+def _challonge_status(match: schemas.ChallongeMatch) -> enums.EncounterStatus:
+    return enums.EncounterStatus(match.state if match.state != "complete" else "completed")
+
+
+def _challonge_scores(match: schemas.ChallongeMatch) -> tuple[int, int]:
     try:
         home_score, away_score = map(int, match.scores_csv.split("-"))
     except ValueError:
         home_score, away_score = 0, 0
-    name = f"{home_team.name} vs {away_team.name}"
-    existed = await service.get_by_challonge_id(session, match.id, [])
-    if existed:
-        existed.home_score = home_score
-        existed.away_score = away_score
-        existed.status = enums.EncounterStatus(match.state if match.state != 'complete' else 'completed')
-        await session.commit()
-        return existed
-    match_db = await service.create(
+    return home_score, away_score
+
+
+async def _fetch_challonge_matches(
+    tournament: models.Tournament, *, skip_finals: bool, force: bool
+) -> tuple[list[tuple[int | None, schemas.ChallongeMatch]], dict[str, str]]:
+    """Fetch the tournament's Challonge brackets concurrently.
+
+    Brackets whose matches were already applied by a previous sync are left
+    out unless `force` is set.
+
+    Returns:
+        (group id, match) of the changed brackets, and the digest of every
+        fetched bracket by path, to record once the sync succeeds.
+    """
+
+    async def fetch(challonge_id: int) -> list[schemas.ChallongeMatch] | None:
+        bracket, digest = await challonge_service.fetch_matches_for_sync(challonge_id, force=force)
+        digests[challonge_service.matches_path(challonge_id)] = digest
+        return bracket
+
+    digests: dict[str, str] = {}
+    if not tournament.challonge_id:
+        groups = [group for group in tournament.groups if group.challonge_id]
+        brackets = await asyncio.gather(*(fetch(group.challonge_id) for group in groups))
+        matches = [
+            (group.id, match)
+            for group, bracket in zip(groups, brackets)
+            if bracket is not None
+            for match in bracket
+            if not (match.group_id is None and skip_finals)
+        ]
+        return matches, digests
+
+    bracket = await fetch(tournament.challonge_id)
+    groups_dict = {group.challonge_id: group.id for group in tournament.groups}
+    matches = []
+    for match in bracket or []:
+        if match.group_id is None and skip_finals:
+            continue
+        if match.group_id is None and len(groups_dict.keys()) == 1:
+            group_id = list(groups_dict.values())[0]
+        else:
+            group_id = groups_dict[match.group_id]
+        matches.append((group_id, match))
+    return matches, digests
+
+
+async def _apply_challonge_matches(
+    session: AsyncSession,
+    tournament: models.Tournament,
+    matches: typing.Sequence[tuple[int | None, schemas.ChallongeMatch]],
+) -> tuple[int, int, set[int]]:
+    """Diff matches against the stored encounters and write only the changes.
+
+    Returns:
+        Number of created and updated encounters, and the groups they belong to.
+    """
+    matches = [(group_id, match) for group_id, match in matches if match.state != "pending"]
+    existing = await service.get_by_challonge_ids(session, {match.id for _, match in matches})
+    teams = await team_service.get_by_tournament_challonge_ids(
         session,
-        name=name,
-        home_team=home_team,
-        away_team=away_team,
-        home_score=home_score,
-        away_score=away_score,
-        round=match.round,
-        tournament=tournament,
-        group_id=group_id,
-        challonge_id=match.id,
-        status=enums.EncounterStatus(match.state if match.state != 'complete' else 'completed'),
+        tournament.id,
+        {
+            participant_id
+            for _, match in matches
+            if match.id not in existing
+            for participant_id in (match.player1_id, match.player2_id)
+            if participant_id is not None
+        },
     )
-    logger.info(
-        f"Encounter [name={match_db.name}] created in tournament [id={tournament.id} number={tournament.number}]"
-    )
-    return match_db
+
+    created: list[dict[str, typing.Any]] = []
+    updated: list[dict[str, typing.Any]] = []
+    groups: set[int] = set()
+    for group_id, match in matches:
+        home_score, away_score = _challonge_scores(match)
+        status = _challonge_status(match)
+
+        encounter = existing.get(match.id)
+        if encounter is not None:
+            if (encounter.home_score, encounter.away_score, encounter.status) != (home_score, away_score, status):
+                updated.append({"id": encounter.id, "home_score": home_score, "away_score": away_score, "status": status})
+                groups.add(encounter.tournament_group_id)
+            continue
+
+        for participant_id in (match.player1_id, match.player2_id):
+            if participant_id not in teams:
+                raise errors.ApiHTTPException(
+                    status_code=404,
+                    detail=[
+                        errors.ApiExc(
+                            code="not_found",
+                            msg=f"Team with challonge_id {participant_id} in tournament {tournament.id} not found.",
+                        )
+                    ],
+                )
+        home_team, away_team = teams[match.player1_id], teams[match.player2_id]
+        groups.add(group_id)
+        created.append(
+            {
+                "name": f"{home_team.name} vs {away_team.name}",
+                "home_team_id": home_team.id,
+                "away_team_id": away_team.id,
+                "home_score": home_score,
+                "away_score": away_score,
+                "round": match.round,
+                "tournament_id": tournament.id,
+                "tournament_group_id": group_id,
+                "challonge_id": match.id,
+                "status": status,
+                "has_logs": False,
+            }
+        )
+
+    await service.bulk_update(session, updated)
+    await service.bulk_create(session, created)
+    await session.commit()
+    return len(created), len(updated), {group for group in groups if group is not None}
 
 
 async def bulk_create_for_tournament_from_challonge(
     session: AsyncSession,
     tournament_id: int,
     skip_finals: bool = False,
-) -> None:
+    force: bool = False,
+) -> tuple[int, int]:
+    """Sync the tournament's encounters with its Challonge brackets.
+
+    Brackets are fetched concurrently under the Challonge rate limiter and
+    revalidated against the previous response, so unchanged brackets are
+    neither parsed nor diffed. Changes are written in bulk.
+
+    Returns:
+        Number of created and updated encounters.
+    """
     tournament = await tournament_flows.get(session, tournament_id, ["groups"])
-    if not tournament.challonge_id:
-        for group in tournament.groups:
-            matches = await challonge_service.fetch_matches(group.challonge_id)
-            for match in matches:
-                if match.group_id is None and skip_finals:
-                    continue
-                await _create_encounter_from_challonge(session, tournament, group.id, match)
-    else:
-        matches = await challonge_service.fetch_matches(tournament.challonge_id)
-        groups_dict = {group.challonge_id: group.id for group in tournament.groups}
+    # Digests are recorded only after the changes are committed, so a failed fetch or
+    # apply leaves every bracket to be synced again next time.
+    matches, digests = await _fetch_challonge_matches(tournament, skip_finals=skip_finals, force=force)
+    if not matches:
+        logger.info(f"Challonge brackets of tournament [id={tournament.id}] did not change. Skipping...")
+        return 0, 0
 
-        for match in matches:
-            if match.group_id is None and len(groups_dict.keys()) == 1:
-                group_id = list(groups_dict.values())[0]
-            else:
-                group_id = groups_dict[match.group_id]
+    created, updated, group_ids = await _apply_challonge_matches(session, tournament, matches)
+    for path, digest in digests.items():
+        challonge_service.sync_state.mark_applied(path, digest)
 
-            if match.group_id is None and skip_finals:
-                continue
+    logger.info(
+        f"Encounters of tournament [id={tournament.id} number={tournament.number}] synced from Challonge: "
+        f"{created} created, {updated} updated"
+    )
+    if created or updated:
+        await user_service.mark_profiles_stale_by_tournament(session, tournament.id)
+        # Keep live standings current; tournaments without standings get them calculated in full later.
+        if await standings_service.get_by_tournament(session, tournament, []):
+            await standings_flows.recalculate_for_groups(session, tournament, group_ids)
+    return created, updated
 
-            await _create_encounter_from_challonge(session, tournament, group_id, match)
+
+async def _sync_tournament(tournament_id: int, semaphore: asyncio.Semaphore) -> None:
+    async with semaphore, db.async_session_maker() as session:
+        try:
+            await bulk_create_for_tournament_from_challonge(session, tournament_id)
+        except Exception as exc:
+            logger.exception(f"Challonge sync of tournament [id={tournament_id}] failed: {exc}")
 
 
 async def bulk_create_for_from_challonge(session: AsyncSession) -> None:
-    tournaments = await tournament_service.get_all(session)
-    for tournament in tournaments:
-        if tournament.id == 4:
-            continue  # In this tournament we have two brackets, but the first bracket is not finished.
-            # Suz Playoffs filled manually
-        await bulk_create_for_tournament_from_challonge(session, tournament.id)
+    """Sync every unfinished tournament from Challonge, a few at a time.
+
+    Finished tournaments are skipped entirely. A failing tournament is
+    logged and does not stop the others.
+    """
+    tournaments = await tournament_service.get_all(session, is_finished=False)
+    # Tournament 4 has two brackets, but the first bracket is not finished; its playoffs are filled manually.
+    tournament_ids = [tournament.id for tournament in tournaments if tournament.id != 4]
+    semaphore = asyncio.Semaphore(config.settings.challonge_max_concurrency)
+    await asyncio.gather(*(_sync_tournament(tournament_id, semaphore) for tournament_id in tournament_ids))
 
 
 async def create_match(
@@ -81,6 +81,19 @@ async def get_by_challonge_id(session: AsyncSession, challonge_id: int, entities
     return result.scalars().first()
 
 
+async def get_by_challonge_ids(
+    session: AsyncSession, challonge_ids: typing.Collection[int]
+) -> dict[int, models.Encounter]:
+    if not challonge_ids:
+        return {}
+    query = sa.select(models.Encounter).where(models.Encounter.challonge_id.in_(list(challonge_ids)))
+    result = await session.scalars(query)
+    encounters: dict[int, models.Encounter] = {}
+    for encounter in result.all():
+        encounters.setdefault(encounter.challonge_id, encounter)
+    return encounters
+
+
 async def get_by_tournament_group_id(
     session: AsyncSession, tournament_id: int, group_id: int, entities: list[str]
 ) -> typing.Sequence[models.Encounter]:
@@ -98,6 +111,26 @@ async def get_by_tournament_group_id(
     return result.scalars().all()
 
 
+async def get_by_tournament_group_ids(
+    session: AsyncSession, tournament_id: int, group_ids: typing.Iterable[int], entities: list[str]
+) -> dict[int, list[models.Encounter]]:
+    query = (
+        sa.select(models.Encounter)
+        .options(*encounter_entities(entities))
+        .where(
+            sa.and_(
+                models.Encounter.tournament_id == tournament_id,
+                models.Encounter.tournament_group_id.in_(list(group_ids)),
+            )
+        )
+    )
+    result = await session.execute(query)
+    encounters: dict[int, list[models.Encounter]] = {}
+    for encounter in result.scalars().all():
+        encounters.setdefault(encounter.tournament_group_id, []).append(encounter)
+    return encounters
+
+
 async def get_by_name_group_id(
     session: AsyncSession, name: str, group_id: int, entities: list[str]
 ) -> models.Encounter | None:
@@ -262,6 +295,18 @@ async def create(
     return encounter
 
 
+async def bulk_create(session: AsyncSession, rows: typing.Sequence[dict[str, typing.Any]]) -> None:
+    """Insert encounters in one statement, without committing."""
+    if rows:
+        await session.execute(sa.insert(models.Encounter), rows)
+
+
+async def bulk_update(session: AsyncSession, rows: typing.Sequence[dict[str, typing.Any]]) -> None:
+    """Update encounters by their `id` in one statement, without committing."""
+    if rows:
+        await session.execute(sa.update(models.Encounter), rows)
+
+
 async def update(
     session: AsyncSession,
     encounter: models.Encounter,
@@ -3,6 +3,7 @@ import csv
 import pandas as pd
 import sqlalchemy as sa
 from loguru import logger
+from shared.observability import stage
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src import models
@@ -687,7 +688,8 @@ class MatchLogProcessor:
 
         if all_stat_objects:
             session.add_all(all_stat_objects)
-            await session.commit()
+            with stage("match_log", "commit"):
+                await session.commit()
 
     async def start(self, session: AsyncSession, is_raise: bool = True) -> models.Match | None:
         logger.info(f"Processing match log {self.filename} in tournament {self.tournament.name}")
@@ -703,12 +705,51 @@ class MatchLogProcessor:
         if not await self.validate(is_raise=is_raise):
             return None
         await self._preload_data(session)
-        (home_team_tuple, away_team_tuple) = await self.process_teams(session)
+        with stage("match_log", "teams"):
+            (home_team_tuple, away_team_tuple) = await self.process_teams(session)
         home_team_db, home_players_map = home_team_tuple
         away_team_db, away_players_map = away_team_tuple
 
         players_map = {**home_players_map, **away_players_map}
 
+        with stage("match_log", "match"):
+            match_model = await self._upsert_match(session, home_team_db, away_team_db)
+
+        logger.info(f"Clearing existing stats/events/kills for match {match_model.id}")
+        with stage("match_log", "clear", match_id=match_model.id):
+            await session.execute(
+                sa.delete(models.MatchStatistics).where(models.MatchStatistics.match_id == match_model.id)
+            )
+            await session.execute(sa.delete(models.MatchEvent).where(models.MatchEvent.match_id == match_model.id))
+            await session.execute(
+                sa.delete(models.MatchKillFeed).where(models.MatchKillFeed.match_id == match_model.id)
+            )
+            with stage("match_log", "commit"):
+                await session.commit()
+
+        logger.info(f"Processing kills for match {match_model.id}")
+        with stage("match_log", "kills", match_id=match_model.id):
+            kill_feed_db_objects = await self.process_kills(match_model, players_map)
+            if kill_feed_db_objects:
+                session.add_all(kill_feed_db_objects)
+                with stage("match_log", "commit"):
+                    await session.commit()
+
+        logger.info(f"Processing events for match {match_model.id}")
+        with stage("match_log", "events", match_id=match_model.id):
+            await self.process_events(session, match_model, players_map)
+
+        logger.info(f"Processing stats for match {match_model.id}")
+        with stage("match_log", "stats", match_id=match_model.id):
+            await self.create_stats(session, match_model, players_map)
+        await user_service.mark_profiles_stale_by_teams(session, [home_team_db.id, away_team_db.id])
+
+        logger.info(f"Match log {self.filename} (match_id={match_model.id}) processed successfully")
+        return match_model
+
+    async def _upsert_match(
+        self, session: AsyncSession, home_team_db: models.Team, away_team_db: models.Team
+    ) -> models.Match:
         match_map_model = await self.get_map(session)
         logger.info(
             f"Match map: {match_map_model.name} in match log {self.filename} in tournament {self.tournament.name}"
@@ -749,27 +790,6 @@ class MatchLogProcessor:
             await session.commit()
             logger.info(f"Match updated [id={match_model.id}] for log {self.filename}")
 
-        logger.info(f"Clearing existing stats/events/kills for match {match_model.id}")
-        await session.execute(
-            sa.delete(models.MatchStatistics).where(models.MatchStatistics.match_id == match_model.id)
-        )
-        await session.execute(sa.delete(models.MatchEvent).where(models.MatchEvent.match_id == match_model.id))
-        await session.execute(sa.delete(models.MatchKillFeed).where(models.MatchKillFeed.match_id == match_model.id))
-        await session.commit()
-
-        logger.info(f"Processing kills for match {match_model.id}")
-        kill_feed_db_objects = await self.process_kills(match_model, players_map)
-        if kill_feed_db_objects:
-            session.add_all(kill_feed_db_objects)
-            await session.commit()
-
-        logger.info(f"Processing events for match {match_model.id}")
-        await self.process_events(session, match_model, players_map)
-
-        logger.info(f"Processing stats for match {match_model.id}")
-        await self.create_stats(session, match_model, players_map)
-
-        logger.info(f"Match log {self.filename} (match_id={match_model.id}) processed successfully")
         return match_model
 
     async def add_substitution(
@@ -1030,20 +1050,25 @@ async def process_closeness(session: AsyncSession, payload: list[str]):
         logger.info(f"Row for encounter {encounter_name} in tournament {tournament.name} processed successfully")
 
 
-async def process_match_log(session: AsyncSession, tournament_id: int, filename: str, *, is_raise: bool = True) -> None:
+async def process_match_log(
+    session: AsyncSession, tournament_id: int, filename: str, *, is_raise: bool = True
+) -> models.Match | None:
     tournament = await tournament_flows.get(session, tournament_id, [])
     logger.info(f"Fetching logs from S3 for tournament {tournament.id} and file {filename}")
 
-    data = await s3_service.async_client.get_log_by_filename(tournament.id, filename)
-    decoded_lines = [line.decode() for line in data.split(b"\n") if line]
-
-    processor = MatchLogProcessor(tournament, filename.split("/")[-1], decoded_lines)
+    with stage("match_log", "fetch"):
+        data = await s3_service.async_client.get_log_by_filename(tournament.id, filename)
+    with stage("match_log", "parse"):
+        decoded_lines = [line.decode() for line in data.split(b"\n") if line]
+        processor = MatchLogProcessor(tournament, filename.split("/")[-1], decoded_lines)
     try:
-        await processor.start(session, is_raise=is_raise)
+        with stage("match_log", "total", tournament_id=tournament.id):
+            return await processor.start(session, is_raise=is_raise)
     except Exception as e:
         logger.exception(e)
         if is_raise:
             raise e
+        return None
 
 
 async def make_tournament_folder(session: AsyncSession, tournament: models.Tournament, filename: str) -> None:
@@ -0,0 +1,33 @@
+"""Broadcast standings changes so app-service drops cached responses built from them."""
+
+import typing
+
+import redis.asyncio as aioredis
+from loguru import logger
+from shared.schemas.events import STANDINGS_CHANGED_CHANNEL, StandingsChangedEvent
+
+from src.core import config
+
+__all__ = ["publish_standings_changed"]
+
+_redis: aioredis.Redis | None = None
+
+
+def _get_redis() -> aioredis.Redis:
+    global _redis
+    if _redis is None:
+        _redis = aioredis.from_url(str(config.settings.redis_url))
+    return _redis
+
+
+async def publish_standings_changed(tournament_id: int, group_ids: typing.Iterable[int]) -> None:
+    """Publish a StandingsChangedEvent.
+
+    Failures are logged and swallowed: the standings are already committed and
+    the cached responses expire on their TTL anyway.
+    """
+    event = StandingsChangedEvent(tournament_id=tournament_id, group_ids=sorted(group_ids))
+    try:
+        await _get_redis().publish(STANDINGS_CHANGED_CHANNEL, event.model_dump_json())
+    except Exception as e:
+        logger.warning(f"Failed to publish standings change event for tournament {tournament_id}: {e}")
@@ -1,11 +1,14 @@
+import typing
+
 from loguru import logger
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src import models, schemas
 from src.services.tournament import flows as tournament_flows
 from src.services.tournament import service as tournament_service
+from src.services.user import service as user_service
 
-from . import service
+from . import events, service
 
 
 async def to_pydantic(session: AsyncSession, standing: models.Standing, entities: list[str]) -> schemas.StandingRead:
@@ -21,20 +24,40 @@ async def to_pydantic(session: AsyncSession, standing: models.Standing, entities
     return schemas.StandingRead(**standing.to_dict(), team=team, group=group, tournament=tournament)
 
 
+async def recalculate_for_groups(
+    session: AsyncSession, tournament: models.Tournament, group_ids: typing.Iterable[int]
+) -> set[int]:
+    """Recalculate the standings of `group_ids` (and the playoffs) and announce changed rows.
+
+    Returns:
+        Ids of the groups whose stored rows changed.
+    """
+    changed = await service.recalculate_groups(session, tournament, group_ids)
+    if changed:
+        await user_service.mark_profiles_stale_by_tournament(session, tournament.id)
+        await events.publish_standings_changed(tournament.id, changed)
+    return changed
+
+
 async def bulk_create_for_tournament(
     session: AsyncSession,
     tournament_id: int,
     rewrite: bool = False,
 ) -> list[schemas.StandingRead]:
-    if rewrite:
-        await service.delete_by_tournament(session, tournament_id)
-
     tournament = await tournament_flows.get(session, tournament_id, ["groups"])
-    if await service.get_by_tournament(session, tournament, []):
-        logger.info(f"Standings for tournament {tournament_id} already exist. Skipping...")
-        return []
-    standings = await service.calculate_for_tournament(session, tournament)
-    return [await to_pydantic(session, standing, ["team"]) for standing in standings]
+    if rewrite:
+        await recalculate_for_groups(session, tournament, [group.id for group in tournament.groups])
+        standings = await service.get_by_tournament(session, tournament, [])
+    else:
+        if await service.get_by_tournament(session, tournament, []):
+            logger.info(f"Standings for tournament {tournament_id} already exist. Skipping...")
+            return []
+        standings = await service.calculate_for_tournament(session, tournament)
+        await user_service.mark_profiles_stale_by_tournament(session, tournament.id)
+    # Only the group and tournament entities need extra loading, so build the rows directly.
+    return [
+        schemas.StandingRead(**standing.to_dict(), team=None, group=None, tournament=None) for standing in standings
+    ]
 
 
 async def bulk_create(session: AsyncSession) -> None:
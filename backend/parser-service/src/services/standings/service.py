@@ -3,12 +3,17 @@ from collections import defaultdict
 
 import sqlalchemy as sa
 from loguru import logger
+from shared.observability import instrumented
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm.strategy_options import _AbstractLoad
 
 from src import models, schemas
 from src.services.encounter import service as encounter_service
 
+# Columns a recalculation may change; a stored row equal on all of them is left untouched.
+STANDING_FIELDS = ("position", "overall_position", "matches", "win", "draw", "lose", "points", "buchholz", "tb")
+
 
 def standing_entities(in_entities: list[str]) -> list[_AbstractLoad]:
     entities = []
@@ -404,6 +409,7 @@ def sort_matches(
     return sorted(matches, key=sort_key)
 
 
+@instrumented("standings")
 async def calculate_for_tournament(
     session: AsyncSession, tournament: models.Tournament
 ) -> typing.Sequence[models.Standing]:
@@ -434,3 +440,99 @@ async def calculate_for_tournament(
     await session.commit()
     logger.info(f"Standings calculated and committed for tournament {tournament.id}")
     return await get_by_tournament(session, tournament, ["team"])
+
+
+def _copy_for_recalculation(standing: models.Standing, is_groups: bool) -> models.Standing:
+    """Transient copy of a stored row, reset the way `calculate_for_groups` leaves it."""
+    values = {field: getattr(standing, field) for field in STANDING_FIELDS}
+    if is_groups:
+        values["overall_position"] = -1
+    return models.Standing(
+        tournament_id=standing.tournament_id, group_id=standing.group_id, team_id=standing.team_id, **values
+    )
+
+
+@instrumented("standings")
+async def recalculate_groups(
+    session: AsyncSession, tournament: models.Tournament, group_ids: typing.Iterable[int]
+) -> set[int]:
+    """Recalculate the standings of some groups and write only the rows that changed.
+
+    The given groups and every playoff group are recalculated from their
+    encounters; the other groups keep their stored rows. Overall positions
+    depend on every group, so they are redistributed over the whole tournament
+    before the result is diffed against the stored rows.
+
+    Args:
+        session: An SQLAlchemy `AsyncSession` for database interaction.
+        tournament: Tournament with its `groups` loaded.
+        group_ids: Groups whose encounters changed.
+
+    Returns:
+        Ids of the groups with inserted, updated or deleted rows.
+    """
+    group_ids = set(group_ids)
+    affected = [group for group in tournament.groups if group.id in group_ids or not group.is_groups]
+    has_groups = any(group.is_groups for group in tournament.groups)
+    has_playoffs = any(not group.is_groups for group in tournament.groups)
+
+    encounters = await encounter_service.get_by_tournament_group_ids(
+        session, tournament.id, [group.id for group in affected], []
+    )
+    standings: list[models.Standing] = []
+    for group in affected:
+        if not encounters.get(group.id):
+            logger.warning(f"No encounters found for group {group.id} in tournament {tournament.id}")
+            continue
+        group_encounters = sort_matches(encounters[group.id])
+        if group.is_groups:
+            standings.extend(calculate_for_groups(group, group_encounters))
+        else:
+            standings.extend(calculate_for_playoffs(group, group_encounters, tournament))
+
+    stored = {
+        (standing.group_id, standing.team_id): standing for standing in await get_by_tournament(session, tournament, [])
+    }
+    affected_ids = {group.id for group in affected}
+    is_groups = {group.id: group.is_groups for group in tournament.groups}
+    standings.extend(
+        _copy_for_recalculation(standing, is_groups.get(group_id, False))
+        for (group_id, _), standing in stored.items()
+        if group_id not in affected_ids
+    )
+    if has_groups:
+        standings = await calculate_overall_positions(standings, has_playoffs)
+
+    changed_rows = [
+        {
+            "tournament_id": tournament.id,
+            "group_id": standing.group_id,
+            "team_id": standing.team_id,
+            **{field: getattr(standing, field) for field in STANDING_FIELDS},
+        }
+        for standing in standings
+        if (current := stored.get((standing.group_id, standing.team_id))) is None
+        or any(getattr(current, field) != getattr(standing, field) for field in STANDING_FIELDS)
+    ]
+    calculated = {(standing.group_id, standing.team_id) for standing in standings}
+    removed = [standing for key, standing in stored.items() if key not in calculated]
+
+    if changed_rows:
+        query = pg_insert(models.Standing).values(changed_rows)
+        query = query.on_conflict_do_update(
+            index_elements=["tournament_id", "group_id", "team_id"],
+            set_={**{field: query.excluded[field] for field in STANDING_FIELDS}, "updated_at": sa.func.now()},
+        )
+        await session.execute(query)
+    if removed:
+        await session.execute(
+            sa.delete(models.Standing).where(models.Standing.id.in_([standing.id for standing in removed]))
+        )
+    await session.commit()
+
+    changed = {row["group_id"] for row in changed_rows} | {standing.group_id for standing in removed}
+    logger.info(
+        f"Standings of tournament {tournament.id} recalculated for groups {sorted(affected_ids)}: "
+        f"{len(changed_rows)} rows written, {len(removed)} removed"
+    )
+    return changed
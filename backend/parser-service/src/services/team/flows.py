@@ -1,3 +1,5 @@
+import typing
+
 import sqlalchemy as sa
 from loguru import logger
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -7,7 +9,7 @@ from src.core import enums, errors
 from src.services.challonge import service as challonge_service
 from src.services.tournament import flows as tournament_flows
 from src.services.tournament import service as tournament_service
-from src.services.user import flows as user_flows
+from src.services.user import service as user_service
 
 from . import service
 
@@ -232,58 +234,96 @@ async def create(
 async def bulk_create_from_balancer(
     session: AsyncSession, tournament_id: int, payload: list[schemas.BalancerTeam]
 ) -> None:
+    """Import the balancer's teams and rosters into the tournament.
+
+    Battle tags, existing teams and players, and the newcomer flags are
+    resolved with a few set-based queries up front; the missing teams and
+    players are then inserted in bulk and committed in one transaction.
+    Teams and players that already exist are skipped.
+
+    Raises:
+        ApiHTTPException: With every battle tag that has no user and every
+            invalid role at once; nothing is written in that case.
+    """
     tournament = await tournament_flows.get(session, tournament_id, [])
+    problems: list[errors.ApiExc] = []
+    rosters: list[tuple[schemas.BalancerTeam, list[tuple[schemas.BalancerTeamMember, enums.HeroClass | None]]]] = []
     for team_data in payload:
-        try:
-            name = team_data.name.split("#")[0]
-        except ValueError:
-            name = team_data.name
-
-        captain = await user_flows.find_by_battle_tag(session, team_data.name)
-        team = await service.get_by_name_and_tournament(session, tournament.id, name, [])
-        if not team:
-            team = await create(
-                session,
-                name=name,
-                balancer_name=team_data.name,
-                avg_sr=team_data.avg_sr,
-                total_sr=team_data.total_sr,
-                tournament=tournament,
-                captain=captain,
-            )
-        else:
-            logger.info(f"Team {name} already exists in tournament {tournament.name}. Skipping...")
-
+        members = []
         for player in team_data.members:
-            logger.info(f"Trying to add player {player.name} to team {team.name} in tournament {tournament.name}")
-            user = await user_flows.find_by_battle_tag(session, player.name)
-            player_db = await service.get_player_by_user_and_tournament(session, user.id, tournament.id, [])
-            if player_db:
+            try:
+                members.append((player, resolve_hero_role_from_balancer(player.role)))
+            except errors.ApiHTTPException as exc:
+                problems.extend(errors.ApiExc.model_validate(detail) for detail in exc.detail)
+        rosters.append((team_data, members))
+
+    battle_tags = [team.name for team in payload] + [player.name for team in payload for player in team.members]
+    user_ids = await user_service.find_ids_by_battle_tags(session, battle_tags)
+    missing = list(dict.fromkeys(battle_tag for battle_tag in battle_tags if battle_tag not in user_ids))
+    problems.extend(
+        errors.ApiExc(code="not_found", msg=f"User with battle tag {battle_tag} not found.") for battle_tag in missing
+    )
+    if problems:
+        raise errors.ApiHTTPException(status_code=400, detail=problems)
+
+    names = {team.name: team.name.split("#")[0] for team in payload}
+    teams = await service.get_by_names_and_tournament(session, tournament.id, names.values())
+    new_teams: dict[str, dict[str, typing.Any]] = {}
+    for team_data in payload:
+        name = names[team_data.name]
+        if name.lower() in teams or name.lower() in new_teams:
+            logger.info(f"Team {name} already exists in tournament {tournament.name}. Skipping...")
+            continue
+        new_teams[name.lower()] = {
+            "name": name,
+            "balancer_name": team_data.name,
+            "avg_sr": team_data.avg_sr,
+            "total_sr": team_data.total_sr,
+            "tournament_id": tournament.id,
+            "captain_id": user_ids[team_data.name],
+        }
+    teams.update((team.name.lower(), team) for team in await service.bulk_create(session, list(new_teams.values())))
+
+    member_ids = {user_ids[player.name] for team in payload for player in team.members}
+    in_tournament = await service.get_user_ids_in_tournament(session, tournament.id, member_ids)
+    played_roles = await service.get_played_roles(session, member_ids)
+
+    players: list[dict[str, typing.Any]] = []
+    for team_data, members in rosters:
+        team = teams[names[team_data.name].lower()]
+        for player, role in members:
+            user_id = user_ids[player.name]
+            if user_id in in_tournament:
                 logger.info(
                     f"Player {player.name} already exists in team [name={team.name} tournament={tournament.name}]."
                 )
                 continue
 
-            is_newcomer = not bool(await service.get_player_by_user(session, user.id, []))
-            role = resolve_hero_role_from_balancer(player.role)
-            is_newcomer_role = not bool(await service.get_player_by_user_and_role(session, user.id, role, []))
-
-            await create_player(
-                session,
-                name=player.name,
-                primary=player.primary,
-                secondary=player.secondary,
-                rank=player.rank,
-                role=role,
-                div=resolve_player_div(player.rank),
-                user=user,
-                tournament=tournament,
-                team=team,
-                is_newcomer=is_newcomer,
-                is_newcomer_role=is_newcomer_role,
+            in_tournament.add(user_id)
+            players.append(
+                {
+                    "name": player.name,
+                    "primary": player.primary,
+                    "secondary": player.secondary,
+                    "rank": player.rank,
+                    "div": resolve_player_div(player.rank),
+                    "role": role,
+                    "user_id": user_id,
+                    "tournament_id": tournament.id,
+                    "team_id": team.id,
+                    "is_newcomer": user_id not in played_roles,
+                    "is_newcomer_role": role not in played_roles.get(user_id, ()),
+                }
             )
-            logger.info(f"Player {player.name} added to team {team.name} in tournament {tournament.id}")
 
+    await service.bulk_create_players(session, players)
+    await session.commit()
+    logger.info(
+        f"Imported {len(new_teams)} teams and {len(players)} players from the balancer "
+        f"into tournament {tournament.name}"
+    )
+    if players:
+        await user_service.mark_profiles_stale_by_teams(session, sorted({player["team_id"] for player in players}))
     return None
 
 
@@ -97,6 +97,27 @@ async def get_by_tournament_challonge_id(
     return result.scalars().first()
 
 
+async def get_by_tournament_challonge_ids(
+    session: AsyncSession, tournament_id: int, challonge_ids: typing.Collection[int]
+) -> dict[int, models.Team]:
+    """Teams of the tournament by their Challonge participant id."""
+    if not challonge_ids:
+        return {}
+    query = (
+        sa.select(models.ChallongeTeam.challonge_id, models.Team)
+        .join(models.ChallongeTeam, models.Team.id == models.ChallongeTeam.team_id)
+        .where(
+            models.ChallongeTeam.tournament_id == tournament_id,
+            models.ChallongeTeam.challonge_id.in_(list(challonge_ids)),
+        )
+    )
+    result = await session.execute(query)
+    teams: dict[int, models.Team] = {}
+    for challonge_id, team in result.all():
+        teams.setdefault(challonge_id, team)
+    return teams
+
+
 async def get_by_captain_tournament(
     session: AsyncSession,
     captain: models.User,
@@ -204,6 +225,70 @@ async def get_player_by_user_and_role(
     return result.unique().scalars().all()
 
 
+async def get_by_names_and_tournament(
+    session: AsyncSession, tournament_id: int, names: typing.Iterable[str]
+) -> dict[str, models.Team]:
+    """Teams of the tournament by lower-cased name."""
+    lowered = list({name.lower() for name in names})
+    if not lowered:
+        return {}
+    query = sa.select(models.Team).where(
+        sa.func.lower(models.Team.name).in_(lowered),
+        models.Team.tournament_id == tournament_id,
+    )
+    result = await session.scalars(query)
+    teams: dict[str, models.Team] = {}
+    for team in result.all():
+        teams.setdefault(team.name.lower(), team)
+    return teams
+
+
+async def get_user_ids_in_tournament(
+    session: AsyncSession, tournament_id: int, user_ids: typing.Collection[int]
+) -> set[int]:
+    """Those of `user_ids` that already play in the tournament."""
+    if not user_ids:
+        return set()
+    query = sa.select(models.Player.user_id).where(
+        models.Player.tournament_id == tournament_id,
+        models.Player.user_id.in_(list(user_ids)),
+    )
+    result = await session.scalars(query)
+    return set(result.all())
+
+
+async def get_played_roles(
+    session: AsyncSession, user_ids: typing.Collection[int]
+) -> dict[int, set[enums.HeroClass | None]]:
+    """Roles every user of `user_ids` has played; users without a player are missing."""
+    if not user_ids:
+        return {}
+    query = (
+        sa.select(models.Player.user_id, models.Player.role)
+        .where(models.Player.user_id.in_(list(user_ids)))
+        .distinct()
+    )
+    result = await session.execute(query)
+    roles: dict[int, set[enums.HeroClass | None]] = {}
+    for user_id, role in result.all():
+        roles.setdefault(user_id, set()).add(role)
+    return roles
+
+
+async def bulk_create(session: AsyncSession, rows: typing.Sequence[dict[str, typing.Any]]) -> list[models.Team]:
+    """Insert teams in one statement, without committing."""
+    if not rows:
+        return []
+    result = await session.scalars(sa.insert(models.Team).returning(models.Team), rows)
+    return list(result.all())
+
+
+async def bulk_create_players(session: AsyncSession, rows: typing.Sequence[dict[str, typing.Any]]) -> None:
+    """Insert players in one statement, without committing."""
+    if rows:
+        await session.execute(sa.insert(models.Player), rows)
+
+
 async def create(
     session: AsyncSession,
     *,
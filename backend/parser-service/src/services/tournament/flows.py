@@ -254,3 +254,15 @@ async def create(
         challonge_id=challonge_tournament.id,
     )
     return tournament
+
+
+async def finish(session: AsyncSession, id: int) -> tuple[models.Tournament, bool]:
+    """Mark a tournament as finished.
+
+    Returns:
+        The tournament and whether it was not finished before.
+    """
+    tournament = await get(session, id, [])
+    if tournament.is_finished:
+        return tournament, False
+    return await service.set_finished(session, tournament, True), True
@@ -132,3 +132,10 @@ async def create_group(
     session.add(group)
     await session.commit()
     return group
+
+
+async def set_finished(session: AsyncSession, tournament: models.Tournament, is_finished: bool) -> models.Tournament:
+    tournament.is_finished = is_finished
+    session.add(tournament)
+    await session.commit()
+    return tournament
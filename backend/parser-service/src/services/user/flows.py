@@ -1,5 +1,7 @@
 import csv
+import itertools
 import re
+import typing
 
 from loguru import logger
 from pydantic import ValidationError
@@ -117,10 +119,93 @@ async def create(session: AsyncSession, data_in: schemas.UserCSV) -> models.User
     return await service.get(session, user.id, ["battle_tag", "twitch", "discord"])  # type: ignore
 
 
+def _parse_csv_row(
+    row: list[str],
+    *,
+    battle_tag_row: int,
+    discord_row: int,
+    twitch_row: int,
+    smurf_row: int,
+    has_discord: bool,
+    has_smurf: bool,
+    has_twitch: bool,
+) -> schemas.UserCSV:
+    battle_tag = row[battle_tag_row - 1].strip().replace(" #", "#").replace("# ", "#")
+    twitch = row[twitch_row - 1].strip() if has_twitch else None
+    discord = row[discord_row - 1].strip() if has_discord else None
+    smurfs = row[smurf_row - 1] if has_smurf else ""
+
+    return schemas.UserCSV(
+        battle_tag=battle_tag_validator.findall(battle_tag)[0],
+        discord=discord,
+        twitch=twitch,
+        smurfs=battle_tag_validator.findall(smurfs),
+    )
+
+
+def _merge_csv_entries(entries: typing.Iterable[schemas.UserCSV]) -> list[tuple[schemas.UserCSV, list[str], list[str]]]:
+    """Merge entries of the same battle tag, the way importing them one after another would.
+
+    Returns:
+        (entry, discords, twitches) per battle tag, the entry being the last one.
+    """
+    merged: dict[str, tuple[schemas.UserCSV, list[str], list[str]]] = {}
+    for entry in entries:
+        previous, discords, twitches = merged.get(entry.battle_tag, (None, [], []))
+        if entry.discord:
+            discords.append(entry.discord)
+        if entry.twitch:
+            twitches.append(entry.twitch)
+        smurfs = list(dict.fromkeys([*previous.smurfs, *entry.smurfs])) if previous else entry.smurfs
+        merged[entry.battle_tag] = (entry.model_copy(update={"smurfs": smurfs}), discords, twitches)
+    return list(merged.values())
+
+
+async def import_users(
+    session: AsyncSession, entries: typing.Sequence[schemas.UserCSV], report: schemas.UserCSVImportReport
+) -> None:
+    """Create or update the users of `entries` with a fixed number of statements.
+
+    Existing users are matched like `service.find_by_csv`, renamed to the
+    entry's battle tag and given its identities; the others are created.
+    Battle tags, discords and twitches some user already has are left alone.
+    """
+    merged = _merge_csv_entries(entries)
+    matched = await service.find_ids_by_csv(session, [entry for entry, _, _ in merged])
+
+    created = await service.upsert_users(
+        session, [entry.battle_tag for key, (entry, _, _) in enumerate(merged) if key not in matched]
+    )
+    renames: dict[int, str] = {}
+    for key, (entry, _, _) in enumerate(merged):
+        if key in matched:
+            renames[matched[key]] = entry.battle_tag
+    report.created += len(created)
+    report.updated += await service.rename_users(session, renames)
+
+    battle_tags: list[dict[str, typing.Any]] = []
+    discords: list[dict[str, typing.Any]] = []
+    twitches: list[dict[str, typing.Any]] = []
+    for key, (entry, entry_discords, entry_twitches) in enumerate(merged):
+        user_id = matched[key] if key in matched else created[entry.battle_tag]
+        for battle_tag in dict.fromkeys([entry.battle_tag, *entry.smurfs]):
+            try:
+                name, tag = battle_tag.split("#")
+            except ValueError:
+                continue
+            battle_tags.append({"user_id": user_id, "battle_tag": battle_tag, "name": name, "tag": tag})
+        discords.extend({"user_id": user_id, "name": discord} for discord in dict.fromkeys(entry_discords))
+        twitches.extend({"user_id": user_id, "name": twitch} for twitch in dict.fromkeys(entry_twitches))
+
+    report.battle_tags += await service.insert_identities(session, models.UserBattleTag, battle_tags, "battle_tag")
+    report.discords += await service.insert_identities(session, models.UserDiscord, discords, "name")
+    report.twitches += await service.insert_identities(session, models.UserTwitch, twitches, "name")
+
+
 async def bulk_create_users_from_csv(
     session: AsyncSession,
     filename: str,
-    data: list[str],
+    data: typing.Iterable[str],
     start_row: int = 0,
     *,
     battle_tag_row: int,
@@ -131,29 +216,61 @@ async def bulk_create_users_from_csv(
     has_discord: bool = True,
     has_smurf: bool = True,
     has_twitch: bool = True,
-) -> None:
-    file_reader = csv.reader(data, delimiter=delimiter)
-    for index, row in enumerate(file_reader, 0):
-        if index < start_row:
-            continue
-        battle_tag = row[battle_tag_row - 1].strip().replace(" #", "#").replace("# ", "#")
-        twitch = row[twitch_row - 1].strip() if has_twitch else None
-        discord = row[discord_row - 1].strip() if has_discord else None
-        smurfs = row[smurf_row - 1] if has_smurf else ""
-
-        try:
-            payload = schemas.UserCSV(
-                battle_tag=battle_tag_validator.findall(battle_tag)[0],
-                discord=discord,
-                twitch=twitch,
-                smurfs=battle_tag_validator.findall(smurfs),
-            )
-        except (IndexError, ValidationError):
-            logger.error(
-                f"Invalid data in row {index + 1} of {filename}: "
-                f"Battle Tag: {battle_tag}, Discord: {discord}, "
-                f"Twitch: {twitch}, Smurfs: {smurfs}"
-            )
-            continue
-
-        await create(session, payload)
+    chunk_size: int = 1000,
+) -> schemas.UserCSVImportReport:
+    """Import a registration sheet, `chunk_size` rows per transaction.
+
+    Rows are validated as they are read; every chunk of valid rows is then
+    written with `import_users`. Invalid rows are logged and reported.
+
+    Returns:
+        Counts of written rows and the skipped rows with their reason.
+    """
+    report = schemas.UserCSVImportReport()
+    columns = max(
+        battle_tag_row,
+        discord_row if has_discord else 0,
+        twitch_row if has_twitch else 0,
+        smurf_row if has_smurf else 0,
+    )
+    rows = itertools.islice(enumerate(csv.reader(data, delimiter=delimiter), 1), start_row, None)
+
+    for chunk in itertools.batched(rows, chunk_size):
+        entries: list[schemas.UserCSV] = []
+        for number, row in chunk:
+            if not any(value.strip() for value in row):
+                continue
+            report.rows += 1
+
+            reason = None
+            if len(row) < columns:
+                reason = "missing_columns"
+            else:
+                try:
+                    entries.append(
+                        _parse_csv_row(
+                            row,
+                            battle_tag_row=battle_tag_row,
+                            discord_row=discord_row,
+                            twitch_row=twitch_row,
+                            smurf_row=smurf_row,
+                            has_discord=has_discord,
+                            has_smurf=has_smurf,
+                            has_twitch=has_twitch,
+                        )
+                    )
+                except IndexError:
+                    reason = "invalid_battle_tag"
+                except ValidationError:
+                    reason = "validation_error"
+            if reason:
+                battle_tag = row[battle_tag_row - 1].strip() if len(row) >= battle_tag_row else None
+                logger.error(f"Invalid data in row {number} of {filename} ({reason}): {row}")
+                report.skipped.append(schemas.UserCSVSkippedRow(row=number, reason=reason, battle_tag=battle_tag))
+
+        if entries:
+            await import_users(session, entries, report)
+            await session.commit()
+        logger.info(f"Imported rows up to {chunk[-1][0]} of {filename}")
+
+    return report
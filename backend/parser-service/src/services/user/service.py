@@ -3,8 +3,9 @@ from datetime import UTC, datetime
 
 import sqlalchemy as sa
 from loguru import logger
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, aliased
 from sqlalchemy.orm.strategy_options import _AbstractLoad
 
 from src import models, schemas
@@ -131,6 +132,176 @@ async def find_by_csv(session: AsyncSession, data_in: schemas.UserCSV) -> models
     return None
 
 
+def _twitch_capitalized(column: typing.Any) -> typing.Any:
+    return sa.func.upper(sa.func.left(column, 1)).cast(sa.String) + sa.func.lower(sa.func.substring(column, 2)).cast(
+        sa.String
+    )
+
+
+async def find_ids_by_csv(session: AsyncSession, entries: typing.Sequence[schemas.UserCSV]) -> dict[int, int]:
+    """Set-based `find_by_csv`: match many CSV entries to existing users in one query.
+
+    Follows `find_by_csv`'s matching, ranked: user name, battle tag, discord,
+    twitch, then smurfs. Among equal matches the lowest user id wins.
+
+    Returns:
+        User id by position in `entries`; unmatched entries are missing.
+    """
+    if not entries:
+        return {}
+
+    values = sa.values(
+        sa.column("key", sa.Integer),
+        sa.column("battle_tag", sa.String),
+        sa.column("battle_tag_capitalized", sa.String),
+        sa.column("discord", sa.String),
+        sa.column("twitch", sa.String),
+        sa.column("twitch_capitalized", sa.String),
+        name="csv_values",
+    ).data(
+        [
+            (
+                key,
+                entry.battle_tag,
+                entry.battle_tag.capitalize(),
+                entry.discord or None,
+                entry.twitch or None,
+                entry.twitch.capitalize() if entry.twitch else None,
+            )
+            for key, entry in enumerate(entries)
+        ]
+    )
+    rows = sa.select(values).cte("csv_rows")
+
+    def match(priority: int, user_id: typing.Any, target: typing.Any, onclause: typing.Any) -> sa.Select:
+        return sa.select(rows.c.key, user_id.label("user_id"), sa.literal(priority).label("priority")).join(
+            target, onclause
+        )
+
+    parts = [
+        match(
+            0,
+            models.User.id,
+            models.User,
+            sa.or_(
+                models.User.name == rows.c.battle_tag,
+                models.User.name == rows.c.battle_tag_capitalized,
+                sa.func.initcap(models.User.name) == rows.c.battle_tag,
+            ),
+        ),
+        match(
+            1,
+            models.UserBattleTag.user_id,
+            models.UserBattleTag,
+            sa.or_(
+                models.UserBattleTag.battle_tag == rows.c.battle_tag,
+                sa.func.initcap(models.UserBattleTag.battle_tag) == rows.c.battle_tag,
+            ),
+        ),
+        match(2, models.UserDiscord.user_id, models.UserDiscord, models.UserDiscord.name == rows.c.discord),
+        match(
+            3,
+            models.UserTwitch.user_id,
+            models.UserTwitch,
+            sa.and_(
+                rows.c.twitch.is_not(None),
+                sa.or_(
+                    models.UserTwitch.name == rows.c.twitch,
+                    _twitch_capitalized(models.UserTwitch.name) == rows.c.twitch_capitalized,
+                    sa.func.initcap(models.UserTwitch.name) == rows.c.twitch,
+                    models.UserTwitch.name == rows.c.twitch_capitalized,
+                    _twitch_capitalized(models.UserTwitch.name) == rows.c.battle_tag,
+                ),
+            ),
+        ),
+    ]
+
+    smurfs = [(key, smurf) for key, entry in enumerate(entries) for smurf in entry.smurfs]
+    if smurfs:
+        smurf_rows = sa.values(
+            sa.column("key", sa.Integer), sa.column("battle_tag", sa.String), name="csv_smurfs"
+        ).data(smurfs)
+        parts.append(
+            sa.select(
+                smurf_rows.c.key, models.UserBattleTag.user_id.label("user_id"), sa.literal(4).label("priority")
+            ).join(
+                models.UserBattleTag,
+                sa.or_(
+                    models.UserBattleTag.battle_tag == smurf_rows.c.battle_tag,
+                    sa.func.initcap(models.UserBattleTag.battle_tag) == smurf_rows.c.battle_tag,
+                ),
+            )
+        )
+
+    matches = sa.union_all(*parts).subquery("matches")
+    query = (
+        sa.select(matches.c.key, matches.c.user_id)
+        .distinct(matches.c.key)
+        .order_by(matches.c.key, matches.c.priority, matches.c.user_id)
+    )
+    result = await session.execute(query)
+    return {key: user_id for key, user_id in result.all()}
+
+
+async def upsert_users(session: AsyncSession, names: typing.Collection[str]) -> dict[str, int]:
+    """Create users by name in one statement, returning the ids of new and existing ones."""
+    if not names:
+        return {}
+    stmt = pg_insert(models.User).values([{"name": name} for name in names])
+    stmt = stmt.on_conflict_do_update(index_elements=[models.User.name], set_={"updated_at": sa.func.now()})
+    result = await session.execute(stmt.returning(models.User.id, models.User.name))
+    return {name: user_id for user_id, name in result.all()}
+
+
+async def rename_users(session: AsyncSession, names: typing.Mapping[int, str]) -> int:
+    """Rename users by id in one statement, skipping names another user already has.
+
+    Returns:
+        Number of renamed users.
+    """
+    if not names:
+        return 0
+    renames = sa.values(sa.column("id", sa.BigInteger), sa.column("name", sa.String), name="renames").data(
+        list(names.items())
+    )
+    taken = aliased(models.User)
+    stmt = (
+        sa.update(models.User)
+        .where(
+            models.User.id == renames.c.id,
+            models.User.name != renames.c.name,
+            ~sa.exists().where(taken.name == renames.c.name, taken.id != renames.c.id),
+        )
+        .values(name=renames.c.name, updated_at=sa.func.now())
+        .returning(models.User.id)
+    )
+    result = await session.execute(stmt)
+    return len(result.all())
+
+
+async def insert_identities(
+    session: AsyncSession,
+    model: type[models.UserBattleTag | models.UserDiscord | models.UserTwitch],
+    rows: typing.Sequence[dict[str, typing.Any]],
+    unique_column: str,
+) -> int:
+    """Insert battle tag / discord / twitch rows, ignoring values some user already has.
+
+    Returns:
+        Number of inserted rows.
+    """
+    if not rows:
+        return 0
+    stmt = (
+        pg_insert(model)
+        .values(list(rows))
+        .on_conflict_do_nothing(index_elements=[unique_column])
+        .returning(model.id)
+    )
+    result = await session.execute(stmt)
+    return len(result.all())
+
+
 async def find_by_battle_tag(session: AsyncSession, battle_tag: str, entities: list[str]) -> models.User | None:
     query = (
         sa.select(models.User)
@@ -169,6 +340,51 @@ async def find_by_battle_tag(session: AsyncSession, battle_tag: str, entities: l
     return None
 
 
+async def find_ids_by_battle_tags(session: AsyncSession, battle_tags: typing.Iterable[str]) -> dict[str, int]:
+    """Set-based `find_by_battle_tag`: resolve many battle tags to user ids in one query.
+
+    Matches on `User.name` win over matches on `UserBattleTag`, as in
+    `find_by_battle_tag`; among equal matches the lowest user id wins.
+
+    Returns:
+        User id by battle tag; tags without a user are missing.
+    """
+    battle_tags = list(dict.fromkeys(battle_tags))
+    if not battle_tags:
+        return {}
+
+    values = sa.values(sa.column("battle_tag", sa.String), name="tag_values").data([(tag,) for tag in battle_tags])
+    tags = sa.select(values).cte("tags")
+    by_name = sa.select(tags.c.battle_tag, models.User.id.label("user_id"), sa.literal(0).label("priority")).join(
+        models.User,
+        sa.or_(
+            models.User.name == tags.c.battle_tag,
+            sa.func.initcap(models.User.name) == tags.c.battle_tag,
+        ),
+    )
+    by_battle_tag = sa.select(
+        tags.c.battle_tag, models.UserBattleTag.user_id.label("user_id"), sa.literal(1).label("priority")
+    ).join(
+        models.UserBattleTag,
+        sa.or_(
+            models.UserBattleTag.battle_tag == tags.c.battle_tag,
+            sa.func.initcap(models.UserBattleTag.battle_tag) == tags.c.battle_tag,
+            sa.func.lower(models.UserBattleTag.battle_tag) == tags.c.battle_tag,
+            models.UserBattleTag.name == tags.c.battle_tag,
+            sa.func.initcap(models.UserBattleTag.name) == tags.c.battle_tag,
+            sa.func.lower(models.UserBattleTag.name) == tags.c.battle_tag,
+        ),
+    )
+    matches = sa.union_all(by_name, by_battle_tag).subquery("matches")
+    query = (
+        sa.select(matches.c.battle_tag, matches.c.user_id)
+        .distinct(matches.c.battle_tag)
+        .order_by(matches.c.battle_tag, matches.c.priority, matches.c.user_id)
+    )
+    result = await session.execute(query)
+    return {battle_tag: user_id for battle_tag, user_id in result.all()}
+
+
 async def get_battle_tag(session: AsyncSession, battle_tag: str) -> models.UserBattleTag | None:
     query = sa.select(models.UserBattleTag).where(
         sa.or_(
@@ -329,3 +545,31 @@ async def update(
     await session.commit()
     logger.info(f"Player updated [id={user.id} name={name}]")
     return user
+
+
+async def mark_profiles_stale(session: AsyncSession, user_ids: sa.Select) -> None:
+    """Flag the materialized profiles of the selected users for a background rebuild in app-service.
+
+    Dropping the claim makes a rebuild already running for one of them leave the flag set.
+    """
+    stmt = pg_insert(models.UserProfileSnapshot).from_select(["user_id"], user_ids.distinct())
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[models.UserProfileSnapshot.user_id],
+        set_={"is_stale": True, "claimed_at": None},
+    )
+    await session.execute(stmt)
+    await session.commit()
+
+
+async def mark_profiles_stale_by_teams(session: AsyncSession, team_ids: list[int]) -> None:
+    await mark_profiles_stale(
+        session, sa.select(models.Player.user_id).where(models.Player.team_id.in_(team_ids))
+    )
+    logger.info(f"Profiles of teams {team_ids} marked for rebuild")
+
+
+async def mark_profiles_stale_by_tournament(session: AsyncSession, tournament_id: int) -> None:
+    await mark_profiles_stale(
+        session, sa.select(models.Player.user_id).where(models.Player.tournament_id == tournament_id)
+    )
+    logger.info(f"Profiles of tournament {tournament_id} players marked for rebuild")
@@ -0,0 +1,20 @@
+import os
+
+# Required settings are validated when `src` is imported. The analytics tests
+# replace the database calls and never reach these services, so placeholders do.
+for name, value in {
+    "PROJECT_URL": "http://localhost",
+    "REDIS_URL": "redis://localhost:6379",
+    "POSTGRES_USER": "test",
+    "POSTGRES_PASSWORD": "test",
+    "POSTGRES_DB": "test",
+    "POSTGRES_HOST": "localhost",
+    "POSTGRES_PORT": "5432",
+    "CHALLONGE_USERNAME": "test",
+    "CHALLONGE_API_KEY": "test",
+    "S3_ACCESS_KEY": "test",
+    "S3_SECRET_KEY": "test",
+    "S3_ENDPOINT_URL": "http://localhost",
+    "S3_BUCKET_NAME": "test",
+}.items():
+    os.environ.setdefault(name, value)
@@ -0,0 +1,98 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from src.core import enums
+from src.services.analytics import backfill, flows, service
+
+ALGORITHM = SimpleNamespace(id=1)
+
+
+def _tournament(tournament_id: int, home_score: int, away_score: int) -> flows.OpenSkillTournament:
+    tournament = flows.OpenSkillTournament(tournament_id)
+    players = [
+        flows.RatedPlayer(user_id, enums.HeroClass.damage, 1600 - user_id * 100, False, False) for user_id in range(1, 5)
+    ]
+    tournament.players = {flows.get_id_role(player): player for player in players}
+    id_roles = list(tournament.players)
+    tournament.encounters.append(flows.RatedEncounter(tuple(id_roles[:2]), tuple(id_roles[2:]), home_score, away_score))
+    return tournament
+
+
+class RatingStore:
+    """In-memory stand-in for the `analytics_ratings` queries of `service`."""
+
+    def __init__(self) -> None:
+        self.tournaments = {tournament_id: _tournament(tournament_id, 3, 1) for tournament_id in (1, 2, 3, 4)}
+        self.rows: list[dict] = []
+
+    def install(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(service, "has_ratings_before", self.has_ratings_before)
+        monkeypatch.setattr(service, "get_unrated_tournament_ids", self.get_unrated_tournament_ids)
+        monkeypatch.setattr(service, "get_warm_up_tournament_ids", self.get_warm_up_tournament_ids)
+        monkeypatch.setattr(service, "get_previous_ratings", self.get_previous_ratings)
+        monkeypatch.setattr(service, "replace_ratings", self.replace_ratings)
+        monkeypatch.setattr(flows, "load_openskill_tournaments", self.load_openskill_tournaments)
+
+    def rated(self) -> set[int]:
+        return {row["tournament_id"] for row in self.rows}
+
+    async def has_ratings_before(self, session, algorithm_id, tournament_id):
+        return any(rated < tournament_id for rated in self.rated())
+
+    async def get_unrated_tournament_ids(self, session, algorithm_id, tournament_id):
+        rated = self.rated()
+        return [i for i in sorted(self.tournaments) if min(rated) <= i < tournament_id and i not in rated]
+
+    async def get_warm_up_tournament_ids(self, session, start_range, end_range):
+        return [i for i in sorted(self.tournaments) if start_range <= i <= end_range]
+
+    async def get_previous_ratings(self, session, algorithm_id, tournament_id, user_ids=None):
+        previous = {}
+        for row in sorted(self.rows, key=lambda row: row["tournament_id"]):
+            if row["tournament_id"] < tournament_id:
+                previous[(row["user_id"], row["role"])] = SimpleNamespace(**row)
+        return previous
+
+    async def replace_ratings(self, session, algorithm_id, tournament_ids, rows):
+        self.rows = [row for row in self.rows if row["tournament_id"] < min(tournament_ids)] + list(rows)
+
+    async def load_openskill_tournaments(self, session, start_range, end_range):
+        return [self.tournaments[i] for i in sorted(self.tournaments) if start_range <= i <= end_range]
+
+
+@pytest.fixture
+def store(monkeypatch: pytest.MonkeyPatch) -> RatingStore:
+    store = RatingStore()
+    store.install(monkeypatch)
+    return store
+
+
+def _rate(tournament_id: int) -> dict[str, tuple[float, float]]:
+    ratings = asyncio.run(flows.get_openskill_ratings(None, ALGORITHM, tournament_id))
+    return {id_role: (rating.mu, rating.sigma) for id_role, rating in ratings.items()}
+
+
+def _in_order(store: RatingStore, tournament_id: int) -> dict[str, tuple[float, float]]:
+    chain = [store.tournaments[i] for i in sorted(store.tournaments) if i <= tournament_id]
+    return backfill.compute_openskill(chain, {}).ratings[tournament_id]
+
+
+def test_recalculating_an_earlier_tournament_replays_the_tournaments_after_it(store: RatingStore) -> None:
+    for tournament_id in (1, 2, 3, 4):
+        _rate(tournament_id)
+
+    store.tournaments[2] = _tournament(2, 0, 3)
+    _rate(2)
+    assert store.rated() == {1, 2}
+
+    assert _rate(4) == pytest.approx(_in_order(store, 4))
+    assert store.rated() == {1, 2, 3, 4}
+
+
+def test_tournaments_never_calculated_are_replayed_first(store: RatingStore) -> None:
+    _rate(1)
+
+    assert _rate(3) == pytest.approx(_in_order(store, 3))
+    assert store.rated() == {1, 2, 3}
@@ -1,11 +1,54 @@
 """Centralized authentication client for validating JWT tokens."""
 
+import asyncio
+import base64
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import NamedTuple
+
 import httpx
 from loguru import logger
 
 from .circuit_breaker import CircuitBreakerOpen
 from .http_client import ResilientHttpClient
 
+# Local JWT verification is optional: services without python-jose/redis
+# installed keep validating every token remotely.
+try:
+    from jose import JWTError, jwt
+except ImportError:
+    jwt = None
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:
+    aioredis = None
+
+try:
+    from prometheus_client import Counter
+except ImportError:
+    Counter = None
+
+from shared.schemas.events import RBAC_CHANGED_CHANNEL, RbacChangedEvent
+
+TOKEN_CACHE_REQUESTS = (
+    Counter(
+        "auth_client_token_cache_requests_total",
+        "AuthClient validated-token cache lookups",
+        ["result"],
+    )
+    if Counter is not None
+    else None
+)
+
+
+class _CachedToken(NamedTuple):
+    expires_at: float  # time.monotonic() deadline
+    payload: dict | None  # None = token was rejected
+    user_id: str | None
+
 
 class AuthClient:
     """Client for interacting with the authentication service.
@@ -13,6 +56,17 @@ class AuthClient:
     This client validates JWT tokens by calling the auth service's validation endpoint.
     It uses the ResilientHttpClient for connection pooling, retries, and circuit breaking.
 
+    With ``local_validation=True`` access tokens are verified against the
+    public keys published at ``/.well-known/jwks.json`` and the RBAC part of
+    the ``/validate`` response is cached per user for ``rbac_cache_ttl``
+    seconds. Cache entries are dropped early when auth-service publishes an
+    ``RbacChangedEvent`` on Redis. If auth-service signs with a shared secret
+    (empty JWKS) the client transparently keeps calling ``/validate``.
+
+    Independently of that, validation results are kept in a bounded LRU keyed
+    by token hash, so repeated requests with one token (SSE, polling
+    dashboards) reach the auth service once.
+
     Example:
         ```python
         auth_client = AuthClient(base_url="http://auth:8001", timeout=5.0)
@@ -29,18 +83,60 @@ class AuthClient:
         ```
     """
 
-    def __init__(self, base_url: str, timeout: float = 5.0):
+    # Upper bound for the per-user RBAC cache; expired entries are pruned past it.
+    RBAC_CACHE_MAX_SIZE = 10_000
+    # Minimum delay between JWKS refetches triggered by an unknown `kid`.
+    JWKS_MIN_REFRESH_INTERVAL = 30.0
+    # Cached tokens are dropped this many seconds before they expire.
+    TOKEN_EXPIRY_LEEWAY = 5.0
+
+    def __init__(
+        self,
+        base_url: str,
+        timeout: float = 5.0,
+        *,
+        local_validation: bool = False,
+        rbac_cache_ttl: float = 60.0,
+        redis_url: str | None = None,
+        token_cache_size: int = 10_000,
+        token_cache_ttl: float = 300.0,
+        negative_cache_ttl: float = 10.0,
+    ):
         """Initialize the auth client.
 
         Args:
             base_url: Base URL of the auth service (e.g., "http://auth:8001")
             timeout: Request timeout in seconds
+            local_validation: Verify access tokens locally using the auth service JWKS
+            rbac_cache_ttl: Seconds a user's roles/permissions are served from cache
+            redis_url: Redis URL for RBAC change notifications (no early invalidation if omitted)
+            token_cache_size: Max validated tokens kept in the LRU (0 disables the cache)
+            token_cache_ttl: Upper bound for caching a valid token (also capped by its `exp`)
+            negative_cache_ttl: Seconds a rejected token is remembered
         """
         self._http = ResilientHttpClient(
             base_url=base_url,
             timeout=timeout,
             max_retries=2,  # Auth is latency-sensitive, don't retry too many times
         )
+        self._local_validation = local_validation and jwt is not None
+        if local_validation and jwt is None:
+            logger.warning("python-jose is not installed — falling back to remote token validation")
+
+        self._rbac_cache_ttl = rbac_cache_ttl
+        self._rbac_cache: dict[str, tuple[float, dict]] = {}
+        self._redis_url = redis_url
+        self._rbac_listener: asyncio.Task | None = None
+
+        self._jwks: dict[str, dict] = {}
+        self._jwks_fetched_at = 0.0
+
+        self._token_cache: OrderedDict[str, _CachedToken] = OrderedDict()
+        self._token_cache_size = token_cache_size
+        self._token_cache_ttl = token_cache_ttl
+        self._negative_cache_ttl = negative_cache_ttl
+        self._cache_counts = {"hit": 0, "negative_hit": 0, "miss": 0}
+        self._inflight: dict[str, asyncio.Future] = {}
 
     async def start(self) -> None:
         """Start the HTTP client with connection pooling.
@@ -49,15 +145,209 @@ class AuthClient:
         """
         await self._http.start()
 
+        if self._local_validation:
+            await self._refresh_jwks()
+        if self._redis_url and aioredis is not None:
+            self._rbac_listener = asyncio.create_task(self._listen_rbac_changes())
+
     async def close(self) -> None:
         """Close the HTTP client and clean up connections.
 
         Should be called during application shutdown.
         """
+        if self._rbac_listener is not None:
+            self._rbac_listener.cancel()
+            try:
+                await self._rbac_listener
+            except asyncio.CancelledError:
+                pass
+            self._rbac_listener = None
         await self._http.close()
 
+    def invalidate_rbac(self, user_id: int | str | None = None) -> None:
+        """Drop cached roles/permissions for one user, or for everyone when user_id is None.
+
+        Validated tokens embed the same RBAC data, so they are evicted too.
+        """
+        if user_id is None:
+            self._rbac_cache.clear()
+            self._token_cache.clear()
+            return
+
+        user_id = str(user_id)
+        self._rbac_cache.pop(user_id, None)
+        stale = [key for key, entry in self._token_cache.items() if entry.user_id == user_id]
+        for key in stale:
+            del self._token_cache[key]
+
+    async def _refresh_jwks(self) -> None:
+        self._jwks_fetched_at = time.monotonic()
+        try:
+            response = await self._http.get("/.well-known/jwks.json")
+            response.raise_for_status()
+            keys = response.json().get("keys", [])
+        except CircuitBreakerOpen:
+            logger.warning("Auth service circuit breaker is open — keeping current JWKS")
+            return
+        except Exception as e:
+            logger.warning(f"Failed to fetch JWKS from auth service: {e}")
+            return
+
+        self._jwks = {key["kid"]: key for key in keys if key.get("kid")}
+        if not self._jwks:
+            logger.info("Auth service publishes no signing keys — tokens are validated remotely")
+
+    async def _listen_rbac_changes(self) -> None:
+        """Evict cached RBAC entries on RbacChangedEvent, reconnecting on failure."""
+        while True:
+            client = aioredis.from_url(self._redis_url)
+            try:
+                async with client.pubsub() as pubsub:
+                    await pubsub.subscribe(RBAC_CHANGED_CHANNEL)
+                    # Events may have been missed while disconnected.
+                    self.invalidate_rbac()
+                    async for message in pubsub.listen():
+                        if message.get("type") != "message":
+                            continue
+                        try:
+                            event = RbacChangedEvent.model_validate_json(message["data"])
+                        except ValueError:
+                            logger.warning("Ignoring malformed RBAC change event")
+                            continue
+                        self.invalidate_rbac(event.user_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"RBAC change listener disconnected: {e}")
+                await asyncio.sleep(5)
+            finally:
+                await client.aclose()
+
+    def _decode_locally(self, token: str) -> dict | None:
+        """Verify signature/expiry against the JWKS.
+
+        Returns:
+            Claims for a valid access token, None for an invalid one
+
+        Raises:
+            LookupError: If the token was signed with a key we don't know
+        """
+        try:
+            header = jwt.get_unverified_header(token)
+        except JWTError:
+            return None
+
+        key = self._jwks.get(header.get("kid"))
+        if key is None:
+            raise LookupError(header.get("kid"))
+
+        try:
+            claims = jwt.decode(
+                token,
+                key,
+                algorithms=[key.get("alg", header.get("alg"))],
+                options={"verify_aud": False},
+            )
+        except JWTError:
+            return None
+
+        if claims.get("type") != "access" or not claims.get("sub"):
+            return None
+        return claims
+
+    async def _validate_locally(self, token: str) -> tuple[dict | None, bool]:
+        try:
+            claims = self._decode_locally(token)
+        except LookupError:
+            # Possibly a rotated key: refetch (rate limited) and retry once.
+            if time.monotonic() - self._jwks_fetched_at >= self.JWKS_MIN_REFRESH_INTERVAL:
+                await self._refresh_jwks()
+            try:
+                claims = self._decode_locally(token)
+            except LookupError:
+                return await self._validate_remote(token)
+
+        if claims is None:
+            return None, True
+
+        user_id = str(claims["sub"])
+        cached = self._rbac_cache.get(user_id)
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1], True
+
+        # Cache miss: /validate also confirms the user still exists and is active.
+        payload, definitive = await self._validate_remote(token)
+        if payload is not None:
+            self._store_rbac(user_id, payload)
+        return payload, definitive
+
+    def _store_rbac(self, user_id: str, payload: dict) -> None:
+        now = time.monotonic()
+        if len(self._rbac_cache) >= self.RBAC_CACHE_MAX_SIZE:
+            self._rbac_cache = {k: v for k, v in self._rbac_cache.items() if v[0] > now}
+            if len(self._rbac_cache) >= self.RBAC_CACHE_MAX_SIZE:
+                self._rbac_cache.clear()
+        self._rbac_cache[user_id] = (now + self._rbac_cache_ttl, payload)
+
+    @staticmethod
+    def _token_key(token: str) -> str:
+        # Never keep raw bearer tokens in memory longer than the request.
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _token_exp(token: str) -> float | None:
+        """Read `exp` without verifying; only used to bound the cache TTL."""
+        try:
+            segment = token.split(".")[1]
+            claims = json.loads(base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4)))
+            return float(claims["exp"])
+        except (IndexError, KeyError, TypeError, ValueError):
+            return None
+
+    def _cache_get(self, key: str) -> tuple[bool, dict | None]:
+        entry = self._token_cache.get(key)
+        if entry is None:
+            return False, None
+        if entry.expires_at <= time.monotonic():
+            del self._token_cache[key]
+            return False, None
+        self._token_cache.move_to_end(key)
+        return True, entry.payload
+
+    def _cache_put(self, token: str, key: str, payload: dict | None) -> None:
+        if payload is None:
+            ttl = self._negative_cache_ttl
+        else:
+            ttl = self._token_cache_ttl
+            exp = self._token_exp(token)
+            if exp is not None:
+                ttl = min(ttl, exp - time.time() - self.TOKEN_EXPIRY_LEEWAY)
+        if ttl <= 0:
+            return
+
+        user_id = str(payload["sub"]) if payload and payload.get("sub") is not None else None
+        self._token_cache[key] = _CachedToken(time.monotonic() + ttl, payload, user_id)
+        self._token_cache.move_to_end(key)
+        while len(self._token_cache) > self._token_cache_size:
+            self._token_cache.popitem(last=False)
+
+    @property
+    def cache_stats(self) -> dict[str, int]:
+        """Token cache counters (hits include cached rejections)."""
+        return {"size": len(self._token_cache), **self._cache_counts}
+
+    def _record(self, result: str) -> None:
+        self._cache_counts[result] += 1
+        if TOKEN_CACHE_REQUESTS is not None:
+            TOKEN_CACHE_REQUESTS.labels(result=result).inc()
+
     async def validate_token(self, token: str) -> dict | None:
-        """Validate a JWT token with the auth service.
+        """Validate a JWT token.
+
+        Verified locally when a JWKS is available, otherwise via the auth service.
+        Results are cached in-process by token hash: valid tokens until shortly
+        before `exp`, rejected tokens for `negative_cache_ttl` seconds. Transient
+        failures (timeouts, 5xx) are never cached.
 
         Args:
             token: JWT token to validate
@@ -69,6 +359,39 @@ class AuthClient:
             CircuitBreakerOpen: If auth service circuit breaker is open
             Exception: For other unexpected errors
         """
+        key = self._token_key(token)
+        if self._token_cache_size > 0:
+            hit, payload = self._cache_get(key)
+            if hit:
+                self._record("hit" if payload is not None else "negative_hit")
+                return payload
+            self._record("miss")
+
+        # Concurrent requests with the same token share a single validation.
+        inflight = self._inflight.get(key)
+        if inflight is None:
+            inflight = asyncio.ensure_future(self._validate_uncached(token, key))
+            self._inflight[key] = inflight
+            inflight.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(inflight)
+
+    async def _validate_uncached(self, token: str, key: str) -> dict | None:
+        if self._local_validation and self._jwks:
+            payload, definitive = await self._validate_locally(token)
+        else:
+            payload, definitive = await self._validate_remote(token)
+
+        if definitive and self._token_cache_size > 0:
+            self._cache_put(token, key, payload)
+        return payload
+
+    async def _validate_remote(self, token: str) -> tuple[dict | None, bool]:
+        """Validate a JWT token with the auth service's `/validate` endpoint.
+
+        Returns:
+            (payload, definitive) — `definitive` is False when the auth service
+            could not give an answer (timeouts, unexpected status codes)
+        """
         try:
             response = await self._http.post(
                 "/validate",
@@ -76,25 +399,25 @@ class AuthClient:
             )
 
             if response.status_code == 200:
-                return response.json()
+                return response.json(), True
             elif response.status_code == 401:
                 # Invalid token
-                return None
+                return None, True
             else:
                 logger.warning(
                     f"Unexpected status code from auth service: {response.status_code}",
                 )
-                return None
+                return None, False
 
         except CircuitBreakerOpen:
             logger.warning("Auth service circuit breaker is open — rejecting token validation")
             raise
         except httpx.TimeoutException:
             logger.warning("Auth service request timed out during token validation")
-            return None
+            return None, False
         except httpx.HTTPError:
             logger.exception("HTTP error validating token")
-            return None
+            return None, False
         except Exception:
             logger.exception("Unexpected error validating token")
             raise
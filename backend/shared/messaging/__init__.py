@@ -1,6 +1,8 @@
 """RabbitMQ messaging configuration with dead letter queues."""
 
 from .config import (
+    ACHIEVEMENT_EVENTS_DLQ,
+    ACHIEVEMENT_EVENTS_QUEUE,
     BALANCER_JOBS_DLQ,
     BALANCER_JOBS_QUEUE,
     DISCORD_COMMANDS_DLQ,
@@ -22,4 +24,6 @@ __all__ = [
     "PROCESS_MATCH_LOG_DLQ",
     "PROCESS_TOURNAMENT_LOGS_QUEUE",
     "PROCESS_TOURNAMENT_LOGS_DLQ",
+    "ACHIEVEMENT_EVENTS_QUEUE",
+    "ACHIEVEMENT_EVENTS_DLQ",
 ]
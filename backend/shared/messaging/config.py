@@ -73,6 +73,25 @@ PROCESS_TOURNAMENT_LOGS_DLQ = RabbitQueue(
     durable=True,
 )
 
+# ============================================================================
+# Achievement Events Queue
+# ============================================================================
+
+ACHIEVEMENT_EVENTS_QUEUE = RabbitQueue(
+    "achievement_events",
+    durable=True,
+    arguments={
+        "x-dead-letter-exchange": "dlx",
+        "x-dead-letter-routing-key": "achievement_events.dlq",
+        "x-message-ttl": 600000,  # 10 minutes
+    },
+)
+
+ACHIEVEMENT_EVENTS_DLQ = RabbitQueue(
+    "achievement_events.dlq",
+    durable=True,
+)
+
 # ============================================================================
 # Balancer Jobs Queue
 # ============================================================================
@@ -1,20 +1,23 @@
-from sqlalchemy import ForeignKey
+from sqlalchemy import Enum, Float, ForeignKey, Index, Integer, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from shared.core import db
+from shared.core import db, enums
 from shared.models.team import Player, Team
 from shared.models.tournament import Tournament
+from shared.models.user import User
 
 __all__ = (
     "AnalyticsPlayer",
     "AnalyticsAlgorithm",
     "AnalyticsShift",
     "AnalyticsPredictions",
+    "AnalyticsRating",
 )
 
 
 class AnalyticsPlayer(db.TimeStampIntegerMixin):
     __tablename__ = "analytics_tournament"
+    __table_args__ = (UniqueConstraint("tournament_id", "player_id", name="uq_analytics_tournament_player"),)
 
     tournament_id: Mapped[int] = mapped_column(
         ForeignKey(Tournament.id, ondelete="CASCADE")
@@ -38,6 +41,7 @@ class AnalyticsAlgorithm(db.TimeStampIntegerMixin):
 
 class AnalyticsShift(db.TimeStampIntegerMixin):
     __tablename__ = "analytics_shifts"
+    __table_args__ = (UniqueConstraint("algorithm_id", "tournament_id", "player_id", name="uq_analytics_shift_player"),)
 
     tournament_id: Mapped[int] = mapped_column(
         ForeignKey(Tournament.id, ondelete="CASCADE")
@@ -54,6 +58,7 @@ class AnalyticsShift(db.TimeStampIntegerMixin):
 
 class AnalyticsPredictions(db.TimeStampIntegerMixin):
     __tablename__ = "analytics_predictions"
+    __table_args__ = (UniqueConstraint("algorithm_id", "tournament_id", "team_id", name="uq_analytics_prediction_team"),)
 
     tournament_id: Mapped[int] = mapped_column(
         ForeignKey(Tournament.id, ondelete="CASCADE")
@@ -63,3 +68,34 @@ class AnalyticsPredictions(db.TimeStampIntegerMixin):
     )
     team_id: Mapped[int] = mapped_column(ForeignKey(Team.id, ondelete="CASCADE"))
     predicted_place: Mapped[int] = mapped_column()
+
+
+class AnalyticsRating(db.TimeStampIntegerMixin):
+    """Rating state of a (user, role) after a tournament, per algorithm.
+
+    The next tournament starts from the latest earlier row instead of replaying
+    the whole history. Points uses `div`, `changes` and `shift`; Open Skill
+    uses `mu` and `sigma`.
+    """
+
+    __tablename__ = "analytics_ratings"
+    __table_args__ = (
+        Index("ix_analytics_ratings_lookup", "algorithm_id", "user_id", "role", "tournament_id"),
+        Index("ix_analytics_ratings_tournament", "algorithm_id", "tournament_id"),
+    )
+
+    tournament_id: Mapped[int] = mapped_column(
+        ForeignKey(Tournament.id, ondelete="CASCADE")
+    )
+    algorithm_id: Mapped[int] = mapped_column(
+        ForeignKey(AnalyticsAlgorithm.id, ondelete="CASCADE")
+    )
+    user_id: Mapped[int] = mapped_column(ForeignKey(User.id, ondelete="CASCADE"))
+    role: Mapped[enums.HeroClass | None] = mapped_column(
+        Enum(enums.HeroClass), nullable=True
+    )
+    div: Mapped[int | None] = mapped_column(Integer(), nullable=True)
+    changes: Mapped[int | None] = mapped_column(Integer(), nullable=True)
+    shift: Mapped[float | None] = mapped_column(Float(), nullable=True)
+    mu: Mapped[float | None] = mapped_column(Float(), nullable=True)
+    sigma: Mapped[float | None] = mapped_column(Float(), nullable=True)
@@ -1,9 +1,9 @@
-from sqlalchemy import Boolean, ForeignKey, String, BigInteger
+from sqlalchemy import Boolean, ForeignKey, Integer, String, BigInteger, Text, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from shared.core import db
 
-__all__ = ("TournamentDiscordChannel",)
+__all__ = ("TournamentDiscordChannel", "DiscordProcessedAttachment")
 
 
 class TournamentDiscordChannel(db.TimeStampIntegerMixin):
@@ -19,9 +19,37 @@ class TournamentDiscordChannel(db.TimeStampIntegerMixin):
     channel_id: Mapped[int] = mapped_column(BigInteger(), nullable=False, unique=True, index=True)
     channel_name: Mapped[str | None] = mapped_column(String(100), nullable=True)
     is_active: Mapped[bool] = mapped_column(Boolean(), default=True, nullable=False)
+    # Newest message id up to which the history has been scanned without failures
+    last_message_id: Mapped[int | None] = mapped_column(BigInteger(), nullable=True)
     
     # Relations
     tournament: Mapped["Tournament"] = relationship()
 
     def __repr__(self):
         return f"<TournamentDiscordChannel tournament_id={self.tournament_id} channel_id={self.channel_id}>"
+
+
+class DiscordProcessedAttachment(db.TimeStampIntegerMixin):
+    """Ledger of log attachments the Discord bot has handled, with the outcome of the last attempt"""
+    __tablename__ = "discord_processed_attachment"
+    __table_args__ = (
+        UniqueConstraint(
+            "channel_id", "message_id", "attachment_id", "size", name="uq_discord_processed_attachment"
+        ),
+    )
+
+    channel_id: Mapped[int] = mapped_column(BigInteger(), nullable=False)
+    message_id: Mapped[int] = mapped_column(BigInteger(), nullable=False)
+    attachment_id: Mapped[int] = mapped_column(BigInteger(), nullable=False)
+    size: Mapped[int] = mapped_column(BigInteger(), nullable=False)
+    tournament_id: Mapped[int] = mapped_column(ForeignKey("tournament.id", ondelete="CASCADE"), nullable=False)
+    filename: Mapped[str] = mapped_column(String(255), nullable=False)
+    status: Mapped[str] = mapped_column(String(20), nullable=False)  # "succeeded" | "failed"
+    error: Mapped[str | None] = mapped_column(Text(), nullable=True)
+    attempts: Mapped[int] = mapped_column(Integer(), default=1, nullable=False)
+
+    def __repr__(self):
+        return (
+            f"<DiscordProcessedAttachment message_id={self.message_id} "
+            f"attachment_id={self.attachment_id} status={self.status}>"
+        )
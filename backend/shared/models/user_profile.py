@@ -0,0 +1,28 @@
+import typing
+from datetime import datetime
+
+from sqlalchemy import Boolean, DateTime, ForeignKey, Index, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from shared.core import db
+from shared.models.user import User
+
+__all__ = ("UserProfileSnapshot",)
+
+
+class UserProfileSnapshot(db.TimeStampIntegerMixin):
+    """Materialized `/users/{id}/profile` document.
+
+    Rows are flagged stale by the parser whenever the user's matches or standings change
+    and rebuilt in the background by app-service.
+    """
+
+    __tablename__ = "user_profile_snapshot"
+    __table_args__ = (Index("ix_user_profile_snapshot_stale", "id", postgresql_where=text("is_stale IS TRUE")),)
+
+    user_id: Mapped[int] = mapped_column(ForeignKey(User.id, ondelete="CASCADE"), unique=True, index=True)
+    data: Mapped[dict[str, typing.Any] | None] = mapped_column(JSONB(), nullable=True)
+    is_stale: Mapped[bool] = mapped_column(Boolean(), default=True, server_default=text("true"))
+    # When a refresher took the stale row for a rebuild; the flag is only cleared once that rebuild is stored.
+    claimed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
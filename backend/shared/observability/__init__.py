@@ -6,6 +6,9 @@ This module provides:
 - OpenTelemetry distributed tracing
 - Enhanced health checks for dependencies
 - Shared time middleware
+- Spans and Prometheus histograms for background pipeline stages
+- Per-request SQL query budgets and N+1 detection
+- On-demand sampling profiler with flamegraph-ready output
 """
 
 from .logging import setup_logging, get_logger
@@ -13,6 +16,9 @@ from .correlation import CorrelationIdMiddleware, get_correlation_id
 from .tracing import setup_tracing, instrument_fastapi, instrument_sqlalchemy
 from .health import check_postgres, check_redis, check_rabbitmq
 from .time_middleware import TimeMiddleware
+from .pipelines import histogram, instrumented, observe_stage, stage
+from .query_budget import QueryBudgetExceeded, QueryBudgetMiddleware, instrument_query_counter, track_queries
+from .profiling import install_profiling_signal, profiler, profiling_router
 
 __all__ = [
     "setup_logging",
@@ -26,4 +32,15 @@ __all__ = [
     "check_redis",
     "check_rabbitmq",
     "TimeMiddleware",
+    "histogram",
+    "instrumented",
+    "observe_stage",
+    "stage",
+    "QueryBudgetExceeded",
+    "QueryBudgetMiddleware",
+    "instrument_query_counter",
+    "track_queries",
+    "install_profiling_signal",
+    "profiler",
+    "profiling_router",
 ]
@@ -0,0 +1,130 @@
+"""Spans and Prometheus histograms for background pipeline stages.
+
+Requests are covered by `instrument_fastapi`, `instrument_sqlalchemy` and the
+services' `/metrics` instrumentator, but the heavy pipelines (match log
+processing, achievement rules, standings, the balancer optimizer) run outside
+a request. Their stages are timed explicitly:
+
+    with stage("match_log", "kills", match_id=match.id):
+        ...
+
+    @instrumented("standings", "recalculate_groups")
+    async def recalculate_groups(...): ...
+
+Every stage opens an OpenTelemetry span named ``<pipeline>.<stage>`` (a no-op
+until `setup_tracing` installs a provider) and observes its duration in the
+``pipeline_stage_duration_seconds`` histogram, labelled by pipeline, stage and
+outcome. prometheus_client is optional: without it only spans are recorded.
+"""
+
+import functools
+import inspect
+import time
+import typing
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+
+from opentelemetry import trace
+
+try:
+    from prometheus_client import Histogram
+except ImportError:
+    Histogram = None
+
+__all__ = (
+    "STAGE_BUCKETS",
+    "histogram",
+    "instrumented",
+    "observe_stage",
+    "stage",
+)
+
+# Seconds, from sub-millisecond rule batches up to full tournament recalculations.
+STAGE_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+_tracer = trace.get_tracer("shared.observability.pipelines")
+_histograms: dict[str, typing.Any] = {}
+
+F = typing.TypeVar("F", bound=Callable[..., typing.Any])
+
+
+def histogram(
+    name: str,
+    documentation: str,
+    labelnames: typing.Sequence[str] = (),
+    buckets: typing.Sequence[float] = STAGE_BUCKETS,
+):
+    """Get or create a Prometheus histogram; None when prometheus_client is not installed.
+
+    Histograms are created once per process, so modules may call this at import
+    time without tripping the registry's duplicate check.
+    """
+    if Histogram is None:
+        return None
+    if name not in _histograms:
+        _histograms[name] = Histogram(name, documentation, labelnames, buckets=buckets)
+    return _histograms[name]
+
+
+PIPELINE_STAGE_SECONDS = histogram(
+    "pipeline_stage_duration_seconds",
+    "Duration of background pipeline stages",
+    ["pipeline", "stage", "outcome"],
+)
+
+
+def observe_stage(pipeline: str, name: str, seconds: float, outcome: str = "ok") -> None:
+    """Record a stage duration measured elsewhere (e.g. in a worker process)."""
+    if PIPELINE_STAGE_SECONDS is not None:
+        PIPELINE_STAGE_SECONDS.labels(pipeline, name, outcome).observe(seconds)
+
+
+@contextmanager
+def stage(pipeline: str, name: str, **attributes: str | int | float | bool | None) -> Iterator[trace.Span]:
+    """Time a pipeline stage as a span and a histogram observation.
+
+    Args:
+        pipeline: Pipeline the stage belongs to, e.g. ``"match_log"``.
+        name: Stage name, e.g. ``"kills"``.
+        **attributes: Span attributes; None values are dropped.
+
+    Yields:
+        The stage span, to add attributes or events while the stage runs.
+    """
+    span_attributes = {"pipeline": pipeline, "stage": name}
+    span_attributes.update({key: value for key, value in attributes.items() if value is not None})
+    outcome = "ok"
+    started = time.perf_counter()
+    with _tracer.start_as_current_span(f"{pipeline}.{name}", attributes=span_attributes) as span:
+        try:
+            yield span
+        except BaseException:
+            outcome = "error"
+            raise
+        finally:
+            observe_stage(pipeline, name, time.perf_counter() - started, outcome)
+
+
+def instrumented(pipeline: str, name: str | None = None) -> Callable[[F], F]:
+    """Decorator form of `stage` for sync and async functions; the stage defaults to the function name."""
+
+    def decorator(func: F) -> F:
+        stage_name = name or func.__name__
+
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with stage(pipeline, stage_name):
+                    return await func(*args, **kwargs)
+
+            return typing.cast(F, async_wrapper)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(pipeline, stage_name):
+                return func(*args, **kwargs)
+
+        return typing.cast(F, wrapper)
+
+    return decorator
@@ -0,0 +1,309 @@
+"""On-demand sampling profiler producing flamegraph-ready stacks per route.
+
+A capture samples the stacks of every thread of the process at a configurable
+rate for a bounded window. Nothing runs between captures, so it is safe to
+trigger in production.
+
+Threads are sampled with `sys._current_frames()` from a background thread. A
+thread sampled that way is mostly caught where it releases the GIL (socket or
+pipe I/O), so the main thread — the event loop, or the job of a worker
+process — is sampled with a CPU-time ``SIGPROF`` timer instead, when the
+capture was prepared from the main thread (see `SamplingProfiler.prepare`).
+
+Samples are aggregated in the collapsed ("folded") stack format read by
+flamegraph.pl, speedscope and Grafana's flame graph panel. The root frame of
+each stack is the request it belongs to, e.g. ``GET /users/{id}/compare``,
+found from the ``scope`` of the ASGI routing frames on the stack; other samples
+are rooted at their thread's name. Samples of an idle event loop are dropped.
+
+Two ways to start a capture without restarting the process:
+
+- HTTP: `profiling_router` adds ``POST /debug/profile?seconds=30&hz=100``; the
+  service includes it behind its admin dependency when profiling is enabled.
+- Signal: `install_profiling_signal` captures on ``SIGUSR2`` and writes the
+  folded stacks to a file, for workers without an HTTP server
+  (``kill -USR2 <pid>``).
+"""
+
+import asyncio
+import os
+import signal
+import sys
+import threading
+import time
+import typing
+from collections import Counter
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import FrameType
+
+from fastapi import APIRouter, HTTPException, Query, params
+from fastapi.responses import PlainTextResponse
+from loguru import logger
+
+__all__ = (
+    "ProfileResult",
+    "ProfilerBusy",
+    "SamplingProfiler",
+    "install_profiling_signal",
+    "profiler",
+    "profiling_router",
+)
+
+DEFAULT_HZ = 100
+MAX_HZ = 1000
+MAX_STACK_DEPTH = 256
+
+# Innermost frames of a thread waiting for work rather than running it.
+_IDLE_FRAMES = frozenset(
+    {("selectors.py", "select"), ("threading.py", "wait"), ("queue.py", "get"), ("thread.py", "_worker")}
+)
+
+
+class ProfilerBusy(RuntimeError):
+    """Raised when a capture is requested while another one is running."""
+
+
+@dataclass(slots=True)
+class ProfileResult:
+    """Samples of one capture window.
+
+    Attributes:
+        stacks: Sample count of every collapsed stack, root (route or thread) first.
+        samples: Samples taken, idle ones included.
+        duration: Length of the window in seconds.
+        hz: Requested sampling rate.
+    """
+
+    stacks: Counter[str] = field(default_factory=Counter)
+    samples: int = 0
+    duration: float = 0.0
+    hz: int = DEFAULT_HZ
+
+    def folded(self) -> str:
+        """Collapsed stacks, one ``frame;frame;frame count`` line each, hottest first."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def by_root(self) -> dict[str, int]:
+        """Samples per route (or thread), hottest first."""
+        roots: Counter[str] = Counter()
+        for stack, count in self.stacks.items():
+            roots[stack.split(";", 1)[0]] += count
+        return dict(roots.most_common())
+
+
+def _frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    filename = code.co_filename
+    if "site-packages" in filename:
+        filename = filename.rsplit("site-packages" + os.sep, 1)[-1]
+    elif filename.startswith(os.getcwd()):
+        filename = os.path.relpath(filename)
+    # The first line of the function rather than the sampled line, so samples aggregate per function.
+    return f"{code.co_qualname} ({filename}:{code.co_firstlineno})".replace(";", ":")
+
+
+def _frame_route(frame: FrameType) -> str | None:
+    if "scope" not in frame.f_code.co_varnames:
+        return None
+    scope = frame.f_locals.get("scope")
+    if not isinstance(scope, dict) or scope.get("type") != "http":
+        return None
+    route = scope.get("route")
+    return f"{scope.get('method', '')} {getattr(route, 'path', None) or scope.get('path', '')}".strip()
+
+
+class SamplingProfiler:
+    """Samples the stacks of all threads of the process during a capture window."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._timer_ready = False
+        # Main thread samples of the running capture, recorded by the SIGPROF handler.
+        self._timer_stacks: Counter[str] | None = None
+        self._timer_samples = 0
+
+    @property
+    def running(self) -> bool:
+        return self._lock.locked()
+
+    def prepare(self) -> None:
+        """Install the SIGPROF handler sampling the main thread; a no-op outside the main thread.
+
+        Signal handlers can only be installed from the main thread, while captures
+        run in a background thread, so the capture entry points call this first.
+        """
+        if self._timer_ready or threading.current_thread() is not threading.main_thread():
+            return
+        if not hasattr(signal, "setitimer"):
+            return
+        signal.signal(signal.SIGPROF, self._on_timer)
+        self._timer_ready = True
+
+    def _on_timer(self, _signum: int, frame: FrameType | None) -> None:
+        stacks = self._timer_stacks
+        if stacks is None:
+            return
+        self._timer_samples += 1
+        main = threading.main_thread()
+        stack = self._stack(frame, main.ident or 0, {main.ident: main.name})
+        if stack is not None:
+            stacks[stack] += 1
+
+    def capture(self, seconds: float, hz: int = DEFAULT_HZ) -> ProfileResult:
+        """Sample for `seconds` in the calling thread and return the aggregated stacks.
+
+        Raises:
+            ProfilerBusy: If another capture is running.
+        """
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusy("A profile capture is already running")
+        hz = max(1, min(hz, MAX_HZ))
+        try:
+            self._stop.clear()
+            if self._timer_ready:
+                self._timer_stacks, self._timer_samples = Counter(), 0
+                signal.setitimer(signal.ITIMER_PROF, 1.0 / hz, 1.0 / hz)
+            try:
+                result = self._sample(seconds, hz, skip_main=self._timer_ready)
+            finally:
+                if self._timer_ready:
+                    signal.setitimer(signal.ITIMER_PROF, 0)
+                timer_stacks, self._timer_stacks = self._timer_stacks, None
+            if timer_stacks is not None:
+                result.stacks.update(timer_stacks)
+                result.samples += self._timer_samples
+            return result
+        finally:
+            self._lock.release()
+
+    async def capture_async(self, seconds: float, hz: int = DEFAULT_HZ) -> ProfileResult:
+        """`capture` from an async handler; the event loop keeps serving (and being sampled)."""
+        self.prepare()
+        return await asyncio.to_thread(self.capture, seconds, hz)
+
+    def stop(self) -> None:
+        """End the running capture early."""
+        self._stop.set()
+
+    def _sample(self, seconds: float, hz: int, skip_main: bool) -> ProfileResult:
+        result = ProfileResult(hz=hz)
+        interval = 1.0 / hz
+        skipped = {threading.get_ident()}
+        if skip_main:
+            skipped.add(threading.main_thread().ident)
+        started = time.perf_counter()
+        deadline = started + seconds
+
+        while not self._stop.is_set():
+            tick = time.perf_counter()
+            if tick >= deadline:
+                break
+            thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+            frames = sys._current_frames()
+            for thread_id, frame in frames.items():
+                if thread_id in skipped:
+                    continue
+                result.samples += 1
+                stack = self._stack(frame, thread_id, thread_names)
+                if stack is not None:
+                    result.stacks[stack] += 1
+            # Don't keep the sampled frames (and their locals) alive until the next tick.
+            del frames
+            self._stop.wait(max(0.0, interval - (time.perf_counter() - tick)))
+
+        result.duration = time.perf_counter() - started
+        return result
+
+    @staticmethod
+    def _stack(frame: FrameType | None, thread_id: int, thread_names: dict[int | None, str]) -> str | None:
+        if frame is not None and (os.path.basename(frame.f_code.co_filename), frame.f_code.co_name) in _IDLE_FRAMES:
+            return None
+        labels: list[str] = []
+        root: str | None = None
+        while frame is not None and len(labels) < MAX_STACK_DEPTH:
+            labels.append(_frame_label(frame))
+            # Innermost routing frame wins; walking outwards only fills in a missing route.
+            root = root or _frame_route(frame)
+            frame = frame.f_back
+        if not labels:
+            return None
+        labels.append(root or thread_names.get(thread_id) or f"thread-{thread_id}")
+        return ";".join(reversed(labels))
+
+
+profiler = SamplingProfiler()
+
+
+def install_profiling_signal(
+    output_dir: str | Path,
+    *,
+    seconds: float = 30.0,
+    hz: int = DEFAULT_HZ,
+    signum: int = signal.SIGUSR2,
+    on_signal: Callable[[], None] | None = None,
+) -> None:
+    """Capture a profile when the process receives `signum` and write it to `output_dir`.
+
+    The file is named ``<pid>-<unix time>.folded``. `on_signal` runs first on
+    every signal, e.g. to forward it to worker processes.
+    """
+    directory = Path(output_dir)
+
+    def run_capture() -> None:
+        try:
+            result = profiler.capture(seconds, hz)
+        except ProfilerBusy:
+            logger.warning("Profile capture requested while another one is running")
+            return
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"{os.getpid()}-{int(time.time())}.folded"
+        path.write_text(result.folded())
+        logger.info(f"Profile of {result.duration:.1f}s ({result.samples} samples) written to {path}")
+
+    def handler(_signum: int, _frame: FrameType | None) -> None:
+        if on_signal is not None:
+            on_signal()
+        profiler.prepare()
+        threading.Thread(target=run_capture, name="profiler", daemon=True).start()
+
+    signal.signal(signum, handler)
+
+
+def profiling_router(
+    dependencies: Sequence[params.Depends] | None = None,
+    max_seconds: int = 120,
+) -> APIRouter:
+    """Router with the on-demand capture endpoint; include it behind an admin dependency.
+
+    Example:
+        ```python
+        app.include_router(profiling_router(dependencies=[Depends(auth.require_role("admin"))]))
+        ```
+    """
+    router = APIRouter(prefix="/debug", tags=["Debug"], dependencies=dependencies)
+
+    @router.post("/profile", response_model=None)
+    async def capture_profile(
+        seconds: typing.Annotated[float, Query(gt=0, le=max_seconds)] = 30.0,
+        hz: typing.Annotated[int, Query(ge=1, le=MAX_HZ)] = DEFAULT_HZ,
+        format: typing.Annotated[typing.Literal["folded", "json"], Query()] = "folded",
+    ) -> PlainTextResponse | dict[str, typing.Any]:
+        """Sample the process for `seconds` and return the stacks (folded text) or a per-route summary."""
+        try:
+            result = await profiler.capture_async(seconds, hz)
+        except ProfilerBusy as exc:
+            raise HTTPException(status_code=409, detail=str(exc)) from exc
+        if format == "json":
+            return {
+                "duration": round(result.duration, 3),
+                "hz": result.hz,
+                "samples": result.samples,
+                "routes": result.by_root(),
+                "stacks": dict(result.stacks.most_common()),
+            }
+        return PlainTextResponse(result.folded())
+
+    return router
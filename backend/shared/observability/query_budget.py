@@ -0,0 +1,218 @@
+"""Per-request SQL statement counting, query budgets and N+1 detection.
+
+`instrument_query_counter` hooks an engine's cursor events; while a
+`track_queries()` block is active (the middleware opens one per request) every
+statement is counted, timed and reduced to its shape: literals and bind
+parameters replaced by ``?``, so a query issued once per loop iteration shows up
+as one shape executed many times — an N+1 candidate.
+
+`QueryBudgetMiddleware` reports the totals as ``X-DB-Query-Count`` and
+``X-DB-Query-Time`` headers and Prometheus histograms, logs requests over the
+budget or with N+1 candidates, and in strict mode (used by the test suites)
+raises `QueryBudgetExceeded` so such regressions fail CI.
+
+Example:
+    ```python
+    from shared.observability import QueryBudgetMiddleware, instrument_query_counter
+
+    instrument_query_counter(async_engine)
+    app.add_middleware(QueryBudgetMiddleware, budget=50, n_plus_one_threshold=20)
+    ```
+"""
+
+import re
+import time
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from loguru import logger
+from sqlalchemy import event
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import Response
+
+from .pipelines import histogram
+
+try:
+    from prometheus_client import Counter as PrometheusCounter
+except ImportError:
+    PrometheusCounter = None
+
+__all__ = (
+    "QueryBudgetExceeded",
+    "QueryBudgetMiddleware",
+    "QueryStats",
+    "instrument_query_counter",
+    "statement_shape",
+    "track_queries",
+)
+
+_query_stats_ctx: ContextVar["QueryStats | None"] = ContextVar("query_stats", default=None)
+
+_WHITESPACE = re.compile(r"\s+")
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_BIND_PARAMETER = re.compile(r"\$\d+(?:::[\w ]+(?:\[\])?)?|%\(\w+\)s|%s|(?<![:\w]):\w+\b")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PARAMETER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+
+DB_QUERIES = histogram(
+    "http_request_db_queries",
+    "SQL statements executed per HTTP request",
+    ["method", "route"],
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500),
+)
+DB_QUERY_SECONDS = histogram(
+    "http_request_db_query_duration_seconds",
+    "Total SQL statement time per HTTP request",
+    ["method", "route"],
+)
+N_PLUS_ONE = (
+    PrometheusCounter(
+        "http_request_db_n_plus_one_total",
+        "Requests that repeated a statement shape at least the N+1 threshold times",
+        ["method", "route"],
+    )
+    if PrometheusCounter is not None
+    else None
+)
+
+
+class QueryBudgetExceeded(RuntimeError):
+    """Raised in strict mode when a request goes over its query budget or repeats a statement shape."""
+
+
+def statement_shape(statement: str) -> str:
+    """Reduce a SQL statement to its shape: literals, bind parameters and IN lists collapse to ``?``."""
+    shape = _STRING_LITERAL.sub("?", statement)
+    shape = _BIND_PARAMETER.sub("?", shape)
+    shape = _NUMBER.sub("?", shape)
+    shape = _PARAMETER_LIST.sub("(?)", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+@dataclass(slots=True)
+class QueryStats:
+    """Statements executed inside one `track_queries` block."""
+
+    count: int = 0
+    duration: float = 0.0
+    shapes: Counter[str] = field(default_factory=Counter)
+
+    def record(self, statement: str, duration: float) -> None:
+        self.count += 1
+        self.duration += duration
+        self.shapes[statement_shape(statement)] += 1
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        """Statement shapes executed at least `threshold` times, most frequent first."""
+        return [(shape, count) for shape, count in self.shapes.most_common() if count >= threshold]
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """Count the statements executed in this context (tasks started inside it included).
+
+    Example:
+        ```python
+        with track_queries() as stats:
+            await flows.get_tournaments(session)
+        assert stats.count <= 3
+        ```
+    """
+    stats = QueryStats()
+    token = _query_stats_ctx.set(stats)
+    try:
+        yield stats
+    finally:
+        _query_stats_ctx.reset(token)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if _query_stats_ctx.get() is not None:
+        conn.info.setdefault("query_budget_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    stats = _query_stats_ctx.get()
+    started = conn.info.get("query_budget_started")
+    if stats is not None and started:
+        stats.record(statement, time.perf_counter() - started.pop())
+
+
+def _handle_error(exception_context) -> None:
+    # Failed statements still count; after_cursor_execute is not called for them.
+    stats = _query_stats_ctx.get()
+    connection = exception_context.connection
+    started = connection.info.get("query_budget_started") if connection is not None else None
+    if stats is not None and started and exception_context.statement is not None:
+        stats.record(exception_context.statement, time.perf_counter() - started.pop())
+
+
+def instrument_query_counter(engine) -> None:
+    """Count the statements of `engine` (sync or async) inside `track_queries` blocks."""
+    target = getattr(engine, "sync_engine", engine)
+    if event.contains(target, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(target, "before_cursor_execute", _before_cursor_execute)
+    event.listen(target, "after_cursor_execute", _after_cursor_execute)
+    event.listen(target, "handle_error", _handle_error)
+
+
+class QueryBudgetMiddleware(BaseHTTPMiddleware):
+    """Middleware enforcing a per-request SQL statement budget.
+
+    - Adds X-DB-Query-Count and X-DB-Query-Time (seconds) headers
+    - Observes the totals in Prometheus histograms labelled by route template
+    - Logs requests over `budget` statements or repeating a statement shape
+      `n_plus_one_threshold` times, with the offending shapes
+    - With `strict=True`, raises `QueryBudgetExceeded` for such requests
+
+    Only engines passed to `instrument_query_counter` are counted.
+    """
+
+    def __init__(self, app, budget: int = 50, n_plus_one_threshold: int = 20, strict: bool = False) -> None:
+        super().__init__(app)
+        self.budget = budget
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.strict = strict
+
+    async def dispatch(self, request: Request, call_next) -> Response:
+        with track_queries() as stats:
+            response = await call_next(request)
+
+        response.headers["X-DB-Query-Count"] = str(stats.count)
+        response.headers["X-DB-Query-Time"] = f"{stats.duration:.6f}"
+
+        route = getattr(request.scope.get("route"), "path", "unmatched")
+        if DB_QUERIES is not None:
+            DB_QUERIES.labels(request.method, route).observe(stats.count)
+            DB_QUERY_SECONDS.labels(request.method, route).observe(stats.duration)
+
+        problems = self._problems(stats)
+        if problems:
+            repeated = stats.repeated(self.n_plus_one_threshold)
+            if repeated and N_PLUS_ONE is not None:
+                N_PLUS_ONE.labels(request.method, route).inc()
+            logger.bind(
+                method=request.method,
+                path=request.url.path,
+                route=route,
+                query_count=stats.count,
+                query_time_ms=round(stats.duration * 1000, 2),
+                n_plus_one=[{"shape": shape[:300], "count": count} for shape, count in repeated[:5]],
+            ).warning(f"SQL query budget exceeded: {'; '.join(problems)}")
+            if self.strict:
+                raise QueryBudgetExceeded(f"{request.method} {request.url.path}: {'; '.join(problems)}")
+
+        return response
+
+    def _problems(self, stats: QueryStats) -> list[str]:
+        problems = []
+        if stats.count > self.budget:
+            problems.append(f"{stats.count} statements (budget {self.budget})")
+        for shape, count in stats.repeated(self.n_plus_one_threshold)[:3]:
+            problems.append(f"N+1 candidate x{count}: {shape[:120]}")
+        return problems
@@ -60,6 +60,58 @@ class ProcessTournamentLogsEvent(BaseEvent):
     tournament_id: int = Field(..., description="Tournament ID to process logs for")
 
 
+class MatchProcessedEvent(BaseEvent):
+    """Event signalling that match logs were (re)processed.
+
+    Published by: parser-service (match log processing)
+    Consumed by: parser-service (achievement worker)
+    """
+
+    event_type: str = Field(default="match_processed", frozen=True)
+    tournament_id: int = Field(..., description="Tournament the match belongs to")
+    match_id: int | None = Field(
+        default=None, description="Processed match, or None when several matches of the tournament changed"
+    )
+
+
+class StandingsCalculatedEvent(BaseEvent):
+    """Event signalling that standings of a tournament were (re)calculated.
+
+    Published by: parser-service (standings)
+    Consumed by: parser-service (achievement worker)
+    """
+
+    event_type: str = Field(default="standings_calculated", frozen=True)
+    tournament_id: int = Field(..., description="Tournament whose standings changed")
+
+
+# Redis pub/sub channel for StandingsChangedEvent (fan-out to every app-service replica).
+STANDINGS_CHANGED_CHANNEL = "parser:standings_changed"
+
+
+class StandingsChangedEvent(BaseEvent):
+    """Event signalling that stored standings rows changed.
+
+    Published by: parser-service (standings)
+    Consumed by: app-service (response cache invalidation)
+    """
+
+    event_type: str = Field(default="standings_changed", frozen=True)
+    tournament_id: int = Field(..., description="Tournament whose standings changed")
+    group_ids: list[int] = Field(default_factory=list, description="Groups with changed rows")
+
+
+class TournamentFinishedEvent(BaseEvent):
+    """Event signalling that a tournament was marked as finished.
+
+    Published by: parser-service (tournament)
+    Consumed by: parser-service (achievement worker)
+    """
+
+    event_type: str = Field(default="tournament_finished", frozen=True)
+    tournament_id: int = Field(..., description="Finished tournament")
+
+
 class BalancerJobEvent(BaseEvent):
     """Event for scheduling a balancer job.
 
@@ -69,3 +121,18 @@ class BalancerJobEvent(BaseEvent):
 
     event_type: str = Field(default="balancer_job", frozen=True)
     job_id: str = Field(..., description="Balancer job identifier")
+
+
+# Redis pub/sub channel for RbacChangedEvent (fan-out to every validating replica).
+RBAC_CHANGED_CHANNEL = "auth:rbac_changed"
+
+
+class RbacChangedEvent(BaseEvent):
+    """Event signalling that cached roles/permissions are stale.
+
+    Published by: auth-service (RBAC routes)
+    Consumed by: AuthClient in every service that validates user tokens
+    """
+
+    event_type: str = Field(default="rbac_changed", frozen=True)
+    user_id: int | None = Field(default=None, description="Affected user, or None when any user may be affected")
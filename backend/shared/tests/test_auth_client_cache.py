@@ -0,0 +1,86 @@
+import asyncio
+import time
+
+from jose import jwt
+
+from shared.clients import AuthClient
+
+
+def _token(sub: str, expires_in: float = 600) -> str:
+    return jwt.encode({"sub": sub, "type": "access", "exp": int(time.time() + expires_in)}, "secret")
+
+
+def _client_with_fake_remote(**kwargs) -> tuple[AuthClient, list[str]]:
+    client = AuthClient(base_url="http://auth:8001", **kwargs)
+    calls: list[str] = []
+
+    async def fake_remote(token: str) -> tuple[dict | None, bool]:
+        calls.append(token)
+        await asyncio.sleep(0)
+        if token == "invalid":
+            return None, True
+        if token == "timeout":
+            return None, False
+        return {"sub": int(jwt.get_unverified_claims(token)["sub"])}, True
+
+    client._validate_remote = fake_remote
+    return client, calls
+
+
+def test_repeated_validation_hits_auth_service_once() -> None:
+    client, calls = _client_with_fake_remote()
+    token = _token("1")
+
+    async def run() -> list[dict | None]:
+        return await asyncio.gather(*(client.validate_token(token) for _ in range(10)))
+
+    results = asyncio.run(run())
+
+    assert results == [{"sub": 1}] * 10
+    assert len(calls) == 1
+    assert client.cache_stats["hit"] + client.cache_stats["miss"] == 10
+
+
+def test_invalid_tokens_are_negatively_cached_but_failures_are_not() -> None:
+    client, calls = _client_with_fake_remote()
+
+    async def run() -> None:
+        for _ in range(3):
+            assert await client.validate_token("invalid") is None
+            assert await client.validate_token("timeout") is None
+
+    asyncio.run(run())
+
+    assert calls.count("invalid") == 1
+    assert calls.count("timeout") == 3
+    assert client.cache_stats["negative_hit"] == 2
+
+
+def test_tokens_about_to_expire_are_not_cached() -> None:
+    client, calls = _client_with_fake_remote()
+    token = _token("1", expires_in=AuthClient.TOKEN_EXPIRY_LEEWAY / 2)
+
+    async def run() -> None:
+        await client.validate_token(token)
+        await client.validate_token(token)
+
+    asyncio.run(run())
+
+    assert len(calls) == 2
+
+
+def test_cache_is_bounded_and_evicted_on_rbac_change() -> None:
+    client, _ = _client_with_fake_remote(token_cache_size=2)
+
+    async def run() -> None:
+        for sub in ("1", "2", "3"):
+            await client.validate_token(_token(sub))
+
+    asyncio.run(run())
+    assert client.cache_stats["size"] == 2
+
+    client.invalidate_rbac(3)
+    assert client.cache_stats["size"] == 1
+
+    client.invalidate_rbac()
+    assert client.cache_stats["size"] == 0
@@ -18,11 +18,14 @@ export interface TeamData {
   roster: Record<string, PlayerData[]>;
 }
 
+export type BalancerSolver = "genetic" | "local_search" | "exact";
+
 export interface Statistics {
   averageMMR: number;
   mmrStdDev: number;
   totalTeams: number;
   playersPerTeam: number;
+  solver?: BalancerSolver | null;
 }
 
 export interface BalanceResponse {
@@ -42,6 +45,9 @@ export interface BalancerConfig {
   DISCOMFORT_WEIGHT?: number;
   INTRA_TEAM_VAR_WEIGHT?: number;
   MAX_DISCOMFORT_WEIGHT?: number;
+  SOLVER?: BalancerSolver | "auto";
+  EXACT_MAX_TEAMS?: number;
+  SMALL_INSTANCE_MAX_TEAMS?: number;
   USE_CAPTAINS?: boolean;
   ROLE_MAPPING?: Record<string, string>;
 }
@@ -58,6 +64,7 @@ export interface BalanceJobProgress {
   current?: number;
   total?: number;
   percent?: number;
+  best_cost?: number;
 }
 
 export interface BalanceJobEvent {